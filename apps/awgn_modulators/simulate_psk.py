@@ -55,6 +55,9 @@ class VerySimplePskSimulationRunner(SimulationRunner):
         self.rep_max = 1000
         self.max_bit_errors = 1. / 100. * self.NSymbs * self.rep_max
 
+        # Simulate 50 repetitions at once in _run_simulation_batch
+        self.reps_per_batch = 50
+
         # self.progressbar_message = None
         self.progressbar_message = "{0}-PSK".format(M) + \
                                    " Simulation - SNR: {SNR}"
@@ -70,8 +73,18 @@ class VerySimplePskSimulationRunner(SimulationRunner):
         The implementation of this method is required by every subclass of
         SimulationRunner.
         """
+        return self._run_simulation_batch(current_parameters, 1)
+
+    def _run_simulation_batch(self, current_parameters, num_reps):
+        """The _run_simulation_batch method simulates `num_reps`
+        repetitions at once.
+
+        Since each repetition is cheap, all `num_reps` repetitions are
+        simulated as a single transmission of `num_reps * NSymbs` symbols
+        and the returned results are the sums for all of them.
+        """
         # xxxxx Input parameters (set in the constructor) xxxxxxxxxxxxxxxxx
-        NSymbs = self.NSymbs
+        NSymbs = self.NSymbs * num_reps
         M = self.modulator.M
         SNR = current_parameters["SNR"]
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -415,9 +415,9 @@ def simulate_general(runner, results_filename):
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
     # xxxxxxxxxx Perform the simulation xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-    # The simulation will be run either in parallel or serially depending
-    # if the IPython engines are running or not.
-    run_in_parallel = True
+    # The simulation will be run in parallel either in the IPython engines,
+    # if they are running, or in a pool of local processes.
+    run_in_ipython_engines = True
     # noinspection PyBroadException,PyBroadException
     try:
         # If we can get an IPython view that means that the IPython engines
@@ -443,16 +443,16 @@ def simulate_general(runner, results_filename):
         lview = cl.load_balanced_view()
     except Exception:  # pylint: disable=W0703
         # If we can't get an IPython view then we will perform the
-        # simulation serially
-        run_in_parallel = False
+        # simulation in all cores of the local machine
+        run_in_ipython_engines = False
 
-    if run_in_parallel is True:
+    if run_in_ipython_engines is True:
         print("-----> Simulation will be run in Parallel")
         # noinspection PyUnboundLocalVariable
         runner.simulate_in_parallel(lview)
     else:
-        print("-----> Simulation will be run serially")
-        runner.simulate()
+        print("-----> Simulation will be run in Parallel (local processes)")
+        runner.simulate_in_parallel()
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
     print("Runned iterations: {0}".format(runner.runned_reps))
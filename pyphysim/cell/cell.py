@@ -22,7 +22,7 @@ import math
 
 from ..cell import shapes
 
-__all__ = ['Node', 'AccessPoint', 'CellBase', 'Cell', 'Cell3Sec',
+__all__ = ['Node', 'UserStore', 'AccessPoint', 'CellBase', 'Cell', 'Cell3Sec',
            'CellSquare', 'CellWrap', 'Cluster', 'Grid']
 
 
@@ -49,11 +49,22 @@ class Node(shapes.Coordinate):
         The ID of the cell where the Node is located.
     parent_pos : complex
         The position of the cell where the Node is located (if any).
+
+    Notes
+    -----
+    When the Node is a user in a cell managed by a :class:`UserStore`,
+    its position and marker color are kept in the arrays of that store
+    and the Node works as a view into them.
     """
 
     def __init__(self,
                  pos, plot_marker='*', marker_color='r',
                  cell_id=None, parent_pos=None):
+        # UserStore holding the position and color of the Node (if any)
+        # and the index of the Node in that store.
+        self._store = None
+        self._store_index = None
+
         shapes.Coordinate.__init__(self, pos)
         self.plot_marker = plot_marker
         self.marker_color = marker_color
@@ -66,6 +77,68 @@ class Node(shapes.Coordinate):
         if parent_pos is not None:
             self._relative_pos = pos - parent_pos
 
+    @property
+    def pos(self):
+        """
+        Get the Node position.
+
+        Returns
+        -------
+        complex
+            The Node position.
+        """
+        if self._store is None:
+            return self._pos
+        # pylint: disable=W0212
+        return self._store._positions[self._store_index]
+
+    @pos.setter
+    def pos(self, value):
+        """
+        Set the Node position.
+
+        Parameters
+        ----------
+        value : complex
+            The new Node position.
+        """
+        if self._store is None:
+            self._pos = value
+        else:
+            # pylint: disable=W0212
+            self._store._positions[self._store_index] = value
+
+    @property
+    def marker_color(self):
+        """
+        Get the color used to plot the Node marker.
+
+        Returns
+        -------
+        str
+            The marker color.
+        """
+        if self._store is None:
+            return self._marker_color
+        # pylint: disable=W0212
+        return self._store._colors[self._store_index]
+
+    @marker_color.setter
+    def marker_color(self, value):
+        """
+        Set the color used to plot the Node marker.
+
+        Parameters
+        ----------
+        value : str
+            The new marker color.
+        """
+        if self._store is None:
+            self._marker_color = value
+        else:
+            # pylint: disable=W0212
+            self._store._colors[self._store_index] = value
+
     @property
     def relative_pos(self):
         """
@@ -117,6 +190,340 @@ class Node(shapes.Coordinate):
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
 
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx UserStore class xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class UserStore(object):
+    """
+    Columnar storage for the users of a group of cells.
+
+    The positions, cell IDs and marker colors of all users in `cells`
+    are kept in contiguous numpy arrays, with the users ordered by cell
+    (in the order of `cells`) and then in the order they were added to
+    each cell. Each user (a :class:`Node`) becomes a view into these
+    arrays, so changing the position of a Node changes the store and
+    vice versa.
+
+    The store is updated lazily: whenever users are added to or removed
+    from the cells, the arrays are rebuilt the next time the store is
+    accessed.
+
+    Parameters
+    ----------
+    cells : list[AccessPoint]
+        The cells (or access points) whose users are stored.
+
+    Notes
+    -----
+    A Node is backed by a single store at a time. If the same users are
+    accessed through two different stores (e.g. the store of a Cluster
+    and the store of the Grid containing it) each store takes the users
+    back when accessed, which requires rebuilding its arrays.
+
+    Examples
+    --------
+    >>> c1 = AccessPoint(0, ap_id=1)
+    >>> c2 = AccessPoint(10, ap_id=2)
+    >>> c1.add_user(Node(1 + 1j))
+    >>> c2.add_user(Node(9))
+    >>> store = UserStore([c1, c2])
+    >>> store.positions
+    array([1.+1.j, 9.+0.j])
+    >>> store.cell_ids
+    array([1, 2])
+    >>> store.move_users(1j)
+    >>> c2.users[0].pos
+    (9+1j)
+    """
+
+    def __init__(self, cells):
+        self._cells = list(cells)
+
+        # Each element is a copy of the users list of a cell when the store
+        # was built. This is used to find out if the store needs to be
+        # rebuilt.
+        self._users_lists = None
+        # The Node objects currently bound to the store
+        self._nodes = []
+
+        self._positions = np.empty(0, dtype=complex)
+        self._colors = np.empty(0, dtype=object)
+        self._cell_ids = np.empty(0, dtype=object)
+        self._cell_indexes = np.empty(0, dtype=int)
+
+        # Extra per user attributes (name -> array)
+        self._attributes = {}
+
+    @property
+    def cells(self):
+        """
+        Get the cells whose users are stored.
+
+        Returns
+        -------
+        list[AccessPoint]
+            The cells whose users are stored.
+        """
+        return self._cells
+
+    def _is_up_to_date(self):
+        """
+        Check if the arrays in the store match the users in the cells.
+
+        Returns
+        -------
+        bool
+            True if the store does not need to be rebuilt.
+        """
+        if self._users_lists is None:
+            return False
+        # The users are compared by identity (Node does not implement
+        # __eq__), which also detects a user replaced by another one.
+        for cell, users in zip(self._cells, self._users_lists):
+            # pylint: disable=W0212
+            if cell._users != users:
+                return False
+        return True
+
+    def _release_nodes(self):
+        """
+        Copy the stored values back to the Node objects bound to the store
+        and unbind them.
+        """
+        for index, node in enumerate(self._nodes):
+            # pylint: disable=W0212
+            if node._store is self:
+                node._store = None
+                node._store_index = None
+                node._pos = complex(self._positions[index])
+                node._marker_color = self._colors[index]
+        self._nodes = []
+        self._users_lists = None
+
+    def update(self):
+        """
+        Rebuild the arrays if users were added to or removed from the
+        cells since the store was built.
+
+        Extra attributes set with :meth:`set_attribute` are discarded
+        when the arrays are rebuilt.
+        """
+        if self._is_up_to_date():
+            return
+
+        self._release_nodes()
+        # pylint: disable=W0212
+        users_lists = [list(cell._users) for cell in self._cells]
+        nodes = [u for users in users_lists for u in users]
+        num_users_per_cell = [len(users) for users in users_lists]
+
+        self._positions = np.array([u.pos for u in nodes], dtype=complex)
+        # The extra None element guarantees a 1D array of objects, even if
+        # the colors are tuples (RGB values, for instance)
+        self._colors = np.array([u.marker_color for u in nodes] + [None],
+                                dtype=object)[:-1]
+        self._cell_indexes = np.repeat(np.arange(len(self._cells)),
+                                       num_users_per_cell)
+        cell_ids = np.array([c.id for c in self._cells] + [None],
+                            dtype=object)[:-1]
+        if all(isinstance(i, (int, np.integer)) for i in cell_ids):
+            cell_ids = cell_ids.astype(int)
+        self._cell_ids = cell_ids[self._cell_indexes]
+        self._attributes = {}
+
+        for index, node in enumerate(nodes):
+            if node._store is not None:
+                # The node was bound to another store, which will need to
+                # be rebuilt the next time it is accessed.
+                node._store._users_lists = None
+            node._store = self
+            node._store_index = index
+
+        self._nodes = nodes
+        self._users_lists = users_lists
+
+    @property
+    def num_users(self):
+        """
+        Get the number of users in the store.
+
+        Returns
+        -------
+        int
+            The number of users.
+        """
+        self.update()
+        return self._positions.size
+
+    @property
+    def users(self):
+        """
+        Get the users in the store.
+
+        Returns
+        -------
+        list[Node]
+            The users, in the same order of the arrays in the store.
+        """
+        self.update()
+        return list(self._nodes)
+
+    @property
+    def positions(self):
+        """
+        Get the positions of all users.
+
+        The returned array is the storage itself. Changing it in place
+        moves the users (until the store is rebuilt).
+
+        Returns
+        -------
+        np.ndarray
+            The positions of all users (complex numbers).
+        """
+        self.update()
+        return self._positions
+
+    @positions.setter
+    def positions(self, value):
+        """
+        Set the positions of all users.
+
+        Parameters
+        ----------
+        value : np.ndarray
+            The new positions of all users.
+        """
+        self.update()
+        self._positions[:] = value
+
+    @property
+    def cell_ids(self):
+        """
+        Get the ID of the cell of each user.
+
+        Returns
+        -------
+        np.ndarray
+            The ID of the cell where each user is located.
+        """
+        self.update()
+        return self._cell_ids
+
+    @property
+    def cell_indexes(self):
+        """
+        Get the index (in `cells`) of the cell of each user.
+
+        Contrary to the cell IDs, these indexes are unique even when
+        the cells belong to different clusters.
+
+        Returns
+        -------
+        np.ndarray
+            The index of the cell where each user is located.
+        """
+        self.update()
+        return self._cell_indexes
+
+    @property
+    def colors(self):
+        """
+        Get the marker color of each user.
+
+        Returns
+        -------
+        np.ndarray
+            The marker color of each user.
+        """
+        self.update()
+        return self._colors
+
+    def move_users(self, displacements):
+        """
+        Move all users at once.
+
+        Parameters
+        ----------
+        displacements : complex | np.ndarray
+            The displacement of all users (a single complex number) or of
+            each user (an array with one complex number per user).
+        """
+        self.update()
+        self._positions += displacements
+
+    def set_attribute(self, name, values):
+        """
+        Set an extra attribute for all users.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        values : np.ndarray
+            The attribute value for each user. If it is a single value it
+            is repeated for all users.
+
+        Raises
+        ------
+        ValueError
+            If the number of values does not match the number of users.
+        """
+        num_users = self.num_users
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.repeat(values, num_users)
+        if values.shape[0] != num_users:
+            raise ValueError("Expected {0} values for the attribute '{1}' "
+                             "(got {2})".format(num_users, name,
+                                                values.shape[0]))
+        self._attributes[name] = values
+
+    def get_attribute(self, name):
+        """
+        Get an extra attribute previously set with :meth:`set_attribute`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+
+        Returns
+        -------
+        np.ndarray
+            The attribute value for each user.
+
+        Raises
+        ------
+        KeyError
+            If the attribute was not set (or the store was rebuilt since
+            then).
+        """
+        self.update()
+        return self._attributes[name]
+
+    def calc_dists(self, points):
+        """
+        Calculate the distance from each user to each point in `points`.
+
+        Parameters
+        ----------
+        points : complex | np.ndarray
+            The positions of the points (a 1D array of complex numbers).
+
+        Returns
+        -------
+        np.ndarray
+            The distances. Each row corresponds to a user and each column
+            to a point.
+        """
+        points = np.atleast_1d(points)
+        return np.abs(self.positions[:, np.newaxis] - points[np.newaxis, :])
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx AccessPoint class xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -486,8 +893,58 @@ class CellBase(AccessPoint, shapes.Shape):  # pylint: disable=W0223
             Minimum allowed (relative) distance between the cell center and
             the generated random user. The value must be between 0 and 0.7.
         """
-        for _ in range(num_users):
-            self.add_random_user(user_color, min_dist_ratio)
+        positions = self.calc_random_user_positions(num_users, min_dist_ratio)
+        for pos in positions:
+            new_user = Node(pos, cell_id=self.id, parent_pos=self.pos)
+            if user_color is not None:
+                new_user.marker_color = user_color
+            self._users.append(new_user)
+
+    def calc_random_user_positions(self, num_users, min_dist_ratio=0):
+        """
+        Calculate the positions of `num_users` users randomly located in
+        the cell.
+
+        The positions are uniformly distributed in the cell (excluding the
+        region closer to the cell center than `min_dist_ratio` times the
+        cell radius). All positions are drawn at once, by drawing candidate
+        positions in the bounding box of the cell and rejecting the ones
+        outside the cell. No user is added to the cell.
+
+        Parameters
+        ----------
+        num_users : int
+            Number of user positions.
+        min_dist_ratio : float
+            Minimum allowed (relative) distance between the cell center and
+            the generated random user. The value must be between 0 and 0.7.
+
+        Returns
+        -------
+        np.ndarray
+            The (absolute) positions of the users (a 1D numpy array of
+            complex numbers).
+        """
+        vertices = self.vertices
+        min_x = np.min(vertices.real)
+        max_x = np.max(vertices.real)
+        min_y = np.min(vertices.imag)
+        max_y = np.max(vertices.imag)
+        min_dist = min_dist_ratio * self.radius
+
+        positions = np.empty(0, dtype=complex)
+        while positions.size < num_users:
+            # Draw more candidates than needed, since some of them will be
+            # outside the cell
+            num_candidates = 2 * (num_users - positions.size) + 10
+            candidates = (
+                np.random.uniform(min_x, max_x, num_candidates) +
+                1j * np.random.uniform(min_y, max_y, num_candidates))
+            valid = (self.is_point_inside_shape(candidates) &
+                     (np.abs(candidates - self.pos) >= min_dist))
+            positions = np.hstack([positions, candidates[valid]])
+
+        return positions[:num_users]
 
     def plot_border(self, ax=None):  # pragma: no cover
         """
@@ -794,6 +1251,23 @@ class Cell3Sec(CellBase):
         # to `r`.
         return np.sqrt(3) * self.radius / 3.0
 
+    @property
+    def sector_boresight_angles(self):
+        """
+        Get method for the sector_boresight_angles property.
+
+        The boresight of each sector points from the cell center to the
+        center of the sector.
+
+        Returns
+        -------
+        np.ndarray
+            The boresight angles (in degrees) of the sectors 1, 2 and 3.
+        """
+        sec_positions = np.array(
+            [self._sec1.pos, self._sec2.pos, self._sec3.pos])
+        return np.angle(sec_positions - self.pos, deg=True)
+
     def _get_vertex_positions(self):
         """
         Calculates the vertex positions ignoring any rotation and
@@ -826,24 +1300,24 @@ class Cell3Sec(CellBase):
 
         return all_vertexes
 
-    def add_random_user_in_sector(self, sector, user_color=None,
-                                  min_dist_ratio=0):
+    def _get_sector(self, sector):
         """
-        Adds a user randomly located in the specified `sector` of the cell.
+        Get the hexagon corresponding to the specified `sector`.
 
         Parameters
         ----------
         sector : int
             The sector index. Can only be 1, 2 or 3.
-        user_color : str
-            Color of the user's marker.
-        min_dist_ratio : float
-            Minimum allowed (relative) distance between the cell center and
-            the generated random user. The value must be between 0 and 0.7.
 
         Returns
         -------
-        None
+        Cell
+            The hexagon of the sector.
+
+        Raises
+        ------
+        RuntimeError
+            If `sector` is not 1, 2 or 3.
         """
         if sector == 1:
             sec = self._sec1
@@ -853,7 +1327,28 @@ class Cell3Sec(CellBase):
             sec = self._sec3
         else:
             raise RuntimeError('Invalid sector number: {0}'.format(sector))
+        return sec
+
+    def add_random_user_in_sector(self, sector, user_color=None,
+                                  min_dist_ratio=0):
+        """
+        Adds a user randomly located in the specified `sector` of the cell.
+
+        Parameters
+        ----------
+        sector : int
+            The sector index. Can only be 1, 2 or 3.
+        user_color : str
+            Color of the user's marker.
+        min_dist_ratio : float
+            Minimum allowed (relative) distance between the cell center and
+            the generated random user. The value must be between 0 and 0.7.
 
+        Returns
+        -------
+        None
+        """
+        sec = self._get_sector(sector)
         sec.add_random_user(user_color, min_dist_ratio)
         self._users.extend(sec.users)
         sec.delete_all_users()
@@ -876,8 +1371,10 @@ class Cell3Sec(CellBase):
             Minimum allowed (relative) distance between the cell center and
             the generated random user. The value must be between 0 and 0.7.
         """
-        for _ in range(num_users):
-            self.add_random_user_in_sector(sector, user_color, min_dist_ratio)
+        sec = self._get_sector(sector)
+        sec.add_random_users(num_users, user_color, min_dist_ratio)
+        self._users.extend(sec.users)
+        sec.delete_all_users()
 
     # noinspection PyUnresolvedReferences
     def plot(self, ax=None):  # pragma: no cover
@@ -1278,11 +1775,6 @@ class Cluster(shapes.Shape):
         # Dictionary to store the wrapped cells (when wrap around is used)
         self._wrapped_cells = {}
 
-        # Each element is a list where the first element of that list if
-        # the position of the corresponding cell. The subsequent elements
-        # are the positions of that same cell wrapped somewhere.
-        self._cell_pos = []
-
         # This will be set later as a 2D numpy array with the difference of
         # the coordinates between each pair of cells (possibly considering
         # wrap around)
@@ -1318,7 +1810,31 @@ class Cluster(shapes.Shape):
                           cell_id,
                           cell_positions[index, 1])
             self._cells.append(c)
-            self._cell_pos.append([c.pos])
+
+        # Columnar storage of the users in the cells of the cluster
+        self._user_store = UserStore(self._cells)
+
+        # xxxxx Wrap around xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        # If True, distances and angles are calculated considering the
+        # closest wrapped image of each cell.
+        self._wrap_around = False
+
+        # Basis (two complex numbers) of the lattice of translations that
+        # map the cluster into its wrapped images. It is None if wrap
+        # around is not supported for this cluster.
+        self._wrap_around_basis = Cluster._calc_wrap_around_basis(
+            cell_radius, num_cells, cell_type, rotation)
+        if self._wrap_around_basis is not None:
+            v1, v2 = self._wrap_around_basis
+            # Matrix to get the coordinates of a point in the lattice
+            # basis (from its real and imaginary parts)
+            self._wrap_around_inv_basis = np.linalg.inv(
+                np.array([[v1.real, v2.real], [v1.imag, v2.imag]]))
+            # Offsets of the images at the corners of the lattice
+            # parallelogram. The closest image of a cell to a point in that
+            # parallelogram is always one of them.
+            self._wrap_around_offsets = np.array([0, v1, v2, v1 + v2])
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
         # Calculates the cluster radius.
         #
@@ -1568,6 +2084,22 @@ class Cluster(shapes.Shape):
             all_users.extend(cell.users)
         return all_users
 
+    @property
+    def user_store(self):
+        """
+        Get the columnar storage of the users in the cluster.
+
+        The users in the store are in the same order as the users returned
+        by :meth:`get_all_users`.
+
+        Returns
+        -------
+        UserStore
+            The store with the users of all cells in the cluster.
+        """
+        self._user_store.update()
+        return self._user_store
+
     @staticmethod
     def _get_ii_and_jj(num_cells):
         """
@@ -1841,6 +2373,64 @@ class Cluster(shapes.Shape):
 
         return cell_positions
 
+    @staticmethod
+    def _calc_wrap_around_basis(cell_radius, num_cells, cell_type='simple',
+                                rotation=None):
+        """
+        Helper function used by the Cluster class.
+
+        Calculates the basis of the lattice of translations that map a
+        cluster into its wrapped images, such that the cluster and its
+        images tile the plane.
+
+        Parameters
+        ----------
+        cell_radius : float
+            Radius of each cell in the cluster (or side length for square
+            cells).
+        num_cells : int
+            Number of cells in the cluster.
+        cell_type : str
+            The type of the cell. It should be a string with one of the
+            possible values: 'simple', '3sec', or 'square'.
+        rotation : float | None, optional
+            Rotation of the cluster.
+
+        Returns
+        -------
+        np.ndarray | None
+            Two complex numbers with the lattice basis, or None if wrap
+            around is not supported for the cluster.
+
+        Notes
+        -----
+        For hexagonal cells the translation between a cell and its closest
+        wrapped image corresponds to `j` steps to the next cell at 30
+        degrees followed by `i` steps to the next cell at 90 degrees, with
+        `i` and `j` from the :math:`N = i^2+i*j+j^2` cluster size formula.
+        The second vector of the basis is the first one rotated by 60
+        degrees.
+        """
+        if cell_type == 'square':
+            side = math.sqrt(num_cells)
+            if side != int(side):
+                return None
+            basis = cell_radius * side * np.array([1, 1j])
+        else:
+            if num_cells not in Cluster._ii_and_jj:
+                return None
+            ii, jj = Cluster._ii_and_jj[num_cells]
+            # Vectors between the centers of neighbor cells
+            dist = 2 * Cluster._calc_cell_height(cell_radius)
+            e1 = cmath.rect(dist, np.pi / 6.)
+            e2 = cmath.rect(dist, np.pi / 2.)
+            v1 = jj * e1 + ii * e2
+            basis = np.array([v1, v1 * cmath.exp(1j * np.pi / 3.)])
+
+        if rotation is not None:
+            basis = shapes.Shape.calc_rotated_pos(basis, rotation)
+        return basis
+
     @staticmethod
     def _calc_cluster_radius(num_cells, cell_radius):
         """
@@ -2140,11 +2730,66 @@ class Cluster(shapes.Shape):
             for data in all_data:
                 self.add_random_users(*data)
         else:
-            for _ in range(num_users):
-                # Note that here cell_ids will be a single value, as well
-                # as user_color and min_dist_ratio
-                self.get_cell_by_id(cell_ids).add_random_user(
-                    user_color, min_dist_ratio)
+            # Note that here cell_ids will be a single value, as well as
+            # user_color and min_dist_ratio
+            self.get_cell_by_id(cell_ids).add_random_users(
+                num_users, user_color, min_dist_ratio)
+
+    def calc_random_user_positions(self, cell_ids=None, num_users=1,
+                                   min_dist_ratio=0):
+        """
+        Calculate the positions of users randomly located in the Cells with
+        the specified cell IDs (the first cell has an ID equal to 1.).
+
+        No user is added to the cells. Use :meth:`add_random_users` to
+        also create the users (Node objects).
+
+        Parameters
+        ----------
+        cell_ids : int | list[int] | np.ndarray
+            IDs of the cells in the Cluster for which user positions will
+            be calculated. If not provided, all cells will be assumed.
+        num_users : int | list[int] | np.ndarray
+            Number of users in each cell.
+        min_dist_ratio : float | list[float] | np.ndarray, optional
+            Minimum allowed (relative) distance between the cell center and
+            the generated random user. See Cell.add_random_user method for
+            details.
+
+        Returns
+        -------
+        positions : np.ndarray
+            The (absolute) positions of the users (a 1D numpy array of
+            complex numbers).
+        user_cell_ids : np.ndarray
+            The ID of the cell of each user (a 1D numpy array of integers).
+
+        Notes
+        -----
+        As in :meth:`add_random_users`, if `cell_ids` is an iterable then
+        `num_users` and `min_dist_ratio` may also be iterables with the
+        same length of `cell_ids`.
+        """
+        if cell_ids is None:
+            cell_ids = range(1, self.num_cells + 1)
+        if not isinstance(cell_ids, Iterable):
+            cell_ids = [cell_ids]
+        if not isinstance(num_users, Iterable):
+            num_users = itertools.repeat(num_users)
+        if not isinstance(min_dist_ratio, Iterable):
+            min_dist_ratio = itertools.repeat(min_dist_ratio)
+
+        all_positions = []
+        all_cell_ids = []
+        for cell_id, n, ratio in zip(cell_ids, num_users, min_dist_ratio):
+            all_positions.append(
+                self.get_cell_by_id(cell_id).calc_random_user_positions(
+                    n, ratio))
+            all_cell_ids.append(np.full(n, cell_id, dtype=int))
+
+        if not all_positions:
+            return np.empty(0, dtype=complex), np.empty(0, dtype=int)
+        return np.hstack(all_positions), np.hstack(all_cell_ids)
 
     def add_border_users(self,
                          cell_ids, angles, ratios=None, user_color=None):
@@ -2325,42 +2970,136 @@ class Cluster(shapes.Shape):
                 self._wrapped_cells['wrap{0}_{1}:{2}'.format(
                     wrapped_id, rel_center, rel_cell)] \
                     = w
-                self._cell_pos[wrapped_id - 1].append(w.pos)
         else:
             msg = ("Wrap around not implemented for a cluster with {0} "
                    "cells.")
             raise RuntimeError(msg.format(self.num_cells))
 
+        self.wrap_around = True
+
+    @property
+    def wrap_around(self):
+        """
+        Get method for the wrap_around property.
+
+        If True, the distance and angle calculations consider the closest
+        wrapped image of each cell (the cluster is repeated to tile the
+        plane), which avoids edge effects at the cluster border.
+
+        Returns
+        -------
+        bool
+            True if wrap around is used.
+        """
+        return self._wrap_around
+
+    @wrap_around.setter
+    def wrap_around(self, value):
+        """
+        Set method for the wrap_around property.
+
+        Parameters
+        ----------
+        value : bool
+            True to use wrap around.
+
+        Raises
+        ------
+        RuntimeError
+            If wrap around is not supported for the cluster size.
+        """
+        if value and self._wrap_around_basis is None:
+            msg = ("Wrap around not implemented for a cluster with {0} "
+                   "cells.")
+            raise RuntimeError(msg.format(self.num_cells))
+        self._wrap_around = bool(value)
+        self._cell_pos_diffs = None
+
+    def calc_wrap_around_diffs(self, points):
+        """
+        Calculate the difference from the closest wrapped image of each
+        cell center to each point in `points`.
+
+        The wrapped images of a cell are the copies of that cell obtained
+        by repeating the cluster in order to tile the plane. This works
+        for all cluster sizes in :attr:`_ii_and_jj` (and for square cells
+        with a perfect square number of cells) without creating the
+        wrapped cells.
+
+        Parameters
+        ----------
+        points : complex | np.ndarray
+            The position of the points.
+
+        Returns
+        -------
+        np.ndarray
+            The differences (complex numbers) with dimension
+            `points.shape + (num_cells,)`. The absolute value is the
+            distance and the angle is the direction from the (wrapped)
+            cell center to the point.
+
+        Raises
+        ------
+        RuntimeError
+            If wrap around is not supported for the cluster size.
+        """
+        if self._wrap_around_basis is None:
+            msg = ("Wrap around not implemented for a cluster with {0} "
+                   "cells.")
+            raise RuntimeError(msg.format(self.num_cells))
+
+        points = np.asarray(points)
+        all_cells_pos = np.array([c.pos for c in self._cells])
+
+        # Coordinates of the points and of the cells in the lattice basis.
+        # Since they are linear, the coordinates of each difference are
+        # obtained by subtracting them.
+        inv_basis = self._wrap_around_inv_basis
+        points_coords = inv_basis.dot(
+            [points.real.ravel(), points.imag.ravel()])
+        cells_coords = inv_basis.dot([all_cells_pos.real, all_cells_pos.imag])
+
+        # Move each difference into the lattice parallelogram with corners
+        # given by self._wrap_around_offsets
+        v1, v2 = self._wrap_around_basis
+        coord1 = np.floor(points_coords[0][:, np.newaxis] - cells_coords[0])
+        coord2 = np.floor(points_coords[1][:, np.newaxis] - cells_coords[1])
+        diffs = (points.reshape(-1, 1) - all_cells_pos -
+                 coord1 * v1 - coord2 * v2)
+
+        # The closest image is in one of the corners of the parallelogram
+        closest_diffs = diffs
+        closest_dists2 = diffs.real ** 2 + diffs.imag ** 2
+        for offset in self._wrap_around_offsets[1:]:
+            candidate = diffs - offset
+            dists2 = candidate.real ** 2 + candidate.imag ** 2
+            is_closer = dists2 < closest_dists2
+            closest_diffs = np.where(is_closer, candidate, closest_diffs)
+            closest_dists2 = np.where(is_closer, dists2, closest_dists2)
+        return closest_diffs.reshape(points.shape + (self.num_cells,))
+
     def calc_dists_between_cells(self):
         """
         This method calculates the distance between any two cells in the
         cluster possibly considering wrap around.
 
-        If the `create_wrap_around_cells` method was called before this
-        one, then when calculating the distance between two cells if the
-        distance between a given cell and the wrapped version of another
-        cell is smaller then the distance to that other cell it will be
-        sued instead.
-
-        For instance, the
+        If wrap around is used (see the :attr:`wrap_around` property) then
+        the closest wrapped image of each other cell is considered.
 
         Returns
         -------
         dists : np.ndarray
-            A matrix with the distance from each cell to each other cell in
-            the cluster.
+            A matrix with the difference (complex numbers) from each cell
+            to each other cell in the cluster. The distance is the absolute
+            value of these differences.
         """
         if self._cell_pos_diffs is None:
-            diffs = np.empty([self.num_cells, self.num_cells],
-                             dtype=complex)
-
-            pos = [np.array(p) for p in self._cell_pos]
-            for i, c in enumerate(self._cells):
-                a = np.abs(c.pos - pos)
-                indexes = map(np.argmin, a)
-
-                for j, idx in enumerate(indexes):
-                    diffs[i, j] = (c.pos - pos[j][idx])
+            all_cells_pos = np.array([c.pos for c in self._cells])
+            if self._wrap_around:
+                diffs = self.calc_wrap_around_diffs(all_cells_pos)
+            else:
+                diffs = all_cells_pos[:, np.newaxis] - all_cells_pos
 
             self._cell_pos_diffs = diffs
 
@@ -2395,18 +3134,36 @@ class Cluster(shapes.Shape):
         the following 2 rows correspond to the users in the second cell and
         the last three rows correspond to the users in the third cell.
         """
-        all_users = self.get_all_users()
-
-        # We use the ndmin=2 option so that the array has two dimensions
-        # instead of just one
-        all_users_pos = np.array([x.pos for x in all_users], ndmin=2)
-        all_cells_pos = np.array([x.pos for x in self._cells], ndmin=2)
+        all_cells_pos = np.array([x.pos for x in self._cells])
 
         # Using broadcast we can calculate all distances in one go without
         # any for loop. -> dists[user_index, cell_index]
-        dists = np.abs(all_users_pos.T - all_cells_pos)
+        dists = self.user_store.calc_dists(all_cells_pos)
         return dists
 
+    def _calc_diffs_all_users_to_each_cell(self):
+        """
+        Returns a matrix with the difference (complex numbers) from each
+        cell center to each user, considering wrap around if it is
+        enabled.
+
+        Returns
+        -------
+        np.ndarray
+            The differences. Each row corresponds to a user and each column
+            to a cell.
+        """
+        # The position of all users in the cluster (no matter which cell
+        # they are assigned to) is already in the user store.
+        all_users_pos = self.user_store.positions
+
+        if self._wrap_around:
+            return self.calc_wrap_around_diffs(all_users_pos)
+
+        # Array with the position of each cell in the cluster
+        all_cells_pos = np.array([c.pos for c in self])
+        return all_users_pos[:, np.newaxis] - all_cells_pos
+
     def calc_dist_all_users_to_each_cell(self):
         """
         Returns a matrix with the distance from each user to each cell
@@ -2420,6 +3177,9 @@ class Cluster(shapes.Shape):
         corresponds to a different base station and each row corresponds to
         a different mobile station.
 
+        If wrap around is used (see the :attr:`wrap_around` property) the
+        distance to the closest wrapped image of each cell is returned.
+
         Returns
         -------
         all_dists : np.ndarray
@@ -2434,19 +3194,148 @@ class Cluster(shapes.Shape):
         the following 2 rows correspond to the users in the second cell and
         the last three rows correspond to the users in the third cell.
         """
-        all_users = self.get_all_users()
+        all_dists = np.abs(self._calc_diffs_all_users_to_each_cell())
+        return all_dists
 
-        # Array with the position of all users in the cluster (no matter
-        # which cell they are assigned to)
-        all_users_pos = np.array([u.pos for u in all_users])
+    def calc_angle_all_users_to_each_cell(self):
+        """
+        Returns a matrix with the angle (in degrees) of each user as seen
+        from each cell center.
 
-        # Array with the position of each cell in the cluster
-        all_cells_pos = np.array([c.pos for c in self])
+        The angle is measured counterclockwise from the horizontal axis,
+        in the (-180, 180] interval. If wrap around is used (see the
+        :attr:`wrap_around` property) the angle from the closest wrapped
+        image of each cell is returned.
 
-        # Calculate the distance from each user to each cell
-        all_dists = np.abs(all_users_pos[:, np.newaxis] - all_cells_pos)
+        Returns
+        -------
+        all_angles : np.ndarray
+            The angles. Each row corresponds to a user and each column to
+            a cell, as in :meth:`calc_dist_all_users_to_each_cell`.
+        """
+        all_angles = np.angle(self._calc_diffs_all_users_to_each_cell(),
+                              deg=True)
+        return all_angles
 
-        return all_dists
+    def _get_sector_boresight_angles(self):
+        """
+        Get the boresight angle (in degrees) of each sector of each cell.
+
+        Cells of the '3sec' type have 3 sectors (see
+        :attr:`Cell3Sec.sector_boresight_angles`). The other cells are
+        considered to have a single sector whose boresight corresponds to
+        the cell rotation.
+
+        Returns
+        -------
+        np.ndarray
+            The boresight angles with dimension `num_cells x num_sectors`.
+        """
+        if self._cell_type == '3sec':
+            return np.array(
+                [c.sector_boresight_angles for c in self._cells])
+        # Note that the rotation of the cells in the cluster may be stored
+        # as a complex number (with zero imaginary part)
+        return np.real([[c.rotation] for c in self._cells])
+
+    def calc_off_boresight_angle_all_users_to_each_sector(self):
+        """
+        Returns the angle (in degrees) between the direction from each cell
+        center to each user and the boresight of each sector of that cell.
+
+        The angles are in the [-180, 180) interval, which is what the
+        antenna gain models (such as
+        :class:`.antennagain.AntGainBS3GPP25996`) expect. If wrap around
+        is used (see the :attr:`wrap_around` property) the angle from the
+        closest wrapped image of each cell is considered.
+
+        Returns
+        -------
+        np.ndarray
+            The off-boresight angles with dimension
+            `num_users x num_cells x num_sectors`, where `num_sectors` is
+            3 for a cluster of '3sec' cells and 1 otherwise.
+        """
+        return self._calc_off_boresight_angles(
+            self._calc_diffs_all_users_to_each_cell())
+
+    def _calc_off_boresight_angles(self, all_diffs):
+        """
+        Calculate the off-boresight angles from the differences between
+        each user and each cell center.
+
+        Parameters
+        ----------
+        all_diffs : np.ndarray
+            The differences (complex numbers) from each cell center to each
+            user, with dimension `num_users x num_cells`.
+
+        Returns
+        -------
+        np.ndarray
+            The off-boresight angles (in degrees), with dimension
+            `num_users x num_cells x num_sectors`.
+        """
+        off_boresight = (np.angle(all_diffs, deg=True)[:, :, np.newaxis] -
+                         self._get_sector_boresight_angles())
+        return np.mod(off_boresight + 180., 360.) - 180.
+
+    def calc_link_budget_all_users_to_each_sector(self, path_loss_obj,
+                                                  ant_gain_obj=None,
+                                                  **kargs):
+        """
+        Calculate the distance, the off-boresight angle and the combined
+        path loss and antenna gain from each sector of each cell to each
+        user.
+
+        Parameters
+        ----------
+        path_loss_obj : PathLossBase
+            The path loss model. Its `calc_path_loss` method is called with
+            the distance matrix, which is in the same unit of the cell
+            radius (Km for most path loss models).
+        ant_gain_obj : AntGainBase, optional
+            The antenna gain model of the base stations. Its
+            `get_antenna_gain` method is called with the off-boresight
+            angles. If not provided, an antenna gain equal to one (0 dBi)
+            is assumed.
+        kargs : dict
+            Extra named parameters passed to the `calc_path_loss` method
+            of `path_loss_obj`.
+
+        Returns
+        -------
+        all_dists : np.ndarray
+            The distance from each cell center to each user, with dimension
+            `num_users x num_cells` (see
+            :meth:`calc_dist_all_users_to_each_cell`).
+        all_angles : np.ndarray
+            The off-boresight angles (in degrees), with dimension
+            `num_users x num_cells x num_sectors` (see
+            :meth:`calc_off_boresight_angle_all_users_to_each_sector`).
+        all_gains : np.ndarray
+            The path loss times the antenna gain (in linear scale), with
+            dimension `num_users x num_cells x num_sectors`.
+
+        Notes
+        -----
+        Since all sectors of a cell are at the cell center, the path loss
+        (including any shadowing) is calculated only once for each user
+        and cell and it is the same for all sectors of that cell.
+        """
+        all_diffs = self._calc_diffs_all_users_to_each_cell()
+        all_dists = np.abs(all_diffs)
+
+        all_angles = self._calc_off_boresight_angles(all_diffs)
+
+        path_loss = path_loss_obj.calc_path_loss(all_dists, **kargs)
+        all_gains = np.asarray(path_loss)[:, :, np.newaxis]
+        if ant_gain_obj is not None:
+            all_gains = all_gains * ant_gain_obj.get_antenna_gain(all_angles)
+        else:
+            all_gains = np.repeat(all_gains, all_angles.shape[-1], axis=-1)
+
+        return all_dists, all_angles, all_gains
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -2489,6 +3378,10 @@ class Grid(object):
         # Surrounding cells in the grid, which are not part of any cluster
         self._surrounding_cells = []
 
+        # Columnar storage of the users in all clusters. This is only
+        # created when requested.
+        self._user_store = None
+
     def get_cluster_from_index(self, index):
         """
         Return the cluster object with index `index` in the Grid.
@@ -2529,6 +3422,42 @@ class Grid(object):
         self._surrounding_cells = []
         self._cell_radius = 0
         self._num_cells = 0
+        self._user_store = None
+
+    def get_all_users(self):
+        """
+        Return all users in the grid.
+
+        Returns
+        -------
+        all_users : list[Node]
+            A list with all users in all clusters of the grid.
+        """
+        all_users = []
+        for cluster in self._clusters:
+            all_users.extend(cluster.get_all_users())
+        return all_users
+
+    @property
+    def user_store(self):
+        """
+        Get the columnar storage of the users in all clusters of the grid.
+
+        The users in the store are in the same order as the users returned
+        by :meth:`get_all_users`. Since the cell IDs are repeated in each
+        cluster, use the `cell_indexes` of the store to identify the cell
+        of each user.
+
+        Returns
+        -------
+        UserStore
+            The store with the users of all cells in the grid.
+        """
+        if self._user_store is None:
+            self._user_store = UserStore(
+                [cell for cluster in self._clusters for cell in cluster])
+        self._user_store.update()
+        return self._user_store
 
     def create_clusters(self, num_clusters, num_cells, cell_radius):
         """
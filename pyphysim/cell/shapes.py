@@ -11,7 +11,7 @@ try:
     # noinspection PyUnresolvedReferences
     from matplotlib import pyplot as plt
     # noinspection PyUnresolvedReferences
-    from matplotlib import patches, path
+    from matplotlib import patches
     _MATPLOTLIB_AVAILABLE = True
 except ImportError:  # pragma: no cover
     _MATPLOTLIB_AVAILABLE = False
@@ -149,6 +149,14 @@ class Shape(Coordinate):
     # 'abstract' must be implemented in a subclass.
     __metaclass__ = ABCMeta
 
+    # Cached vertices (with translation and rotation) and the (pos,
+    # radius, rotation) values used to calculate them. The cache is
+    # invalidated when any of these values change. These are class
+    # attributes so that the cache also works for subclasses that do not
+    # call Shape.__init__.
+    _vertices_cache = None
+    _vertices_cache_key = None
+
     def __init__(self, pos, radius, rotation=0):
         Coordinate.__init__(self, pos)
 
@@ -278,43 +286,42 @@ class Shape(Coordinate):
         -------
         np.ndarray
             The shape vertexes.
-        """
-        vertex_positions = self._get_vertex_positions()
-        vertex_positions = self.pos + Shape.calc_rotated_pos(
-            vertex_positions, self.rotation)
-        return vertex_positions
+
+        Notes
+        -----
+        The vertices are cached and only calculated again when the
+        position, radius or rotation of the shape change. The returned
+        array is read-only.
+        """
+        key = (self.pos, self.radius, self.rotation)
+        if self._vertices_cache is None or self._vertices_cache_key != key:
+            vertex_positions = self._get_vertex_positions()
+            vertex_positions = self.pos + Shape.calc_rotated_pos(
+                vertex_positions, self.rotation)
+            vertex_positions.flags.writeable = False
+            self._vertices_cache = vertex_positions
+            self._vertices_cache_key = key
+        return self._vertices_cache
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
-    def is_point_inside_shape(self, point: complex) -> bool:
+    def is_point_inside_shape(self, point):
         """
-        Test is a point is inside the shape.
+        Test is a point (or an array of points) is inside the shape.
 
         Parameters
         ----------
-        point
-            A single complex number.
+        point : complex | np.ndarray
+            A single complex number or a numpy array of complex numbers.
 
         Returns
         -------
-        inside_or_not
-            True if `point` is inside the shape, False otherwise.
+        inside_or_not : bool | np.ndarray
+            True if `point` is inside the shape, False otherwise. If
+            `point` is an array, a boolean array with the same shape is
+            returned.
         """
-        mpl_path = path.Path(from_complex_array_to_real_matrix(
-            self.vertices))
-
-        # This code is used with Matplotlib version 1.2 or higher.
-        return mpl_path.contains_point([point.real, point.imag])
-
-        # xxxxx Code for Matplotlib version 1.1 xxxxxxxxxxxxxxxxxxxxxxxxxxx
-        # The code below was used for Matplotlib lower then version
-        # 1.2. However, since Matplotlib version 1.2 the pnpoly function is
-        # deprecated
-
-        # # pnpoly returns 1 if point is inside the polygon and 0 otherwise
-        # import matplotlib.nxutils as mnx
-        # return mnx.pnpoly(point.real, point.imag,
-        #                   from_complex_array_to_real_matrix(
-        #                       self.vertices)) == 1
+        return _to_bool_if_scalar(
+            points_inside_polygon(point, self.vertices))
 
     # noinspection PyUnresolvedReferences
     def get_border_point(self, angle, ratio):  # pylint: disable=R0914
@@ -579,6 +586,36 @@ class Hexagon(Shape):
 
         return vertex_positions
 
+    def is_point_inside_shape(self, point):
+        """
+        Test is a point (or an array of points) is inside the hexagon.
+
+        Parameters
+        ----------
+        point : complex | np.ndarray
+            A single complex number or a numpy array of complex numbers.
+
+        Returns
+        -------
+        inside_or_not : bool | np.ndarray
+            True if `point` is inside the hexagon, False otherwise. If
+            `point` is an array, a boolean array with the same shape is
+            returned.
+        """
+        # Position of the points in the hexagon axes (centered at the
+        # origin and without rotation)
+        point = Shape.calc_rotated_pos(np.asarray(point) - self.pos,
+                                       -self.rotation)
+        x = np.abs(point.real)
+        y = np.abs(point.imag)
+
+        # The point is inside the hexagon if its projection into the normal
+        # of each pair of parallel edges (at 90, 30 and -30 degrees) is
+        # smaller than the hexagon height.
+        height = self.height
+        inside = (y < height) & (np.sqrt(3.) * x + y < 2 * height)
+        return _to_bool_if_scalar(inside)
+
 
 class Rectangle(Shape):
     """
@@ -662,34 +699,29 @@ class Rectangle(Shape):
 
     def is_point_inside_shape(self, point):
         """
-        Test is a point is inside the rectangle
+        Test is a point (or an array of points) is inside the rectangle.
 
         Parameters
         ----------
-        point : complex
-            A single complex number.
+        point : complex | np.ndarray
+            A single complex number or a numpy array of complex numbers.
 
         Returns
         -------
-        inside_or_not : bool
-            True if `point` is inside the rectangle, False otherwise.
+        inside_or_not : bool | np.ndarray
+            True if `point` is inside the rectangle, False otherwise. If
+            `point` is an array, a boolean array with the same shape is
+            returned.
         """
         min_x = min(self._lower_coord.real, self._upper_coord.real)
         max_x = max(self._lower_coord.real, self._upper_coord.real)
         min_y = min(self._lower_coord.imag, self._upper_coord.imag)
         max_y = max(self._lower_coord.imag, self._upper_coord.imag)
 
-        point_x = point.real
-        point_y = point.imag
-        if point_x < min_x:
-            return False
-        if point_x > max_x:
-            return False
-        if point_y < min_y:
-            return False
-        if point_y > max_y:
-            return False
-        return True
+        point = np.asarray(point)
+        inside = ((point.real >= min_x) & (point.real <= max_x) &
+                  (point.imag >= min_y) & (point.imag <= max_y))
+        return _to_bool_if_scalar(inside)
 
 
 class Circle(Shape):
@@ -761,21 +793,24 @@ class Circle(Shape):
         angle_rad = np.pi * angle / 180.
         return self.pos + np.exp(1j * angle_rad) * self.radius * ratio
 
-    def is_point_inside_shape(self, point: complex) -> bool:
+    def is_point_inside_shape(self, point):
         """
-        Test is a point is inside the circle
+        Test is a point (or an array of points) is inside the circle.
 
         Parameters
         ----------
-        point
-            A single complex number.
+        point : complex | np.ndarray
+            A single complex number or a numpy array of complex numbers.
 
         Returns
         -------
-        inside_or_not
-            True if `point` is inside the circle, False otherwise.
+        inside_or_not : bool | np.ndarray
+            True if `point` is inside the circle, False otherwise. If
+            `point` is an array, a boolean array with the same shape is
+            returned.
         """
-        return np.abs(self.pos - point) < self.radius
+        return _to_bool_if_scalar(
+            np.abs(self.pos - np.asarray(point)) < self.radius)
 
     # noinspection PyShadowingNames,PyShadowingNames
     def plot(self, ax=None):  # pragma: no cover
@@ -825,6 +860,75 @@ class Circle(Shape):
             plt.show()
 
 
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+def _to_bool_if_scalar(inside):
+    """
+    Convert the output of a (vectorized) point inside shape test to a bool
+    if it corresponds to a single point.
+
+    Parameters
+    ----------
+    inside : np.ndarray
+        A boolean numpy array.
+
+    Returns
+    -------
+    bool | np.ndarray
+        A bool if `inside` has zero dimensions, or `inside` otherwise.
+    """
+    if np.ndim(inside) == 0:
+        return bool(inside)
+    return inside
+
+
+def points_inside_polygon(points, vertices):
+    """
+    Test which points in `points` are inside the polygon with the given
+    `vertices`.
+
+    The test uses the even-odd (ray casting) rule, computed for all
+    points at once.
+
+    Parameters
+    ----------
+    points : np.ndarray | complex
+        A numpy array of complex numbers (or a single complex number).
+    vertices : np.ndarray
+        The vertices of the polygon (a 1D numpy array of complex numbers).
+
+    Returns
+    -------
+    np.ndarray
+        A boolean numpy array (same shape as `points`) which is True for
+        the points inside the polygon.
+
+    Examples
+    --------
+    >>> vertices = np.array([0, 2, 2+2j, 2j])
+    >>> points_inside_polygon(np.array([1+1j, 3+1j, 1.5+0.1j]), vertices)
+    array([ True, False,  True])
+    """
+    points = np.asarray(points)
+    x = points.real[..., np.newaxis]
+    y = points.imag[..., np.newaxis]
+
+    # Each edge of the polygon goes from (x1, y1) to (x2, y2)
+    x1 = vertices.real
+    y1 = vertices.imag
+    x2 = np.roll(x1, -1)
+    y2 = np.roll(y1, -1)
+
+    # An horizontal ray starting at each point (going to the right) crosses
+    # the edge if the edge has one vertex above and one below the point
+    # and the intersection is at the right of the point
+    straddle = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_intersection = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    crossings = straddle & (x < x_intersection)
+
+    return np.count_nonzero(crossings, axis=-1) % 2 == 1
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 def from_complex_array_to_real_matrix(a):
     """
@@ -863,10 +967,10 @@ def from_complex_array_to_real_matrix(a):
      [ 3. -4.]
      [ 5.  6.]]
     """
-    num_elem = np.size(a)
-    a.dtype = a.real.dtype
-    a = np.reshape(a, (num_elem, 2))
-    return a
+    # Note that `a` is not modified, since it may be the (cached) vertices
+    # of a shape.
+    a = np.ravel(a)
+    return np.column_stack([a.real, a.imag])
 
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -695,6 +695,10 @@ class TdlChannel(object):
     tap_delays : np.ndarray
         The delay of each tap (in seconds). Dimension: `L x 1`
     """
+    # Maximum number of elements in the frequency responses calculated at
+    # once in the corrupt_data_in_freq_domain method.
+    _max_freq_response_size = 2 ** 22
+
     # Note: It would be better to have only the first argument as
     # positional argument and all the others as keyword only arguments. We
     # can do this in Python3 by adding ",*," after the first positional
@@ -870,7 +874,7 @@ class TdlChannel(object):
         # tap_delays correspond to integers
         return self._channel_profile.num_taps_with_padding
 
-    def generate_impulse_response(self, num_samples=1):
+    def generate_impulse_response(self, num_samples=1, stride=1):
         """
         Generate a new impulse response of all discretized taps (not
         including possible zero padding) for `num_samples` channel
@@ -901,8 +905,16 @@ class TdlChannel(object):
         ----------
         num_samples : int
             The number of samples to generate (for each tap).
+        stride : int
+            The distance (in samples) between two generated samples. If
+            this is greater than one, then the fading generator is advanced
+            by `stride - 1` samples after each generated sample.
         """
-        self._fading_generator.generate_more_samples(num_samples)
+        if stride == 1:
+            self._fading_generator.generate_more_samples(num_samples)
+        else:
+            self._fading_generator.generate_more_samples_with_stride(
+                num_samples, stride)
         channel_samples = self._fading_generator.get_samples()
 
         # xxxxxxxxxx Apply the power to each tap xxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1003,7 +1015,7 @@ class TdlChannel(object):
                     signal = np.reshape(signal, (1, signal.size))
         return signal
 
-    def corrupt_data(self, signal):
+    def corrupt_data(self, signal, out=None):
         """
         Transmit the signal though the TDL channel.
 
@@ -1012,11 +1024,16 @@ class TdlChannel(object):
         signal : np.ndarray
             The signal to be transmitted. This should be 1D for SISO
             systems (or SIMO systems) and 2D for MIMO systems.
+        out : np.ndarray, optional
+            A complex array where the received signal will be stored. Its
+            shape must be the shape of the returned array. If not
+            provided, a new array is allocated.
 
         Returns
         -------
         np.ndarray
-            The received signal after transmission through the TDL channel
+            The received signal after transmission through the TDL
+            channel. If `out` was provided, this is `out`.
         """
         # Number of symbols to be transmitted
         num_symbols = signal.shape[-1]
@@ -1042,36 +1059,47 @@ class TdlChannel(object):
             # xxxxxxxxxx SISO Case xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
             # The output size will be equal to the number of symbols to transit
             # plus the channel_memory.
-            output = np.zeros(num_symbols + channel_memory, dtype=complex)
+            output = self.__get_output_buffer(
+                out, (num_symbols + channel_memory,))
 
+            # Buffer for the contribution of each tap
+            contribution = np.empty(num_symbols, dtype=complex)
             for i, d in enumerate(tap_indexes_sparse):
-                output[d:d + num_symbols] += tap_values_sparse[i] * signal
+                np.multiply(tap_values_sparse[i], signal, out=contribution)
+                output[d:d + num_symbols] += contribution
             # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
         elif len(self._fading_generator.shape) == 3:
             # xxxxxxxxxx MIMO Case xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-            # The output size will be equal to the number of symbols to transit
-            # plus the channel_memory.
             _, num_rx_ant, num_tx_ant = self._fading_generator.shape
 
             if self.switched_direction:
-                # xxxxxxxxxx Code for reversed direction xxxxxxxxxxxxxxxxxx
-                output = np.zeros((num_tx_ant, num_symbols + channel_memory),
-                                  dtype=complex)
-                for i, d in enumerate(tap_indexes_sparse):
-                    for rx_idx in range(num_rx_ant):
-                        output[:, d:d + num_symbols] += (
-                            tap_values_sparse[i, rx_idx, :, :] * signal[rx_idx])
-                # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-            else:
-                # xxxxxxxxxx Code for original direction xxxxxxxxxxxxxxxxxx
-                output = np.zeros((num_rx_ant, num_symbols + channel_memory),
-                                  dtype=complex)
-
-                for i, d in enumerate(tap_indexes_sparse):
-                    for tx_idx in range(num_tx_ant):
-                        output[:, d:d + num_symbols] += (
-                            tap_values_sparse[i, :, tx_idx, :] * signal[tx_idx])
-                # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+                # The roles of the antennas are switched: the signal is
+                # transmitted by the receive antennas. Dimension of the
+                # tap values: `num taps x num_tx_ant x num_rx_ant x
+                # num_symbols`
+                tap_values_sparse = np.swapaxes(tap_values_sparse, 1, 2)
+                num_rx_ant, num_tx_ant = num_tx_ant, num_rx_ant
+
+            # The output size will be equal to the number of symbols to transit
+            # plus the channel_memory.
+            output = self.__get_output_buffer(
+                out, (num_rx_ant, num_symbols + channel_memory))
+
+            # For each tap, contributions[:, 0] has the current output and
+            # contributions[:, 1:] has the contribution of each transmit
+            # antenna. Summing them over the second dimension (which numpy
+            # does sequentially) gives exactly the same result as adding the
+            # contribution of each transmit antenna to the output one at a
+            # time, but without creating any temporary array.
+            contributions = np.empty((num_rx_ant, num_tx_ant + 1, num_symbols),
+                                     dtype=complex)
+            for i, d in enumerate(tap_indexes_sparse):
+                output_slice = output[:, d:d + num_symbols]
+                contributions[:, 0] = output_slice
+                np.multiply(tap_values_sparse[i], signal,
+                            out=contributions[:, 1:])
+                np.add.reduce(contributions, axis=1, out=output_slice)
+            # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
         else:  # pragma: no cover
             raise RuntimeError(
                 "Shape of the fading generator of the TdlChannel class must "
@@ -1079,6 +1107,34 @@ class TdlChannel(object):
 
         return output
 
+    @staticmethod
+    def __get_output_buffer(out, shape):
+        """
+        Get the (zero filled) array where the received signal will be
+        stored.
+
+        Parameters
+        ----------
+        out : np.ndarray | None
+            The array provided by the caller, if any.
+        shape : tuple[int]
+            The required shape.
+
+        Returns
+        -------
+        np.ndarray
+            A new array if `out` is None or `out` otherwise.
+        """
+        if out is None:
+            return np.zeros(shape, dtype=complex)
+
+        if out.shape != shape or out.dtype != complex:
+            raise ValueError(
+                "The provided output array must be a complex array with "
+                "shape {0}".format(shape))
+        out[...] = 0
+        return out
+
     def corrupt_data_in_freq_domain(self, signal, fft_size,
                                     carrier_indexes=None):
         """
@@ -1141,21 +1197,10 @@ class TdlChannel(object):
                              "`fft_size`.")
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
-        # Variable to store the impulse responses for each block. We will
-        # concatenate these impulse responses at the end so that we can set
-        # self._last_impulse_response to the impulse response of all blocks
-        impulse_responses = []
         if len(self._fading_generator.shape) == 1:
-            # Output variable representing the received signal
-            output = np.empty(num_symbols, dtype=complex)
+            num_rx_ant, num_tx_ant = 1, 1
         elif len(self._fading_generator.shape) == 3:
             _, num_rx_ant, num_tx_ant = self._fading_generator.shape
-            if self.switched_direction:
-                # xxxxxxxxxx Code for reversed direction xxxxxxxxxxxxxxxxxx
-                output = np.zeros((num_symbols, num_tx_ant), dtype=complex)
-            else:
-                # xxxxxxxxxx Code for original direction xxxxxxxxxxxxxxxxxx
-                output = np.zeros((num_symbols, num_rx_ant), dtype=complex)
         else:  # pragma: no cover
             raise RuntimeError(
                 "Shape of the fading generator of the TdlChannel class must "
@@ -1164,72 +1209,74 @@ class TdlChannel(object):
         # Number of full blocks in `signal`
         num_full_blocks = num_symbols // block_size
 
-        for i in range(num_full_blocks):
-            start_idx = block_size * i
-            end_idx = block_size * (i + 1)
+        # The blocks are processed in chunks so that the frequency
+        # responses of all blocks in a chunk do not use too much memory
+        blocks_per_chunk = max(
+            1, self._max_freq_response_size // (fft_size * num_rx_ant *
+                                                num_tx_ant))
 
-            # Generate next impulse response: the one we will use to
-            # transmit the current block (the channel is static during
-            # transmission of a single block)
-            self.generate_impulse_response(1)
-            impulse_responses.append(self.get_last_impulse_response())
+        # The impulse response of each chunk. We will concatenate these
+        # impulse responses at the end so that we can set
+        # self._last_impulse_response to the impulse response of all blocks
+        impulse_responses = []
+        outputs = []
+        for first_block in range(0, num_full_blocks, blocks_per_chunk):
+            num_blocks = min(blocks_per_chunk, num_full_blocks - first_block)
+            start_idx = block_size * first_block
+            end_idx = block_size * (first_block + num_blocks)
+
+            # Generate one impulse response for each block (the channel is
+            # static during transmission of a single block). The fading
+            # generator is advanced by "fft_size - 1" after each sample to
+            # account how much the channel has "changed" during the
+            # duration of each block.
+            self.generate_impulse_response(num_blocks, stride=fft_size)
+            impulse_responses.append(self._last_impulse_response)
+
+            # Get the equivalent frequency response of each block with a
+            # single FFT. Dimension: `fft_size x num_blocks` (SISO) or
+            # `fft_size x num_rx_ant x num_tx_ant x num_blocks` (MIMO)
+            freq_response = self._last_impulse_response.get_freq_response(
+                fft_size)
+            if carrier_indexes is not None:
+                freq_response = freq_response[carrier_indexes]
 
             if len(self._fading_generator.shape) == 1:
                 # xxxxxxxxxx SISO case xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-                # Get the equivalent frequency response of the last
-                # generated impulse response. That is what we will use
-                # to corrupt the current block of signal
-                if carrier_indexes is None:
-                    freq_response = \
-                        self._last_impulse_response.get_freq_response(
-                            fft_size)[:, 0]
-                else:
-                    freq_response = \
-                        self._last_impulse_response.get_freq_response(
-                            fft_size)[carrier_indexes, 0]
-
-                output[start_idx:end_idx] = (freq_response *
-                                             signal[start_idx:end_idx])
+                # Dimension: `num_blocks x block_size`
+                block_signal = np.reshape(signal[start_idx:end_idx],
+                                          (num_blocks, block_size))
+                outputs.append(
+                    (freq_response.T * block_signal).reshape(-1))
                 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
             else:  # len(self._fading_generator.shape) == 3
                 # xxxxxxxxxx MIMO Case xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-                # Get the equivalent frequency response of the last
-                # generated impulse response. That is what we will use
-                # to corrupt the current block of signal
-                if carrier_indexes is None:
-                    freq_response = \
-                        self._last_impulse_response.get_freq_response(
-                            fft_size)[:, :, :, 0]
-                else:
-                    freq_response = \
-                        self._last_impulse_response.get_freq_response(
-                            fft_size)[carrier_indexes, :, :, 0]
-
                 if self.switched_direction:
-                    # xxxxxxxxxx Code for reversed direction xxxxxxxxxxxxxx
-                    # noinspection PyUnboundLocalVariable
-                    for rx_idx in range(num_rx_ant):
-                        output[start_idx:end_idx, :] += (
-                            freq_response[:, rx_idx, :] *
-                            signal[rx_idx, start_idx:end_idx, np.newaxis])
+                    # Dimension: `num_rx_ant x num_blocks x block_size x
+                    # num_tx_ant`
+                    freq_response = np.transpose(freq_response, (1, 3, 0, 2))
                 else:
-                    # xxxxxxxxxx Code for original direction xxxxxxxxxxxxxx
-                    # noinspection PyUnboundLocalVariable
-                    for tx_idx in range(num_tx_ant):
-                        output[start_idx:end_idx, :] += (
-                            freq_response[:, :, tx_idx] *
-                            signal[tx_idx, start_idx:end_idx, np.newaxis])
+                    # Dimension: `num_tx_ant x num_blocks x block_size x
+                    # num_rx_ant`
+                    freq_response = np.transpose(freq_response, (2, 3, 0, 1))
+
+                # Dimension: `num transmitting antennas x num_blocks x
+                # block_size x 1`
+                block_signal = np.reshape(
+                    signal[:, start_idx:end_idx],
+                    (signal.shape[0], num_blocks, block_size, 1))
+
+                # Sum the received signal from each transmitting antenna.
+                # Dimension: `num_blocks * block_size x num receiving
+                # antennas`
+                received = np.sum(freq_response * block_signal, axis=0)
+                outputs.append(received.reshape(-1, received.shape[-1]))
                 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
-            # Advance the fading generator by "fft_size - 1" to account how
-            # much the channel has "changed" during the duration of the
-            # current block
-            self._fading_generator.skip_samples_for_next_generation(
-                fft_size - 1)
-
         self._last_impulse_response = TdlImpulseResponse.concatenate_samples(
             impulse_responses)
+        output = np.concatenate(outputs, axis=0)
 
         # Transposition has no effect for the SISO case. For the MIMO case
         # it will make output have dimension `num_rx_ant x num_samples`
@@ -170,6 +170,30 @@ class FadingSampleGenerator(object):
         """
         raise NotImplementedError("Implement in a subclass")
 
+    def generate_more_samples_with_stride(self, num_samples, stride):
+        """
+        Generate `num_samples` samples spaced by `stride` samples.
+
+        This is equivalent to calling `generate_more_samples()` followed
+        by `skip_samples_for_next_generation(stride - 1)` `num_samples`
+        times and concatenating the generated samples in the last
+        dimension. Subclasses should override this method to generate all
+        samples at once.
+
+        Parameters
+        ----------
+        num_samples : int
+            Number of samples (with the provided shape) to generate.
+        stride : int
+            The distance (in samples) between two generated samples.
+        """
+        samples = []
+        for _ in range(num_samples):
+            self.generate_more_samples(1)
+            samples.append(self.get_samples())
+            self.skip_samples_for_next_generation(stride - 1)
+        self._samples = np.concatenate(samples, axis=-1)
+
     def skip_samples_for_next_generation(
             self, num_samples):  # pragma: no cover
         """
@@ -238,6 +262,24 @@ class RayleighSampleGenerator(FadingSampleGenerator):
             shape.append(num_samples)
             self._samples = randn_c(*shape)
 
+    def generate_more_samples_with_stride(self, num_samples, stride):
+        """
+        Generate `num_samples` samples spaced by `stride` samples.
+
+        Since the samples generated by RayleighSampleGenerator are
+        independent, this is the same as calling
+        `generate_more_samples(num_samples)`.
+
+        Parameters
+        ----------
+        num_samples : int
+            Number of samples (with the provided shape) to generate.
+        stride : int
+            The distance (in samples) between two generated samples. This
+            is ignored in the RayleighSampleGenerator.
+        """
+        self.generate_more_samples(num_samples)
+
     def skip_samples_for_next_generation(self,
                                          num_samples):  # pragma: no cover
         """
@@ -307,6 +349,10 @@ class JakesSampleGenerator(FadingSampleGenerator):
     --------
     generate_jakes_samples
     """
+    # Maximum number of elements of each chunk of samples calculated at
+    # once. This bounds the memory used for temporary arrays when many
+    # samples are generated.
+    _max_chunk_size = 2 ** 16
 
     def __init__(self, Fd=100, Ts=1e-3, L=8, shape=None, RS=None):
         super(JakesSampleGenerator, self).__init__(shape)
@@ -471,7 +517,7 @@ class JakesSampleGenerator(FadingSampleGenerator):
 
         return t
 
-    def generate_more_samples(self, num_samples=None):
+    def generate_more_samples(self, num_samples=None, out=None):
         """
         Generate next samples.
 
@@ -485,6 +531,10 @@ class JakesSampleGenerator(FadingSampleGenerator):
         num_samples : int, optional
             Number of samples (with the provided shape) to generate. If not
             provided it will be assumed to be 1.
+        out : np.ndarray, optional
+            A complex array with shape `shape + (num_samples,)` where the
+            samples will be stored. If not provided a new array is
+            allocated.
 
         Notes
         -----
@@ -494,12 +544,150 @@ class JakesSampleGenerator(FadingSampleGenerator):
         t = self._generate_time_samples(num_samples)
 
         # Finally calculate the channel samples
+        self._samples = self._calc_samples(t, out)
+
+    def generate_more_samples_with_stride(self, num_samples, stride,
+                                          out=None):
+        """
+        Generate `num_samples` samples spaced by `stride` samples.
+
+        This gives the same samples of calling `generate_more_samples()`
+        followed by `skip_samples_for_next_generation(stride - 1)`
+        `num_samples` times, but all samples are calculated at once.
+
+        Parameters
+        ----------
+        num_samples : int
+            Number of samples (with the provided shape) to generate.
+        stride : int
+            The distance (in samples) between two generated samples.
+        out : np.ndarray, optional
+            A complex array with shape `shape + (num_samples,)` where the
+            samples will be stored. If not provided a new array is
+            allocated.
+
+        Notes
+        -----
+        This method will update the self._current_time variable.
+        """
+        # The time of each sample is accumulated in the same way it would
+        # be if we called generate_more_samples and
+        # skip_samples_for_next_generation, so that the samples are exactly
+        # the same.
+        t = np.empty(num_samples)
+        current_time = self._current_time
+        for i in range(num_samples):
+            t[i] = current_time
+            current_time = current_time + self.Ts
+            current_time += (stride - 1) * self.Ts
+        self._current_time = current_time
+
+        self._samples = self._calc_samples(t, out)
+
+    def _calc_samples(self, t, out=None):
+        """
+        Calculate the channel samples for the time samples in `t`.
+
+        The samples are calculated in chunks of at most
+        `_max_chunk_size` elements and one ray at a time. Therefore, the
+        memory used for temporary arrays does not depend on the number of
+        samples (or on the number of rays) and the samples are exactly the
+        same as the ones obtained by evaluating the whole Jakes model
+        expression at once.
+
+        Parameters
+        ----------
+        t : np.ndarray
+            The time samples. Only the last dimension of `t` can be
+            different from 1.
+        out : np.ndarray, optional
+            The array where the samples will be stored.
+
+        Returns
+        -------
+        np.ndarray
+            The channel samples.
+        """
+        t = np.reshape(t, -1)
+        num_samples = t.size
+        shape = () if self.shape is None else tuple(self.shape)
+
+        out = self._get_output_buffer(out, shape + (num_samples, ))
+
+        # The samples are calculated as a 2D array where each row
+        # corresponds to one element of the generator shape
+        num_rows = int(np.prod(shape))
+        if out.flags.c_contiguous:
+            samples = out.reshape(num_rows, num_samples)
+        else:
+            samples = np.empty((num_rows, num_samples), dtype=complex)
+
+        # This is the same as "2 * pi * Fd * cos(phi_l)" in the Jakes model
+        # expression. Both this and psi_l have shape `L x num_rows x 1`,
+        # which is broadcast with the time samples.
         # noinspection PyTypeChecker
-        h = (math.sqrt(1.0 / self.L) *
-             np.sum(np.exp(1j * (2 * np.pi * self.Fd *
-                                 np.cos(self._phi_l) * t + self._psi_l)),
-                    axis=0))
-        self._samples = h
+        doppler = np.reshape(2 * np.pi * self.Fd * np.cos(self._phi_l),
+                             (self.L, num_rows, 1))
+        psi = np.reshape(self._psi_l, (self.L, num_rows, 1))
+
+        # Each chunk has `chunk_rows` rows and `chunk_cols` columns. The
+        # chunks span whole rows whenever they fit, instead of splitting
+        # only the time samples. Otherwise a generator with a large shape
+        # (such as the one used by the stacked multiuser channels) would be
+        # evaluated in many tiny chunks.
+        chunk_cols = max(1, min(num_samples, self._max_chunk_size))
+        chunk_rows = max(1, self._max_chunk_size // chunk_cols)
+        for row in range(0, num_rows, chunk_rows):
+            rows = slice(row, row + chunk_rows)
+            for col in range(0, num_samples, chunk_cols):
+                t_chunk = t[col:col + chunk_cols]
+                chunk = samples[rows, col:col + chunk_cols]
+                phase = np.empty(chunk.shape)
+                ray = np.empty(chunk.shape, dtype=complex)
+                for l in range(self.L):
+                    np.multiply(doppler[l, rows], t_chunk, out=phase)
+                    np.add(phase, psi[l, rows], out=phase)
+                    np.multiply(1j, phase, out=ray)
+                    if l == 0:
+                        np.exp(ray, out=chunk)
+                    else:
+                        np.exp(ray, out=ray)
+                        # Numpy sums over the first dimension
+                        # sequentially, thus accumulating one ray at a time
+                        # gives the same result
+                        chunk += ray
+                chunk *= math.sqrt(1.0 / self.L)
+
+        if not out.flags.c_contiguous:
+            out[...] = samples.reshape(out.shape)
+
+        return out
+
+    @staticmethod
+    def _get_output_buffer(out, shape):
+        """
+        Get the array where the generated samples will be stored.
+
+        Parameters
+        ----------
+        out : np.ndarray | None
+            The array provided by the caller, if any.
+        shape : tuple[int]
+            The required shape.
+
+        Returns
+        -------
+        np.ndarray
+            A new array if `out` is None or `out` otherwise.
+        """
+        if out is None:
+            return np.empty(shape, dtype=complex)
+
+        if out.shape != shape or out.dtype != complex:
+            raise ValueError(
+                "The provided output array must be a complex array with "
+                "shape {0}".format(shape))
+        return out
 
     def skip_samples_for_next_generation(self, num_samples):
         """
@@ -26,6 +26,81 @@ from ..util.misc import randn_c_RS
 from . import singleuser
 
 
+def _stack_and_pad(arrays):
+    """
+    Stack a sequence of arrays (possibly with different shapes in the last
+    two dimensions) into a single array, padding each of them with zeros.
+
+    Parameters
+    ----------
+    arrays : list[np.ndarray] | np.ndarray
+        A sequence of numpy arrays with at least two dimensions. Any
+        dimension before the last two ones is broadcast.
+
+    Returns
+    -------
+    np.ndarray
+        A numpy array with dimension `... x len(arrays) x max_rows x
+        max_cols`, where `max_rows` and `max_cols` are the largest number of
+        rows and columns among the arrays in `arrays`.
+    """
+    leading_shape = ()
+    for a in arrays:
+        leading_shape = np.broadcast(np.empty(leading_shape),
+                                     np.empty(a.shape[:-2])).shape
+    num_rows = max(a.shape[-2] for a in arrays)
+    num_cols = max(a.shape[-1] for a in arrays)
+    dtype = np.result_type(*arrays)
+    stacked = np.zeros(leading_shape + (len(arrays), num_rows, num_cols),
+                       dtype=dtype)
+    for i, a in enumerate(arrays):
+        stacked[..., i, :a.shape[-2], :a.shape[-1]] = a
+    return stacked
+
+
+def _calc_dense_SINR(dense_H, F, U, noise_var):
+    """
+    Calculates the SINR (in linear scale) of all streams of all users.
+
+    Parameters
+    ----------
+    dense_H : np.ndarray
+        The channel from all transmitters to all receivers. Dimension:
+        `... x K x K x Nr x Nt`.
+    F : np.ndarray
+        The precoders of all users. Dimension: `... x K x Nt x Ns`.
+    U : np.ndarray
+        The receive filters of all users. Dimension: `... x K x Nr x Ns`.
+    noise_var : float
+        The noise variance.
+
+    Returns
+    -------
+    np.ndarray
+        The SINR of all streams of all users. Dimension: `... x K x Ns`.
+        Streams that only exist due to zero padding have a NaN SINR.
+    """
+    U_H = np.conj(np.swapaxes(U, -1, -2))
+
+    # G[..., k, j, l, d] is the gain from stream `d` of transmitter `j` to
+    # stream `l` of receiver `k`, after the receive filter
+    G = np.matmul(np.matmul(U_H[..., np.newaxis, :, :], dense_H),
+                  F[..., np.newaxis, :, :, :])
+    power = np.abs(G) ** 2
+
+    desired_power = np.diagonal(
+        np.diagonal(power, axis1=-4, axis2=-3), axis1=-3, axis2=-2)
+    # The denominator is equal to the quadratic form of the Bkl covariance
+    # matrix, that is, the power received from all streams except the
+    # desired one plus the noise
+    total_power = np.sum(power, axis=(-3, -1))
+    noise_power = noise_var * np.sum(np.abs(U) ** 2, axis=-2)
+
+    # Streams that only exist due to padding give 0/0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return desired_power / (total_power - desired_power + noise_power)
+
+
 class MuChannel(object):
     """
     SISO multiuser channel.
@@ -551,2190 +626,3402 @@ class MuMimoChannel(MuChannel):
                     num_rx_antennas, num_tx_antennas)
 
 
-# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-# xxxxxxxxxxxxxxx Old Classes for backward compatibility xxxxxxxxxxxxxxxxxx
-# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-# TODO: Maybe remove the N0_or_Rek argument of the "*calc_Bkl*" methods and
-# use the value of self.noise_var whenever possible.
-class MultiUserChannelMatrix(object):  # pylint: disable=R0902
+class _StackedTdlChannel(fading.TdlChannel):
     """
-    Stores the (fast fading) channel matrix of a multi-user scenario.
-    The path-loss from each transmitter to each receiver is also be
-    accounted if the set_pathloss is called to set the path-loss matrix.
+    TdlChannel used by :class:`StackedMuChannel` to represent all links of
+    a multiuser channel as a single MIMO TdlChannel.
 
-    This channel matrix can be seem as an concatenation of blocks (of
-    non-uniform size) where each block is a channel from one transmitter to
-    one receiver and the block size is equal to the number of receive
-    antennas of the receiver times the number of transmit antennas of the
-    transmitter.
+    The only difference to a regular TdlChannel is that the gain of each
+    (rx antenna, tx antenna) pair, given by `link_gains`, is applied to
+    each generated impulse response.
+    """
+    def __init__(self, fading_generator, channel_profile=None,
+                 tap_powers_dB=None, tap_delays=None, Ts=None):
+        super(_StackedTdlChannel, self).__init__(
+            fading_generator, channel_profile, tap_powers_dB, tap_delays,
+            Ts)
 
-    For instance, in a 3-users scenario the block (1,0) corresponds to the
-    channel between the transmit antennas of user 0 and the receive
-    antennas of user 1 (indexing staring at zero). If the number of receive
-    antennas and transmit antennas of the three users are [2, 4, 6] and
-    [2, 3, 5], respectively, then the block (1,0) would have a dimension of
-    4x2. Likewise, the channel matrix would look similar to the block
-    structure below.
+        # Either None or an array with dimension `num_rx_ant x num_tx_ant`
+        # which is multiplied by the generated tap values.
+        self.link_gains = None
 
-      +-----+---------+---------------+
-      |2 x 2|  2 x 3  |     2 x 5     |
-      |     |         |               |
-      +-----+---------+---------------+
-      |4 x 2|  4 x 3  |     4 x 5     |
-      |     |         |               |
-      |     |         |               |
-      |     |         |               |
-      +-----+---------+---------------+
-      |6 x 2|  6 x 3  |     6 x 5     |
-      |     |         |               |
-      |     |         |               |
-      |     |         |               |
-      |     |         |               |
-      |     |         |               |
-      +-----+---------+---------------+
+    def generate_impulse_response(self, num_samples=1, stride=1):
+        """
+        Generate a new impulse response of all discretized taps (not
+        including possible zero padding) for `num_samples` channel
+        realizations, including the gain of each link.
 
-    It is possible to initialize the channel matrix randomly by calling the
-    `randomize` method, or from a given matrix by calling the
-    `init_from_channel_matrix` method.
+        Parameters
+        ----------
+        num_samples : int
+            The number of samples to generate (for each tap).
+        stride : int
+            The distance (in samples) between two generated samples.
+        """
+        super(_StackedTdlChannel, self).generate_impulse_response(
+            num_samples, stride)
+        if self.link_gains is not None:
+            self._last_impulse_response = (
+                self._last_impulse_response *
+                self.link_gains[:, :, np.newaxis])
 
-    In order to get the channel matrix of a specific user `k` to another
-    user `l`, call the `get_Hkl` method.
+
+class StackedMuChannel(object):
     """
+    SISO multiuser channel where all links are generated and applied at
+    once.
 
-    def __init__(self):
-        # The _big_H_no_pathloss variable is an internal variable with all
-        # the channels from each transmitter to each receiver represented
-        # as a single big matrix.
-        self._big_H_no_pathloss = np.array([], dtype=np.ndarray)
+    This has the same interface of :class:`MuChannel`, but instead of
+    one SuChannel object (with its own fading generator) for each link,
+    the fading samples, channel profile and path loss of all links are
+    stored in stacked numpy arrays of a single TdlChannel whose antennas
+    are the antennas of all receivers and of all transmitters. Therefore,
+    the number of Python calls and FFTs in `corrupt_data` and
+    `corrupt_data_in_freq_domain` does not depend on the number of links.
 
-        # The _H_no_pathloss variable is an internal variable with all the
-        # channels from each transmitter to each receiver. It points to the
-        # same data as the _big_H_no_pathloss variable, however, _H is a
-        # "matrix of matrices" instead of a single big matrix.
-        self._H_no_pathloss = np.array([], dtype=np.ndarray)
+    Note that noise is NOT added.
 
-        # The _big_H_with_pathloss and _H_with_pathloss variables are
-        # similar to their no_pathloss counterpart, but include the effect
-        # of pathloss if it was set.
-        self._big_H_with_pathloss = None
-        self._H_with_pathloss = None
+    Parameters
+    ----------
+    N : int | list[int,int] | tuple[int,int]
+        The number of transmit/receive pairs.
+    fading_generator : T <= fading_generators.FadingSampleGenerator
+        The instance of a fading generator in the `fading_generators`
+        module. It should be a subclass of FadingSampleGenerator. A
+        similar (but independent) fading generator will be created from
+        it to generate the channel samples of all links. If not provided
+        then RayleighSampleGenerator will be used
+    channel_profile : fading.TdlChannelProfile
+        The channel profile, which specifies the tap powers and delays.
+    tap_powers_dB : np.ndarray
+        The powers of each tap (in dB). Dimension: `L x 1`
+        Note: The power of each tap will be a negative number (in dB).
+    tap_delays : np.ndarray
+        The delay of each tap (in seconds). Dimension: `L x 1`
+    """
+    def __init__(self, N, fading_generator=None, channel_profile=None,
+                 tap_powers_dB=None, tap_delays=None, Ts=None):
+        if fading_generator is None:
+            fading_generator = fading_generators.RayleighSampleGenerator()
+
+        if isinstance(N, tuple) or isinstance(N, list):
+            num_rx = N[0]
+            num_tx = N[1]
+        else:
+            num_rx = N
+            num_tx = N
+
+        self._num_rx = num_rx
+        self._num_tx = num_tx
+
+        # Number of antennas of each receiver and of each transmitter. They
+        # are None for SISO transmission.
+        self._num_rx_antennas = None
+        self._num_tx_antennas = None
+
+        if (channel_profile is None and
+                tap_powers_dB is None and
+                tap_delays is None):
+            # Only the fading generator was provided. Let's assume a flat
+            # fading channel
+            tap_powers_dB = np.zeros(1)
+            tap_delays = np.zeros(1)
+
+        self._tdlchannel = _StackedTdlChannel(
+            fading_generator.get_similar_fading_generator(),
+            channel_profile, tap_powers_dB, tap_delays, Ts)
+        self._tdlchannel.set_num_antennas(num_rx, num_tx)
 
-        self._Nr = np.array([])
-        self._Nt = np.array([])
-        self._K = 0
         self._pathloss_matrix = None
-        # _pathloss_big_matrix should not be set directly. It is set when
-        # _pathloss_matrix is set in the set_pathloss method.
-        self._pathloss_big_matrix = None
-        self._RS_channel = np.random.RandomState()
-        self._RS_noise = np.random.RandomState()
 
-        # Store the AWGN noise array from the last time any of the
-        # corrupt*_data methods were called.
-        self._last_noise = None
-        # Store the noise variance. If it is None, then no noise is added
-        # in the "corrupt_*data" methods.
-        self._noise_var = None
+    def __repr__(self):
+        """
+        String representation the object.
 
-        # Post processing filters (a list of 2D numpy arrays) for each user
-        self._W = None
-        # Same as _W, but as a single block diagonal matrix.
-        self._big_W = None
+        Returns
+        -------
+        str
+            The string representation of the object.
+        """
+        return "{0}(shape={1}, switched={2})".format(
+            self.__class__.__name__,
+            "{0}x{1}".format(self._num_rx, self._num_tx),
+            self.switched_direction)
 
-    def set_channel_seed(self, seed=None):  # pragma: no cover
+    def _set_num_antennas(self, num_rx_antennas, num_tx_antennas):
         """
-        Set the seed of the RandomState object used to generate the random
-        elements of the channel (when self.randomize is called).
+        Set the number of antennas of each receiver and of each
+        transmitter.
 
         Parameters
         ----------
-        seed : None | int | array_like
-            Random seed initializing the pseudo-random number
-            generator. See np.random.RandomState help for more info.
+        num_rx_antennas : int
+            Number of receive antennas of each user.
+        num_tx_antennas : int
+            Number of transmit antennas of each user.
+        """
+        self._num_rx_antennas = num_rx_antennas
+        self._num_tx_antennas = num_tx_antennas
+        self._tdlchannel.set_num_antennas(self._num_rx * num_rx_antennas,
+                                          self._num_tx * num_tx_antennas)
+        # The link gains depend on the number of antennas
+        self.set_pathloss(self._pathloss_matrix)
+
+    @property
+    def switched_direction(self):
         """
-        self._RS_channel.seed(seed=seed)
+        Get the value of `switched_direction`.
 
-    def set_noise_seed(self, seed=None):  # pragma: no cover
+        Returns
+        -------
+        bool
+            True if direction is switched and False otherwise.
         """
-        Set the seed of the RandomState object used to generate the random
-        noise elements (when the corrupt data function is called).
+        return self._tdlchannel.switched_direction
+
+    @switched_direction.setter
+    def switched_direction(self, value):
+        """
+        Set the value of `switched_direction`.
 
         Parameters
         ----------
-        seed : None | int | array_like
-            Random seed initializing the pseudo-random number
-            generator. See np.random.RandomState help for more info.
+        value : bool
+            True to switch directions of false to use original direction.
         """
-        self._RS_noise.seed(seed)
+        self._tdlchannel.switched_direction = value
 
-    def re_seed(self):  # pragma: no cover
+    @property
+    def num_tx_antennas(self):
         """
-        Re-seed the channel and noise RandomState objects randomly.
+        Get the number of transmit antennas.
 
-        If you want to specify the seed for each of them call the
-        `set_channel_seed` and `set_noise_seed` methods and pass the
-        desired seed for each of them.
+        Returns
+        -------
+        np.ndarray
+            The number of transmit antennas.
         """
-        self.set_channel_seed(None)
-        self.set_noise_seed(None)
+        if self._num_tx_antennas is None:
+            return np.full(self._num_tx, -1, dtype=int)
+        return np.full(self._num_tx, self._num_tx_antennas, dtype=int)
 
-    # Property to get the number of receive antennas
     @property
-    def Nr(self):
+    def num_rx_antennas(self):
         """
-        Get method for the Nr property.
+        Get the number of receive antennas.
 
         Returns
         -------
         np.ndarray
-            The number of receive antennas of all users.
+            The number of receive antennas.
         """
-        return self._Nr
+        if self._num_rx_antennas is None:
+            return np.full(self._num_rx, -1, dtype=int)
+        return np.full(self._num_rx, self._num_rx_antennas, dtype=int)
 
-    # Property to get the number of transmit antennas
     @property
-    def Nt(self):
+    def channel_profile(self):
         """
-        Get method for the Nt property.
+        Return the channel profile.
 
         Returns
         -------
-        np.ndarray
-            The number of transmit antennas of all users.
+        fading.TdlChannelProfile
+            The channel profile.
         """
-        return self._Nt
+        return self._tdlchannel.channel_profile
 
-    # Property to get the number of users
     @property
-    def K(self):
+    def num_taps(self):
         """
-        Get method for the K property.
+        Get the number of taps in the profile.
+
+        Note that all links have the same channel profile.
 
         Returns
         -------
         int
-            The number of users (transmit-receive pairs).
+            The number of taps in the channel (not including any zero
+            padding).
         """
-        return self._K
+        return self._tdlchannel.num_taps
 
-    # Property to get the matrix of channel matrices (with pass loss
-    # applied if any)
     @property
-    def H(self):
+    def num_taps_with_padding(self):
         """
-        Get method for the H property.
+        Get the number of taps in the profile including zero-padding
+        when the profile is discretized.
+
+        If the profile is not discretized an exception is raised.
+
+        Note that all links have the same channel profile.
 
         Returns
         -------
-        np.ndarray
-            The channel from all transmitters to all receivers. This is a
-            numpy array of numpy arrays.
+        int
+            The number of taps in the channel (including any zero padding).
         """
-        if self._pathloss_matrix is None:
-            # No path loss
-            return self._H_no_pathloss
-        else:
-            if self._H_with_pathloss is None:
-                # Apply path loss. Note that the _pathloss_big_matrix
-                # matrix has the same dimension as the
-                # self._big_H_no_pathloss matrix and we are performing
-                # element-wise multiplication here.
-                # noinspection PyTypeChecker
-                self._H_with_pathloss = self._H_no_pathloss * np.sqrt(
-                    self._pathloss_matrix)
-            return self._H_with_pathloss
+        return self._tdlchannel.num_taps_with_padding
 
-    # Property to get the big channel matrix (with pass loss applied if
-    # any)
     @property
-    def big_H(self):
+    def pathloss_matrix(self):
         """
-        Get method for the big_H property.
+        Get the matrix with the pathloss from each transmitter to each
+        receiver.
 
         Returns
         -------
         np.ndarray
-            The channel from all transmitters to all receivers as a single
-            big matrix (numpy complex array)
+            The pathloss matrix, if it was set, or None if there is no
+            pathloss.
         """
-        if self._pathloss_matrix is None:
-            # No path loss
-            return self._big_H_no_pathloss
-        else:
-            if self._big_H_with_pathloss is None:
-                # Apply path loss. Note that the _pathloss_big_matrix
-                # matrix has the same dimension as the
-                # self._big_H_no_pathloss matrix and we are performing
-                # element-wise multiplication here.
-                # noinspection PyTypeChecker
-                self._big_H_with_pathloss = (
-                    self._big_H_no_pathloss *
-                    np.sqrt(self._pathloss_big_matrix))
-            return self._big_H_with_pathloss
+        return self._pathloss_matrix
 
-    # Property to get the pathloss. Use the "set_pathloss" method to set
-    # the pathloss.
-    @property
-    def pathloss(self):
+    def set_pathloss(self, pathloss_matrix=None):
         """
-        Get method for the pathloss property.
+        Set the path loss (IN LINEAR SCALE) from each transmitter to each
+        receiver.
 
-        Returns
-        -------
-        None | np.ndarray
-            The pathloss matrix (if one was set).
+        The path loss will be accounted when calling the corrupt_data
+        method.
+
+        If you want to disable the path loss, set `pathloss_matrix` to
+        None.
+
+        Parameters
+        ----------
+        pathloss_matrix : np.ndarray
+            A matrix with dimension "K x K", where K is the number of
+            users, with the path loss (IN LINEAR SCALE) from each
+            transmitter (columns) to each receiver (rows). If you want to
+            disable the path loss then set it to None.
+
+        Notes
+        -----
+        Note that path loss is a power relation, which means that the
+        channel coefficients will be multiplied by the square root of
+        elements in `pathloss_matrix`.
         """
-        return self._pathloss_matrix
+        if pathloss_matrix is None:
+            self._pathloss_matrix = None
+            self._tdlchannel.link_gains = None
+            return
 
-    @property
-    def last_noise(self):
+        pathloss_matrix = np.array(pathloss_matrix, dtype=float)
+        if np.any(pathloss_matrix < 0) or np.any(pathloss_matrix > 1):
+            raise ValueError("Pathloss must be between 0 and 1")
+
+        # Set in an attribute for easy retriaval later
+        self._pathloss_matrix = pathloss_matrix
+
+        # The gain of each link is repeated for all of its antennas
+        link_gains = np.sqrt(pathloss_matrix)
+        if self._num_rx_antennas is not None:
+            link_gains = np.kron(
+                link_gains,
+                np.ones((self._num_rx_antennas, self._num_tx_antennas)))
+        self._tdlchannel.link_gains = link_gains
+
+    def _get_num_users_and_antennas(self):
         """
-        Get method for the last_noise property.
+        Get the number of receivers, transmitters and their number of
+        antennas, considering the current direction.
 
         Returns
         -------
-        None | np.ndarray
-            The last AWGN noise array added to corrupt the data.
-        """
-        return self._last_noise
+        (int, int, int, int)
+            The number of receivers, the number of antennas of each
+            receiver, the number of transmitters and the number of antennas
+            of each transmitter.
+        """
+        num_rx, num_tx = self._num_rx, self._num_tx
+        num_rx_ant = self._num_rx_antennas or 1
+        num_tx_ant = self._num_tx_antennas or 1
+        if self.switched_direction:
+            return num_tx, num_tx_ant, num_rx, num_rx_ant
+        return num_rx, num_rx_ant, num_tx, num_tx_ant
 
-    @property
-    def noise_var(self):
+    def _stack_signal(self, signal):
         """
-        Get method for the noise_var property.
+        Stack the signal of all transmitters into a single 2D array, where
+        each row corresponds to one transmit antenna.
+
+        Parameters
+        ----------
+        signal : np.ndarray | list[np.ndarray]
+            The signal of each transmitter.
 
         Returns
         -------
-        None | float
-            The noise variance, if noise is being added in "corrupt_*data"
-            methods.
+        np.ndarray
+            The stacked signal.
         """
-        return self._noise_var
+        _, _, num_tx, num_tx_ant = self._get_num_users_and_antennas()
 
-    @noise_var.setter
-    def noise_var(self, value):
+        if isinstance(signal, np.ndarray) and signal.dtype != object:
+            stacked_signal = np.reshape(signal, (-1, signal.shape[-1]))
+        else:
+            stacked_signal = np.concatenate(
+                [np.reshape(s, (-1, s.shape[-1])) for s in signal])
+
+        if stacked_signal.shape[0] != num_tx * num_tx_ant:
+            raise ValueError(
+                "The signal must have {0} transmitters with {1} antennas "
+                "each".format(num_tx, num_tx_ant))
+        return stacked_signal
+
+    def _split_output(self, output):
         """
-        Set method for the noise_var property.
+        Split the stacked output of all receive antennas into the output
+        of each receiver.
 
         Parameters
         ----------
-        value: float | None
-            The noise variance used when generating a new noise vector to add
-            in the "corrupt_*data" methods. If `value` is None then noise
-            addition is disabled.
+        output : np.ndarray
+            The stacked output, where each row corresponds to one receive
+            antenna.
+
+        Returns
+        -------
+        np.ndarray
+            Received signal at each receiver.
         """
-        if value is not None:
-            assert value >= 0.0, "Noise variance must be >= 0."
-        self._noise_var = value
+        num_rx, num_rx_ant, _, _ = self._get_num_users_and_antennas()
 
-    @staticmethod
-    def _from_small_matrix_to_big_matrix(small_matrix, Nr, Nt, Kr, Kt=None):
+        outputs = np.empty(num_rx, dtype=object)
+        for rx in range(num_rx):
+            if self._num_rx_antennas is None:
+                outputs[rx] = output[rx]
+            else:
+                outputs[rx] = output[rx * num_rx_ant:(rx + 1) * num_rx_ant]
+        return outputs
+
+    def corrupt_data(self, signal):
         """
-        Convert from a small matrix to a big matrix by repeating elements
-        according to the number of receive and transmit antennas.
+        Corrupt data passed through the TDL channels of each link.
+
+        Note that noise is NOT added in `corrupt_data`.
 
         Parameters
         ----------
-        small_matrix : np.ndarray
-            Any 2D numpy array
-        Nr : np.ndarray
-            Number of antennas at each receiver. This should be a 1D numpy
-            array.
-        Nt : np.ndarray
-            Number of antennas at each transmitter. This should be a 1D numpy
-            array.
-        Kr : int
-            Number of receivers to consider.
-        Kt : int, optional
-            Number of transmitters to consider. It not provided the value of
-            Kr will be used.
+        signal : np.ndarray | list[np.ndarray]
+            Signal to be transmitted through the channel. This should be
+            a 2D numpy array (1D array if there is only one
+            transmitter), where each row corresponds to the transmit
+            data of one transmitter. For MIMO transmission this should be
+            a 3D numpy array (or a list of 2D numpy arrays) with the
+            transmit data of each transmitter.
 
         Returns
         -------
-        big_matrix : np.ndarray
-            The converted matrix. This is a 2D numpy array
-
-        Notes
-        -----
-        Since a 'user' is a transmit/receive pair then the small_matrix
-        will be a square matrix and `Kr` must be equal to `Kt`.  However, in
-        the :class:`MultiUserChannelMatrixExtInt` class we will only have the
-        'transmitter part' for the external interference sources. That
-        means that small_matrix will have more columns then rows and `Kt`
-        will be greater then `Kr`.
+        np.ndarray
+            Received signal at each receiver. Each row corresponds to one
+            receiver.
+        """
+        output = self._tdlchannel.corrupt_data(self._stack_signal(signal))
+        return self._split_output(output)
 
-        Examples
-        --------
-        >>> K = 3
-        >>> Nr = np.array([2, 4, 6])
-        >>> Nt = np.array([2, 3, 5])
-        >>> small_matrix = np.array([[1,2,3],[4,5,6],[7,8,9]])
-        >>> MultiUserChannelMatrix._from_small_matrix_to_big_matrix(\
-                small_matrix, Nr, Nt, K)
-        array([[1, 1, 2, 2, 2, 3, 3, 3, 3, 3],
-               [1, 1, 2, 2, 2, 3, 3, 3, 3, 3],
-               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
-               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
-               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
-               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
-               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9]])
+    def corrupt_data_in_freq_domain(self, signal, fft_size,
+                                    carrier_indexes=None):
         """
-        if Kt is None:
-            Kt = Kr
+        Corrupt data passed through the TDL channels of each link,
+        but in the frequency domain..
 
-        cumNr = np.hstack([0, np.cumsum(Nr)])
-        cumNt = np.hstack([0, np.cumsum(Nt)])
-        big_matrix = np.ones([int(np.sum(Nr)), int(np.sum(Nt))],
-                             dtype=small_matrix.dtype)
+        For each link, this is ROUGHLY equivalent to modulating `signal`
+        with OFDM using `fft_size` subcarriers, transmitting through a
+        regular TdlChannel, and then demodulating with OFDM to recover the
+        received signal.
 
-        for rx in range(Kr):
-            for tx in range(Kt):
-                big_matrix[cumNr[rx]:cumNr[rx + 1], cumNt[tx]:cumNt[tx + 1]] \
-                    *= small_matrix[rx, tx]
-        return big_matrix
+        One important difference is that here the channel is considered
+        constant during the transmission of `fft_size` elements in
+        `signal`, and then it is varied by the equivalent of the variation
+        for that number of elements. That is, the channel is block static.
 
-    def init_from_channel_matrix(self, channel_matrix, Nr, Nt, K):
-        """
-        Initializes the multiuser channel matrix from the given
-        `channel_matrix`.
+        Note that noise is NOT added in `corrupt_data`.
 
         Parameters
         ----------
-        channel_matrix : np.ndarray
-            A matrix concatenating the channel of all users (from each
-            transmitter to each receiver). This is a 2D numpy array.
-        Nr : int | np.ndarray
-            Number of antennas at each receiver.
-        Nt : int | np.ndarray
-            Number of antennas at each transmitter.
-        K : int
-            Number of transmit/receive pairs.
+        signal : np.ndarray | list[np.ndarray]
+            Signal to be transmitted through the channel. This should be a 2D
+            numpy array where each row corresponds to the transmit data of
+            one transmitter. It can also be a list of numpy arrays or,
+            if there is only one transmitter, a single 1D numpy array.
+        fft_size : int
+            The size of the Fourier transform to get the frequency
+            response.
+        carrier_indexes : slice | np.ndarray | list[int]
+            The indexes of the subcarriers where signal is to be
+            transmitted (all users will use the same indexes). If it is
+            None assume all subcarriers will be used.
 
         Returns
         -------
-        None
-
-        Raises
-        ------
-        ValueError
-            If the arguments are invalid.
+        np.ndarray
+            Received signal at each receiver. Each row corresponds to one
+            receiver.
+        """
+        output = self._tdlchannel.corrupt_data_in_freq_domain(
+            self._stack_signal(signal), fft_size, carrier_indexes)
+        return self._split_output(output)
 
+    def get_last_impulse_response(self, rx_idx, tx_idx):
         """
-        # If Nt or Nr (or both) is (are) int assume the same value should
-        # be used for all users.
-        if isinstance(Nr, int):  # pragma: no cover
-            Nr = np.ones(K, dtype=int) * Nr
-        if isinstance(Nt, int):  # pragma: no cover
-            Nt = np.ones(K, dtype=int) * Nt
+        Get the last generated impulse response.
 
-        if channel_matrix.shape != (np.sum(Nr), np.sum(Nt)):
-            msg = ("Shape of the channel_matrix must be equal to the sum or"
-                   " receive antennas of all users times the sum of the "
-                   "receive antennas of all users.")
-            raise ValueError(msg)
+        A new impulse response is generated when the method `corrupt_data`
+        is called. You can use the `get_last_impulse_response` method to
+        get the impulse response used to corrupt the last data.
 
-        if (Nt.size != K) or (Nr.size != K):
-            raise ValueError(
-                "K must be equal to the number of elements in Nr and Nt")
+        Parameters
+        ----------
+        rx_idx : int
+            The index of the receiver.
+        tx_idx : int
+            The index of the transmitter
 
-        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
-        # correctly set the first time the _get_H or _get_big_H methods are
-        # called.
-        self._big_H_with_pathloss = None
-        self._H_with_pathloss = None
+        Returns
+        -------
+        fading.TdlImpulseResponse
+            The impulse response of the channel that was used to corrupt
+            the last data for the link from transmitter `tx_idx` to
+            receiver `rx_idx`.
+        """
+        impulse_response = self._tdlchannel.get_last_impulse_response()
+        tap_values = impulse_response.tap_values_sparse
 
-        self._K = K
-        self._Nr = Nr
-        self._Nt = Nt
+        if self._num_rx_antennas is None:
+            link_tap_values = tap_values[:, rx_idx, tx_idx]
+        else:
+            num_rx_ant = self._num_rx_antennas
+            num_tx_ant = self._num_tx_antennas
+            link_tap_values = tap_values[
+                :,
+                rx_idx * num_rx_ant:(rx_idx + 1) * num_rx_ant,
+                tx_idx * num_tx_ant:(tx_idx + 1) * num_tx_ant]
+
+        return fading.TdlImpulseResponse(link_tap_values,
+                                         impulse_response.channel_profile)
+
+
+class StackedMuMimoChannel(StackedMuChannel):
+    """
+    MIMO multiuser channel where all links are generated and applied at
+    once.
+
+    This has the same interface of :class:`MuMimoChannel`. See
+    :class:`StackedMuChannel` for details.
+
+    Note that noise is NOT added.
+
+    Parameters
+    ----------
+    N : int
+        The number of transmit/receive pairs.
+    num_rx_antennas : int
+        Number of receive antennas of each user.
+    num_tx_antennas : int
+        Number of transmit antennas of each user.
+    fading_generator : T <= fading_generators.FadingSampleGenerator
+        The instance of a fading generator in the `fading_generators`
+        module. It should be a subclass of FadingSampleGenerator. A
+        similar (but independent) fading generator will be created from
+        it to generate the channel samples of all links. If not provided
+        then RayleighSampleGenerator will be used
+    channel_profile : fading.TdlChannelProfile
+        The channel profile, which specifies the tap powers and delays.
+    tap_powers_dB : np.ndarray
+        The powers of each tap (in dB). Dimension: `L x 1`
+        Note: The power of each tap will be a negative number (in dB).
+    tap_delays : np.ndarray
+        The delay of each tap (in seconds). Dimension: `L x 1`
+    """
+    def __init__(self, N,
+                 num_rx_antennas, num_tx_antennas, fading_generator=None,
+                 channel_profile=None,
+                 tap_powers_dB=None, tap_delays=None, Ts=None):
+        super(StackedMuMimoChannel, self).__init__(
+            N, fading_generator, channel_profile,
+            tap_powers_dB, tap_delays, Ts)
+        self._set_num_antennas(num_rx_antennas, num_tx_antennas)
+
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx Old Classes for backward compatibility xxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# TODO: Maybe remove the N0_or_Rek argument of the "*calc_Bkl*" methods and
+# use the value of self.noise_var whenever possible.
+class MultiUserChannelMatrix(object):  # pylint: disable=R0902
+    """
+    Stores the (fast fading) channel matrix of a multi-user scenario.
+    The path-loss from each transmitter to each receiver is also be
+    accounted if the set_pathloss is called to set the path-loss matrix.
+
+    This channel matrix can be seem as an concatenation of blocks (of
+    non-uniform size) where each block is a channel from one transmitter to
+    one receiver and the block size is equal to the number of receive
+    antennas of the receiver times the number of transmit antennas of the
+    transmitter.
+
+    For instance, in a 3-users scenario the block (1,0) corresponds to the
+    channel between the transmit antennas of user 0 and the receive
+    antennas of user 1 (indexing staring at zero). If the number of receive
+    antennas and transmit antennas of the three users are [2, 4, 6] and
+    [2, 3, 5], respectively, then the block (1,0) would have a dimension of
+    4x2. Likewise, the channel matrix would look similar to the block
+    structure below.
+
+      +-----+---------+---------------+
+      |2 x 2|  2 x 3  |     2 x 5     |
+      |     |         |               |
+      +-----+---------+---------------+
+      |4 x 2|  4 x 3  |     4 x 5     |
+      |     |         |               |
+      |     |         |               |
+      |     |         |               |
+      +-----+---------+---------------+
+      |6 x 2|  6 x 3  |     6 x 5     |
+      |     |         |               |
+      |     |         |               |
+      |     |         |               |
+      |     |         |               |
+      |     |         |               |
+      +-----+---------+---------------+
+
+    It is possible to initialize the channel matrix randomly by calling the
+    `randomize` method, or from a given matrix by calling the
+    `init_from_channel_matrix` method.
+
+    In order to get the channel matrix of a specific user `k` to another
+    user `l`, call the `get_Hkl` method.
+    """
+
+    def __init__(self):
+        # The _big_H_no_pathloss variable is an internal variable with all
+        # the channels from each transmitter to each receiver represented
+        # as a single big matrix.
+        self._big_H_no_pathloss = np.array([], dtype=np.ndarray)
+
+        # The _H_no_pathloss variable is an internal variable with all the
+        # channels from each transmitter to each receiver. It points to the
+        # same data as the _big_H_no_pathloss variable, however, _H is a
+        # "matrix of matrices" instead of a single big matrix.
+        self._H_no_pathloss = np.array([], dtype=np.ndarray)
+
+        # The _big_H_with_pathloss and _H_with_pathloss variables are
+        # similar to their no_pathloss counterpart, but include the effect
+        # of pathloss if it was set.
+        self._big_H_with_pathloss = None
+        self._H_with_pathloss = None
+
+        self._Nr = np.array([])
+        self._Nt = np.array([])
+        self._K = 0
+        self._pathloss_matrix = None
+        # _pathloss_big_matrix should not be set directly. It is set when
+        # _pathloss_matrix is set in the set_pathloss method.
+        self._pathloss_big_matrix = None
+        self._RS_channel = np.random.RandomState()
+        self._RS_noise = np.random.RandomState()
+
+        # Store the AWGN noise array from the last time any of the
+        # corrupt*_data methods were called.
+        self._last_noise = None
+        # Store the noise variance. If it is None, then no noise is added
+        # in the "corrupt_*data" methods.
+        self._noise_var = None
+
+        # Post processing filters (a list of 2D numpy arrays) for each user
+        self._W = None
+        # Same as _W, but as a single block diagonal matrix.
+        self._big_W = None
+
+        # If True, then get_Hkl, calc_Q and calc_SINR (as well as the
+        # computation of the Bkl covariance matrices) are performed with
+        # batched operations on the dense representation of the channel
+        # (see the dense_H property) instead of looping over the users.
+        self.use_dense_backend = False
+        # The dense representation of the channel (including the path
+        # loss). This is set the first time the dense_H property is used.
+        self._dense_H = None
+
+    def set_channel_seed(self, seed=None):  # pragma: no cover
+        """
+        Set the seed of the RandomState object used to generate the random
+        elements of the channel (when self.randomize is called).
+
+        Parameters
+        ----------
+        seed : None | int | array_like
+            Random seed initializing the pseudo-random number
+            generator. See np.random.RandomState help for more info.
+        """
+        self._RS_channel.seed(seed=seed)
+
+    def set_noise_seed(self, seed=None):  # pragma: no cover
+        """
+        Set the seed of the RandomState object used to generate the random
+        noise elements (when the corrupt data function is called).
+
+        Parameters
+        ----------
+        seed : None | int | array_like
+            Random seed initializing the pseudo-random number
+            generator. See np.random.RandomState help for more info.
+        """
+        self._RS_noise.seed(seed)
+
+    def re_seed(self):  # pragma: no cover
+        """
+        Re-seed the channel and noise RandomState objects randomly.
+
+        If you want to specify the seed for each of them call the
+        `set_channel_seed` and `set_noise_seed` methods and pass the
+        desired seed for each of them.
+        """
+        self.set_channel_seed(None)
+        self.set_noise_seed(None)
+
+    # Property to get the number of receive antennas
+    @property
+    def Nr(self):
+        """
+        Get method for the Nr property.
+
+        Returns
+        -------
+        np.ndarray
+            The number of receive antennas of all users.
+        """
+        return self._Nr
+
+    # Property to get the number of transmit antennas
+    @property
+    def Nt(self):
+        """
+        Get method for the Nt property.
+
+        Returns
+        -------
+        np.ndarray
+            The number of transmit antennas of all users.
+        """
+        return self._Nt
+
+    # Property to get the number of users
+    @property
+    def K(self):
+        """
+        Get method for the K property.
+
+        Returns
+        -------
+        int
+            The number of users (transmit-receive pairs).
+        """
+        return self._K
+
+    # Property to get the matrix of channel matrices (with pass loss
+    # applied if any)
+    @property
+    def H(self):
+        """
+        Get method for the H property.
+
+        Returns
+        -------
+        np.ndarray
+            The channel from all transmitters to all receivers. This is a
+            numpy array of numpy arrays.
+        """
+        if self._pathloss_matrix is None:
+            # No path loss
+            return self._H_no_pathloss
+        else:
+            if self._H_with_pathloss is None:
+                # Apply path loss. Note that the _pathloss_big_matrix
+                # matrix has the same dimension as the
+                # self._big_H_no_pathloss matrix and we are performing
+                # element-wise multiplication here.
+                # noinspection PyTypeChecker
+                self._H_with_pathloss = self._H_no_pathloss * np.sqrt(
+                    self._pathloss_matrix)
+            return self._H_with_pathloss
+
+    # Property to get the big channel matrix (with pass loss applied if
+    # any)
+    @property
+    def big_H(self):
+        """
+        Get method for the big_H property.
+
+        Returns
+        -------
+        np.ndarray
+            The channel from all transmitters to all receivers as a single
+            big matrix (numpy complex array)
+        """
+        if self._pathloss_matrix is None:
+            # No path loss
+            return self._big_H_no_pathloss
+        else:
+            if self._big_H_with_pathloss is None:
+                # Apply path loss. Note that the _pathloss_big_matrix
+                # matrix has the same dimension as the
+                # self._big_H_no_pathloss matrix and we are performing
+                # element-wise multiplication here.
+                # noinspection PyTypeChecker
+                self._big_H_with_pathloss = (
+                    self._big_H_no_pathloss *
+                    np.sqrt(self._pathloss_big_matrix))
+            return self._big_H_with_pathloss
+
+    @property
+    def dense_H(self):
+        """
+        Get method for the dense_H property.
+
+        Returns
+        -------
+        np.ndarray
+            The channel from all transmitters to all receivers (with path
+            loss applied, if any) as a dense 4D numpy array with dimension
+            `K x K x max(Nr) x max(Nt)`. The element `[k, l]` is the
+            channel from transmitter `l` to receiver `k`. If the users have
+            different numbers of antennas the channels are padded with
+            zeros.
+        """
+        if self._dense_H is None:
+            K = self.K
+            Nr = self.Nr
+            Nt = self.Nt
+            if np.all(Nr == Nr[0]) and np.all(Nt == Nt[0]):
+                # All users have the same number of antennas and we can get
+                # the dense channel by just reshaping big_H
+                big_H = self.big_H[:K * Nr[0], :K * Nt[0]]
+                dense_H = np.ascontiguousarray(
+                    np.reshape(big_H, (K, Nr[0], K, Nt[0])).transpose(
+                        0, 2, 1, 3))
+            else:
+                H = self.H
+                dense_H = np.zeros((K, K, np.max(Nr), np.max(Nt)),
+                                   dtype=self.big_H.dtype)
+                for k in range(K):
+                    for l in range(K):
+                        dense_H[k, l, :Nr[k], :Nt[l]] = H[k, l]
+
+            dense_H.setflags(write=False)
+            self._dense_H = dense_H
+        return self._dense_H
+
+    # Property to get the pathloss. Use the "set_pathloss" method to set
+    # the pathloss.
+    @property
+    def pathloss(self):
+        """
+        Get method for the pathloss property.
+
+        Returns
+        -------
+        None | np.ndarray
+            The pathloss matrix (if one was set).
+        """
+        return self._pathloss_matrix
+
+    @property
+    def last_noise(self):
+        """
+        Get method for the last_noise property.
+
+        Returns
+        -------
+        None | np.ndarray
+            The last AWGN noise array added to corrupt the data.
+        """
+        return self._last_noise
+
+    @property
+    def noise_var(self):
+        """
+        Get method for the noise_var property.
+
+        Returns
+        -------
+        None | float
+            The noise variance, if noise is being added in "corrupt_*data"
+            methods.
+        """
+        return self._noise_var
+
+    @noise_var.setter
+    def noise_var(self, value):
+        """
+        Set method for the noise_var property.
+
+        Parameters
+        ----------
+        value: float | None
+            The noise variance used when generating a new noise vector to add
+            in the "corrupt_*data" methods. If `value` is None then noise
+            addition is disabled.
+        """
+        if value is not None:
+            assert value >= 0.0, "Noise variance must be >= 0."
+        self._noise_var = value
+
+    @staticmethod
+    def _from_small_matrix_to_big_matrix(small_matrix, Nr, Nt, Kr, Kt=None):
+        """
+        Convert from a small matrix to a big matrix by repeating elements
+        according to the number of receive and transmit antennas.
+
+        Parameters
+        ----------
+        small_matrix : np.ndarray
+            Any 2D numpy array
+        Nr : np.ndarray
+            Number of antennas at each receiver. This should be a 1D numpy
+            array.
+        Nt : np.ndarray
+            Number of antennas at each transmitter. This should be a 1D numpy
+            array.
+        Kr : int
+            Number of receivers to consider.
+        Kt : int, optional
+            Number of transmitters to consider. It not provided the value of
+            Kr will be used.
+
+        Returns
+        -------
+        big_matrix : np.ndarray
+            The converted matrix. This is a 2D numpy array
+
+        Notes
+        -----
+        Since a 'user' is a transmit/receive pair then the small_matrix
+        will be a square matrix and `Kr` must be equal to `Kt`.  However, in
+        the :class:`MultiUserChannelMatrixExtInt` class we will only have the
+        'transmitter part' for the external interference sources. That
+        means that small_matrix will have more columns then rows and `Kt`
+        will be greater then `Kr`.
+
+        Examples
+        --------
+        >>> K = 3
+        >>> Nr = np.array([2, 4, 6])
+        >>> Nt = np.array([2, 3, 5])
+        >>> small_matrix = np.array([[1,2,3],[4,5,6],[7,8,9]])
+        >>> MultiUserChannelMatrix._from_small_matrix_to_big_matrix(\
+                small_matrix, Nr, Nt, K)
+        array([[1, 1, 2, 2, 2, 3, 3, 3, 3, 3],
+               [1, 1, 2, 2, 2, 3, 3, 3, 3, 3],
+               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
+               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
+               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
+               [4, 4, 5, 5, 5, 6, 6, 6, 6, 6],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9],
+               [7, 7, 8, 8, 8, 9, 9, 9, 9, 9]])
+        """
+        if Kt is None:
+            Kt = Kr
+
+        cumNr = np.hstack([0, np.cumsum(Nr)])
+        cumNt = np.hstack([0, np.cumsum(Nt)])
+        big_matrix = np.ones([int(np.sum(Nr)), int(np.sum(Nt))],
+                             dtype=small_matrix.dtype)
+
+        for rx in range(Kr):
+            for tx in range(Kt):
+                big_matrix[cumNr[rx]:cumNr[rx + 1], cumNt[tx]:cumNt[tx + 1]] \
+                    *= small_matrix[rx, tx]
+        return big_matrix
+
+    def init_from_channel_matrix(self, channel_matrix, Nr, Nt, K):
+        """
+        Initializes the multiuser channel matrix from the given
+        `channel_matrix`.
+
+        Parameters
+        ----------
+        channel_matrix : np.ndarray
+            A matrix concatenating the channel of all users (from each
+            transmitter to each receiver). This is a 2D numpy array.
+        Nr : int | np.ndarray
+            Number of antennas at each receiver.
+        Nt : int | np.ndarray
+            Number of antennas at each transmitter.
+        K : int
+            Number of transmit/receive pairs.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If the arguments are invalid.
+
+        """
+        # If Nt or Nr (or both) is (are) int assume the same value should
+        # be used for all users.
+        if isinstance(Nr, int):  # pragma: no cover
+            Nr = np.ones(K, dtype=int) * Nr
+        if isinstance(Nt, int):  # pragma: no cover
+            Nt = np.ones(K, dtype=int) * Nt
+
+        if channel_matrix.shape != (np.sum(Nr), np.sum(Nt)):
+            msg = ("Shape of the channel_matrix must be equal to the sum or"
+                   " receive antennas of all users times the sum of the "
+                   "receive antennas of all users.")
+            raise ValueError(msg)
+
+        if (Nt.size != K) or (Nr.size != K):
+            raise ValueError(
+                "K must be equal to the number of elements in Nr and Nt")
+
+        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
+        # correctly set the first time the _get_H or _get_big_H methods are
+        # called.
+        self._big_H_with_pathloss = None
+        self._H_with_pathloss = None
+        self._dense_H = None
+
+        self._K = K
+        self._Nr = Nr
+        self._Nt = Nt
 
         self._big_H_no_pathloss = channel_matrix
 
-        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-        # Lets convert the full channel_matrix matrix to our internal
-        # representation of H as a matrix of matrices.
-        self._H_no_pathloss = single_matrix_to_matrix_of_matrices(
-            channel_matrix, Nr, Nt)
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        # Lets convert the full channel_matrix matrix to our internal
+        # representation of H as a matrix of matrices.
+        self._H_no_pathloss = single_matrix_to_matrix_of_matrices(
+            channel_matrix, Nr, Nt)
+
+        # Assures that _big_H and _H will stay in sync by disallowing
+        # modification of individual elements in both of them.
+        self._big_H_no_pathloss.setflags(write=False)
+        self._H_no_pathloss.setflags(write=False)
+
+    def randomize(self, Nr, Nt, K):
+        """
+        Generates a random channel matrix for all users.
+
+        Parameters
+        ----------
+        Nr : int | np.ndarray
+            Number of receive antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        Nt : int | np.ndarray
+            Number of transmit antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        K : int
+            Number of users.
+        """
+        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
+        # correctly set the first time the _get_H or _get_big_H methods are
+        # called.
+        self._big_H_with_pathloss = None
+        self._H_with_pathloss = None
+        self._dense_H = None
+
+        if isinstance(Nr, int):
+            Nr = np.ones(K, dtype=int) * Nr
+        if isinstance(Nt, int):
+            Nt = np.ones(K, dtype=int) * Nt
+
+        self._Nr = Nr.astype(int)
+        self._Nt = Nt.astype(int)
+        self._K = int(K)
+
+        self._big_H_no_pathloss = randn_c_RS(
+            self._RS_channel, np.sum(self._Nr), np.sum(self._Nt))
+
+        self._H_no_pathloss = single_matrix_to_matrix_of_matrices(
+            self._big_H_no_pathloss, Nr, Nt)
+
+        # Assures that _big_H and _H will stay in sync by disallowing
+        # modification of individual elements in both of them.
+        self._big_H_no_pathloss.setflags(write=False)
+        self._H_no_pathloss.setflags(write=False)
+
+    def get_Hkl(self, k, l):
+        """
+        Get the channel matrix from user `l` to user `k`.
+
+        Parameters
+        ----------
+        l : int
+            Transmitting user.
+        k : int
+            Receiving user.
+
+        Returns
+        -------
+        channel : np.ndarray
+            Channel from transmitter `l` to receiver `k`. This is a 2D numpy
+            array.
+
+        See also
+        --------
+        get_Hk
+
+        Examples
+        --------
+        >>> multiH = MultiUserChannelMatrix()
+        >>> H = np.reshape(np.r_[0:16], [4,4])
+        >>> Nt = np.array([2, 2])
+        >>> Nr = np.array([2, 2])
+        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2)
+        >>> print(multiH.big_H)
+        [[ 0  1  2  3]
+         [ 4  5  6  7]
+         [ 8  9 10 11]
+         [12 13 14 15]]
+        >>> print(multiH.get_Hkl(0, 0))
+        [[0 1]
+         [4 5]]
+        >>> print(multiH.get_Hkl(1, 0))
+        [[ 8  9]
+         [12 13]]
+        """
+        if self.use_dense_backend and l < self.K:
+            return self.dense_H[k, l, :self.Nr[k], :self.Nt[l]]
+
+        # This will call the _get_H method, which already applies the path
+        # loss (if there is any)
+        channel = self.H
+        return channel[k, l]
+
+    def get_Hk(self, k):
+        """
+        Get the channel from all transmitters to receiver `k`.
+
+        Parameters
+        ----------
+        k : int
+            Receiving user.
+
+        Returns
+        -------
+        channel_k : np.ndarray
+            Channel from all transmitters to receiver `k`. This is a 2D numpy
+            array.
+
+        See also
+        --------
+        get_Hkl
+
+        Examples
+        --------
+        >>> multiH = MultiUserChannelMatrix()
+        >>> H = np.reshape(np.r_[0:16], [4,4])
+        >>> Nt = np.array([2, 2])
+        >>> Nr = np.array([2, 2])
+        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2)
+        >>> print(multiH.big_H)
+        [[ 0  1  2  3]
+         [ 4  5  6  7]
+         [ 8  9 10 11]
+         [12 13 14 15]]
+        >>> print(multiH.get_Hk(0))
+        [[0 1 2 3]
+         [4 5 6 7]]
+        >>> print(multiH.get_Hk(1))
+        [[ 8  9 10 11]
+         [12 13 14 15]]
+        """
+        # The channel to receiver k corresponds to its rows in big_H
+        cumNr = np.hstack([0, np.cumsum(self.Nr)])
+        return self.big_H[cumNr[k]:cumNr[k + 1]]
+
+    def set_post_filter(self, filters):
+        """
+        Set the post-processing filters.
+
+        The post-processing filters will be applied to the data after if
+        has been corrupted by the channel in either the `corrupt_data` or
+        the `corrupt_concatenated_data` methods.
+
+        Parameters
+        ----------
+        filters : list[np.ndarray] | np.ndarray
+            The post processing filters of each user. This should be a list
+            of 2D np arrays or a 1D np array of 2D np arrays.
+        """
+        self._W = filters
+        # This will be set in the get property only when required.
+        self._big_W = None
+
+    @property
+    def W(self):
+        """
+        Post processing filters (a list of 2D numpy arrays) for each user.
+
+        Returns
+        -------
+        list[np.ndarray]
+            The Post processing filters for each user.
+        """
+        return self._W
+
+    @property
+    def big_W(self):
+        """
+        Post processing filters (a block diagonal matrix) for each user.
+
+        Returns
+        -------
+        np.ndarray
+            The big block diagonal matrix with the post processing filters
+            for each user.
+        """
+        if self._big_W is None and self.W is not None:
+            # noinspection PyArgumentList
+            self._big_W = block_diag(*self.W)
+        return self._big_W
+
+    def corrupt_concatenated_data(self, data):
+        """
+        Corrupt data passed through the channel.
+
+        If self.noise_var is set to some scalar number then white noise
+        will also be added.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            A bi-dimensional numpy array with the concatenated data of all
+            transmitters. The dimension of data is sum(self.Nt) x
+            NSymb. That is, the number of rows corresponds to the sum of
+            the number of transmit antennas of all users and the number of
+            columns correspond to the number of transmitted symbols.
+
+        Returns
+        -------
+        output : np.ndarray
+            A bi-dimension numpy array where the number of rows corresponds
+            to the sum of the number of receive antennas of all users and
+            the number of columns correspond to the number of transmitted
+            symbols.
+        """
+        # Note that self.big_H already accounts the path loss (while
+        # self._big_H_no_pathloss does not)
+
+        output = np.dot(self.big_H, data)
+
+        # Add the noise, if self.noise_var is not None
+        if self.noise_var is not None:
+            awgn_noise = (
+                randn_c_RS(self._RS_noise, *output.shape) *
+                math.sqrt(self.noise_var))
+            output += awgn_noise
+            self._last_noise = awgn_noise
+        else:
+            self._last_noise = None
+
+        # Apply the post processing filter (if there is one set)
+        if self.big_W is not None:
+            output = np.dot(self.big_W.conjugate().T, output)
+
+        return output
+
+    def corrupt_data(self, data):
+        """
+        Corrupt data passed through the channel.
+
+        If the noise_var is supplied then an white noise will also be
+        added.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            An array of numpy matrices with the data of the multiple
+            users. The k-th element in `data` is a numpy array with
+            dimension Nt_k x NSymbs, where Nt_k is the number of transmit
+            antennas of the k-th user and NSymbs is the number of
+            transmitted symbols.
+
+        Returns
+        -------
+        output : np.ndarray
+            A numpy array where each element contains the received data (a
+            2D numpy array) of a user.
+
+        """
+        # Note that we intentionally use self.K instead of self._K in this
+        # method. In the MultiUserChannelMatrix class they have the same
+        # value. However, in the MultiUserChannelMatrixExtInt subclass the
+        # self._K attribute will correspond to the number of users plus the
+        # number of external interference sources, while the self.K
+        # property will return only the number of users, which is what we
+        # want here.
+        concatenated_data = np.vstack(data)
+        concatenated_output = self.corrupt_concatenated_data(
+            concatenated_data)
+
+        output = np.zeros(self.K, dtype=np.ndarray)
+        cumNr = np.hstack([0, np.cumsum(self._Nr)])
+
+        for k in np.arange(self.K):
+            output[k] = concatenated_output[cumNr[k]:cumNr[k + 1], :]
+
+        return output
+
+    def set_pathloss(self, pathloss_matrix=None):
+        """
+        Set the path loss (IN LINEAR SCALE) from each transmitter to each
+        receiver.
+
+        The path loss will be accounted when calling the get_Hkl, get_Hk, the
+        corrupt_concatenated_data and the corrupt_data methods.
+
+        If you want to disable the path loss, set `pathloss_matrix` to None.
+
+        Parameters
+        ----------
+        pathloss_matrix : np.ndarray
+            A matrix with dimension "K x K", where K is the number of
+            users, with the path loss (IN LINEAR SCALE) from each
+            transmitter (columns) to each receiver (rows). If you want to
+            disable the path loss then set it to None.
+
+        Notes
+        -----
+        Note that path loss is a power relation, which means that the
+        channel coefficients will be multiplied by the square root of
+        elements in `pathloss_matrix`.
+        """
+        # A matrix with the path loss from each transmitter to each
+        # receiver.
+        self._pathloss_matrix = pathloss_matrix
+
+        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
+        # correctly set the first time the _get_H or _get_big_H methods are
+        # called.
+        self._big_H_with_pathloss = None
+        self._H_with_pathloss = None
+        self._dense_H = None
+
+        if pathloss_matrix is None:
+            self._pathloss_big_matrix = None
+        else:
+            self._pathloss_big_matrix \
+                = MultiUserChannelMatrix._from_small_matrix_to_big_matrix(
+                    pathloss_matrix, self._Nr, self._Nt, self._K)
+
+            # Assures that _pathloss_matrix and _pathloss_big_matrix will stay
+            # in sync by disallowing modification of individual elements in
+            # both of them.
+            self._pathloss_matrix.setflags(write=False)
+            self._pathloss_big_matrix.setflags(write=False)
+
+    # noinspection PyPep8
+    def _calc_Q_impl(self, k, F_all_users):
+        """
+        Calculates the interference covariance matrix (without any noise) at
+        the :math:`k`-th receiver.
+
+        See the documentation of the calc_Q method.
+
+        Returns
+        -------
+        np.ndarray
+        """
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H$$
+        if self.use_dense_backend:
+            return self._calc_Q_impl_dense(k, F_all_users)
+
+        interfering_users = set(range(self.K)) - {k}
+        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
+
+        for l in interfering_users:
+            Hkl_F = np.dot(
+                self.get_Hkl(k, l),
+                F_all_users[l])
+            Qk = Qk + np.dot(Hkl_F, Hkl_F.transpose().conjugate())
+
+        return Qk
+
+    def _calc_Q_impl_dense(self, k, F_all_users):
+        """
+        Same as :meth:`_calc_Q_impl`, but computed with batched operations
+        on the dense channel.
+
+        Parameters
+        ----------
+        k : int
+            Index of the desired receiver.
+        F_all_users : np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power).
+
+        Returns
+        -------
+        np.ndarray
+        """
+        Nr_k = self.Nr[k]
+        F = _stack_and_pad(F_all_users[:self.K])
+
+        # Hkl_F[l] is equal to H_kl F_l
+        Hkl_F = np.matmul(self.dense_H[k, :, :Nr_k], F)
+        Hkl_F = np.delete(Hkl_F, k, axis=0)
+
+        # Concatenating H_kl F_l of all interfering users in a single
+        # matrix A, Qk is equal to A A^H
+        A = np.reshape(Hkl_F.transpose(1, 0, 2), (Nr_k, -1))
+        return np.dot(A, A.conj().T).astype(complex)
+
+    # noinspection PyPep8
+    def calc_Q(self, k, F_all_users):
+        """
+        Calculates the interference plus noise covariance matrix at the
+        :math:`k`-th receiver.
+
+        The interference covariance matrix at the :math:`k`-th receiver,
+        :math:`\\mtQ k`, is given by
+
+            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{kj} \\mtF_j \\mtF_j^H \\mtH_{kj}^H`
+
+        where :math:`P_j` is the transmit power of transmitter :math:`j`,
+        and :math:`Ns_j` is the number of streams for user :math:`j`.
+
+        Parameters
+        ----------
+        k : int
+            Index of the desired receiver.
+        F_all_users : np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This should be a 1D numpy array of 2D numpy
+            arrays.
+
+        Returns
+        -------
+        Qk : np.ndarray
+            The interference covariance matrix at receiver :math:`k` (a 2D
+            numpy complex array).
+        """
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H + \sigma_n^2 \mtI_{N_k}$$
+        Qk = self._calc_Q_impl(k, F_all_users)
+
+        if self.noise_var is not None:
+            # If self.noise_var is not None we add the covariance matrix of
+            # the noise.
+            Rnk = np.eye(self.Nr[k]) * self.noise_var
+            Qk += Rnk
+
+        return Qk
+
+    # noinspection PyPep8
+    def _calc_JP_Q_impl(self, k, F_all_users):
+        """
+        Calculates the interference covariance matrix (without any noise) at
+        the :math:`k`-th receiver with a joint processing scheme.
+
+        See the documentation of the calc_JP_Q method.
+
+        Parameters
+        ----------
+        k : int
+            The user index.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoders of all users. It can be a list of numpy arrays or a
+            numpy array of numpy arrays.
+
+        Returns
+        -------
+        np.ndarray
+            The interference covariance matrix (without any noise).
+        """
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H$$
+        interfering_users = set(range(self.K)) - {k}
+        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
+
+        for l in interfering_users:
+            Hk_F = np.dot(
+                self.get_Hk(k),
+                F_all_users[l])
+            Qk = Qk + np.dot(Hk_F, Hk_F.transpose().conjugate())
+
+        return Qk
+
+    # noinspection PyPep8,PyPep8
+    def calc_JP_Q(self, k, F_all_users):
+        """
+        Calculates the interference plus noise covariance matrix at the
+        :math:`k`-th receiver with a joint processing scheme.
+
+        The interference covariance matrix at the :math:`k`-th receiver,
+        :math:`\\mtQ k`, is given by
+
+            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{k} \\mtF_j \\mtF_j^H \\mtH_{k}^H`
+
+        where :math:`P_j` is the transmit power of transmitter :math:`j`,
+        and :math:`Ns_j` is the number of streams for user :math:`j`.
+
+        Parameters
+        ----------
+        k : int
+            Index of the desired receiver.
+        F_all_users : np.ndarray | list[np.ndarray]
+            The precoder of all users (already taking into account the
+            transmit power).
+
+        Returns
+        -------
+        Qk : np.ndarray
+            The interference covariance matrix at receiver :math:`k`.
+        """
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H + \sigma_n^2 \mtI_{N_k}$$
+        Qk = self._calc_JP_Q_impl(k, F_all_users)
+
+        if self.noise_var is not None:
+            Rnk = np.eye(self.Nr[k]) * self.noise_var
+            return Qk + Rnk
+        else:  # pragma: no cover
+            return Qk
+
+    # noinspection PyPep8,PyPep8
+    def _calc_Bkl_cov_matrix_first_part(self, F_all_users, k, N0_or_Rek=0.0):
+        """
+        Calculates the first part in the equation of the Blk covariance matrix
+        in equation (28) of [Cadambe2008]_.
+
+        The first part is given by
+
+            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
+
+        Note that it only depends on the value of :math:`k`.
+
+        Parameters
+        ----------
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). It can be a list of numpy arrays or a
+            numpy array of numpy arrays.
+        k : int
+            Index of the desired user.
+        N0_or_Rek : float | np.ndarray
+            If this is a 2D numpy array, it is interpreted as the
+            covariance matrix of any external interference plus noise. If
+            this is a number, it is interpreted as the noise power, in
+            which case the covariance matrix will be an identity matrix
+            times this noise power.
+
+        Returns
+        -------
+        first_part : np.ndarray
+        """
+        # The first part in Bkl is given by
+        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[kj]\dagger} + \mtR e_k$$
+        # where $\mtR e_k$ is the covariance matrix of the (external
+        # interference plus) noise.
+        # Note that here the power is already included in `Fk`.
+        if N0_or_Rek is None:
+            N0_or_Rek = 0.0
+
+        if isinstance(N0_or_Rek, Number):
+            noise_power = N0_or_Rek
+            # noinspection PyUnresolvedReferences
+            Rek = (noise_power * np.eye(self.Nr[k]))
+        else:
+            Rek = N0_or_Rek
+
+        first_part = 0.0
+        for j in range(self.K):
+            Hkj = self.get_Hkl(k, j)
+            Hkj_H = Hkj.conjugate().transpose()
+            Vj = F_all_users[j]
+            Vj_H = Vj.conjugate().transpose()
+
+            first_part = first_part + np.dot(
+                Hkj,
+                np.dot(
+                    np.dot(Vj,
+                           Vj_H),
+                    Hkj_H))
+        first_part = first_part + Rek
+
+        return first_part
+
+    # noinspection PyPep8
+    def _calc_Bkl_cov_matrix_second_part(self, Fk, k, l):
+        """
+        Calculates the second part in the equation of the Blk covariance
+        matrix in equation (28) of [Cadambe2008]_ (note that it does not
+        include the identity matrix).
+
+        The second part is given by
+
+            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
+
+        Parameters
+        ----------
+        Fk : np.ndarray
+            The precoder of the desired user.
+        k : int
+            Index of the desired user.
+        l : int
+            Index of the desired stream.
+
+        Returns
+        -------
+        second_part : np.ndarray
+            Second part in equation (28) of [Cadambe2008]_.
+
+        """
+        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger}$$
+        Hkk = self.get_Hkl(k, k)
+        Hkk_H = Hkk.transpose().conjugate()
 
-        # Assures that _big_H and _H will stay in sync by disallowing
-        # modification of individual elements in both of them.
-        self._big_H_no_pathloss.setflags(write=False)
-        self._H_no_pathloss.setflags(write=False)
+        Vkl = Fk[:, l:l + 1]
+        Vkl_H = Vkl.transpose().conjugate()
+        second_part = np.dot(Hkk,
+                             np.dot(np.dot(Vkl, Vkl_H),
+                                    Hkk_H))
 
-    def randomize(self, Nr, Nt, K):
+        return second_part
+
+    # noinspection PyPep8
+    def _calc_Bkl_cov_matrix_all_l(self, F_all_users, k, N0_or_Rek=0.0):
         """
-        Generates a random channel matrix for all users.
+        Calculates the interference-plus-noise covariance matrix for all
+        streams at receiver :math:`k` according to equation (28) in [
+        Cadambe2008]_.
+
+        The interference-plus-noise covariance matrix for stream :math:`l`
+        of user :math:`k` is given by Equation (28) in [Cadambe2008]_,
+        which is reproduced below
+
+            :math:`\\mtB^{[kl]} = \\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star l}^{[j]} \\mtV_{\\star l}^{[j]\\dagger} \\mtH^{[kj]\\dagger} - \\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger} + \\mtI_{N^{[k]}}`
+
+        where :math:`P^{[k]}` is the transmit power of transmitter
+        :math:`k`, :math:`d^{[k]}` is the number of degrees of freedom of
+        user :math:`k`, :math:`\\mtH^{[kj]}` is the channel between
+        transmitter :math:`j` and receiver :math:`k`, :math:`\\mtV_{\\star
+        l}` is the :math:`l`-th column of the precoder of user :math:`k`
+        and :math:`\\mtI_{N^{k}}` is an identity matrix with size equal to
+        the number of receive antennas of receiver :math:`k`.
 
         Parameters
         ----------
-        Nr : int | np.ndarray
-            Number of receive antennas of each user. If an integer is
-            specified, all users will have that number of receive antennas.
-        Nt : int | np.ndarray
-            Number of transmit antennas of each user. If an integer is
-            specified, all users will have that number of receive antennas.
-        K : int
-            Number of users.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This can be a list of numpy arrays or a 1D numpy
+            array of numpy arrays.
+        k : int
+            Index of the desired user.
+        N0_or_Rek : float | np.ndarray
+            If this is a 2D numpy array, it is interpreted as the
+            covariance matrix of any external interference plus noise. If
+            this is a number, it is interpreted as the noise power, in
+            which case the covariance matrix will be an identity matrix
+            times this noise power.
+
+        Returns
+        -------
+        Bkl : np.ndarray
+            Covariance matrix of all streams of user k. Each element of the
+            returned 1D numpy array is a 2D numpy complex array corresponding
+            to the covariance matrix of one stream of user k.
+
+        Notes
+        -----
+        To be simple, a function that returns the covariance matrix of only
+        a single stream "l" of the desired user "k" could be implemented,
+        but in the order to calculate the max SINR algorithm we need the
+        covariance matrix of all streams and returning them in single
+        function as is done here allows us to calculate the first part in
+        equation (28) of [Cadambe2008]_ only once, since it is the same for
+        all streams.
+
         """
-        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
-        # correctly set the first time the _get_H or _get_big_H methods are
-        # called.
-        self._big_H_with_pathloss = None
-        self._H_with_pathloss = None
+        # $$\mtB^{[kl]} = \sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star l}^{[j]} \mtV_{\star l}^{[j]\dagger} \mtH^{[kj]\dagger} - \frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger} + \mtI_{N^{[k]}}$$
 
-        if isinstance(Nr, int):
-            Nr = np.ones(K, dtype=int) * Nr
-        if isinstance(Nt, int):
-            Nt = np.ones(K, dtype=int) * Nt
+        if self.use_dense_backend:
+            return self._calc_Bkl_cov_matrix_all_l_dense(
+                F_all_users, k, N0_or_Rek)
 
-        self._Nr = Nr.astype(int)
-        self._Nt = Nt.astype(int)
-        self._K = int(K)
+        Ns_k = F_all_users[k].shape[1]
+        Bkl_all_l = np.empty(Ns_k, dtype=np.ndarray)
+        first_part = self._calc_Bkl_cov_matrix_first_part(
+            F_all_users, k, N0_or_Rek)
+        for l in range(Ns_k):
+            second_part = self._calc_Bkl_cov_matrix_second_part(
+                F_all_users[k], k, l)
+            Bkl_all_l[l] = first_part - second_part
 
-        self._big_H_no_pathloss = randn_c_RS(
-            self._RS_channel, np.sum(self._Nr), np.sum(self._Nt))
+        return Bkl_all_l
 
-        self._H_no_pathloss = single_matrix_to_matrix_of_matrices(
-            self._big_H_no_pathloss, Nr, Nt)
+    def _calc_Bkl_cov_matrix_all_l_dense(self, F_all_users, k,
+                                         N0_or_Rek=0.0):
+        """
+        Same as :meth:`_calc_Bkl_cov_matrix_all_l`, but computed with
+        batched operations on the dense channel.
 
-        # Assures that _big_H and _H will stay in sync by disallowing
-        # modification of individual elements in both of them.
-        self._big_H_no_pathloss.setflags(write=False)
-        self._H_no_pathloss.setflags(write=False)
+        Parameters
+        ----------
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power).
+        k : int
+            Index of the desired user.
+        N0_or_Rek : float | np.ndarray
+            The noise power or the covariance matrix of any external
+            interference plus noise.
 
-    def get_Hkl(self, k, l):
+        Returns
+        -------
+        Bkl : np.ndarray
+            Covariance matrix of all streams of user k.
         """
-        Get the channel matrix from user `l` to user `k`.
+        if N0_or_Rek is None:
+            N0_or_Rek = 0.0
+
+        Nr_k = self.Nr[k]
+        Ns_k = F_all_users[k].shape[1]
+        if isinstance(N0_or_Rek, Number):
+            Rek = N0_or_Rek * np.eye(Nr_k)
+        else:
+            Rek = N0_or_Rek
+
+        F = _stack_and_pad(F_all_users[:self.K])
+
+        # Hkj_F[j] is equal to H_kj F_j
+        Hkj_F = np.matmul(self.dense_H[k, :, :Nr_k], F)
+        A = np.reshape(Hkj_F.transpose(1, 0, 2), (Nr_k, -1))
+        first_part = np.dot(A, A.conj().T) + Rek
+
+        Hkk_Fk = Hkj_F[k]
+        Bkl_all_l = np.empty(Ns_k, dtype=np.ndarray)
+        for l in range(Ns_k):
+            Bkl_all_l[l] = first_part - np.outer(Hkk_Fk[:, l],
+                                                 Hkk_Fk[:, l].conj())
+
+        return Bkl_all_l
+
+    # noinspection PyPep8
+    def _calc_JP_Bkl_cov_matrix_first_part_impl(self, Hk, F_all_users, Rek):
+        """
+        Common implementation of the _calc_JP_Bkl_cov_matrix_first_part.
 
         Parameters
         ----------
-        l : int
-            Transmitting user.
+        Hk : np.ndarray
+            The channel from all transmitters (not including external
+            interference source, if any) to receiver k.
+        F_all_users : list[np.ndarray]
+            The precoder of all users (already taking into account the
+            transmit power).
+        Rek : np.ndarray | float
+            Covariance matrix of the external interference (if there is
+            any) plus noise.
+
+        Returns
+        -------
+        np.ndarray
+            The `first_part` for the Bkl matrix computation.
+        """
+        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[k]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[k]\dagger} + \mtR e_k$$
+        first_part = 0.0
+
+        HK_H = Hk.conjugate().transpose()
+        for j in range(self.K):
+            Vj = F_all_users[j]
+            Vj_H = Vj.conjugate().transpose()
+
+            first_part = first_part + np.dot(
+                Hk,
+                np.dot(
+                    np.dot(Vj,
+                           Vj_H),
+                    HK_H))
+        first_part += Rek
+
+        return first_part
+
+    # noinspection PyPep8,PyPep8
+    def _calc_JP_Bkl_cov_matrix_first_part(self, F_all_users, k,
+                                           noise_power=0.0):
+        """
+        Calculates the first part in the equation of the Blk covariance matrix
+        in equation (28) of [Cadambe2008]_ when joint process is employed.
+
+        The first part is given by
+
+            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
+
+        Note that it only depends on the value of :math:`k`.
+
+        Parameters
+        ----------
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). It can be a list of numpy arrays or a numpy
+            array of numpy arrays.
         k : int
-            Receiving user.
+            Index of the desired user.
+        noise_power : float
+            The noise power.
 
         Returns
         -------
-        channel : np.ndarray
-            Channel from transmitter `l` to receiver `k`. This is a 2D numpy
-            array.
+        np.ndarray
+        """
+        # The first part in Bkl is given by
+        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[kj]\dagger} + \mtI_{N^{[k]}}$$
+        # Note that here the power is already included in `Fk`.
+        if noise_power is None:
+            noise_power = 0.0
 
-        See also
-        --------
-        get_Hk
+        Rek = (noise_power * np.eye(self.Nr[k]))
+        Hk = self.get_Hk(k)
+        # noinspection PyTypeChecker
+        return self._calc_JP_Bkl_cov_matrix_first_part_impl(
+            Hk, F_all_users, Rek)
 
-        Examples
-        --------
-        >>> multiH = MultiUserChannelMatrix()
-        >>> H = np.reshape(np.r_[0:16], [4,4])
-        >>> Nt = np.array([2, 2])
-        >>> Nr = np.array([2, 2])
-        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2)
-        >>> print(multiH.big_H)
-        [[ 0  1  2  3]
-         [ 4  5  6  7]
-         [ 8  9 10 11]
-         [12 13 14 15]]
-        >>> print(multiH.get_Hkl(0, 0))
-        [[0 1]
-         [4 5]]
-        >>> print(multiH.get_Hkl(1, 0))
-        [[ 8  9]
-         [12 13]]
+    # noinspection PyPep8
+    @staticmethod
+    def _calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l):
         """
-        # This will call the _get_H method, which already applies the path
-        # loss (if there is any)
-        channel = self.H
-        return channel[k, l]
+        Common implementation of the _calc_JP_Bkl_cov_matrix_second_part
+        method.
 
-    def get_Hk(self, k):
+        Parameters
+        ----------
+        Hk : np.ndarray
+        Fk : np.ndarray
+        l : int
+
+        Returns
+        -------
+        np.ndarray
         """
-        Get the channel from all transmitters to receiver `k`.
+        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
+        Hk_H = Hk.transpose().conjugate()
+
+        Vkl = Fk[:, l:l + 1]
+        Vkl_H = Vkl.transpose().conjugate()
+        second_part = np.dot(Hk, np.dot(np.dot(Vkl, Vkl_H), Hk_H))
+
+        return second_part
+
+    # noinspection PyPep8
+    def _calc_JP_Bkl_cov_matrix_second_part(self, Fk, k, l):
+        """Calculates the second part in the equation of the Blk covariance
+        matrix in equation (28) of [Cadambe2008]_ (note that it does not
+        include the identity matrix).
+
+        The second part is given by
+
+            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
 
         Parameters
         ----------
+        Fk : np.ndarray
+            The precoder of the desired user.
         k : int
-            Receiving user.
+            Index of the desired user.
+        l : int
+            Index of the desired stream.
 
         Returns
         -------
-        channel_k : np.ndarray
-            Channel from all transmitters to receiver `k`. This is a 2D numpy
-            array.
-
-        See also
-        --------
-        get_Hkl
-
-        Examples
-        --------
-        >>> multiH = MultiUserChannelMatrix()
-        >>> H = np.reshape(np.r_[0:16], [4,4])
-        >>> Nt = np.array([2, 2])
-        >>> Nr = np.array([2, 2])
-        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2)
-        >>> print(multiH.big_H)
-        [[ 0  1  2  3]
-         [ 4  5  6  7]
-         [ 8  9 10 11]
-         [12 13 14 15]]
-        >>> print(multiH.get_Hk(0))
-        [[0 1 2 3]
-         [4 5 6 7]]
-        >>> print(multiH.get_Hk(1))
-        [[ 8  9 10 11]
-         [12 13 14 15]]
+        second_part : np.ndarray.
+            Second part in equation (28) of [Cadambe2008]_.
         """
-        receive_channels = single_matrix_to_matrix_of_matrices(
-            self.big_H, self.Nr)
-        return receive_channels[k]
+        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
+        Hk = self.get_Hk(k)
+        return self._calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l)
 
-    def set_post_filter(self, filters):
+    # noinspection PyPep8
+    def _calc_JP_Bkl_cov_matrix_all_l(self, F_all_users, k, N0_or_Rek=0.0):
         """
-        Set the post-processing filters.
+        Calculates the interference-plus-noise covariance matrix for all
+        streams at receiver :math:`k` according to equation (28) in [
+        Cadambe2008]_.
 
-        The post-processing filters will be applied to the data after if
-        has been corrupted by the channel in either the `corrupt_data` or
-        the `corrupt_concatenated_data` methods.
+        The interference-plus-noise covariance matrix for stream :math:`l`
+        of user :math:`k` is given by Equation (28) in [Cadambe2008]_,
+        which is reproduced below
+
+            :math:`\\mtB^{[kl]} = \\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star l}^{[j]} \\mtV_{\\star l}^{[j]\\dagger} \\mtH^{[kj]\\dagger} - \\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger} + \\mtI_{N^{[k]}}`
+
+        where :math:`P^{[k]}` is the transmit power of transmitter
+        :math:`k`, :math:`d^{[k]}` is the number of degrees of freedom of
+        user :math:`k`, :math:`\\mtH^{[kj]}` is the channel between
+        transmitter :math:`j` and receiver :math:`k`, :math:`\\mtV_{\\star
+        l}` is the :math:`l`-th column of the precoder of user :math:`k`
+        and :math:`\\mtI_{N^{k}}` is an identity matrix with size equal to
+        the number of receive antennas of receiver :math:`k`.
 
         Parameters
         ----------
-        filters : list[np.ndarray] | np.ndarray
-            The post processing filters of each user. This should be a list
-            of 2D np arrays or a 1D np array of 2D np arrays.
-        """
-        self._W = filters
-        # This will be set in the get property only when required.
-        self._big_W = None
-
-    @property
-    def W(self):
-        """
-        Post processing filters (a list of 2D numpy arrays) for each user.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This can be either a 1D numpy array of numpy
+            arrays or a list of numpy arrays.
+        k : int
+            Index of the desired user.
+        N0_or_Rek : float | np.ndarray
+            If this is a 2D numpy array, it is interpreted as the
+            covariance matrix of any external interference plus noise. If
+            this is a number, it is interpreted as the noise power, in
+            which case the covariance matrix will be an identity matrix
+            times this noise power.
 
         Returns
         -------
-        list[np.ndarray]
-            The Post processing filters for each user.
-        """
-        return self._W
+        Bkl : np.ndarray
+            Covariance matrix of all streams of user k. Each element of the
+            returned 1D numpy array is a 2D numpy complex array
+            corresponding to the covariance matrix of one stream of user k.
 
-    @property
-    def big_W(self):
-        """
-        Post processing filters (a block diagonal matrix) for each user.
+        Notes
+        -----
 
-        Returns
-        -------
-        np.ndarray
-            The big block diagonal matrix with the post processing filters
-            for each user.
-        """
-        if self._big_W is None and self.W is not None:
-            # noinspection PyArgumentList
-            self._big_W = block_diag(*self.W)
-        return self._big_W
+        To be simple, a function that returns the covariance matrix of only
+        a single stream "l" of the desired user "k" could be implemented,
+        but in the order to calculate the max SINR algorithm we need the
+        covariance matrix of all streams and returning them in single
+        function as is done here allows us to calculate the first part in
+        equation (28) of [Cadambe2008]_ only once, since it is the same for
+        all streams.
 
-    def corrupt_concatenated_data(self, data):
         """
-        Corrupt data passed through the channel.
+        # $$\mtB^{[kl]} = \sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star l}^{[j]} \mtV_{\star l}^{[j]\dagger} \mtH^{[kj]\dagger} - \frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger} + \mtI_{N^{[k]}}$$
+        Ns_k = F_all_users[k].shape[1]
+        Bkl_all_l = np.empty(Ns_k, dtype=np.ndarray)
+        first_part = self._calc_JP_Bkl_cov_matrix_first_part(
+            F_all_users, k, N0_or_Rek)
+        for l in range(Ns_k):
+            second_part = self._calc_JP_Bkl_cov_matrix_second_part(
+                F_all_users[k], k, l)
+            Bkl_all_l[l] = first_part - second_part
 
-        If self.noise_var is set to some scalar number then white noise
-        will also be added.
+        return Bkl_all_l
+
+    def _calc_SINR_k(self, k, Fk, Uk, Bkl_all_l):
+        """
+        Calculates the SINR of all streams of user 'k'.
 
         Parameters
         ----------
-        data : np.ndarray
-            A bi-dimensional numpy array with the concatenated data of all
-            transmitters. The dimension of data is sum(self.Nt) x
-            NSymb. That is, the number of rows corresponds to the sum of
-            the number of transmit antennas of all users and the number of
-            columns correspond to the number of transmitted symbols.
+        Fk : np.ndarray
+            The precoder of user k.
+        Uk : np.ndarray
+            The receive filter of user k (before applying the conjugate
+            transpose).
+        k : int
+            Index of the desired user.
+        Bkl_all_l : list[np.ndarray] | np.ndarray
+            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
+            corresponding to the Bkl matrices for all 'l's.
 
         Returns
         -------
-        output : np.ndarray
-            A bi-dimension numpy array where the number of rows corresponds
-            to the sum of the number of receive antennas of all users and
-            the number of columns correspond to the number of transmitted
-            symbols.
+        SINR_k : np.ndarray
+            The SINR for the different streams of user k.
         """
-        # Note that self.big_H already accounts the path loss (while
-        # self._big_H_no_pathloss does not)
+        Ns_k = Fk.shape[1]
 
-        output = np.dot(self.big_H, data)
+        SINR_k = np.empty(Ns_k, dtype=float)
 
-        # Add the noise, if self.noise_var is not None
-        if self.noise_var is not None:
-            awgn_noise = (
-                randn_c_RS(self._RS_noise, *output.shape) *
-                math.sqrt(self.noise_var))
-            output += awgn_noise
-            self._last_noise = awgn_noise
-        else:
-            self._last_noise = None
+        for l in range(Ns_k):
+            Fkl = Fk[:, l:l + 1]
+            Ukl = Uk[:, l:l + 1]
+            Ukl_H = Ukl.conj().T
 
-        # Apply the post processing filter (if there is one set)
-        if self.big_W is not None:
-            output = np.dot(self.big_W.conjugate().T, output)
+            aux = np.dot(Ukl_H,
+                         np.dot(self.get_Hkl(k, k),
+                                Fkl))
+            numerator = np.dot(aux,
+                               aux.transpose().conjugate())
+            denominator = np.dot(Ukl_H,
+                                 np.dot(Bkl_all_l[l], Ukl))
+            SINR_kl = np.asscalar(numerator) / np.asscalar(denominator)
+            # The imaginary part should be negligible
+            SINR_k[l] = np.abs(SINR_kl)
 
-        return output
+        return SINR_k
 
-    def corrupt_data(self, data):
+    def calc_SINR(self, F, U):
         """
-        Corrupt data passed through the channel.
+        Calculates the SINR values (in linear scale) of all streams of all
+        users with the current IA solution.
 
-        If the noise_var is supplied then an white noise will also be
-        added.
+        The noise variance used will be the value of the noise_var
+        property.
 
         Parameters
         ----------
-        data : np.ndarray
-            An array of numpy matrices with the data of the multiple
-            users. The k-th element in `data` is a numpy array with
-            dimension Nt_k x NSymbs, where Nt_k is the number of transmit
-            antennas of the k-th user and NSymbs is the number of
-            transmitted symbols.
+        F : np.ndarray
+            The precoders of all users. This should be a 1D numpy array
+            of 2D numpy arrays.
+        U : np.ndarray
+            The receive filters of all users. This should be a 1D numpy
+            array of 2D numpy arrays.
 
         Returns
         -------
-        output : np.ndarray
-            A numpy array where each element contains the received data (a
-            2D numpy array) of a user.
-
-        """
-        # Note that we intentionally use self.K instead of self._K in this
-        # method. In the MultiUserChannelMatrix class they have the same
-        # value. However, in the MultiUserChannelMatrixExtInt subclass the
-        # self._K attribute will correspond to the number of users plus the
-        # number of external interference sources, while the self.K
-        # property will return only the number of users, which is what we
-        # want here.
-        concatenated_data = np.vstack(data)
-        concatenated_output = self.corrupt_concatenated_data(
-            concatenated_data)
-
-        output = np.zeros(self.K, dtype=np.ndarray)
-        cumNr = np.hstack([0, np.cumsum(self._Nr)])
-
-        for k in np.arange(self.K):
-            output[k] = concatenated_output[cumNr[k]:cumNr[k + 1], :]
-
-        return output
-
-    def set_pathloss(self, pathloss_matrix=None):
+        SINRs : np.ndarray
+            The SINR (in linear scale) of all streams of all users. This is a
+            1D numpy array of 1D numpy arrays (of floats)
         """
-        Set the path loss (IN LINEAR SCALE) from each transmitter to each
-        receiver.
+        if self.use_dense_backend:
+            return self._calc_SINR_dense(F, U)
 
-        The path loss will be accounted when calling the get_Hkl, get_Hk, the
-        corrupt_concatenated_data and the corrupt_data methods.
+        K = self.K
+        SINRs = np.empty(K, dtype=np.ndarray)
 
-        If you want to disable the path loss, set `pathloss_matrix` to None.
+        for k in range(self.K):
+            Bkl_all_l = self._calc_Bkl_cov_matrix_all_l(F, k,
+                                                        self.noise_var)
+            SINRs[k] = self._calc_SINR_k(k, F[k], U[k], Bkl_all_l)
+        return SINRs
+
+    def _calc_SINR_dense(self, F, U):
+        """
+        Same as :meth:`calc_SINR`, but computed for all users at once with
+        batched operations on the dense channel.
 
         Parameters
         ----------
-        pathloss_matrix : np.ndarray
-            A matrix with dimension "K x K", where K is the number of
-            users, with the path loss (IN LINEAR SCALE) from each
-            transmitter (columns) to each receiver (rows). If you want to
-            disable the path loss then set it to None.
+        F : np.ndarray
+            The precoders of all users.
+        U : np.ndarray
+            The receive filters of all users.
 
-        Notes
-        -----
-        Note that path loss is a power relation, which means that the
-        channel coefficients will be multiplied by the square root of
-        elements in `pathloss_matrix`.
+        Returns
+        -------
+        SINRs : np.ndarray
+            The SINR (in linear scale) of all streams of all users.
         """
-        # A matrix with the path loss from each transmitter to each
-        # receiver.
-        self._pathloss_matrix = pathloss_matrix
-
-        # Reset the _big_H_with_pathloss and _H_with_pathloss. They will be
-        # correctly set the first time the _get_H or _get_big_H methods are
-        # called.
-        self._big_H_with_pathloss = None
-        self._H_with_pathloss = None
+        K = self.K
+        noise_var = 0.0 if self.noise_var is None else self.noise_var
 
-        if pathloss_matrix is None:
-            self._pathloss_big_matrix = None
-        else:
-            self._pathloss_big_matrix \
-                = MultiUserChannelMatrix._from_small_matrix_to_big_matrix(
-                    pathloss_matrix, self._Nr, self._Nt, self._K)
+        SINR_dense = _calc_dense_SINR(self.dense_H, _stack_and_pad(F),
+                                      _stack_and_pad(U), noise_var)
 
-            # Assures that _pathloss_matrix and _pathloss_big_matrix will stay
-            # in sync by disallowing modification of individual elements in
-            # both of them.
-            self._pathloss_matrix.setflags(write=False)
-            self._pathloss_big_matrix.setflags(write=False)
+        SINRs = np.empty(K, dtype=np.ndarray)
+        for k in range(K):
+            SINRs[k] = SINR_dense[k, :F[k].shape[1]]
+        return SINRs
 
-    # noinspection PyPep8
-    def _calc_Q_impl(self, k, F_all_users):
+    @staticmethod
+    def _calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l):
         """
-        Calculates the interference covariance matrix (without any noise) at
-        the :math:`k`-th receiver.
+        Implementation of the :meth:`_calc_JP_SINR_k` method.
 
-        See the documentation of the calc_Q method.
+        Parameters
+        ----------
+        Hk : np.ndarray
+            Channel from all transmitters to receiver k.
+        Fk : np.ndarray
+            The precoder of user k.
+        Uk : np.ndarray
+            The receive filter of user k (before applying the conjugate
+            transpose).
+        Bkl_all_l : list[np.ndarray]
+            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
+            corresponding to the Bkl matrices for all 'l's.
 
         Returns
         -------
-        np.ndarray
-        """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H$$
-        interfering_users = set(range(self.K)) - {k}
-        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
-
-        for l in interfering_users:
-            Hkl_F = np.dot(
-                self.get_Hkl(k, l),
-                F_all_users[l])
-            Qk = Qk + np.dot(Hkl_F, Hkl_F.transpose().conjugate())
+        SINR_k : np.ndarray
+            The SINR for the different streams of user k.
 
-        return Qk
+        Notes
+        -----
 
-    # noinspection PyPep8
-    def calc_Q(self, k, F_all_users):
+        The implementation of the _calc_JP_SINR_k method is almost the same
+        for the MultiuserChannelMatrix and MultiuserChannelMatrixExtint
+        class, except for the `Hk` argument. Therefore, the common code was
+        put here and in each class the :meth:`_calc_JP_SINR_k` is
+        implemented as simply getting the correct `Hk` argument and then
+        calling :meth:`_calc_JP_SINR_k_impl`.
         """
-        Calculates the interference plus noise covariance matrix at the
-        :math:`k`-th receiver.
+        Ns_k = Fk.shape[1]
 
-        The interference covariance matrix at the :math:`k`-th receiver,
-        :math:`\\mtQ k`, is given by
+        SINR_k = np.empty(Ns_k, dtype=float)
 
-            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{kj} \\mtF_j \\mtF_j^H \\mtH_{kj}^H`
+        for l in range(Ns_k):
+            Fkl = Fk[:, l:l + 1]
+            Ukl = Uk[:, l:l + 1]
+            Ukl_H = Ukl.conj().T
 
-        where :math:`P_j` is the transmit power of transmitter :math:`j`,
-        and :math:`Ns_j` is the number of streams for user :math:`j`.
+            aux = np.dot(Ukl_H,
+                         np.dot(Hk, Fkl))
+            numerator = np.dot(aux,
+                               aux.transpose().conjugate())
+            denominator = np.dot(Ukl_H,
+                                 np.dot(Bkl_all_l[l], Ukl))
+            SINR_kl = np.asscalar(numerator) / np.asscalar(denominator)
+            # The imaginary part should be negligible
+            SINR_k[l] = np.abs(SINR_kl)
+
+        return SINR_k
+
+    def _calc_JP_SINR_k(self, k, Fk, Uk, Bkl_all_l):
+        """
+        Calculates the SINR of all streams of user 'k'.
 
         Parameters
         ----------
+        Fk : np.ndarray
+            The precoder of user k.
+        Uk : np.ndarray
+            The receive filter of user k (before applying the conjugate
+            transpose).
         k : int
-            Index of the desired receiver.
-        F_all_users : np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This should be a 1D numpy array of 2D numpy
-            arrays.
+            Index of the desired user.
+        Bkl_all_l : list[np.ndarray] | np.ndarray
+            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
+            corresponding to the Bkl matrices for all 'l's.
 
         Returns
         -------
-        Qk : np.ndarray
-            The interference covariance matrix at receiver :math:`k` (a 2D
-            numpy complex array).
+        SINR_k : np.ndarray
+            The SINR for the different streams of user k.
         """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H + \sigma_n^2 \mtI_{N_k}$$
-        Qk = self._calc_Q_impl(k, F_all_users)
-
-        if self.noise_var is not None:
-            # If self.noise_var is not None we add the covariance matrix of
-            # the noise.
-            Rnk = np.eye(self.Nr[k]) * self.noise_var
-            Qk += Rnk
-
-        return Qk
+        Hk = self.get_Hk(k)
+        return self._calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l)
 
-    # noinspection PyPep8
-    def _calc_JP_Q_impl(self, k, F_all_users):
+    def calc_JP_SINR(self, F, U):
         """
-        Calculates the interference covariance matrix (without any noise) at
-        the :math:`k`-th receiver with a joint processing scheme.
+        Calculates the SINR values (in linear scale) of all streams of all
+        users with the current IA solution.
 
-        See the documentation of the calc_JP_Q method.
+        The noise variance used will be the value of the noise_var
+        property.
 
         Parameters
         ----------
-        k : int
-            The user index.
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoders of all users. It can be a list of numpy arrays or a
-            numpy array of numpy arrays.
+        F : np.ndarray
+            The precoders of all users. This should be a 1D numpy array
+            of 2D numpy arrays.
+        U : np.ndarray
+            The receive filters of all users. This should be a 1D numpy
+            array of 2D numpy arrays.
 
         Returns
         -------
-        np.ndarray
-            The interference covariance matrix (without any noise).
+        SINRs : np.ndarray
+            The SINR (in linear scale) of all streams of all users. This is a
+            1D numpy array of 1D numpy arrays (of floats).
         """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H$$
-        interfering_users = set(range(self.K)) - {k}
-        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
-
-        for l in interfering_users:
-            Hk_F = np.dot(
-                self.get_Hk(k),
-                F_all_users[l])
-            Qk = Qk + np.dot(Hk_F, Hk_F.transpose().conjugate())
+        K = self.K
+        SINRs = np.empty(K, dtype=np.ndarray)
 
-        return Qk
+        for k in range(self.K):
+            Bkl_all_l = self._calc_JP_Bkl_cov_matrix_all_l(F, k,
+                                                           self.noise_var)
+            SINRs[k] = self._calc_JP_SINR_k(k, F[k], U[k], Bkl_all_l)
+        return SINRs
 
-    # noinspection PyPep8,PyPep8
-    def calc_JP_Q(self, k, F_all_users):
-        """
-        Calculates the interference plus noise covariance matrix at the
-        :math:`k`-th receiver with a joint processing scheme.
 
-        The interference covariance matrix at the :math:`k`-th receiver,
-        :math:`\\mtQ k`, is given by
+class MultiUserChannelMatrixExtInt(  # pylint: disable=R0904
+        MultiUserChannelMatrix):
+    """
+    Very similar to the MultiUserChannelMatrix class, but the
+    MultiUserChannelMatrixExtInt also includes the effect of an external
+    interference.
 
-            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{k} \\mtF_j \\mtF_j^H \\mtH_{k}^H`
+    This channel matrix can be seem as an concatenation of blocks (of
+    non-uniform size) where each block is a channel from one transmitter to
+    one receiver and the block size is equal to the number of receive
+    antennas of the receiver times the number of transmit antennas of the
+    transmitter. The difference compared with MultiUserChannelMatrix is
+    that in the MultiUserChannelMatrixExtInt class the interference user
+    counts as one more user, but with zero receive antennas.
 
-        where :math:`P_j` is the transmit power of transmitter :math:`j`,
-        and :math:`Ns_j` is the number of streams for user :math:`j`.
+    For instance, in a 3-users scenario the block (1,0) corresponds to the
+    channel between the transmit antennas of user 0 and the receive
+    antennas of user 1 (indexing staring at zero). If the number of receive
+    antennas and transmit antennas of the three users are [2, 4, 6] and [2,
+    3, 5], respectively, then the block (1,0) would have a dimension of
+    4x2. The external interference will count as one more block where the
+    number of columns of this block corresponds to the rank of the external
+    interference. If the external interference has a rank 2 then the
+    complete channel matrix would look similar to the block structure
+    below.
 
-        Parameters
-        ----------
-        k : int
-            Index of the desired receiver.
-        F_all_users : np.ndarray | list[np.ndarray]
-            The precoder of all users (already taking into account the
-            transmit power).
+      +-----+---------+---------------+-----+
+      |2 x 2|  2 x 3  |     2 x 5     |2 x 2|
+      |     |         |               |     |
+      +-----+---------+---------------+-----+
+      |4 x 2|  4 x 3  |     4 x 5     |4 x 2|
+      |     |         |               |     |
+      |     |         |               |     |
+      |     |         |               |     |
+      +-----+---------+---------------+-----+
+      |6 x 2|  6 x 3  |     6 x 5     |6 x 2|
+      |     |         |               |     |
+      |     |         |               |     |
+      |     |         |               |     |
+      |     |         |               |     |
+      |     |         |               |     |
+      +-----+---------+---------------+-----+
 
-        Returns
-        -------
-        Qk : np.ndarray
-            The interference covariance matrix at receiver :math:`k`.
-        """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H + \sigma_n^2 \mtI_{N_k}$$
-        Qk = self._calc_JP_Q_impl(k, F_all_users)
+    The methods from the MultiUserChannelMatrix class that makes sense were
+    reimplemented here to include information regarding the external
+    interference.
+    """
 
-        if self.noise_var is not None:
-            Rnk = np.eye(self.Nr[k]) * self.noise_var
-            return Qk + Rnk
-        else:  # pragma: no cover
-            return Qk
+    def __init__(self):
+        MultiUserChannelMatrix.__init__(self)
+        self._extIntK = 0       # Number of external interference sources
+        # Number of transmit antennas of the external interference sources.
+        self._extIntNt = 0
 
-    # noinspection PyPep8,PyPep8
-    def _calc_Bkl_cov_matrix_first_part(self, F_all_users, k, N0_or_Rek=0.0):
-        """
-        Calculates the first part in the equation of the Blk covariance matrix
-        in equation (28) of [Cadambe2008]_.
+    # Property to get the number of external interference sources
+    @property
+    def extIntK(self):
+        """Get method for the extIntK property."""
+        return self._extIntK
 
-        The first part is given by
+    # Property to get the number of transmit antennas (or the rank) of the
+    # external interference sources
+    @property
+    def extIntNt(self):
+        """Get method for the extIntNt property."""
+        return self._extIntNt
 
-            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
+    # Property to get the number of receive antennas of all users. We
+    # overwrite the property from the MultiUserChannelMatrix to avoid
+    # account the number of receive antennas of the external interference
+    # sources.
+    @property
+    def Nr(self):
+        """Get method for the Nr property."""
+        return self._Nr[:-self._extIntK]
 
-        Note that it only depends on the value of :math:`k`.
+    @property
+    def Nt(self):
+        """Get method for the Nt property."""
+        return self._Nt[:-self._extIntK]
 
-        Parameters
-        ----------
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). It can be a list of numpy arrays or a
-            numpy array of numpy arrays.
-        k : int
-            Index of the desired user.
-        N0_or_Rek : float | np.ndarray
-            If this is a 2D numpy array, it is interpreted as the
-            covariance matrix of any external interference plus noise. If
-            this is a number, it is interpreted as the noise power, in
-            which case the covariance matrix will be an identity matrix
-            times this noise power.
+    @property
+    def K(self):
+        """Get method for the K property."""
+        return self._K - self._extIntK
 
-        Returns
-        -------
-        first_part : np.ndarray
+    @property
+    def big_H_no_ext_int(self):
         """
-        # The first part in Bkl is given by
-        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[kj]\dagger} + \mtR e_k$$
-        # where $\mtR e_k$ is the covariance matrix of the (external
-        # interference plus) noise.
-        # Note that here the power is already included in `Fk`.
-        if N0_or_Rek is None:
-            N0_or_Rek = 0.0
-
-        if isinstance(N0_or_Rek, Number):
-            noise_power = N0_or_Rek
-            # noinspection PyUnresolvedReferences
-            Rek = (noise_power * np.eye(self.Nr[k]))
-        else:
-            Rek = N0_or_Rek
+        Get method for the big_H_no_est_int property.
 
-        first_part = 0.0
-        for j in range(self.K):
-            Hkj = self.get_Hkl(k, j)
-            Hkj_H = Hkj.conjugate().transpose()
-            Vj = F_all_users[j]
-            Vj_H = Vj.conjugate().transpose()
+        big_H_no_est_int is similar to big_H, but does not include the last
+        column(s) corresponding to the external interference channel.
+        """
+        return self.big_H[:, :np.sum(self.Nt)]
 
-            first_part = first_part + np.dot(
-                Hkj,
-                np.dot(
-                    np.dot(Vj,
-                           Vj_H),
-                    Hkj_H))
-        first_part = first_part + Rek
+    @property
+    def H(self):
+        """Get method for the H property."""
+        # We only care about the first self.K "rows". The remaining rows
+        # are the channels from all transmitters to the "external
+        # interference user".
+        H = self._H_no_pathloss[0:self.K]
+        if self._pathloss_matrix is None:
+            # No path loss
+            return H
+        else:
+            # Apply path loss. Note that the _pathloss_big_matrix matrix
+            # has the same dimension as the self._big_H_no_pathloss matrix
+            # and we are performing element-wise multiplication here.
+            return H * np.sqrt(self._pathloss_matrix)
 
-        return first_part
+    @property
+    def H_no_ext_int(self):
+        """Get method for the H_no_ext_int property."""
+        # Call H property get method of the base class
+        H = MultiUserChannelMatrix.H.fget(self)
+        return H[:self.K, :self.K]
 
-    # noinspection PyPep8
-    def _calc_Bkl_cov_matrix_second_part(self, Fk, k, l):
+    def corrupt_data(self, data, ext_int_data):
         """
-        Calculates the second part in the equation of the Blk covariance
-        matrix in equation (28) of [Cadambe2008]_ (note that it does not
-        include the identity matrix).
-
-        The second part is given by
+        Corrupt data passed through the channel.
 
-            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
+        If the noise_var member variable is not None then an white noise
+        will also be added.
 
         Parameters
         ----------
-        Fk : np.ndarray
-            The precoder of the desired user.
-        k : int
-            Index of the desired user.
-        l : int
-            Index of the desired stream.
+        data : np.ndarray
+            An array of numpy matrices with the data of the multiple
+            users. The k-th element in `data` is a numpy array with
+            dimension Nt_k x NSymbs, where Nt_k is the number of transmit
+            antennas of the k-th user and NSymbs is the number of
+            transmitted symbols.
+        ext_int_data : list[np.ndarray] | np.ndarray
+            An array of numpy matrices with the data of the external
+            interference sources. The l-th element is the data transmitted
+            by the l-th external interference source, which must have a
+            dimension of NtEl x NSymbs, where NtEl is the number of
+            transmit antennas of the l-th external interference source.
 
         Returns
         -------
-        second_part : np.ndarray
-            Second part in equation (28) of [Cadambe2008]_.
-
+        output : np.ndarray
+            A numpy array where each element contains the received data (a
+            2D numpy array) of a user.
         """
-        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger}$$
-        Hkk = self.get_Hkl(k, k)
-        Hkk_H = Hkk.transpose().conjugate()
-
-        Vkl = Fk[:, l:l + 1]
-        Vkl_H = Vkl.transpose().conjugate()
-        second_part = np.dot(Hkk,
-                             np.dot(np.dot(Vkl, Vkl_H),
-                                    Hkk_H))
-
-        return second_part
+        input_data = np.hstack([data, ext_int_data])
+        return MultiUserChannelMatrix.corrupt_data(self, input_data)
 
-    # noinspection PyPep8
-    def _calc_Bkl_cov_matrix_all_l(self, F_all_users, k, N0_or_Rek=0.0):
+    def corrupt_concatenated_data(self, data):
         """
-        Calculates the interference-plus-noise covariance matrix for all
-        streams at receiver :math:`k` according to equation (28) in [
-        Cadambe2008]_.
-
-        The interference-plus-noise covariance matrix for stream :math:`l`
-        of user :math:`k` is given by Equation (28) in [Cadambe2008]_,
-        which is reproduced below
-
-            :math:`\\mtB^{[kl]} = \\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star l}^{[j]} \\mtV_{\\star l}^{[j]\\dagger} \\mtH^{[kj]\\dagger} - \\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger} + \\mtI_{N^{[k]}}`
+        Corrupt data passed through the channel.
 
-        where :math:`P^{[k]}` is the transmit power of transmitter
-        :math:`k`, :math:`d^{[k]}` is the number of degrees of freedom of
-        user :math:`k`, :math:`\\mtH^{[kj]}` is the channel between
-        transmitter :math:`j` and receiver :math:`k`, :math:`\\mtV_{\\star
-        l}` is the :math:`l`-th column of the precoder of user :math:`k`
-        and :math:`\\mtI_{N^{k}}` is an identity matrix with size equal to
-        the number of receive antennas of receiver :math:`k`.
+        If the noise_var member variable is not None then an white noise
+        will also be added.
 
         Parameters
         ----------
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This can be a list of numpy arrays or a 1D numpy
-            array of numpy arrays.
-        k : int
-            Index of the desired user.
-        N0_or_Rek : float | np.ndarray
-            If this is a 2D numpy array, it is interpreted as the
-            covariance matrix of any external interference plus noise. If
-            this is a number, it is interpreted as the noise power, in
-            which case the covariance matrix will be an identity matrix
-            times this noise power.
+        data : np.ndarray
+            A bi-dimensional numpy array with the concatenated data of all
+            transmitters as well as the data from all external interference
+            sources. The dimension of data is (sum(self._Nt) +
+            sum(self.extIntNt)) x NSymb. That is, the number of rows
+            corresponds to the sum of the number of transmit antennas of
+            all users and external interference sources and the number of
+            columns correspond to the number of transmitted symbols.
 
         Returns
         -------
-        Bkl : np.ndarray
-            Covariance matrix of all streams of user k. Each element of the
-            returned 1D numpy array is a 2D numpy complex array corresponding
-            to the covariance matrix of one stream of user k.
-
-        Notes
-        -----
-        To be simple, a function that returns the covariance matrix of only
-        a single stream "l" of the desired user "k" could be implemented,
-        but in the order to calculate the max SINR algorithm we need the
-        covariance matrix of all streams and returning them in single
-        function as is done here allows us to calculate the first part in
-        equation (28) of [Cadambe2008]_ only once, since it is the same for
-        all streams.
+        output : np.ndarray
+            A bi-dimension numpy array where the number of rows corresponds
+            to the sum of the number of receive antennas of all users and
+            the number of columns correspond to the number of transmitted
+            symbols.
 
         """
-        # $$\mtB^{[kl]} = \sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star l}^{[j]} \mtV_{\star l}^{[j]\dagger} \mtH^{[kj]\dagger} - \frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger} + \mtI_{N^{[k]}}$$
-
-        Ns_k = F_all_users[k].shape[1]
-        Bkl_all_l = np.empty(Ns_k, dtype=np.ndarray)
-        first_part = self._calc_Bkl_cov_matrix_first_part(
-            F_all_users, k, N0_or_Rek)
-        for l in range(Ns_k):
-            second_part = self._calc_Bkl_cov_matrix_second_part(
-                F_all_users[k], k, l)
-            Bkl_all_l[l] = first_part - second_part
-
-        return Bkl_all_l
-
-    # noinspection PyPep8
-    def _calc_JP_Bkl_cov_matrix_first_part_impl(self, Hk, F_all_users, Rek):
+        return MultiUserChannelMatrix.corrupt_concatenated_data(self, data)
+
+    def get_Hk_without_ext_int(self, k):
         """
-        Common implementation of the _calc_JP_Bkl_cov_matrix_first_part.
+        Get the channel from all transmitters (without including the external
+        interference sources) to receiver `k`.
 
         Parameters
         ----------
-        Hk : np.ndarray
-            The channel from all transmitters (not including external
-            interference source, if any) to receiver k.
-        F_all_users : list[np.ndarray]
-            The precoder of all users (already taking into account the
-            transmit power).
-        Rek : np.ndarray | float
-            Covariance matrix of the external interference (if there is
-            any) plus noise.
+        k : int
+            Receiving user.
 
         Returns
         -------
-        np.ndarray
-            The `first_part` for the Bkl matrix computation.
-        """
-        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[k]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[k]\dagger} + \mtR e_k$$
-        first_part = 0.0
-
-        HK_H = Hk.conjugate().transpose()
-        for j in range(self.K):
-            Vj = F_all_users[j]
-            Vj_H = Vj.conjugate().transpose()
-
-            first_part = first_part + np.dot(
-                Hk,
-                np.dot(
-                    np.dot(Vj,
-                           Vj_H),
-                    HK_H))
-        first_part += Rek
+        channel_k : np.ndarray
+            Channel from all transmitters to receiver `k` (2D numpy array).
 
-        return first_part
+        See also
+        --------
+        .get_Hkl,
+        .get_Hk,
+        get_Hk_with_ext_int
 
-    # noinspection PyPep8,PyPep8
-    def _calc_JP_Bkl_cov_matrix_first_part(self, F_all_users, k,
-                                           noise_power=0.0):
+        Examples
+        --------
+        >>> multiH = MultiUserChannelMatrixExtInt()
+        >>> H = np.reshape(np.r_[0:20], [4,5])
+        >>> Nt = np.array([2, 2])
+        >>> Nr = np.array([2, 2])
+        >>> NextInt = np.array([1])
+        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2, 1)
+        >>> # Note that the last column of multiH.big_H corresponds to the
+        >>> # external interference source
+        >>> print(multiH.big_H)
+        [[ 0  1  2  3  4]
+         [ 5  6  7  8  9]
+         [10 11 12 13 14]
+         [15 16 17 18 19]]
+        >>> print(multiH.get_Hk_without_ext_int(0))
+        [[0 1 2 3]
+         [5 6 7 8]]
+        >>> print(multiH.get_Hk_without_ext_int(1))
+        [[10 11 12 13]
+         [15 16 17 18]]
         """
-        Calculates the first part in the equation of the Blk covariance matrix
-        in equation (28) of [Cadambe2008]_ when joint process is employed.
-
-        The first part is given by
+        receive_channels = single_matrix_to_matrix_of_matrices(
+            self.big_H[:, :np.sum(self.Nt)], self.Nr)
+        return receive_channels[k]
 
-            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
+    # This is exactly the same as the
+    # get_Hk_without_ext_int method from the
+    # MultiUserChannelMatrix class. therefore, we don't need to test it.
+    def get_Hk_with_ext_int(self, k):
+        """
+        Get the channel from all transmitters (including the external
+        interference sources) to receiver `k`.
 
-        Note that it only depends on the value of :math:`k`.
+        This method is essentially the same as the get_Hk method.
 
         Parameters
         ----------
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). It can be a list of numpy arrays or a numpy
-            array of numpy arrays.
         k : int
-            Index of the desired user.
-        noise_power : float
-            The noise power.
+            Receiving user.
 
         Returns
         -------
-        np.ndarray
-        """
-        # The first part in Bkl is given by
-        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[kj]\dagger} + \mtI_{N^{[k]}}$$
-        # Note that here the power is already included in `Fk`.
-        if noise_power is None:
-            noise_power = 0.0
+        channel_k : np.ndarray
+            Channel from all transmitters to receiver `k`.
 
-        Rek = (noise_power * np.eye(self.Nr[k]))
-        Hk = self.get_Hk(k)
-        # noinspection PyTypeChecker
-        return self._calc_JP_Bkl_cov_matrix_first_part_impl(
-            Hk, F_all_users, Rek)
+        See also
+        --------
+        .get_Hkl,
+        .get_Hk,
+        get_Hk_without_ext_int
+
+        Examples
+        --------
+        >>> multiH = MultiUserChannelMatrixExtInt()
+        >>> H = np.reshape(np.r_[0:20], [4,5])
+        >>> Nt = np.array([2, 2])
+        >>> Nr = np.array([2, 2])
+        >>> NextInt = np.array([1])
+        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2, 1)
+        >>> # Note that the last column of multiH.big_H corresponds to the
+        >>> # external interference source
+        >>> print(multiH.big_H)
+        [[ 0  1  2  3  4]
+         [ 5  6  7  8  9]
+         [10 11 12 13 14]
+         [15 16 17 18 19]]
+        >>> print(multiH.get_Hk_with_ext_int(0))
+        [[0 1 2 3 4]
+         [5 6 7 8 9]]
+        >>> print(multiH.get_Hk_with_ext_int(1))
+        [[10 11 12 13 14]
+         [15 16 17 18 19]]
+        """
+        return MultiUserChannelMatrix.get_Hk(self, k)  # pragma: no cover
 
-    # noinspection PyPep8
     @staticmethod
-    def _calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l):
+    def _prepare_input_parans(Nr, Nt, K, NtE):
         """
-        Common implementation of the _calc_JP_Bkl_cov_matrix_second_part
-        method.
+        Helper method used in the init_from_channel_matrix and randomize
+        method definitions.
 
         Parameters
         ----------
-        Hk : np.ndarray
-        Fk : np.ndarray
-        l : int
+        Nr : np.ndarray
+            Number of antennas at each receiver.
+        Nt : np.ndarray
+            Number of antennas at each transmitter.
+        K : int
+            Number of transmit/receive pairs.
+        NtE : int | list[int] | np.ndarray
+            Number of transmit antennas of the external interference
+            source(s). If `NtE` is an iterable, the number of external
+            interference sources will be the len(NtE).
 
         Returns
         -------
-        np.ndarray
+        output : tuple
+            The tuple (full_Nr, full_Nt, full_K, extIntK, extIntNt).
         """
-        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
-        Hk_H = Hk.transpose().conjugate()
-
-        Vkl = Fk[:, l:l + 1]
-        Vkl_H = Vkl.transpose().conjugate()
-        second_part = np.dot(Hk, np.dot(np.dot(Vkl, Vkl_H), Hk_H))
+        if isinstance(NtE, (int, np.int_)):
+            # NtE is a scalar number, which means we have a single external
+            # interference source.
+            extIntK = 1
+            extIntNt = np.array([NtE])
+        else:
+            # We have multiple external interference sources
+            extIntK = len(NtE)
+            extIntNt = np.array(NtE)
 
-        return second_part
+        # Number of receive antennas also including the number of receive
+        # antennas of the interference users (which are zeros)
+        full_Nr = np.hstack([Nr, np.zeros(extIntK, dtype=int)])
+        # Number of transmit antennas also including the number of transmit
+        # antennas of the interference users
+        full_Nt = np.hstack([Nt, NtE])
+        # Total number of users including the interference users.
+        full_K = K + extIntK
 
-    # noinspection PyPep8
-    def _calc_JP_Bkl_cov_matrix_second_part(self, Fk, k, l):
-        """Calculates the second part in the equation of the Blk covariance
-        matrix in equation (28) of [Cadambe2008]_ (note that it does not
-        include the identity matrix).
+        return full_Nr, full_Nt, full_K, extIntK, extIntNt
 
-        The second part is given by
+    def init_from_channel_matrix(self, channel_matrix, Nr, Nt, K, NtE):
+        """
+        Initializes the multiuser channel matrix from the given
+        `channel_matrix`.
 
-            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
+        Note that `channel_matrix` must also include the channel terms for
+        the external interference, which must be the last `NtE` columns of
+        `channel_matrix`. The number of rows in `channel_matrix` must be
+        equal to np.sum(Nr), while the number of columns must be
+        np.sum(Nt) + NtE.
 
         Parameters
         ----------
-        Fk : np.ndarray
-            The precoder of the desired user.
-        k : int
-            Index of the desired user.
-        l : int
-            Index of the desired stream.
-
-        Returns
-        -------
-        second_part : np.ndarray.
-            Second part in equation (28) of [Cadambe2008]_.
-        """
-        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
-        Hk = self.get_Hk(k)
-        return self._calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l)
+        channel_matrix : np.ndarray
+            A matrix concatenating the channel of all transmitters
+            (including the external interference sources) to all receivers.
+        Nr : np.ndarray
+            Number of antennas at each receiver.
+        Nt : np.ndarray
+            Number of antennas at each transmitter.
+        K : int
+            Number of transmit/receive pairs.
+        NtE : int | list[int] | np.ndarray
+            Number of transmit antennas of the external interference
+            source(s). If NtE is an iterable, the number of external
+            interference sources will be the len(NtE).
 
-    # noinspection PyPep8
-    def _calc_JP_Bkl_cov_matrix_all_l(self, F_all_users, k, N0_or_Rek=0.0):
+        Raises
+        ------
+        ValueError
+            If the arguments are invalid.
         """
-        Calculates the interference-plus-noise covariance matrix for all
-        streams at receiver :math:`k` according to equation (28) in [
-        Cadambe2008]_.
+        (full_Nr, full_Nt, full_K, extIntK, extIntNt) \
+            = MultiUserChannelMatrixExtInt._prepare_input_parans(
+                Nr, Nt, K, NtE)
 
-        The interference-plus-noise covariance matrix for stream :math:`l`
-        of user :math:`k` is given by Equation (28) in [Cadambe2008]_,
-        which is reproduced below
+        self._extIntK = extIntK
+        self._extIntNt = extIntNt
 
-            :math:`\\mtB^{[kl]} = \\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star l}^{[j]} \\mtV_{\\star l}^{[j]\\dagger} \\mtH^{[kj]\\dagger} - \\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger} + \\mtI_{N^{[k]}}`
+        MultiUserChannelMatrix.init_from_channel_matrix(
+            self, channel_matrix, full_Nr, full_Nt, full_K)
 
-        where :math:`P^{[k]}` is the transmit power of transmitter
-        :math:`k`, :math:`d^{[k]}` is the number of degrees of freedom of
-        user :math:`k`, :math:`\\mtH^{[kj]}` is the channel between
-        transmitter :math:`j` and receiver :math:`k`, :math:`\\mtV_{\\star
-        l}` is the :math:`l`-th column of the precoder of user :math:`k`
-        and :math:`\\mtI_{N^{k}}` is an identity matrix with size equal to
-        the number of receive antennas of receiver :math:`k`.
+    def randomize(self, Nr, Nt, K, NtE):
+        """
+        Generates a random channel matrix for all users as well as for the
+        external interference source(s).
 
         Parameters
         ----------
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This can be either a 1D numpy array of numpy
-            arrays or a list of numpy arrays.
-        k : int
-            Index of the desired user.
-        N0_or_Rek : float | np.ndarray
-            If this is a 2D numpy array, it is interpreted as the
-            covariance matrix of any external interference plus noise. If
-            this is a number, it is interpreted as the noise power, in
-            which case the covariance matrix will be an identity matrix
-            times this noise power.
+        Nr : int | np.ndarray
+            Number of receive antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        Nt : int | np.ndarray
+            Number of transmit antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        K : int
+            Number of users.
+        NtE : int | list[int] | np.ndarray
+            Number of transmit antennas of the external interference
+            source(s). If NtE is an iterable, the number of external
+            interference sources will be the len(NtE).
+        """
+        if isinstance(Nr, int):
+            Nr = np.ones(K, dtype=int) * Nr
+        if isinstance(Nt, int):
+            Nt = np.ones(K, dtype=int) * Nt
 
-        Returns
-        -------
-        Bkl : np.ndarray
-            Covariance matrix of all streams of user k. Each element of the
-            returned 1D numpy array is a 2D numpy complex array
-            corresponding to the covariance matrix of one stream of user k.
+        (full_Nr, full_Nt, full_K, extIntK, extIntNt) \
+            = MultiUserChannelMatrixExtInt._prepare_input_parans(
+                Nr, Nt, K, NtE)
 
-        Notes
-        -----
+        self._extIntK = extIntK
+        self._extIntNt = extIntNt
 
-        To be simple, a function that returns the covariance matrix of only
-        a single stream "l" of the desired user "k" could be implemented,
-        but in the order to calculate the max SINR algorithm we need the
-        covariance matrix of all streams and returning them in single
-        function as is done here allows us to calculate the first part in
-        equation (28) of [Cadambe2008]_ only once, since it is the same for
-        all streams.
+        MultiUserChannelMatrix.randomize(self, full_Nr, full_Nt, full_K)
 
+    def set_pathloss(self, pathloss_matrix=None, ext_int_pathloss=None):
         """
-        # $$\mtB^{[kl]} = \sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[kj]}\mtV_{\star l}^{[j]} \mtV_{\star l}^{[j]\dagger} \mtH^{[kj]\dagger} - \frac{P^{[k]}}{d^{[k]}} \mtH^{[kk]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[kk]\dagger} + \mtI_{N^{[k]}}$$
-        Ns_k = F_all_users[k].shape[1]
-        Bkl_all_l = np.empty(Ns_k, dtype=np.ndarray)
-        first_part = self._calc_JP_Bkl_cov_matrix_first_part(
-            F_all_users, k, N0_or_Rek)
-        for l in range(Ns_k):
-            second_part = self._calc_JP_Bkl_cov_matrix_second_part(
-                F_all_users[k], k, l)
-            Bkl_all_l[l] = first_part - second_part
+        Set the path loss (IN LINEAR SCALE) from each transmitter to each
+        receiver, as well as the path loss from the external interference
+        source(s) to each receiver.
 
-        return Bkl_all_l
+        The path loss will be accounted when calling the get_Hkl, get_Hk,
+        the corrupt_concatenated_data and the corrupt_data methods.
 
-    def _calc_SINR_k(self, k, Fk, Uk, Bkl_all_l):
-        """
-        Calculates the SINR of all streams of user 'k'.
+        Note that path loss is a power relation, which means that the
+        channel coefficients will be multiplied by the square root of
+        elements in `pathloss_matrix`.
+
+        If you want to disable the path loss, set pathloss_matrix to None.
 
         Parameters
         ----------
-        Fk : np.ndarray
-            The precoder of user k.
-        Uk : np.ndarray
-            The receive filter of user k (before applying the conjugate
-            transpose).
-        k : int
-            Index of the desired user.
-        Bkl_all_l : list[np.ndarray] | np.ndarray
-            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
-            corresponding to the Bkl matrices for all 'l's.
-
-        Returns
-        -------
-        SINR_k : np.ndarray
-            The SINR for the different streams of user k.
+        pathloss_matrix : np.ndarray
+            A matrix with dimension "K x K", where K is the number of
+            users, with the path loss (IN LINEAR SCALE) from each
+            transmitter (columns) to each receiver (rows). If you want to
+            disable the path loss then set it to None.  ext_int_pathloss :
+            2D numpy array The path loss from each interference source to
+            each receiver. The number of rows of ext_int_pathloss must be
+            equal to the number of receives, while the number of columns
+            must be equal to the number of external interference sources.
+        ext_int_pathloss : np.ndarray
+            The external interference path loss.
         """
-        Ns_k = Fk.shape[1]
+        # A matrix with the path loss from each transmitter to each
+        # receiver.
+        self._pathloss_matrix = pathloss_matrix
 
-        SINR_k = np.empty(Ns_k, dtype=float)
+        # Reset the channels with path loss. They will be correctly set
+        # the next time they are used.
+        self._big_H_with_pathloss = None
+        self._dense_H = None
 
-        for l in range(Ns_k):
-            Fkl = Fk[:, l:l + 1]
-            Ukl = Uk[:, l:l + 1]
-            Ukl_H = Ukl.conj().T
+        if pathloss_matrix is None:
+            self._pathloss_matrix = None
+            self._pathloss_big_matrix = None
+        else:
+            pathloss_matrix_with_ext_int = np.hstack([
+                pathloss_matrix,
+                ext_int_pathloss])
+            self._pathloss_matrix = pathloss_matrix_with_ext_int
 
-            aux = np.dot(Ukl_H,
-                         np.dot(self.get_Hkl(k, k),
-                                Fkl))
-            numerator = np.dot(aux,
-                               aux.transpose().conjugate())
-            denominator = np.dot(Ukl_H,
-                                 np.dot(Bkl_all_l[l], Ukl))
-            SINR_kl = np.asscalar(numerator) / np.asscalar(denominator)
-            # The imaginary part should be negligible
-            SINR_k[l] = np.abs(SINR_kl)
+            self._pathloss_big_matrix \
+                = MultiUserChannelMatrix._from_small_matrix_to_big_matrix(
+                    pathloss_matrix_with_ext_int, self._Nr, self._Nt,
+                    self.K, self._K)
 
-        return SINR_k
+            # Assures that _pathloss_matrix and _pathloss_big_matrix
+            # will stay in sync by disallowing modification of
+            # individual elements in both of them.
+            self._pathloss_matrix.setflags(write=False)
+            self._pathloss_big_matrix.setflags(write=False)
 
-    def calc_SINR(self, F, U):
+    def calc_cov_matrix_extint_without_noise(self, pe=1):
         """
-        Calculates the SINR values (in linear scale) of all streams of all
-        users with the current IA solution.
-
-        The noise variance used will be the value of the noise_var
-        property.
+        Calculates the covariance matrix of the external interference
+        without include the noise.
 
         Parameters
         ----------
-        F : np.ndarray
-            The precoders of all users. This should be a 1D numpy array
-            of 2D numpy arrays.
-        U : np.ndarray
-            The receive filters of all users. This should be a 1D numpy
-            array of 2D numpy arrays.
+        pe : float, optional
+            External interference power (in linear scale)
 
         Returns
         -------
-        SINRs : np.ndarray
-            The SINR (in linear scale) of all streams of all users. This is a
-            1D numpy array of 1D numpy arrays (of floats)
+        R_all_k : np.ndarray
+            Return a numpy array, where each element is the covariance
+            matrix of the external interference at one receiver.
         """
-        K = self.K
-        SINRs = np.empty(K, dtype=np.ndarray)
+        # $$\mtR_e = \sum_{j=1}^{Ke} P_{e_j} \mtH_{k{e_j}} \mtH_{k{e_j}}^H$$
+        R_all_k = np.empty(self.Nr.size, dtype=np.ndarray)
+        cum_Nr = np.hstack([0, np.cumsum(self.Nr)])
 
-        for k in range(self.K):
-            Bkl_all_l = self._calc_Bkl_cov_matrix_all_l(F, k,
-                                                        self.noise_var)
-            SINRs[k] = self._calc_SINR_k(k, F[k], U[k], Bkl_all_l)
-        return SINRs
+        for ii in range(self.Nr.size):
+            extH = self.big_H[cum_Nr[ii]:cum_Nr[ii + 1], np.sum(self.Nt):]
+            R_all_k[ii] = pe * np.dot(extH, extH.transpose().conjugate())
+        return R_all_k
 
-    @staticmethod
-    def _calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l):
+    # noinspection PyPep8
+    def calc_cov_matrix_extint_plus_noise(self, pe=1):
         """
-        Implementation of the :meth:`_calc_JP_SINR_k` method.
+        Calculates the covariance matrix of the external interference plus
+        noise.
 
         Parameters
         ----------
-        Hk : np.ndarray
-            Channel from all transmitters to receiver k.
-        Fk : np.ndarray
-            The precoder of user k.
-        Uk : np.ndarray
-            The receive filter of user k (before applying the conjugate
-            transpose).
-        Bkl_all_l : list[np.ndarray]
-            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
-            corresponding to the Bkl matrices for all 'l's.
+        pe : float, optional [default=1]
+            External interference power (in linear scale)
 
         Returns
         -------
-        SINR_k : np.ndarray
-            The SINR for the different streams of user k.
-
-        Notes
-        -----
-
-        The implementation of the _calc_JP_SINR_k method is almost the same
-        for the MultiuserChannelMatrix and MultiuserChannelMatrixExtint
-        class, except for the `Hk` argument. Therefore, the common code was
-        put here and in each class the :meth:`_calc_JP_SINR_k` is
-        implemented as simply getting the correct `Hk` argument and then
-        calling :meth:`_calc_JP_SINR_k_impl`.
+        R_all_k : np.ndarray
+            Return a numpy array, where each element is the covariance
+            matrix of the external interference plus noise at one receiver.
         """
-        Ns_k = Fk.shape[1]
-
-        SINR_k = np.empty(Ns_k, dtype=float)
-
-        for l in range(Ns_k):
-            Fkl = Fk[:, l:l + 1]
-            Ukl = Uk[:, l:l + 1]
-            Ukl_H = Ukl.conj().T
-
-            aux = np.dot(Ukl_H,
-                         np.dot(Hk, Fkl))
-            numerator = np.dot(aux,
-                               aux.transpose().conjugate())
-            denominator = np.dot(Ukl_H,
-                                 np.dot(Bkl_all_l[l], Ukl))
-            SINR_kl = np.asscalar(numerator) / np.asscalar(denominator)
-            # The imaginary part should be negligible
-            SINR_k[l] = np.abs(SINR_kl)
+        # $$\mtR_e = \sum_{j=1}^{Ke} P_{e_j} \mtH_{k{e_j}} \mtH_{k{e_j}}^H + \sigma_n^2 \mtI$$
+        # where $Ke$ is the number of external interference sources and
+        # ${e_j}$ is the j-th external interference source.
 
-        return SINR_k
+        # Calculate the covariance matrix of the external interference
+        # without noise.
+        R_all_k = self.calc_cov_matrix_extint_without_noise(pe)
 
-    def _calc_JP_SINR_k(self, k, Fk, Uk, Bkl_all_l):
-        """
-        Calculates the SINR of all streams of user 'k'.
+        if self.noise_var is not None:
+            # If self.noise_var is not None then let's add the noise
+            # covariance matrix
+            noise_var = self.noise_var
+            for i in range(len(R_all_k)):
+                R_all_k[i] += np.eye(self.Nr[i]) * noise_var
 
-        Parameters
-        ----------
-        Fk : np.ndarray
-            The precoder of user k.
-        Uk : np.ndarray
-            The receive filter of user k (before applying the conjugate
-            transpose).
-        k : int
-            Index of the desired user.
-        Bkl_all_l : list[np.ndarray] | np.ndarray
-            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
-            corresponding to the Bkl matrices for all 'l's.
+        return R_all_k
 
-        Returns
-        -------
-        SINR_k : np.ndarray
-            The SINR for the different streams of user k.
+    # noinspection PyPep8,PyPep8
+    def calc_Q(self, k, F_all_users, pe=1.0):
         """
-        Hk = self.get_Hk(k)
-        return self._calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l)
+        Calculates the interference covariance matrix at the
+        :math:`k`-th receiver.
 
-    def calc_JP_SINR(self, F, U):
-        """
-        Calculates the SINR values (in linear scale) of all streams of all
-        users with the current IA solution.
+        The interference covariance matrix at the :math:`k`-th receiver,
+        :math:`\\mtQ k`, is given by
 
-        The noise variance used will be the value of the noise_var
-        property.
+            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{kj} \\mtF_j \\mtF_j^H \\mtH_{kj}^H`
+
+        where :math:`P_j` is the transmit power of transmitter :math:`j`,
+        and :math:`Ns_j` is the number of streams for user :math:`j`.
 
         Parameters
         ----------
-        F : np.ndarray
-            The precoders of all users. This should be a 1D numpy array
-            of 2D numpy arrays.
-        U : np.ndarray
-            The receive filters of all users. This should be a 1D numpy
-            array of 2D numpy arrays.
+        k : int
+            Index of the desired receiver.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This should be either a list of numpy
+            2D arrays or a 1D numpy array of 2D numpy arrays.
+        pe : float
+            The power of the external interference source(s).
 
         Returns
         -------
-        SINRs : np.ndarray
-            The SINR (in linear scale) of all streams of all users. This is a
-            1D numpy array of 1D numpy arrays (of floats).
+        Qk : np.ndarray
+            The interference covariance matrix at receiver :math:`k`.
         """
-        K = self.K
-        SINRs = np.empty(K, dtype=np.ndarray)
-
-        for k in range(self.K):
-            Bkl_all_l = self._calc_JP_Bkl_cov_matrix_all_l(F, k,
-                                                           self.noise_var)
-            SINRs[k] = self._calc_JP_SINR_k(k, F[k], U[k], Bkl_all_l)
-        return SINRs
-
-
-class MultiUserChannelMatrixExtInt(  # pylint: disable=R0904
-        MultiUserChannelMatrix):
-    """
-    Very similar to the MultiUserChannelMatrix class, but the
-    MultiUserChannelMatrixExtInt also includes the effect of an external
-    interference.
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H + \mtR_e$$
+        Rek_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
+        Qk = self._calc_Q_impl(k, F_all_users) + Rek_all_k[k]
 
-    This channel matrix can be seem as an concatenation of blocks (of
-    non-uniform size) where each block is a channel from one transmitter to
-    one receiver and the block size is equal to the number of receive
-    antennas of the receiver times the number of transmit antennas of the
-    transmitter. The difference compared with MultiUserChannelMatrix is
-    that in the MultiUserChannelMatrixExtInt class the interference user
-    counts as one more user, but with zero receive antennas.
+        return Qk
 
-    For instance, in a 3-users scenario the block (1,0) corresponds to the
-    channel between the transmit antennas of user 0 and the receive
-    antennas of user 1 (indexing staring at zero). If the number of receive
-    antennas and transmit antennas of the three users are [2, 4, 6] and [2,
-    3, 5], respectively, then the block (1,0) would have a dimension of
-    4x2. The external interference will count as one more block where the
-    number of columns of this block corresponds to the rank of the external
-    interference. If the external interference has a rank 2 then the
-    complete channel matrix would look similar to the block structure
-    below.
+    # noinspection PyPep8
+    def _calc_JP_Q(self, k, F_all_users):
+        """
+        Calculates the interference covariance matrix at the :math:`k`-th
+        receiver with a joint processing scheme (not including the
+        covariance matrix of the external interference plus noise)
 
-      +-----+---------+---------------+-----+
-      |2 x 2|  2 x 3  |     2 x 5     |2 x 2|
-      |     |         |               |     |
-      +-----+---------+---------------+-----+
-      |4 x 2|  4 x 3  |     4 x 5     |4 x 2|
-      |     |         |               |     |
-      |     |         |               |     |
-      |     |         |               |     |
-      +-----+---------+---------------+-----+
-      |6 x 2|  6 x 3  |     6 x 5     |6 x 2|
-      |     |         |               |     |
-      |     |         |               |     |
-      |     |         |               |     |
-      |     |         |               |     |
-      |     |         |               |     |
-      +-----+---------+---------------+-----+
+        Parameters
+        ----------
+        k : int
+            Index of the desired receiver.
+        F_all_users : np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This is a 1D numpy array of 2D numpy array.
 
-    The methods from the MultiUserChannelMatrix class that makes sense were
-    reimplemented here to include information regarding the external
-    interference.
-    """
+        See also
+        --------
+        calc_JP_Q
+        """
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H$$
+        interfering_users = set(range(self.K)) - {k}
+        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
 
-    def __init__(self):
-        MultiUserChannelMatrix.__init__(self)
-        self._extIntK = 0       # Number of external interference sources
-        # Number of transmit antennas of the external interference sources.
-        self._extIntNt = 0
+        for l in interfering_users:
+            Hk_F = np.dot(
+                self.get_Hk_without_ext_int(k),
+                F_all_users[l])
+            Qk = Qk + np.dot(Hk_F, Hk_F.transpose().conjugate())
 
-    # Property to get the number of external interference sources
-    @property
-    def extIntK(self):
-        """Get method for the extIntK property."""
-        return self._extIntK
+        return Qk
 
-    # Property to get the number of transmit antennas (or the rank) of the
-    # external interference sources
-    @property
-    def extIntNt(self):
-        """Get method for the extIntNt property."""
-        return self._extIntNt
+    # noinspection PyPep8,PyPep8
+    def calc_JP_Q(self, k, F_all_users, pe=1.0):
+        """
+        Calculates the interference covariance matrix at the
+        :math:`k`-th receiver with a joint processing scheme.
 
-    # Property to get the number of receive antennas of all users. We
-    # overwrite the property from the MultiUserChannelMatrix to avoid
-    # account the number of receive antennas of the external interference
-    # sources.
-    @property
-    def Nr(self):
-        """Get method for the Nr property."""
-        return self._Nr[:-self._extIntK]
+        The interference covariance matrix at the :math:`k`-th receiver,
+        :math:`\\mtQ k`, is given by
 
-    @property
-    def Nt(self):
-        """Get method for the Nt property."""
-        return self._Nt[:-self._extIntK]
+            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{k} \\mtF_j \\mtF_j^H \\mtH_{k}^H`
 
-    @property
-    def K(self):
-        """Get method for the K property."""
-        return self._K - self._extIntK
+        where :math:`P_j` is the transmit power of transmitter :math:`j`,
+        and :math:`Ns_j` is the number of streams for user :math:`j`.
 
-    @property
-    def big_H_no_ext_int(self):
-        """
-        Get method for the big_H_no_est_int property.
+        Parameters
+        ----------
+        k : int
+            Index of the desired receiver.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This is a 1D numpy array of 2D numpy array.
+        pe : float
+            The power of the external interference source(s).
 
-        big_H_no_est_int is similar to big_H, but does not include the last
-        column(s) corresponding to the external interference channel.
+        Returns
+        -------
+        Qk : np.ndarray
+            The interference covariance matrix at receiver :math:`k`.
         """
-        return self.big_H[:, :np.sum(self.Nt)]
-
-    @property
-    def H(self):
-        """Get method for the H property."""
-        # We only care about the first self.K "rows". The remaining rows
-        # are the channels from all transmitters to the "external
-        # interference user".
-        H = self._H_no_pathloss[0:self.K]
-        if self._pathloss_matrix is None:
-            # No path loss
-            return H
-        else:
-            # Apply path loss. Note that the _pathloss_big_matrix matrix
-            # has the same dimension as the self._big_H_no_pathloss matrix
-            # and we are performing element-wise multiplication here.
-            return H * np.sqrt(self._pathloss_matrix)
+        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H + \mtR_e$$
+        Rek_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
+        Qk = self._calc_JP_Q(k, F_all_users) + Rek_all_k[k]
 
-    @property
-    def H_no_ext_int(self):
-        """Get method for the H_no_ext_int property."""
-        # Call H property get method of the base class
-        H = MultiUserChannelMatrix.H.fget(self)
-        return H[:self.K, :self.K]
+        return Qk
 
-    def corrupt_data(self, data, ext_int_data):
+    # noinspection PyUnresolvedReferences
+    def calc_SINR(self, F, U, pe=1.0):
         """
-        Corrupt data passed through the channel.
+        Calculates the SINR values (in linear scale) of all streams of all
+        users with the current IA solution.
 
-        If the noise_var member variable is not None then an white noise
-        will also be added.
+        The noise variance used will be the value of the noise_var
+        property.
 
         Parameters
         ----------
-        data : np.ndarray
-            An array of numpy matrices with the data of the multiple
-            users. The k-th element in `data` is a numpy array with
-            dimension Nt_k x NSymbs, where Nt_k is the number of transmit
-            antennas of the k-th user and NSymbs is the number of
-            transmitted symbols.
-        ext_int_data : list[np.ndarray] | np.ndarray
-            An array of numpy matrices with the data of the external
-            interference sources. The l-th element is the data transmitted
-            by the l-th external interference source, which must have a
-            dimension of NtEl x NSymbs, where NtEl is the number of
-            transmit antennas of the l-th external interference source.
+        F : list[np.ndarray] | np.ndarray
+            The precoders of all users. This should be either a list of numpy
+            2D arrays or a 1D numpy array of 2D numpy arrays.
+        U : list[np.ndarray] | np.ndarray
+            The receive filters of all users. This should be either a list of
+            numpy 2D arrays or a 1D numpy array of 2D numpy arrays.
+        pe : float
+            Power of the external interference source.
 
         Returns
         -------
-        output : np.ndarray
-            A numpy array where each element contains the received data (a
-            2D numpy array) of a user.
+        SINRs : np.ndarray
+            The SINR (in linear scale) of all streams of all users. This is a
+            1D numpy array of 1D numpy arrays (of floats)
         """
-        input_data = np.hstack([data, ext_int_data])
-        return MultiUserChannelMatrix.corrupt_data(self, input_data)
+        K = self.K
+        SINRs = np.empty(K, dtype=np.ndarray)
+
+        Re_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
+
+        for k in range(self.K):
+            Bkl_all_l = self._calc_Bkl_cov_matrix_all_l(F, k, Re_all_k[k])
+            SINRs[k] = self._calc_SINR_k(k, F[k], U[k], Bkl_all_l)
+        return SINRs
 
-    def corrupt_concatenated_data(self, data):
+    # pylint: disable=W0222
+    # noinspection PyPep8
+    def _calc_JP_Bkl_cov_matrix_first_part(self, F_all_users, k, Rek):
         """
-        Corrupt data passed through the channel.
+        Calculates the first part in the equation of the Blk covariance matrix
+        in equation (28) of [Cadambe2008]_ when joint process is employed.
 
-        If the noise_var member variable is not None then an white noise
-        will also be added.
+        The first part is given by
+
+            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
+
+        Note that it only depends on the value of :math:`k`.
 
         Parameters
         ----------
-        data : np.ndarray
-            A bi-dimensional numpy array with the concatenated data of all
-            transmitters as well as the data from all external interference
-            sources. The dimension of data is (sum(self._Nt) +
-            sum(self.extIntNt)) x NSymb. That is, the number of rows
-            corresponds to the sum of the number of transmit antennas of
-            all users and external interference sources and the number of
-            columns correspond to the number of transmitted symbols.
+        F_all_users : list[np.ndarray] | np.ndarray
+            The precoder of all users (already taking into account the
+            transmit power). This can be either a 1D numpy array of numpy
+            arrays or a list of numpy arrays.
+        k : int
+            Index of the desired user.
+        Rek : np.ndarray | float
+            Covariance matrix of the external interference plus noise.
 
         Returns
         -------
-        output : np.ndarray
-            A bi-dimension numpy array where the number of rows corresponds
-            to the sum of the number of receive antennas of all users and
-            the number of columns correspond to the number of transmitted
-            symbols.
-
+        np.ndarray
+            The first part in the equation of the Blk covariance matrix.
         """
-        return MultiUserChannelMatrix.corrupt_concatenated_data(self, data)
+        # The first part in Bkl is given by
+        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[k]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[k]\dagger} + \mtR e_k$$
+        # Note that here the power is already included in `Fk`.
 
-    def get_Hk_without_ext_int(self, k):
+        Hk = self.get_Hk_without_ext_int(k)
+        return self._calc_JP_Bkl_cov_matrix_first_part_impl(
+            Hk, F_all_users, Rek)
+
+    # noinspection PyPep8,PyPep8
+    def _calc_JP_Bkl_cov_matrix_second_part(self, Fk, k, l):
         """
-        Get the channel from all transmitters (without including the external
-        interference sources) to receiver `k`.
+        Calculates the second part in the equation of the Blk covariance
+        matrix in equation (28) of [Cadambe2008]_ (note that it does not
+        include the identity matrix).
+
+        The second part is given by
+
+            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
 
         Parameters
         ----------
+        Fk : np.ndarray
+            The precoder of the desired user.
         k : int
-            Receiving user.
+            Index of the desired user.
+        l : int
+            Index of the desired stream.
 
         Returns
         -------
-        channel_k : np.ndarray
-            Channel from all transmitters to receiver `k` (2D numpy array).
-
-        See also
-        --------
-        .get_Hkl,
-        .get_Hk,
-        get_Hk_with_ext_int
+        second_part : np.ndarray
+            Second part in equation (28) of [Cadambe2008]_.
 
-        Examples
-        --------
-        >>> multiH = MultiUserChannelMatrixExtInt()
-        >>> H = np.reshape(np.r_[0:20], [4,5])
-        >>> Nt = np.array([2, 2])
-        >>> Nr = np.array([2, 2])
-        >>> NextInt = np.array([1])
-        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2, 1)
-        >>> # Note that the last column of multiH.big_H corresponds to the
-        >>> # external interference source
-        >>> print(multiH.big_H)
-        [[ 0  1  2  3  4]
-         [ 5  6  7  8  9]
-         [10 11 12 13 14]
-         [15 16 17 18 19]]
-        >>> print(multiH.get_Hk_without_ext_int(0))
-        [[0 1 2 3]
-         [5 6 7 8]]
-        >>> print(multiH.get_Hk_without_ext_int(1))
-        [[10 11 12 13]
-         [15 16 17 18]]
         """
-        receive_channels = single_matrix_to_matrix_of_matrices(
-            self.big_H[:, :np.sum(self.Nt)], self.Nr)
-        return receive_channels[k]
+        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
+        Hk = self.get_Hk_without_ext_int(k)
+        return self._calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l)
 
-    # This is exactly the same as the
-    # get_Hk_without_ext_int method from the
-    # MultiUserChannelMatrix class. therefore, we don't need to test it.
-    def get_Hk_with_ext_int(self, k):
+    def _calc_JP_SINR_k(self, k, Fk, Uk, Bkl_all_l):
         """
-        Get the channel from all transmitters (including the external
-        interference sources) to receiver `k`.
-
-        This method is essentially the same as the get_Hk method.
+        Calculates the SINR of all streams of user 'k'.
 
         Parameters
         ----------
+        Fk : np.ndarray
+            The precoder of user k.
+        Uk : np.ndarray
+            The receive filter of user k (before applying the conjugate
+            transpose).
         k : int
-            Receiving user.
+            Index of the desired user.
+        Bkl_all_l : list[np.ndarray] | np.ndarray
+            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
+            corresponding to the Bkl matrices for all 'l's.
 
         Returns
         -------
-        channel_k : np.ndarray
-            Channel from all transmitters to receiver `k`.
-
-        See also
-        --------
-        .get_Hkl,
-        .get_Hk,
-        get_Hk_without_ext_int
+        SINR_k : np.ndarray
+            The SINR for the different streams of user k.
 
-        Examples
-        --------
-        >>> multiH = MultiUserChannelMatrixExtInt()
-        >>> H = np.reshape(np.r_[0:20], [4,5])
-        >>> Nt = np.array([2, 2])
-        >>> Nr = np.array([2, 2])
-        >>> NextInt = np.array([1])
-        >>> multiH.init_from_channel_matrix(H, Nr, Nt, 2, 1)
-        >>> # Note that the last column of multiH.big_H corresponds to the
-        >>> # external interference source
-        >>> print(multiH.big_H)
-        [[ 0  1  2  3  4]
-         [ 5  6  7  8  9]
-         [10 11 12 13 14]
-         [15 16 17 18 19]]
-        >>> print(multiH.get_Hk_with_ext_int(0))
-        [[0 1 2 3 4]
-         [5 6 7 8 9]]
-        >>> print(multiH.get_Hk_with_ext_int(1))
-        [[10 11 12 13 14]
-         [15 16 17 18 19]]
         """
-        return MultiUserChannelMatrix.get_Hk(self, k)  # pragma: no cover
+        Hk = self.get_Hk_without_ext_int(k)
+        return self._calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l)
 
-    @staticmethod
-    def _prepare_input_parans(Nr, Nt, K, NtE):
+    def calc_JP_SINR(self, F, U, pe=1.0):
         """
-        Helper method used in the init_from_channel_matrix and randomize
-        method definitions.
+        Calculates the SINR values (in linear scale) of all streams of all
+        users with the current IA solution.
+
+        The noise variance used will be the value of the noise_var
+        property.
 
         Parameters
         ----------
-        Nr : np.ndarray
-            Number of antennas at each receiver.
-        Nt : np.ndarray
-            Number of antennas at each transmitter.
-        K : int
-            Number of transmit/receive pairs.
-        NtE : int | list[int] | np.ndarray
-            Number of transmit antennas of the external interference
-            source(s). If `NtE` is an iterable, the number of external
-            interference sources will be the len(NtE).
+        F : np.ndarray
+            The precoders of all users. This is a 1D numpy array of 2D
+            numpy arrays.
+        U : np.ndarray
+            The receive filters of all users. This is a 1D numpy array
+            of 2D numpy arrays.
+        pe : float
+            The external interference power.
 
         Returns
         -------
-        output : tuple
-            The tuple (full_Nr, full_Nt, full_K, extIntK, extIntNt).
+        SINRs : np.ndarray
+            The SINR (in linear scale) of all streams of all users. This
+            is a 1D numpy array of 1D numpy arrays (of floats).
         """
-        if isinstance(NtE, (int, np.int_)):
-            # NtE is a scalar number, which means we have a single external
-            # interference source.
-            extIntK = 1
-            extIntNt = np.array([NtE])
-        else:
-            # We have multiple external interference sources
-            extIntK = len(NtE)
-            extIntNt = np.array(NtE)
+        K = self.K
+        SINRs = np.empty(K, dtype=np.ndarray)
 
-        # Number of receive antennas also including the number of receive
-        # antennas of the interference users (which are zeros)
-        full_Nr = np.hstack([Nr, np.zeros(extIntK, dtype=int)])
-        # Number of transmit antennas also including the number of transmit
-        # antennas of the interference users
-        full_Nt = np.hstack([Nt, NtE])
-        # Total number of users including the interference users.
-        full_K = K + extIntK
+        Re_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
 
-        return full_Nr, full_Nt, full_K, extIntK, extIntNt
+        for k in range(self.K):
+            Bkl_all_l = self._calc_JP_Bkl_cov_matrix_all_l(
+                F, k, Re_all_k[k])
+            SINRs[k] = self._calc_JP_SINR_k(k, F[k], U[k], Bkl_all_l)
+        return SINRs
 
-    def init_from_channel_matrix(self, channel_matrix, Nr, Nt, K, NtE):
-        """
-        Initializes the multiuser channel matrix from the given
-        `channel_matrix`.
 
-        Note that `channel_matrix` must also include the channel terms for
-        the external interference, which must be the last `NtE` columns of
-        `channel_matrix`. The number of rows in `channel_matrix` must be
-        equal to np.sum(Nr), while the number of columns must be
-        np.sum(Nt) + NtE.
+class MultiUserChannelMatrixEnsemble(object):
+    """
+    Stores many independent realizations of the (fast fading) channel
+    matrix of a multi-user scenario.
+
+    This is similar to :class:`MultiUserChannelMatrix`, but every channel
+    related quantity has an extra leading dimension with the realizations
+    (the "ensemble"). This allows evaluating many channel draws with a
+    single numpy call, for instance, in Monte Carlo simulations.
+
+    Use :meth:`get_realization` to get a :class:`MultiUserChannelMatrix`
+    object for a single realization.
+
+    Parameters
+    ----------
+    num_realizations : int
+        The number of channel realizations (B) in the ensemble.
+    """
+
+    def __init__(self, num_realizations):
+        self._B = int(num_realizations)
+
+        # Channel of all realizations without path loss. Dimension:
+        # `B x sum(Nr) x sum(Nt)`
+        self._big_H_no_pathloss = None
+        # Same as _big_H_no_pathloss, but with path loss applied. This is
+        # set the first time the big_H property is used.
+        self._big_H_with_pathloss = None
+        # Dense representation of the channel. This is set the first time
+        # the dense_H property is used.
+        self._dense_H = None
+
+        self._Nr = np.array([])
+        self._Nt = np.array([])
+        self._K = 0
+        self._pathloss_matrix = None
+
+        self._RS_channel = np.random.RandomState()
+        self._RS_noise = np.random.RandomState()
+
+        # Store the AWGN noise array from the last time any of the
+        # corrupt*_data methods were called.
+        self._last_noise = None
+        # Store the noise variance. If it is None, then no noise is added
+        # in the "corrupt_*data" methods.
+        self._noise_var = None
+
+    def set_channel_seed(self, seed=None):
+        """
+        Set the seed of the RandomState object used to generate the random
+        elements of the channel (when self.randomize is called).
 
         Parameters
         ----------
-        channel_matrix : np.ndarray
-            A matrix concatenating the channel of all transmitters
-            (including the external interference sources) to all receivers.
-        Nr : np.ndarray
-            Number of antennas at each receiver.
-        Nt : np.ndarray
-            Number of antennas at each transmitter.
-        K : int
-            Number of transmit/receive pairs.
-        NtE : int | list[int] | np.ndarray
-            Number of transmit antennas of the external interference
-            source(s). If NtE is an iterable, the number of external
-            interference sources will be the len(NtE).
-
-        Raises
-        ------
-        ValueError
-            If the arguments are invalid.
+        seed : None | int | array_like
+            Random seed initializing the pseudo-random number
+            generator. See np.random.RandomState help for more info.
         """
-        (full_Nr, full_Nt, full_K, extIntK, extIntNt) \
-            = MultiUserChannelMatrixExtInt._prepare_input_parans(
-                Nr, Nt, K, NtE)
-
-        self._extIntK = extIntK
-        self._extIntNt = extIntNt
-
-        MultiUserChannelMatrix.init_from_channel_matrix(
-            self, channel_matrix, full_Nr, full_Nt, full_K)
+        self._RS_channel.seed(seed=seed)
 
-    def randomize(self, Nr, Nt, K, NtE):
+    def set_noise_seed(self, seed=None):  # pragma: no cover
         """
-        Generates a random channel matrix for all users as well as for the
-        external interference source(s).
+        Set the seed of the RandomState object used to generate the random
+        noise elements (when the corrupt data function is called).
 
         Parameters
         ----------
-        Nr : int | np.ndarray
-            Number of receive antennas of each user. If an integer is
-            specified, all users will have that number of receive antennas.
-        Nt : int | np.ndarray
-            Number of transmit antennas of each user. If an integer is
-            specified, all users will have that number of receive antennas.
-        K : int
-            Number of users.
-        NtE : int | list[int] | np.ndarray
-            Number of transmit antennas of the external interference
-            source(s). If NtE is an iterable, the number of external
-            interference sources will be the len(NtE).
+        seed : None | int | array_like
+            Random seed initializing the pseudo-random number
+            generator. See np.random.RandomState help for more info.
         """
-        if isinstance(Nr, int):
-            Nr = np.ones(K, dtype=int) * Nr
-        if isinstance(Nt, int):
-            Nt = np.ones(K, dtype=int) * Nt
+        self._RS_noise.seed(seed)
 
-        (full_Nr, full_Nt, full_K, extIntK, extIntNt) \
-            = MultiUserChannelMatrixExtInt._prepare_input_parans(
-                Nr, Nt, K, NtE)
+    @property
+    def B(self):
+        """
+        Get method for the B property.
 
-        self._extIntK = extIntK
-        self._extIntNt = extIntNt
+        Returns
+        -------
+        int
+            The number of channel realizations in the ensemble.
+        """
+        return self._B
 
-        MultiUserChannelMatrix.randomize(self, full_Nr, full_Nt, full_K)
+    @property
+    def Nr(self):
+        """
+        Get method for the Nr property.
 
-    def set_pathloss(self, pathloss_matrix=None, ext_int_pathloss=None):
+        Returns
+        -------
+        np.ndarray
+            The number of receive antennas of all users.
         """
-        Set the path loss (IN LINEAR SCALE) from each transmitter to each
-        receiver, as well as the path loss from the external interference
-        source(s) to each receiver.
+        return self._Nr
 
-        The path loss will be accounted when calling the get_Hkl, get_Hk,
-        the corrupt_concatenated_data and the corrupt_data methods.
+    @property
+    def Nt(self):
+        """
+        Get method for the Nt property.
 
-        Note that path loss is a power relation, which means that the
-        channel coefficients will be multiplied by the square root of
-        elements in `pathloss_matrix`.
+        Returns
+        -------
+        np.ndarray
+            The number of transmit antennas of all users.
+        """
+        return self._Nt
 
-        If you want to disable the path loss, set pathloss_matrix to None.
+    @property
+    def K(self):
+        """
+        Get method for the K property.
 
-        Parameters
-        ----------
-        pathloss_matrix : np.ndarray
-            A matrix with dimension "K x K", where K is the number of
-            users, with the path loss (IN LINEAR SCALE) from each
-            transmitter (columns) to each receiver (rows). If you want to
-            disable the path loss then set it to None.  ext_int_pathloss :
-            2D numpy array The path loss from each interference source to
-            each receiver. The number of rows of ext_int_pathloss must be
-            equal to the number of receives, while the number of columns
-            must be equal to the number of external interference sources.
-        ext_int_pathloss : np.ndarray
-            The external interference path loss.
+        Returns
+        -------
+        int
+            The number of users (transmit-receive pairs).
         """
-        # A matrix with the path loss from each transmitter to each
-        # receiver.
-        self._pathloss_matrix = pathloss_matrix
+        return self._K
 
-        if pathloss_matrix is None:
-            self._pathloss_matrix = None
-            self._pathloss_big_matrix = None
-        else:
-            pathloss_matrix_with_ext_int = np.hstack([
-                pathloss_matrix,
-                ext_int_pathloss])
-            self._pathloss_matrix = pathloss_matrix_with_ext_int
+    @property
+    def pathloss(self):
+        """
+        Get method for the pathloss property.
 
-            self._pathloss_big_matrix \
-                = MultiUserChannelMatrix._from_small_matrix_to_big_matrix(
-                    pathloss_matrix_with_ext_int, self._Nr, self._Nt,
-                    self.K, self._K)
+        Returns
+        -------
+        None | np.ndarray
+            The pathloss matrix (if one was set). Its dimension is either
+            `K x K` (same path loss for all realizations) or `B x K x K`.
+        """
+        return self._pathloss_matrix
 
-            # Assures that _pathloss_matrix and _pathloss_big_matrix
-            # will stay in sync by disallowing modification of
-            # individual elements in both of them.
-            self._pathloss_matrix.setflags(write=False)
-            self._pathloss_big_matrix.setflags(write=False)
+    @property
+    def last_noise(self):
+        """
+        Get method for the last_noise property.
 
-    def calc_cov_matrix_extint_without_noise(self, pe=1):
+        Returns
+        -------
+        None | np.ndarray
+            The last AWGN noise array added to corrupt the data.
         """
-        Calculates the covariance matrix of the external interference
-        without include the noise.
+        return self._last_noise
 
-        Parameters
-        ----------
-        pe : float, optional
-            External interference power (in linear scale)
+    @property
+    def noise_var(self):
+        """
+        Get method for the noise_var property.
 
         Returns
         -------
-        R_all_k : np.ndarray
-            Return a numpy array, where each element is the covariance
-            matrix of the external interference at one receiver.
+        None | float
+            The noise variance, if noise is being added in "corrupt_*data"
+            methods.
         """
-        # $$\mtR_e = \sum_{j=1}^{Ke} P_{e_j} \mtH_{k{e_j}} \mtH_{k{e_j}}^H$$
-        R_all_k = np.empty(self.Nr.size, dtype=np.ndarray)
-        cum_Nr = np.hstack([0, np.cumsum(self.Nr)])
-
-        for ii in range(self.Nr.size):
-            extH = self.big_H[cum_Nr[ii]:cum_Nr[ii + 1], np.sum(self.Nt):]
-            R_all_k[ii] = pe * np.dot(extH, extH.transpose().conjugate())
-        return R_all_k
+        return self._noise_var
 
-    # noinspection PyPep8
-    def calc_cov_matrix_extint_plus_noise(self, pe=1):
+    @noise_var.setter
+    def noise_var(self, value):
         """
-        Calculates the covariance matrix of the external interference plus
-        noise.
+        Set method for the noise_var property.
 
         Parameters
         ----------
-        pe : float, optional [default=1]
-            External interference power (in linear scale)
+        value: float | None
+            The noise variance used when generating a new noise vector to add
+            in the "corrupt_*data" methods. If `value` is None then noise
+            addition is disabled.
+        """
+        if value is not None:
+            assert value >= 0.0, "Noise variance must be >= 0."
+        self._noise_var = value
+
+    @property
+    def big_H(self):
+        """
+        Get method for the big_H property.
 
         Returns
         -------
-        R_all_k : np.ndarray
-            Return a numpy array, where each element is the covariance
-            matrix of the external interference plus noise at one receiver.
+        np.ndarray
+            The channel from all transmitters to all receivers (with path
+            loss applied, if any) of all realizations. Dimension: `B x
+            sum(Nr) x sum(Nt)`.
         """
-        # $$\mtR_e = \sum_{j=1}^{Ke} P_{e_j} \mtH_{k{e_j}} \mtH_{k{e_j}}^H + \sigma_n^2 \mtI$$
-        # where $Ke$ is the number of external interference sources and
-        # ${e_j}$ is the j-th external interference source.
-
-        # Calculate the covariance matrix of the external interference
-        # without noise.
-        R_all_k = self.calc_cov_matrix_extint_without_noise(pe)
-
-        if self.noise_var is not None:
-            # If self.noise_var is not None then let's add the noise
-            # covariance matrix
-            noise_var = self.noise_var
-            for i in range(len(R_all_k)):
-                R_all_k[i] += np.eye(self.Nr[i]) * noise_var
+        if self._pathloss_matrix is None:
+            return self._big_H_no_pathloss
 
-        return R_all_k
+        if self._big_H_with_pathloss is None:
+            # Repeat the path loss of each link for all of its antennas
+            pathloss_big_matrix = np.repeat(
+                np.repeat(self._pathloss_matrix, self._Nr, axis=-2),
+                self._Nt, axis=-1)
+            self._big_H_with_pathloss = (self._big_H_no_pathloss *
+                                         np.sqrt(pathloss_big_matrix))
+            self._big_H_with_pathloss.setflags(write=False)
+        return self._big_H_with_pathloss
 
-    # noinspection PyPep8,PyPep8
-    def calc_Q(self, k, F_all_users, pe=1.0):
+    @property
+    def dense_H(self):
         """
-        Calculates the interference covariance matrix at the
-        :math:`k`-th receiver.
+        Get method for the dense_H property.
 
-        The interference covariance matrix at the :math:`k`-th receiver,
-        :math:`\\mtQ k`, is given by
-
-            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{kj} \\mtF_j \\mtF_j^H \\mtH_{kj}^H`
-
-        where :math:`P_j` is the transmit power of transmitter :math:`j`,
-        and :math:`Ns_j` is the number of streams for user :math:`j`.
+        Returns
+        -------
+        np.ndarray
+            The channel from all transmitters to all receivers (with path
+            loss applied, if any) as a dense numpy array with dimension `B
+            x K x K x max(Nr) x max(Nt)`. If the users have different
+            numbers of antennas the channels are padded with zeros.
+        """
+        if self._dense_H is None:
+            B = self.B
+            K = self.K
+            Nr = self.Nr
+            Nt = self.Nt
+            big_H = self.big_H
+            if np.all(Nr == Nr[0]) and np.all(Nt == Nt[0]):
+                dense_H = np.ascontiguousarray(
+                    np.reshape(big_H, (B, K, Nr[0], K, Nt[0])).transpose(
+                        0, 1, 3, 2, 4))
+            else:
+                cumNr = np.hstack([0, np.cumsum(Nr)])
+                cumNt = np.hstack([0, np.cumsum(Nt)])
+                dense_H = np.zeros((B, K, K, np.max(Nr), np.max(Nt)),
+                                   dtype=big_H.dtype)
+                for k in range(K):
+                    for l in range(K):
+                        dense_H[:, k, l, :Nr[k], :Nt[l]] = big_H[
+                            :, cumNr[k]:cumNr[k + 1], cumNt[l]:cumNt[l + 1]]
+
+            dense_H.setflags(write=False)
+            self._dense_H = dense_H
+        return self._dense_H
+
+    def _set_channel(self, big_H, Nr, Nt, K):
+        """
+        Set the channel of all realizations.
 
         Parameters
         ----------
-        k : int
-            Index of the desired receiver.
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This should be either a list of numpy
-            2D arrays or a 1D numpy array of 2D numpy arrays.
-        pe : float
-            The power of the external interference source(s).
-
-        Returns
-        -------
-        Qk : np.ndarray
-            The interference covariance matrix at receiver :math:`k`.
+        big_H : np.ndarray
+            The channel of all realizations without path loss.
+        Nr : np.ndarray
+            Number of antennas at each receiver.
+        Nt : np.ndarray
+            Number of antennas at each transmitter.
+        K : int
+            Number of transmit/receive pairs.
         """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{kj} \mtF_j \mtF_j^H \mtH_{kj}^H + \mtR_e$$
-        Rek_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
-        Qk = self._calc_Q_impl(k, F_all_users) + Rek_all_k[k]
+        self._K = int(K)
+        self._Nr = np.asarray(Nr, dtype=int)
+        self._Nt = np.asarray(Nt, dtype=int)
+        self._big_H_no_pathloss = big_H
+        self._big_H_no_pathloss.setflags(write=False)
 
-        return Qk
+        # The path loss of a previous channel may not be valid anymore
+        self._pathloss_matrix = None
+        self._big_H_with_pathloss = None
+        self._dense_H = None
 
-    # noinspection PyPep8
-    def _calc_JP_Q(self, k, F_all_users):
+    def init_from_channel_matrix(self, channel_matrices, Nr, Nt, K):
         """
-        Calculates the interference covariance matrix at the :math:`k`-th
-        receiver with a joint processing scheme (not including the
-        covariance matrix of the external interference plus noise)
+        Initializes the channel of all realizations from the given
+        `channel_matrices`.
 
         Parameters
         ----------
-        k : int
-            Index of the desired receiver.
-        F_all_users : np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This is a 1D numpy array of 2D numpy array.
+        channel_matrices : np.ndarray
+            The concatenated channel of all users (from each transmitter to
+            each receiver) for each realization. This is a 3D numpy array
+            with dimension `B x sum(Nr) x sum(Nt)`.
+        Nr : int | np.ndarray
+            Number of antennas at each receiver.
+        Nt : int | np.ndarray
+            Number of antennas at each transmitter.
+        K : int
+            Number of transmit/receive pairs.
 
-        See also
-        --------
-        calc_JP_Q
+        Raises
+        ------
+        ValueError
+            If the arguments are invalid.
         """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H$$
-        interfering_users = set(range(self.K)) - {k}
-        Qk = np.zeros([self.Nr[k], self.Nr[k]], dtype=complex)
-
-        for l in interfering_users:
-            Hk_F = np.dot(
-                self.get_Hk_without_ext_int(k),
-                F_all_users[l])
-            Qk = Qk + np.dot(Hk_F, Hk_F.transpose().conjugate())
-
-        return Qk
+        if isinstance(Nr, int):
+            Nr = np.ones(K, dtype=int) * Nr
+        if isinstance(Nt, int):
+            Nt = np.ones(K, dtype=int) * Nt
 
-    # noinspection PyPep8,PyPep8
-    def calc_JP_Q(self, k, F_all_users, pe=1.0):
-        """
-        Calculates the interference covariance matrix at the
-        :math:`k`-th receiver with a joint processing scheme.
+        if (Nt.size != K) or (Nr.size != K):
+            raise ValueError(
+                "K must be equal to the number of elements in Nr and Nt")
 
-        The interference covariance matrix at the :math:`k`-th receiver,
-        :math:`\\mtQ k`, is given by
+        if channel_matrices.shape != (self.B, np.sum(Nr), np.sum(Nt)):
+            raise ValueError(
+                "Shape of the channel_matrices must be equal to the number "
+                "of realizations times the sum of receive antennas of all "
+                "users times the sum of transmit antennas of all users.")
 
-            :math:`\\mtQ k = \\sum_{j=1, j \\neq k}^{K} \\frac{P_j}{Ns_j} \\mtH_{k} \\mtF_j \\mtF_j^H \\mtH_{k}^H`
+        self._set_channel(channel_matrices, Nr, Nt, K)
 
-        where :math:`P_j` is the transmit power of transmitter :math:`j`,
-        and :math:`Ns_j` is the number of streams for user :math:`j`.
+    def randomize(self, Nr, Nt, K):
+        """
+        Generates random channel matrices for all users and all
+        realizations.
 
         Parameters
         ----------
-        k : int
-            Index of the desired receiver.
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This is a 1D numpy array of 2D numpy array.
-        pe : float
-            The power of the external interference source(s).
-
-        Returns
-        -------
-        Qk : np.ndarray
-            The interference covariance matrix at receiver :math:`k`.
+        Nr : int | np.ndarray
+            Number of receive antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        Nt : int | np.ndarray
+            Number of transmit antennas of each user. If an integer is
+            specified, all users will have that number of receive antennas.
+        K : int
+            Number of users.
         """
-        # $$\mtQ k = \sum_{j=1, j \neq k}^{K} \frac{P_j}{Ns_j} \mtH_{k} \mtF_j \mtF_j^H \mtH_{k}^H + \mtR_e$$
-        Rek_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
-        Qk = self._calc_JP_Q(k, F_all_users) + Rek_all_k[k]
+        if isinstance(Nr, int):
+            Nr = np.ones(K, dtype=int) * Nr
+        if isinstance(Nt, int):
+            Nt = np.ones(K, dtype=int) * Nt
 
-        return Qk
+        big_H = randn_c_RS(self._RS_channel,
+                           self.B, np.sum(Nr), np.sum(Nt))
+        self._set_channel(big_H, Nr, Nt, K)
 
-    # noinspection PyUnresolvedReferences
-    def calc_SINR(self, F, U, pe=1.0):
+    def set_pathloss(self, pathloss_matrix=None):
         """
-        Calculates the SINR values (in linear scale) of all streams of all
-        users with the current IA solution.
+        Set the path loss (IN LINEAR SCALE) from each transmitter to each
+        receiver.
 
-        The noise variance used will be the value of the noise_var
-        property.
+        If you want to disable the path loss, set `pathloss_matrix` to None.
 
         Parameters
         ----------
-        F : list[np.ndarray] | np.ndarray
-            The precoders of all users. This should be either a list of numpy
-            2D arrays or a 1D numpy array of 2D numpy arrays.
-        U : list[np.ndarray] | np.ndarray
-            The receive filters of all users. This should be either a list of
-            numpy 2D arrays or a 1D numpy array of 2D numpy arrays.
-        pe : float
-            Power of the external interference source.
+        pathloss_matrix : np.ndarray
+            A matrix with dimension "K x K", where K is the number of
+            users, with the path loss (IN LINEAR SCALE) from each
+            transmitter (columns) to each receiver (rows), which is used
+            for all realizations. It can also have dimension "B x K x K"
+            with a different path loss for each realization. If you want
+            to disable the path loss then set it to None.
 
-        Returns
-        -------
-        SINRs : np.ndarray
-            The SINR (in linear scale) of all streams of all users. This is a
-            1D numpy array of 1D numpy arrays (of floats)
+        Notes
+        -----
+        Note that path loss is a power relation, which means that the
+        channel coefficients will be multiplied by the square root of
+        elements in `pathloss_matrix`.
         """
-        K = self.K
-        SINRs = np.empty(K, dtype=np.ndarray)
+        if pathloss_matrix is not None:
+            pathloss_matrix = np.array(pathloss_matrix)
+            if pathloss_matrix.shape not in [(self.K, self.K),
+                                             (self.B, self.K, self.K)]:
+                raise ValueError(
+                    "The pathloss matrix must have dimension K x K or "
+                    "B x K x K")
+            if np.any(pathloss_matrix < 0) or np.any(pathloss_matrix > 1):
+                raise ValueError("Pathloss must be between 0 and 1")
+            pathloss_matrix.setflags(write=False)
 
-        Re_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
-
-        for k in range(self.K):
-            Bkl_all_l = self._calc_Bkl_cov_matrix_all_l(F, k, Re_all_k[k])
-            SINRs[k] = self._calc_SINR_k(k, F[k], U[k], Bkl_all_l)
-        return SINRs
+        self._pathloss_matrix = pathloss_matrix
+        self._big_H_with_pathloss = None
+        self._dense_H = None
 
-    # pylint: disable=W0222
-    # noinspection PyPep8
-    def _calc_JP_Bkl_cov_matrix_first_part(self, F_all_users, k, Rek):
+    def get_Hkl(self, k, l):
         """
-        Calculates the first part in the equation of the Blk covariance matrix
-        in equation (28) of [Cadambe2008]_ when joint process is employed.
-
-        The first part is given by
-
-            :math:`\\sum_{j=1}^{K} \\frac{P^{[j]}}{d^{[j]}} \\sum_{d=1}^{d^{[j]}} \\mtH^{[kj]}\\mtV_{\\star d}^{[j]} \\mtV_{\\star d}^{[j]\\dagger} \\mtH^{[kj]\\dagger} + \\mtI_{Nk}`
-
-        Note that it only depends on the value of :math:`k`.
+        Get the channel matrix from user `l` to user `k` in all
+        realizations.
 
         Parameters
         ----------
-        F_all_users : list[np.ndarray] | np.ndarray
-            The precoder of all users (already taking into account the
-            transmit power). This can be either a 1D numpy array of numpy
-            arrays or a list of numpy arrays.
+        l : int
+            Transmitting user.
         k : int
-            Index of the desired user.
-        Rek : np.ndarray | float
-            Covariance matrix of the external interference plus noise.
+            Receiving user.
 
         Returns
         -------
         np.ndarray
-            The first part in the equation of the Blk covariance matrix.
+            Channel from transmitter `l` to receiver `k`. Dimension: `B x
+            Nr[k] x Nt[l]`.
         """
-        # The first part in Bkl is given by
-        # $$\sum_{j=1}^{K} \frac{P^{[j]}}{d^{[j]}} \sum_{d=1}^{d^{[j]}} \mtH^{[k]}\mtV_{\star d}^{[j]} \mtV_{\star d}^{[j]\dagger} \mtH^{[k]\dagger} + \mtR e_k$$
-        # Note that here the power is already included in `Fk`.
-
-        Hk = self.get_Hk_without_ext_int(k)
-        return self._calc_JP_Bkl_cov_matrix_first_part_impl(
-            Hk, F_all_users, Rek)
+        return self.dense_H[:, k, l, :self.Nr[k], :self.Nt[l]]
 
-    # noinspection PyPep8,PyPep8
-    def _calc_JP_Bkl_cov_matrix_second_part(self, Fk, k, l):
+    def get_realization(self, b):
         """
-        Calculates the second part in the equation of the Blk covariance
-        matrix in equation (28) of [Cadambe2008]_ (note that it does not
-        include the identity matrix).
+        Get a MultiUserChannelMatrix object with the channel (and path loss
+        and noise variance) of the realization `b`.
 
-        The second part is given by
+        Parameters
+        ----------
+        b : int
+            The index of the realization.
 
-            :math:`\\frac{P^{[k]}}{d^{[k]}} \\mtH^{[kk]} \\mtV_{\\star l}^{[k]} \\mtV_{\\star l}^{[k]\\dagger} \\mtH^{[kk]\\dagger}`
+        Returns
+        -------
+        MultiUserChannelMatrix
+            The channel of the realization `b`.
+        """
+        multiH = MultiUserChannelMatrix()
+        multiH.init_from_channel_matrix(
+            self._big_H_no_pathloss[b], self.Nr, self.Nt, self.K)
+        if self._pathloss_matrix is not None:
+            if self._pathloss_matrix.ndim == 3:
+                multiH.set_pathloss(self._pathloss_matrix[b])
+            else:
+                multiH.set_pathloss(self._pathloss_matrix)
+        multiH.noise_var = self.noise_var
+        return multiH
+
+    def corrupt_concatenated_data(self, data):
+        """
+        Corrupt data passed through the channel of all realizations.
+
+        If self.noise_var is set to some scalar number then white noise
+        will also be added.
 
         Parameters
         ----------
-        Fk : np.ndarray
-            The precoder of the desired user.
-        k : int
-            Index of the desired user.
-        l : int
-            Index of the desired stream.
+        data : np.ndarray
+            The concatenated data of all transmitters. The dimension of
+            data is either `sum(self.Nt) x NSymb`, in which case the same
+            data is transmitted in all realizations, or `B x sum(self.Nt) x
+            NSymb`.
 
         Returns
         -------
-        second_part : np.ndarray
-            Second part in equation (28) of [Cadambe2008]_.
-
+        output : np.ndarray
+            The received data of all realizations. Dimension: `B x
+            sum(self.Nr) x NSymb`.
         """
-        # $$\frac{P^{[k]}}{d^{[k]}} \mtH^{[k]} \mtV_{\star l}^{[k]} \mtV_{\star l}^{[k]\dagger} \mtH^{[k]\dagger}$$
-        Hk = self.get_Hk_without_ext_int(k)
-        return self._calc_JP_Bkl_cov_matrix_second_part_impl(Hk, Fk, l)
+        output = np.matmul(self.big_H, data)
 
-    def _calc_JP_SINR_k(self, k, Fk, Uk, Bkl_all_l):
+        # Add the noise, if self.noise_var is not None
+        if self.noise_var is not None:
+            awgn_noise = (
+                randn_c_RS(self._RS_noise, *output.shape) *
+                math.sqrt(self.noise_var))
+            output += awgn_noise
+            self._last_noise = awgn_noise
+        else:
+            self._last_noise = None
+
+        return output
+
+    def corrupt_data(self, data):
         """
-        Calculates the SINR of all streams of user 'k'.
+        Corrupt data passed through the channel of all realizations.
+
+        If the noise_var is supplied then an white noise will also be
+        added.
 
         Parameters
         ----------
-        Fk : np.ndarray
-            The precoder of user k.
-        Uk : np.ndarray
-            The receive filter of user k (before applying the conjugate
-            transpose).
-        k : int
-            Index of the desired user.
-        Bkl_all_l : list[np.ndarray] | np.ndarray
-            A sequence (1D numpy array, a list, etc) of 2D numpy arrays
-            corresponding to the Bkl matrices for all 'l's.
+        data : np.ndarray | list[np.ndarray]
+            The data of the multiple users. The k-th element in `data` is
+            a numpy array with dimension `Nt_k x NSymbs` (same data in all
+            realizations) or `B x Nt_k x NSymbs`, where Nt_k is the number
+            of transmit antennas of the k-th user and NSymbs is the number
+            of transmitted symbols.
 
         Returns
         -------
-        SINR_k : np.ndarray
-            The SINR for the different streams of user k.
+        output : np.ndarray
+            A numpy array where each element contains the received data of
+            a user in all realizations (a 3D numpy array with dimension `B
+            x Nr_k x NSymbs`).
+        """
+        if any(np.ndim(d) == 3 for d in data):
+            data = [np.broadcast_to(d, (self.B, ) + np.shape(d)[-2:])
+                    for d in data]
+        concatenated_data = np.concatenate(data, axis=-2)
+        concatenated_output = self.corrupt_concatenated_data(
+            concatenated_data)
 
-        """
-        Hk = self.get_Hk_without_ext_int(k)
-        return self._calc_JP_SINR_k_impl(Hk, Fk, Uk, Bkl_all_l)
+        output = np.empty(self.K, dtype=np.ndarray)
+        cumNr = np.hstack([0, np.cumsum(self._Nr)])
+        for k in range(self.K):
+            output[k] = concatenated_output[:, cumNr[k]:cumNr[k + 1], :]
 
-    def calc_JP_SINR(self, F, U, pe=1.0):
+        return output
+
+    def calc_SINR(self, F, U):
         """
         Calculates the SINR values (in linear scale) of all streams of all
-        users with the current IA solution.
+        users in all realizations.
 
         The noise variance used will be the value of the noise_var
         property.
 
         Parameters
         ----------
-        F : np.ndarray
-            The precoders of all users. This is a 1D numpy array of 2D
-            numpy arrays.
-        U : np.ndarray
-            The receive filters of all users. This is a 1D numpy array
-            of 2D numpy arrays.
-        pe : float
-            The external interference power.
+        F : np.ndarray | list[np.ndarray]
+            The precoders of all users. The k-th element is a numpy array
+            with dimension `Nt_k x Ns_k` (same precoder for all
+            realizations) or `B x Nt_k x Ns_k`.
+        U : np.ndarray | list[np.ndarray]
+            The receive filters of all users. The k-th element is a numpy
+            array with dimension `Nr_k x Ns_k` (same receive filter for all
+            realizations) or `B x Nr_k x Ns_k`.
 
         Returns
         -------
         SINRs : np.ndarray
-            The SINR (in linear scale) of all streams of all users. This
-            is a 1D numpy array of 1D numpy arrays (of floats).
+            The SINR (in linear scale) of all streams of all users. This is
+            a 1D numpy array where the k-th element is a 2D numpy array
+            with dimension `B x Ns_k`.
         """
-        K = self.K
-        SINRs = np.empty(K, dtype=np.ndarray)
+        noise_var = 0.0 if self.noise_var is None else self.noise_var
 
-        Re_all_k = self.calc_cov_matrix_extint_plus_noise(pe)
+        SINR_dense = _calc_dense_SINR(self.dense_H, _stack_and_pad(F),
+                                      _stack_and_pad(U), noise_var)
 
+        SINRs = np.empty(self.K, dtype=np.ndarray)
         for k in range(self.K):
-            Bkl_all_l = self._calc_JP_Bkl_cov_matrix_all_l(
-                F, k, Re_all_k[k])
-            SINRs[k] = self._calc_JP_SINR_k(k, F[k], U[k], Bkl_all_l)
+            SINRs[k] = SINR_dense[:, k, :F[k].shape[-1]]
         return SINRs
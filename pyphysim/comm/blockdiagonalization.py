@@ -304,49 +304,71 @@ class BlockDiagonalizer(object):
         iNrU = iNr // self.num_users
 
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-        Ms_bad = []
-        Sigma = []
-
-        # Calculates the interfering channels $\tilde{\mat{H}}_j$ as well
-        # as $\tilde{\mtV}_j^{(1)}$ and $\tilde{\mtV}_j^{(0)}$.
+        # Channel of each user, stacked along the first dimension
+        H_all_users = mtChannel.reshape(
+            [self.num_users, iNrU, mtChannel.shape[1]])
+
+        # Calculates the interfering channels $\tilde{\mat{H}}_j$ of all
+        # users at once, as well as a single SVD for each of them. This SVD
+        # gives both the rank of $\tilde{\mat{H}}_j$ and
+        # $\tilde{\mtV}_j^{(0)}$.
         # Note that $\tilde{\mat{H}}_j = \tilde{\mtU}_j \tilde{\Sigma}_j [\tilde{\mtV}_j^{(1)} \; \tilde{\mtV}_j^{(0)}]^H$ where $\tilde{\mtV}_j^{(1)}$ holds
         # the first
         # $\tilde{L}_j$ right singular vectors and $\tilde{\mtV}_j^{(0)}$
         # holds the last $(n_T - \tilde{L}_j)$ right singular values
-        for user in range(0, self.num_users):
-            # channel of all users except the current user
-            tilde_H_cur_user = self._get_tilde_channel(mtChannel, user)
-
-            # How many streams user `user` can receive is given by the
-            # total number of receive antennas minus the rank of
-            # tilde_H_cur_user
-            nStreams = iNr - np.linalg.matrix_rank(tilde_H_cur_user)
-            tilde_V0 = least_right_singular_vectors(
-                tilde_H_cur_user,
-                nStreams)[0]
-
-            # The equivalent channel of the current user corresponds to
-            # $\mtH_j \tilde{\mtV}_j^{(0)}$
-
-            # First we get $\mtH_j$
-            H_cur_user = self._get_sub_channel(mtChannel, user)
-
-            # Now we get the right singular value of the equivalent channel
-            (_, V1, S) = least_right_singular_vectors(
-                np.dot(H_cur_user, tilde_V0),
-                # Number of receive antennas minus number of desired
-                # streams
-                iNrU - nStreams)
-
-            # Get Ms and Sigma
-            Ms_bad.append(np.dot(tilde_V0, V1))
-            Sigma.extend(S)
-
-        # Concatenates the precoder for each user to form the complete Ms
-        # matrix. Ms_bad is the version without water-filling.
-        # This is equivalent to "concatenate(Ms_bad, axis=1)"
-        Ms_bad = np.hstack(Ms_bad)
-        Sigma = np.array(Sigma)
+        tilde_H_all_users = self._get_all_tilde_channels(mtChannel)
+        _, tilde_S, tilde_V_H = np.linalg.svd(tilde_H_all_users,
+                                              full_matrices=True)
+        # Reverse the columns so that the right singular vectors are in
+        # crescent order of the singular values (same ordering used by
+        # least_right_singular_vectors)
+        tilde_V = tilde_V_H.conj().transpose([0, 2, 1])[:, :, ::-1]
+
+        # How many streams each user can receive is given by the total
+        # number of receive antennas minus the rank of its interfering
+        # channel. The rank uses the same tolerance as
+        # np.linalg.matrix_rank.
+        tol = (tilde_S.max(axis=-1, keepdims=True) *
+               max(tilde_H_all_users.shape[1:]) * np.finfo(float).eps)
+        nStreams_all_users = iNr - np.sum(tilde_S > tol, axis=-1)
+
+        if np.all(nStreams_all_users == nStreams_all_users[0]):
+            nStreams = nStreams_all_users[0]
+            tilde_V0 = tilde_V[:, :, :nStreams]
+
+            # The equivalent channel of each user corresponds to
+            # $\mtH_j \tilde{\mtV}_j^{(0)}$. Now we get its right
+            # singular values
+            _, S, V_H = np.linalg.svd(np.matmul(H_all_users, tilde_V0),
+                                      full_matrices=True)
+            V = V_H.conj().transpose([0, 2, 1])
+            # Number of receive antennas minus number of desired streams
+            remaining = np.arange(nStreams)[::-1][iNrU - nStreams:]
+
+            # Get Ms and Sigma, concatenating the precoder for each user
+            # to form the complete Ms matrix. Ms_bad is the version
+            # without water-filling.
+            Ms_bad_all_users = np.matmul(tilde_V0, V[:, :, remaining])
+            Ms_bad = np.concatenate(Ms_bad_all_users, axis=1)
+            Sigma = S[:, remaining].ravel()
+        else:
+            # The interfering channels of different users have different
+            # ranks. This only happens for degenerated channels and we
+            # handle each user separately (still reusing the SVD of its
+            # interfering channel).
+            Ms_bad = []
+            Sigma = []
+            for user in range(0, self.num_users):
+                nStreams = nStreams_all_users[user]
+                tilde_V0 = tilde_V[user, :, :nStreams]
+                (_, V1, S) = least_right_singular_vectors(
+                    np.dot(H_all_users[user], tilde_V0),
+                    iNrU - nStreams)
+                Ms_bad.append(np.dot(tilde_V0, V1))
+                Sigma.extend(S)
+            Ms_bad = np.hstack(Ms_bad)
+            Sigma = np.array(Sigma)
+
         return Ms_bad, Sigma
 
     def _perform_global_waterfilling_power_scaling(self, Ms_bad, Sigma):
@@ -597,6 +619,50 @@ class BlockDiagonalizer(object):
         desiredUsers = [i for i in vtAllUserIndexes if i != user]
         return self._get_sub_channel(mtChannel, desiredUsers)
 
+    def _get_all_tilde_channels(self, mtChannel):
+        """
+        Return the combined channel of all users except `user`, for each
+        `user`, stacked in a 3D numpy array.
+
+        The k-th element in the first dimension of the returned array is
+        equal to ``self._get_tilde_channel(mtChannel, k)``.
+
+        Parameters
+        ----------
+        mtChannel : np.ndarray
+            Channel of all users (2D numpy array).
+
+        Returns
+        -------
+        np.ndarray
+            A 3D numpy array with the combined channel of all users except
+            `user` for each user.
+
+        Examples
+        --------
+        >>> BD = BlockDiagonalizer(3, 0, 0)
+        >>> channel = np.vstack([np.ones([1, 2]), 2 * np.ones([1, 2]),\
+                                 3 * np.ones([1, 2])])
+        >>> BD._get_all_tilde_channels(channel)
+        array([[[2., 2.],
+                [3., 3.]],
+        <BLANKLINE>
+               [[1., 1.],
+                [3., 3.]],
+        <BLANKLINE>
+               [[1., 1.],
+                [2., 2.]]])
+        """
+        # Number of receive antennas per user
+        iNrU = mtChannel.shape[0] // self.num_users
+
+        # Row indexes of the channel of each user
+        rows = np.arange(mtChannel.shape[0]).reshape([self.num_users, iNrU])
+        # mask[k] is False only for the rows of user k
+        mask = ~np.eye(self.num_users, dtype=bool)
+        tilde_rows = np.array([rows[m].ravel() for m in mask])
+        return mtChannel[tilde_rows]
+
     def _get_sub_channel(self, mt_channel, desired_users):
         """
         Get a subchannel according to the desired_users vector.
@@ -1323,6 +1389,10 @@ class EnhancedBD(BDWithExtIntBase):
             Pk_all = np.empty(Ntk, dtype=np.ndarray)
             norm_term_all = np.empty(Ntk)
             Wk_all = np.empty(Ntk, dtype=np.ndarray)
+            # The stream reduction matrix for any number of streams is
+            # given by the first columns of this matrix, therefore we only
+            # need to calculate the SVD of Rek once
+            min_Vs_k = _calc_stream_reduction_matrix(Rek, Ntk)
             for index in range(Ntk):
                 Ns_k = index + 1
                 # xxxxx Find Pk xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1335,7 +1405,7 @@ class EnhancedBD(BDWithExtIntBase):
                 if index == Ntk - 1:
                     Pk = np.eye(Ntk)
                 else:
-                    Pk = _calc_stream_reduction_matrix(Rek, Ns_k)
+                    Pk = min_Vs_k[:, 0:Ns_k]
                 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
                 Pk_all[index] = Pk  # Save for later
 
@@ -12,7 +12,7 @@ __all__ = ['doWF']
 
 
 # noinspection PyUnresolvedReferences
-def doWF(vtChannels, dPt, noiseVar=1.0, Es=1.0):
+def doWF(vtChannels, dPt, noiseVar=1.0, Es=1.0, vtMaxP=None):
     """
     Performs the Waterfilling algorithm and returns the optimum power and
     water level.
@@ -21,7 +21,138 @@ def doWF(vtChannels, dPt, noiseVar=1.0, Es=1.0):
     ----------
     vtChannels : np.ndarray
         Numpy array with the channel POWER gains (power of the parallel
-        AWGN channels).
+        AWGN channels). This can also be an ND numpy array, in which case
+        the water-filling is performed independently for each 1D array
+        along the last dimension (for instance, one for each subcarrier or
+        for each channel realization).
+    dPt : float | np.ndarray
+        Total available power. If `vtChannels` is an ND array then this
+        can also be an array with one total power for each 1D array of
+        channels (that is, with shape ``vtChannels.shape[:-1]``).
+    noiseVar : float
+        Noise variance (power in linear scale).
+    Es : float
+        Symbol energy (in linear scale).
+    vtMaxP : float | np.ndarray, optional
+        Maximum power that can be allocated to each channel. This must be
+        broadcastable to the shape of `vtChannels`. If not provided the
+        power in each channel is not limited.
+
+    Returns
+    -------
+    (vtOptP, mu) : (np.ndarray, float | np.ndarray)
+        A tuple with vtOptP and mu, where vtOptP are the optimum powers,
+        while mu is the water level. If `vtChannels` is an ND array then
+        vtOptP has the same shape of `vtChannels` and mu is an array with
+        the water level of each 1D array of channels. If all channels are
+        limited by `vtMaxP` then the water level is infinite.
+
+    Notes
+    -----
+    For ND arrays of channels or when `vtMaxP` is provided, the water
+    level is found with a single sort of the channels followed by a
+    cumulative sum over the sorted channels, instead of removing one
+    channel at a time. Therefore, the complexity is O(n log(n)) in the
+    number of channels. A single 1D array of channels without maximum
+    powers, which is usually small, is handled by removing the worst
+    channel one at a time, since that has less overhead.
+
+    Examples
+    --------
+    >>> vtChannels = np.array([[2.0, 1.0, 0.5], [1.0, 1.0, 0.1]])
+    >>> (vtOptP, mu) = doWF(vtChannels, 2.0)
+    >>> print(np.round(vtOptP, 4))
+    [[1.25 0.75 0.  ]
+     [1.   1.   0.  ]]
+    >>> print(np.round(mu, 4))
+    [1.75 2.  ]
+    >>> (vtOptP, mu) = doWF(vtChannels, 2.0, vtMaxP=0.8)
+    >>> print(np.round(vtOptP, 4))
+    [[0.8 0.8 0.4]
+     [0.8 0.8 0.4]]
+    """
+    vtChannels = np.asarray(vtChannels, dtype=float)
+    if vtMaxP is None and vtChannels.ndim == 1 and np.ndim(dPt) == 0:
+        return _doWF_single(vtChannels, float(dPt), noiseVar, Es)
+    dPt = np.asarray(dPt, dtype=float)[..., np.newaxis]
+
+    # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+    # The power allocated to each channel is
+    #     P_i = min(max(mu - floor_i, 0), maxP_i),
+    # where 'floor_i' is the inverse of the channel SNR. Therefore, the
+    # total allocated power is a piecewise linear function of the water
+    # level 'mu' whose slope increases by one at each floor_i (the channel
+    # starts being used) and decreases by one at each floor_i + maxP_i (the
+    # channel reaches its maximum power). We sort all these breakpoints
+    # once and compute the total power at each of them with a cumulative
+    # sum. The water level is then found in the linear segment where the
+    # total power reaches the available power.
+    # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+    # Water level required to start using each channel. A channel with
+    # zero gain is never used.
+    with np.errstate(divide='ignore'):
+        floor = float(noiseVar) / (Es * vtChannels)
+    if vtMaxP is None:
+        maxP = np.full(vtChannels.shape, np.inf)
+    else:
+        maxP = np.broadcast_to(np.asarray(vtMaxP, dtype=float),
+                               vtChannels.shape)
+    ceil = floor + maxP
+
+    breakpoints = np.concatenate([floor, ceil], axis=-1)
+    slope_changes = np.concatenate(
+        [np.ones(vtChannels.shape), -np.ones(vtChannels.shape)], axis=-1)
+    sort_indexes = np.argsort(breakpoints, axis=-1, kind='mergesort')
+    breakpoints = np.take_along_axis(breakpoints, sort_indexes, axis=-1)
+    slopes = np.cumsum(
+        np.take_along_axis(slope_changes, sort_indexes, axis=-1), axis=-1)
+
+    # Total allocated power when the water level is equal to each
+    # breakpoint. Breakpoints at infinity result in infinite (or NaN)
+    # powers, which are never selected below.
+    with np.errstate(invalid='ignore'):
+        total_powers = np.cumsum(
+            slopes[..., :-1] * np.diff(breakpoints, axis=-1), axis=-1)
+    total_powers = np.concatenate(
+        [np.zeros(vtChannels.shape[:-1] + (1,)), total_powers], axis=-1)
+
+    # Index of the (last) breakpoint below the water level
+    index = np.sum(total_powers <= dPt, axis=-1, keepdims=True) - 1
+    base_mu = np.take_along_axis(breakpoints, index, axis=-1)
+    base_P = np.take_along_axis(total_powers, index, axis=-1)
+    slope = np.take_along_axis(slopes, index, axis=-1)
+
+    # Distributes the remaining power among the channels being used. If no
+    # channel can receive more power (all of them reached the maximum
+    # power) then the water level is infinite.
+    with np.errstate(invalid='ignore'):
+        extra_mu = np.where(slope > 0,
+                            (dPt - base_P) / np.maximum(slope, 1),
+                            np.inf)
+        mu = base_mu + extra_mu
+        # The power of each channel is computed relative to its own
+        # breakpoint instead of subtracting 'floor' from the absolute water
+        # level. Otherwise the power would be lost to rounding when the
+        # floor is much larger than the available power.
+        vtOptP = np.minimum(np.maximum((base_mu - floor) + extra_mu, 0.0),
+                            maxP)
+    vtOptP[~np.isfinite(floor)] = 0.0
+
+    mu = mu[..., 0]
+    if mu.ndim == 0:
+        mu = mu[()]
+    return vtOptP, mu
+
+
+def _doWF_single(vtChannels, dPt, noiseVar, Es):
+    """
+    Performs the Waterfilling algorithm for a single 1D array of channels
+    without maximum powers.
+
+    Parameters
+    ----------
+    vtChannels : np.ndarray
+        1D numpy array with the channel POWER gains.
     dPt : float
         Total available power.
     noiseVar : float
@@ -35,10 +166,18 @@ def doWF(vtChannels, dPt, noiseVar=1.0, Es=1.0):
         A tuple with vtOptP and mu, where vtOptP are the optimum powers,
         while mu is the water level.
     """
-    # Sort Channels (descending order)
-    vtChannelsSortIndexes = np.argsort(vtChannels)[::-1]
-    vtChannelsSorted = vtChannels[vtChannelsSortIndexes]
-    assert isinstance(vtChannelsSorted, np.ndarray)
+    vtOptP = np.zeros(vtChannels.size)
+
+    # A channel with zero gain is never used
+    vtUsedIndexes = np.flatnonzero(vtChannels > 0)
+    if vtUsedIndexes.size == 0:
+        return vtOptP, np.inf
+
+    # Water level required to start using each channel, sorted in
+    # ascending order (descending order of the channel gains)
+    vtFloors = float(noiseVar) / (Es * vtChannels[vtUsedIndexes])
+    vtFloorsSortIndexes = np.argsort(vtFloors, kind='mergesort')
+    vtFloors = vtFloors[vtFloorsSortIndexes]
 
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
     # Calculates the water level that touches the worst channel (the higher
@@ -51,34 +190,17 @@ def doWF(vtChannels, dPt, noiseVar=1.0, Es=1.0):
     # is greater then the total available power then we remove the worst
     # channel and repeat the process.
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-    # Calculates minimum water-level $\mu$ required to use all channels
-    dNChannels = vtChannels.size
-    dRemoveChannels = 0
-
-    minMu = float(noiseVar) / (
-        Es * vtChannelsSorted[dNChannels - dRemoveChannels - 1])
-    Ps = (minMu - float(noiseVar) / (
-        Es * vtChannelsSorted[np.arange(0, dNChannels - dRemoveChannels)]))
-
-    # Ps should be a numpy array
-    assert isinstance(Ps, np.ndarray)
-
-    while (sum(Ps) > dPt) and (dRemoveChannels < dNChannels):
-        dRemoveChannels += 1
-        minMu = float(noiseVar) / (
-            Es * vtChannelsSorted[dNChannels - dRemoveChannels - 1])
-        Ps = (minMu - float(noiseVar) / (
-            Es *
-            vtChannelsSorted[np.arange(0, dNChannels - dRemoveChannels)]))
+    dNChannels = vtFloors.size
+    Ps = vtFloors[dNChannels - 1] - vtFloors
+    while Ps.sum() > dPt and dNChannels > 1:
+        dNChannels -= 1
+        Ps = vtFloors[dNChannels - 1] - vtFloors[:dNChannels]
 
     # Distributes the remaining power among the all the remaining channels
-    dPdiff = dPt - np.sum(Ps)
-    vtOptPaux = dPdiff / (dNChannels - dRemoveChannels) + Ps
+    vtOptPaux = (dPt - Ps.sum()) / dNChannels + Ps
 
     # Put optimum power in the original channel order
-    vtOptP = np.zeros([vtChannels.size, ])
-    vtOptP[vtChannelsSortIndexes[
-        np.arange(0, dNChannels - dRemoveChannels)]] = vtOptPaux
-    mu = vtOptPaux[0] + float(noiseVar) / vtChannelsSorted[0]
+    vtOptP[vtUsedIndexes[vtFloorsSortIndexes[:dNChannels]]] = vtOptPaux
+    mu = vtOptPaux[0] + vtFloors[0]
 
     return vtOptP, mu
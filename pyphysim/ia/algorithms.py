@@ -15,19 +15,23 @@ the noise variance.
 import numpy as np
 from scipy import optimize
 import itertools
-from copy import copy
+from copy import copy, deepcopy
 from abc import ABCMeta, abstractmethod
 from itertools import product
 
 from .iabase import IASolverBaseClass
 from ..util.misc import peig, leig, update_inv_sum_diag, \
-    get_principal_component_matrix, least_right_singular_vectors
+    get_principal_component_matrix, least_right_singular_vectors, \
+    randn_c_RS
 from ..channels import multiuser as muchannels
+from ..comm import waterfilling
 
 __all__ = ['AlternatingMinIASolver', 'MaxSinrIASolver',
            'MinLeakageIASolver', 'ClosedFormIASolver', 'MMSEIASolver',
            'GreedStreamIASolver', 'BruteForceStreamIASolver',
-           'IterativeIASolverBaseClass']
+           'IterativeIASolverBaseClass', 'BatchedIterativeIASolverBaseClass',
+           'BatchedAlternatingMinIASolver', 'BatchedMinLeakageIASolver',
+           'BatchedMaxSinrIASolver']
 
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1829,6 +1833,136 @@ class MMSEIASolver(IterativeIASolverBaseClass):
         self._F = norm_Vi
 
 
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxx Helper functions for the stream IA solvers xxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+def _calc_capacity_upper_bounds(iasolver, Ns, P=None):
+    """
+    Calculates an upper bound for the capacity of each user for any
+    number of streams from 1 to `Ns[k]`.
+
+    The bound is the interference free capacity of the direct channel of
+    each user when the transmit power is optimally allocated (with
+    waterfilling) among the `n` strongest eigenmodes. No IA solution with
+    `n` streams for user `k` can achieve a higher capacity for that user.
+
+    Parameters
+    ----------
+    iasolver : T <= IASolverBaseClass
+        The IA solver whose channel is used.
+    Ns : np.ndarray
+        Maximum number of streams of each user.
+    P : np.ndarray | List[float] | float, optional
+        Power of each user. If not provided, a value of 1 will be used for
+        each user.
+
+    Returns
+    -------
+    np.ndarray
+        A 2D numpy array where the element `[k, n]` is the capacity upper
+        bound of user `k` when it transmits `n` streams. If the noise
+        variance is zero all bounds are infinite.
+    """
+    K = iasolver.K
+    if P is None:
+        P = np.ones(K, dtype=float)
+    else:
+        P = np.ones(K, dtype=float) * P
+    noise_var = iasolver.noise_var
+
+    bounds = np.zeros([K, np.max(Ns) + 1])
+    if noise_var == 0.0:
+        bounds[:, 1:] = np.inf
+        return bounds
+
+    for k in range(K):
+        gains = np.linalg.svd(iasolver._get_channel(k, k),
+                              compute_uv=False) ** 2
+        # Row `n-1` keeps only the `n` strongest eigenmodes (more streams
+        # than eigenmodes cannot increase the capacity) and the
+        # water-filling is performed for all the rows at once
+        num_streams = np.arange(1, Ns[k] + 1)
+        masked_gains = np.where(
+            np.arange(gains.size) < num_streams[:, np.newaxis], gains, 0.0)
+        powers, _ = waterfilling.doWF(masked_gains, P[k], noise_var)
+        bounds[k, 1:Ns[k] + 1] = np.sum(
+            np.log2(1 + powers * masked_gains / noise_var), axis=-1)
+    return bounds
+
+
+def _extend_precoder(Fk, Hkk, n):
+    """
+    Get a precoder with `n` streams from the precoder `Fk` of a different
+    number of streams.
+
+    The columns of the returned precoder are an orthonormal basis of the
+    subspace spanned by (the first `n` columns of) `Fk`. If `Fk` has less
+    than `n` columns, the extra columns are the most significant right
+    singular vectors of the direct channel `Hkk` after removing their
+    components in the subspace spanned by `Fk`.
+
+    Parameters
+    ----------
+    Fk : np.ndarray
+        The precoder of user `k`.
+    Hkk : np.ndarray
+        The direct channel of user `k`.
+    n : int
+        The desired number of streams.
+
+    Returns
+    -------
+    np.ndarray
+        The new precoder (normalized to have a Frobenius norm equal to
+        one).
+    """
+    basis = np.linalg.qr(Fk[:, :n])[0]
+    if basis.shape[1] < n:
+        _, _, V_H = np.linalg.svd(Hkk)
+        for v in V_H.conj():
+            v = v - basis.dot(basis.conj().T.dot(v))
+            norm_v = np.linalg.norm(v)
+            if norm_v > 1e-6:
+                basis = np.hstack([basis, v[:, np.newaxis] / norm_v])
+            if basis.shape[1] == n:
+                break
+    return basis / np.sqrt(n)
+
+
+def _solve_stream_configuration_with_copy(iasolver, comb, P):
+    """
+    Find the IA solution for the stream configuration `comb` using a copy
+    of `iasolver`.
+
+    This is used to solve different stream configurations concurrently
+    in :class:`BruteForceStreamIASolver`, since the IA solver object
+    stores the solution.
+
+    Parameters
+    ----------
+    iasolver : T <= IterativeIASolverBaseClass
+        The IA solver. It is not modified.
+    comb : tuple[int]
+        Number of streams of each user.
+    P : np.ndarray | List[float] | float
+        Power of each user.
+
+    Returns
+    -------
+    (int, float, np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+        The number of iterations the IA algorithm run, the sum capacity of
+        the solution and the F, full_F, W_H and Ns attributes of the
+        solution.
+    """
+    iasolver = deepcopy(iasolver)
+    iasolver.clear()
+    iasolver.initialize_with = 'svd'
+    runned_iterations = iasolver.solve(np.array(comb), P)
+    sum_capacity = iasolver.calc_sum_capacity()
+    return (runned_iterations, sum_capacity, iasolver.F, iasolver.full_F,
+            iasolver.W_H, iasolver.Ns)
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx GreedStreamIASolver Class xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1846,6 +1980,13 @@ class GreedStreamIASolver(object):
     after stream reduction is lower. The final solution will be for the
     number of streams that yielded the largest sum capacity.
 
+    Each new solution after a stream reduction is initialized from the
+    previous solution (without the removed stream). If `use_pruning` is
+    True, the stream reduction also stops (without solving the reduced
+    configuration) when the sum capacity upper bound (the interference
+    free capacity of each user) of the reduced configuration is lower
+    than the sum capacity of the current solution.
+
     Parameters
     ----------
     iasolver_obj : T <= IASolverBaseClass
@@ -1873,6 +2014,10 @@ class GreedStreamIASolver(object):
         self._old_W_H = None
         self._old_Ns = None
 
+        # If True, stop the stream reduction when the reduced stream
+        # configuration cannot beat the current solution
+        self.use_pruning = False
+
     @property
     def runned_iterations(self):
         """
@@ -1926,6 +2071,10 @@ class GreedStreamIASolver(object):
             # False to disable stream reduction.
             keep_going = False  # pragma: no cover
 
+        if self.use_pruning:
+            bounds = _calc_capacity_upper_bounds(
+                self._iasolver, self._iasolver.Ns, P)
+
         while keep_going is True:
             # xxxxxxxxxx Store the current solution xxxxxxxxxxxxxxxxxxxxxxx
             self._old_F = [F.copy() for F in self._iasolver.F]
@@ -1944,6 +2093,15 @@ class GreedStreamIASolver(object):
                 self._find_index_stream_with_worst_sinr()
             # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
+            # xxxxx Stop if the reduced configuration can't be better xxxxx
+            if self.use_pruning:
+                reduced_Ns = copy(self._iasolver.Ns)
+                reduced_Ns[user_idx] -= 1
+                if (np.sum(bounds[np.arange(self._iasolver.K), reduced_Ns])
+                        < old_sum_capacity):
+                    break
+            # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
             # xxxxx Remove the stream and find a new IA solution xxxxxxxxxx
             self._iasolver.F[user_idx] = np.delete(
                 self._iasolver.F[user_idx], stream_idx, 1)
@@ -2050,6 +2208,30 @@ class BruteForceStreamIASolver(object):
     'initialize_with' property in the IterativeIASolverBaseClass class) so
     that the initialization is always the same.
 
+    Since the number of stream configurations grows exponentially with the
+    number of users, two optional optimizations are provided:
+
+    - If `use_warm_start` is True, each configuration is initialized from
+      the solution of an already solved neighboring configuration (one
+      stream more or less for one of the users) instead of with the 'svd'
+      initialization. The precoder of each user is initialized with an
+      orthonormal basis of the subspace of the neighbor solution and an
+      extra stream is initialized with the most significant right
+      singular vector of the direct channel that is not in that subspace.
+    - If `use_pruning` is True, the configurations are solved in
+      descending order of their sum capacity upper bound (the
+      interference free capacity of each user) and configurations whose
+      upper bound cannot beat the best sum capacity found so far are
+      skipped. Their sum capacity in `every_sum_capacity` is NaN.
+
+    The stream configurations can also be solved concurrently by setting
+    the `executor` attribute to a `concurrent.futures.Executor` object
+    (such as a `ThreadPoolExecutor` or a `ProcessPoolExecutor`). Each
+    configuration is then solved in a copy of the IA solver object and
+    the solution is the same one found when they are solved sequentially.
+    Since warm-start and pruning depend on the order the configurations
+    are solved, they cannot be used with an executor.
+
     Parameters
     ----------
     iasolver_obj : T <= IASolverBaseClass
@@ -2071,6 +2253,18 @@ class BruteForceStreamIASolver(object):
         self._best_W_H = None
         self._best_Ns = None
 
+        # Warm-start and pruning of the stream configurations
+        self.use_warm_start = False
+        self.use_pruning = False
+
+        # If set to a concurrent.futures.Executor object, it is used to
+        # solve the stream configurations concurrently
+        self.executor = None
+
+        # Store the precoders found for each (solved) stream
+        # configuration. This is used for the warm-start.
+        self._solutions = {}
+
     def clear(self):
         """
         Clear the BruteForceStreamIASolver object.
@@ -2087,6 +2281,8 @@ class BruteForceStreamIASolver(object):
         self._best_W_H = None
         self._best_Ns = None
 
+        self._solutions = {}
+
     @property
     def runned_iterations(self):
         """
@@ -2124,6 +2320,156 @@ class BruteForceStreamIASolver(object):
         """
         return self._every_sum_capacity
 
+    def _find_solved_neighbor(self, comb):
+        """
+        Find an already solved stream configuration that differs from
+        `comb` by a single stream of a single user.
+
+        Parameters
+        ----------
+        comb : tuple[int]
+            The stream configuration.
+
+        Returns
+        -------
+        tuple[int] | None
+            The neighbor configuration, or None if no neighbor was solved
+            yet.
+        """
+        # Prefer a neighbor with less streams, since the extra stream can
+        # be initialized from the direct channel.
+        for n in (-1, 1):
+            for k in reversed(range(len(comb))):
+                neighbor = comb[:k] + (comb[k] + n,) + comb[k + 1:]
+                if neighbor in self._solutions:
+                    return neighbor
+        return None
+
+    def _solve_stream_configuration(self, comb, P):
+        """
+        Find the IA solution for the stream configuration `comb`.
+
+        Parameters
+        ----------
+        comb : tuple[int]
+            Number of streams of each user.
+        P : np.ndarray | List[float] | float
+            Power of each user.
+
+        Returns
+        -------
+        int
+            Number of iterations the iterative interference alignment
+            algorithm run.
+        """
+        self._iasolver.clear()
+
+        neighbor = None
+        if self.use_warm_start:
+            neighbor = self._find_solved_neighbor(comb)
+
+        if neighbor is None:
+            self._iasolver.initialize_with = 'svd'
+        else:
+            neighbor_F = self._solutions[neighbor]
+            F = np.empty(self._iasolver.K, dtype=np.ndarray)
+            for k in range(self._iasolver.K):
+                F[k] = _extend_precoder(neighbor_F[k],
+                                        self._iasolver._get_channel(k, k),
+                                        comb[k])
+            self._iasolver.set_precoders(F=F)
+            self._iasolver.initialize_with = 'fix'
+
+        runned_iterations = self._iasolver.solve(np.array(comb), P)
+        self._solutions[comb] = self._iasolver.F
+        return runned_iterations
+
+    def _solve_sequentially(self, Ns, P):
+        """
+        Find the IA solution of every stream configuration (one after the
+        other) and store the best one.
+
+        Parameters
+        ----------
+        Ns : np.ndarray
+            MAXIMUM number of streams of each user.
+        P : np.ndarray | List[float] | float
+            Power of each user.
+        """
+        if self.use_pruning:
+            # Solve the configurations with the largest sum capacity upper
+            # bound first, since they are the ones more likely to have the
+            # best solution, and thus allow pruning the other ones.
+            bounds = _calc_capacity_upper_bounds(self._iasolver, Ns, P)
+            K = self._iasolver.K
+            comb_bounds = np.array(
+                [np.sum(bounds[np.arange(K), comb])
+                 for comb in self._stream_combinations])
+            order = np.argsort(-comb_bounds, kind='mergesort')
+        else:
+            order = range(len(self._stream_combinations))
+        best_sum_capacity = -np.inf
+        best_index = -1
+
+        for index in order:
+            comb = self._stream_combinations[index]
+
+            # Skip the configuration if even its interference free sum
+            # capacity is not better than the best solution
+            if self.use_pruning and comb_bounds[index] <= best_sum_capacity:
+                continue
+
+            self._runned_iterations += self._solve_stream_configuration(
+                comb, P)
+            sum_capacity = self._iasolver.calc_sum_capacity()
+            self._every_sum_capacity[index] = sum_capacity
+
+            # If the current solution is better then the best one, store it
+            # as the new best solution. Ties are resolved in favor of the
+            # first stream configuration.
+            if sum_capacity > best_sum_capacity or (
+                    sum_capacity == best_sum_capacity and
+                    index < best_index):
+                best_sum_capacity = sum_capacity
+                best_index = index
+                self._best_F = self._iasolver._F
+                self._best_full_F = self._iasolver._full_F
+                self._best_W_H = self._iasolver._W_H
+                self._best_Ns = self._iasolver.Ns
+
+    def _solve_with_executor(self, P):
+        """
+        Find the IA solution of every stream configuration concurrently
+        with `self.executor` and store the best one.
+
+        Parameters
+        ----------
+        P : np.ndarray | List[float] | float
+            Power of each user.
+        """
+        num_combinations = len(self._stream_combinations)
+        # The results are returned in the order of the stream
+        # configurations, regardless of the order they finish
+        results = self.executor.map(
+            _solve_stream_configuration_with_copy,
+            [self._iasolver] * num_combinations,
+            self._stream_combinations,
+            [P] * num_combinations)
+
+        best_sum_capacity = -np.inf
+        for index, result in enumerate(results):
+            runned_iterations, sum_capacity, F, full_F, W_H, Ns = result
+            self._runned_iterations += runned_iterations
+            self._every_sum_capacity[index] = sum_capacity
+            self._solutions[self._stream_combinations[index]] = F
+
+            if sum_capacity > best_sum_capacity:
+                best_sum_capacity = sum_capacity
+                self._best_F = F
+                self._best_full_F = full_F
+                self._best_W_H = W_H
+                self._best_Ns = Ns
+
     def solve(self, Ns, P=None):
         """
         Find the IA solution.
@@ -2148,7 +2494,6 @@ class BruteForceStreamIASolver(object):
         self._iasolver.clear()
         self._runned_iterations = 0
 
-        self._iasolver.initialize_with = 'svd'
         K = self._iasolver.K
 
         if isinstance(Ns, int):
@@ -2165,37 +2510,17 @@ class BruteForceStreamIASolver(object):
         self._stream_combinations = tuple(product(*each_user_variation))
 
         # xxxxx Find the solution for each stream configuration xxxxxxxxxxx
-        self._every_sum_capacity = []
-
-        # xxxxx Compute the solution for the first combination xxxxxxxxxxxx
-        stream_combinations = iter(self._stream_combinations)
-        comb = next(stream_combinations)
-        self._iasolver.clear()
-        self._runned_iterations += self._iasolver.solve(np.array(comb), P)
-        self._every_sum_capacity.append(self._iasolver.calc_sum_capacity())
-
-        self._best_F = self._iasolver._F
-        self._best_full_F = self._iasolver._full_F
-        self._best_W_H = self._iasolver._W_H
-        self._best_Ns = self._iasolver.Ns
-        best_sum_capacity = self._every_sum_capacity[-1]
-        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-
-        # xxxxx Compute the solution for the remaining combinations xxxxxxx
-        for comb in stream_combinations:
-            self._iasolver.clear()
-            self._runned_iterations += \
-                self._iasolver.solve(np.array(comb), P)
-            self._every_sum_capacity.append(self._iasolver.calc_sum_capacity())
-
-            # If the current solution is better then the best one, store it
-            # as the new best solution.
-            if self._every_sum_capacity[-1] > best_sum_capacity:
-                best_sum_capacity = self._every_sum_capacity[-1]
-                self._best_F = self._iasolver._F
-                self._best_full_F = self._iasolver._full_F
-                self._best_W_H = self._iasolver._W_H
-                self._best_Ns = self._iasolver.Ns
+        num_combinations = len(self._stream_combinations)
+        self._every_sum_capacity = [np.nan] * num_combinations
+        self._solutions = {}
+
+        if self.executor is None:
+            self._solve_sequentially(Ns, P)
+        elif self.use_warm_start or self.use_pruning:
+            raise RuntimeError(
+                "Warm-start and pruning cannot be used with an executor")
+        else:
+            self._solve_with_executor(P)
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
         # Now that we tested every possible solution, lets keep the best
@@ -2209,4 +2534,798 @@ class BruteForceStreamIASolver(object):
 
         return self._runned_iterations
 
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxx BatchedIterativeIASolverBaseClass xxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+def _conj_transpose(A):
+    """
+    Return the conjugate transpose of the matrices in the last two
+    dimensions of `A`.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        The stacked matrices.
+
+    Returns
+    -------
+    np.ndarray
+        The conjugate transpose of each matrix in `A`.
+    """
+    return np.conj(np.swapaxes(A, -1, -2))
+
+
+def _sum_over_other_users(A):
+    """
+    Sum the covariance matrices `A[..., k, j, :, :]` over all `j`
+    different from `k`.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        The covariance matrices of each link. Dimension: `... x K x K x N
+        x N`.
+
+    Returns
+    -------
+    np.ndarray
+        The sum for each `k`. Dimension: `... x K x N x N`.
+    """
+    K = A.shape[-3]
+    other_users = ~np.eye(K, dtype=bool)
+    return np.sum(A * other_users[:, :, np.newaxis, np.newaxis], axis=-3)
+
+
+def _batched_leig(A, n):
+    """
+    Batched version of :func:`.leig`.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Stacked Hermitian matrices. Dimension: `... x N x N`.
+    n : int
+        Number of desired least significant eigenvectors.
+
+    Returns
+    -------
+    np.ndarray
+        The `n` least significant eigenvectors of each matrix in `A`.
+        Dimension: `... x N x n`.
+
+    Notes
+    -----
+    Each eigenvector is scaled such that its component with the largest
+    modulus is real and positive (the same convention of `np.linalg.eig`
+    used in :func:`.leig`). Since eigenvectors are only unique up to a
+    phase, without this the precoders could change by an arbitrary phase
+    from one iteration to the next one and convergence would not be
+    detected.
+    """
+    # The eigenvalues returned by eigh are in ascending order
+    _, V = np.linalg.eigh(A)
+    V = V[..., :n]
+    largest = np.take_along_axis(
+        V, np.argmax(np.abs(V), axis=-2)[..., np.newaxis, :], axis=-2)
+    return V * (np.conj(largest) / np.abs(largest))
+
+
+class BatchedIterativeIASolverBaseClass(object):
+    """
+    Base class for Iterative IA algorithms that solve the IA problem for
+    all realizations of a :class:`.MultiUserChannelMatrixEnsemble` at
+    once.
+
+    The precoders and receive filters of all users in all realizations are
+    stored as stacked numpy arrays with dimensions `B x K x Nt x Ns` and `B
+    x K x Nr x Ns`, respectively, and each iteration of the algorithm is
+    performed with batched numpy operations (stacked `np.linalg.eigh`,
+    `np.linalg.solve`, etc.) instead of looping over users and
+    realizations.
+
+    Just like in :class:`IterativeIASolverBaseClass`, the algorithm stops
+    early when the precoder does not change significantly from one
+    iteration to the next one, but here this is tracked independently for
+    each realization. Once a realization has converged it is not updated
+    anymore and the remaining iterations only process the realizations
+    that have not converged yet.
+
+    Subclasses must implement the `_calc_F` and `_calc_W` methods.
+
+    Parameters
+    ----------
+    multiUserChannel : muchannels.MultiUserChannelMatrixEnsemble
+        The ensemble of multiuser channel realizations. All users must
+        have the same number of transmit antennas and the same number of
+        receive antennas.
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self, multiUserChannel):
+        if not isinstance(multiUserChannel,
+                          muchannels.MultiUserChannelMatrixEnsemble):
+            raise ValueError(
+                "multiUserChannel must be an object of the "
+                "MultiUserChannelMatrixEnsemble class (or a subclass).")
+        self._multiUserChannel = multiUserChannel
+
+        # Number of streams per user
+        self._Ns = None
+        # Power of each user. If not set (_P is None), then a power of 1
+        # will be used for each transmitter.
+        self._P = None
+
+        # Precoder and receive filter of all users in all
+        # realizations. Dimensions: `B x K x Nt x Ns` and `B x K x Nr x Ns`
+        self._F = None
+        self._W = None
+
+        # Number of times the step method was run for each realization
+        self._runned_iterations = np.zeros(multiUserChannel.B, dtype=int)
+        self.max_iterations = 50
+        self.relative_factor = 1e-6
+
+        # RandomState object used to randomize the precoder
+        self._rs = np.random.RandomState()
+
+    # xxxxx Properties to read the channel related variables xxxxxxxxxxxxxx
+    @property
+    def B(self):
+        """
+        The number of channel realizations.
+
+        Returns
+        -------
+        int
+            The number of channel realizations.
+        """
+        return self._multiUserChannel.B
+
+    @property
+    def K(self):
+        """
+        The number of users.
+
+        Returns
+        -------
+        int
+            The number of users.
+        """
+        return self._multiUserChannel.K
+
+    @property
+    def Nr(self):
+        """
+        Number of receive antennas of all users.
+
+        Returns
+        -------
+        np.ndarray
+            Number of receive antennas of all users.
+        """
+        return self._multiUserChannel.Nr
+
+    @property
+    def Nt(self):
+        """
+        Number of transmit antennas of all users.
+
+        Returns
+        -------
+        np.ndarray
+            Number of transmit antennas of all users.
+        """
+        return self._multiUserChannel.Nt
+
+    @property
+    def noise_var(self):
+        """
+        Get method for the noise_var property.
+
+        Returns
+        -------
+        float
+            The noise variance (a real non-negative number).
+        """
+        noise_var = self._multiUserChannel.noise_var
+        if noise_var is None:
+            return 0.0
+        return noise_var
+    # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+    @property
+    def Ns(self):
+        """
+        Number of streams of all users.
+
+        Returns
+        -------
+        np.ndarray
+            Number of streams of all users.
+        """
+        return self._Ns
+
+    @property
+    def P(self):
+        """
+        Transmit power of all users.
+
+        Returns
+        -------
+        np.ndarray
+            The power of all users.
+        """
+        if self._P is None:
+            return np.ones(self.K, dtype=float)
+        return self._P
+
+    @P.setter
+    def P(self, value):
+        """
+        Transmit power of all users.
+
+        Parameters
+        ----------
+        value : float | np.ndarray | None
+            The new power of all users.
+        """
+        if value is None:
+            self._P = None
+            return
+
+        value = np.ones(self.K, dtype=float) * value
+        if value.size != self.K:
+            raise ValueError("P must be set to a sequence of length K")
+        if np.any(value <= 0.0):
+            raise ValueError("P cannot be negative or equal to zero.")
+        self._P = value
+
+    @property
+    def runned_iterations(self):
+        """
+        Get method for the runned_iterations property.
+
+        Returns
+        -------
+        np.ndarray
+            The number of iterations run for each realization.
+        """
+        return self._runned_iterations
+
+    @property
+    def F(self):
+        """
+        Transmit precoder of all users in all realizations.
+
+        Returns
+        -------
+        np.ndarray
+            The precoders. Dimension: `B x K x Nt x Ns`.
+        """
+        return self._F
+
+    @property
+    def full_F(self):
+        """
+        Transmit precoder of all users in all realizations, scaled with the
+        transmit power of each user.
+
+        Returns
+        -------
+        np.ndarray
+            The precoders. Dimension: `B x K x Nt x Ns`.
+        """
+        return self._F * np.sqrt(self.P)[:, np.newaxis, np.newaxis]
+
+    @property
+    def W(self):
+        """
+        Receive filter of all users in all realizations.
+
+        Returns
+        -------
+        np.ndarray
+            The receive filters. Dimension: `B x K x Nr x Ns`.
+        """
+        return self._W
+
+    @property
+    def W_H(self):
+        """
+        Conjugate transpose of the receive filter of all users in all
+        realizations.
+
+        Returns
+        -------
+        np.ndarray
+            The receive filters. Dimension: `B x K x Ns x Nr`.
+        """
+        return _conj_transpose(self._W)
+
+    @property
+    def full_W_H(self):
+        """
+        The equivalent filter of the IA filter plus the post processing
+        filter of all users in all realizations.
+
+        Returns
+        -------
+        np.ndarray
+            The equivalent filters. Dimension: `B x K x Ns x Nr`.
+        """
+        K = self.K
+        W_H = self.W_H
+        H = self._multiUserChannel.dense_H
+        direct_H = H[:, np.arange(K), np.arange(K)]
+        Heq = np.matmul(W_H, np.matmul(direct_H, self.full_F))
+        return np.linalg.solve(Heq, W_H)
+
+    def clear(self):
+        """
+        Clear the IA Solver object.
+
+        All member attributes that are updated during the solve method,
+        such as the precoder and receive filters, will be cleared.
+        """
+        self._F = None
+        self._W = None
+        self._P = None
+        self._Ns = None
+        self._runned_iterations = np.zeros(self.B, dtype=int)
+
+    def randomizeF(self, Ns, P=None):
+        """
+        Generates a random precoder for each user in each realization.
+
+        Parameters
+        ----------
+        Ns : int | list[int] | np.ndarray
+            Number of streams of each user. All users must have the same
+            number of streams.
+        P : np.ndarray | None, optional
+            Power of each user. If not provided, a value of 1 will be used
+            for each user.
+        """
+        Ns = np.ones(self.K, dtype=int) * Ns
+        if np.any(Ns != Ns[0]):
+            raise ValueError("All users must have the same number of "
+                             "streams.")
+        self._Ns = Ns
+        self.P = P
+
+        F = randn_c_RS(self._rs, self.B, self.K, self.Nt[0], Ns[0])
+        self._F = F / np.linalg.norm(F, axis=(-2, -1))[..., np.newaxis,
+                                                       np.newaxis]
+        self._W = None
+        self._runned_iterations = np.zeros(self.B, dtype=int)
+
+    @classmethod
+    def _is_diff_significant(cls, F_old, F_new, relative_factor):
+        """
+        Test if there was any significant change from `F_old` to `F_new` in
+        each realization.
+
+        This is the batched version of
+        :meth:`IterativeIASolverBaseClass._is_diff_significant`.
+
+        Parameters
+        ----------
+        F_old : np.ndarray
+            The precoder of all users (in a previous iteration). Dimension:
+            `B x K x Nt x Ns`.
+        F_new : np.ndarray
+            The precoder of all users (in the current iteration).
+            Dimension: `B x K x Nt x Ns`.
+        relative_factor : float
+            The relative change considered significant.
+
+        Returns
+        -------
+        np.ndarray
+            A 1D boolean array with True for the realizations where the
+            difference is significant.
+        """
+        min_value = np.min(np.abs(F_new), axis=(-2, -1))
+        max_diff = np.max(np.abs(F_new - F_old), axis=(-2, -1))
+        return np.any(max_diff > (min_value * relative_factor), axis=-1)
+
+    @abstractmethod
+    def _calc_F(self, H, W):  # pragma: no cover
+        """
+        Calculates the precoders of the given realizations.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel of the realizations being updated. Dimension: `b x
+            K x K x Nr x Nt`.
+        W : np.ndarray
+            The current receive filters. Dimension: `b x K x Nr x Ns`.
+
+        Returns
+        -------
+        np.ndarray
+            The new precoders. Dimension: `b x K x Nt x Ns`.
+        """
+        raise NotImplementedError("_calc_F: Not implemented")
+
+    @abstractmethod
+    def _calc_W(self, H, F):  # pragma: no cover
+        """
+        Calculates the receive filters of the given realizations.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel of the realizations being updated. Dimension: `b x
+            K x K x Nr x Nt`.
+        F : np.ndarray
+            The current precoders. Dimension: `b x K x Nt x Ns`.
+
+        Returns
+        -------
+        np.ndarray
+            The new receive filters. Dimension: `b x K x Nr x Ns`.
+        """
+        raise NotImplementedError("_calc_W: Not implemented")
+
+    def _solve_init(self, Ns, P):
+        """
+        Code run in the `solve` method before the loop that runs the
+        :meth:`_step` method.
+
+        Parameters
+        ----------
+        Ns : int | np.ndarray
+            Number of streams of each user.
+        P : float | np.ndarray
+            Power of each user.
+        """
+        self.randomizeF(Ns, P)
+        self._W = self._calc_W(self._multiUserChannel.dense_H, self._F)
+
+    def _step(self, idx):
+        """
+        Performs one iteration of the algorithm for the realizations in
+        `idx`.
+
+        Parameters
+        ----------
+        idx : np.ndarray
+            The indexes of the realizations that should be updated.
+        """
+        H = self._multiUserChannel.dense_H[idx]
+        F = self._calc_F(H, self._W[idx])
+        self._F[idx] = F
+        self._W[idx] = self._calc_W(H, F)
+
+    def _solve_finalize(self):
+        """
+        Perform any post processing after the solution has been found.
+        """
+        pass
+
+    def solve(self, Ns, P=None):
+        """
+        Find the IA solution of all realizations.
+
+        Parameters
+        ----------
+        Ns : int | np.ndarray
+            Number of streams of each user. All users must have the same
+            number of streams.
+        P : np.ndarray | List[float] | float, optional
+            Power of each user. If not provided, a value of 1 will be used
+            for each user.
+
+        Returns
+        -------
+        np.ndarray
+            Number of iterations the algorithm run for each realization.
+        """
+        if np.any(self.Nr != self.Nr[0]) or np.any(self.Nt != self.Nt[0]):
+            raise ValueError("All users must have the same number of "
+                             "transmit and receive antennas.")
+
+        self._solve_init(Ns, P)
+
+        # Indexes of the realizations that did not converge yet
+        idx = np.arange(self.B)
+        for _ in range(self.max_iterations):
+            old_F = self._F[idx]
+            self._step(idx)
+            self._runned_iterations[idx] += 1
+
+            # Stop updating the realizations whose precoder did not
+            # change too much
+            idx = idx[self._is_diff_significant(
+                old_F, self._F[idx], self.relative_factor)]
+            if idx.size == 0:
+                break
+
+        self._solve_finalize()
+
+        return self._runned_iterations
+
+    def calc_SINR(self):
+        """
+        Calculates the SINR values (in linear scale) of all streams of all
+        users in all realizations with the current IA solution.
+
+        Returns
+        -------
+        np.ndarray
+            The SINR (in linear scale). Dimension: `B x K x Ns`.
+        """
+        full_F = self.full_F
+        full_W = _conj_transpose(self.full_W_H)
+        SINRs = self._multiUserChannel.calc_SINR(
+            [full_F[:, k] for k in range(self.K)],
+            [full_W[:, k] for k in range(self.K)])
+        return np.stack(SINRs, axis=1)
+
+    def calc_sum_capacity(self):
+        """
+        Calculates the sum capacity of the current solution of each
+        realization.
+
+        Returns
+        -------
+        np.ndarray
+            The sum capacity of each realization.
+        """
+        return np.sum(np.log2(1 + self.calc_SINR()), axis=(-2, -1))
+
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxx BatchedAlternatingMinIASolver Class xxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class BatchedAlternatingMinIASolver(BatchedIterativeIASolverBaseClass):
+    """
+    Batched version of :class:`AlternatingMinIASolver`.
+
+    Parameters
+    ----------
+    multiUserChannel : muchannels.MultiUserChannelMatrixEnsemble
+        The ensemble of multiuser channel realizations.
+    """
+
+    def __init__(self, multiUserChannel):
+        BatchedIterativeIASolverBaseClass.__init__(self, multiUserChannel)
+
+        # Basis of the interference subspace for each user. Dimension:
+        # `B x K x Nr x (Nr - Ns)`
+        self._C = None
+
+    def clear(self):
+        BatchedIterativeIASolverBaseClass.clear(self)
+        self._C = None
+    clear.__doc__ = BatchedIterativeIASolverBaseClass.clear.__doc__
+
+    def _calc_C(self, H, F):
+        """
+        Calculates the orthogonal basis of the interference subspace of
+        all users.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel. Dimension: `b x K x K x Nr x Nt`.
+        F : np.ndarray
+            The precoders. Dimension: `b x K x Nt x Ns`.
+
+        Returns
+        -------
+        np.ndarray
+            The Nr - Ns dominant eigenvectors of the interference
+            covariance matrix of each user. Dimension: `b x K x Nr x (Nr -
+            Ns)`.
+        """
+        Ni = self.Nr[0] - self.Ns[0]
+        full_F = F * np.sqrt(self.P)[:, np.newaxis, np.newaxis]
+        HF = np.matmul(H, full_F[:, np.newaxis])
+        Q = _sum_over_other_users(np.matmul(HF, _conj_transpose(HF)))
+        # The eigenvalues returned by eigh are in ascending order
+        _, V = np.linalg.eigh(Q)
+        return V[..., :-Ni - 1:-1]
+
+    def _calc_F(self, H, C):
+        """
+        Calculates the precoders of all users.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel. Dimension: `b x K x K x Nr x Nt`.
+        C : np.ndarray
+            The interference subspace of each user. Dimension: `b x K x Nr
+            x (Nr - Ns)`.
+
+        Returns
+        -------
+        np.ndarray
+            The new precoders. Dimension: `b x K x Nt x Ns`.
+        """
+        # $\sum_{k \neq l} \mtH_{k,l}^H (\mtI - \mtC_k \mtC_k^H)\mtH_{k,l}$
+        Y = np.eye(self.Nr[0]) - np.matmul(C, _conj_transpose(C))
+        # Transpose so that the first user dimension is the transmitter
+        H_lk = np.swapaxes(H, 1, 2)
+        A = np.matmul(_conj_transpose(H_lk),
+                      np.matmul(Y[:, np.newaxis], H_lk))
+        F = _batched_leig(_sum_over_other_users(A), self.Ns[0])
+        return F / np.linalg.norm(F, axis=(-2, -1))[..., np.newaxis,
+                                                    np.newaxis]
+
+    def _calc_W(self, H, F):
+        """
+        Calculates the zero-forcing receive filters of all users.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel. Dimension: `b x K x K x Nr x Nt`.
+        F : np.ndarray
+            The precoders. Dimension: `b x K x Nt x Ns`.
+
+        Returns
+        -------
+        np.ndarray
+            The new receive filters. Dimension: `b x K x Nr x Ns`.
+        """
+        K = self.K
+        C = self._calc_C(H, F)
+        direct_H = H[:, np.arange(K), np.arange(K)]
+        tildeH = np.concatenate([np.matmul(direct_H, F), C], axis=-1)
+        W_H = np.linalg.inv(tildeH)[..., :self.Ns[0], :]
+        return _conj_transpose(W_H)
+
+    def _solve_init(self, Ns, P):
+        self.randomizeF(Ns, P)
+        self._C = self._calc_C(self._multiUserChannel.dense_H, self._F)
+    _solve_init.__doc__ = BatchedIterativeIASolverBaseClass._solve_init.__doc__
+
+    def _step(self, idx):
+        # The precoders only depend on the C matrices. Because of that,
+        # the receive filters are only calculated in _solve_finalize
+        H = self._multiUserChannel.dense_H[idx]
+        F = self._calc_F(H, self._C[idx])
+        self._F[idx] = F
+        self._C[idx] = self._calc_C(H, F)
+    _step.__doc__ = BatchedIterativeIASolverBaseClass._step.__doc__
+
+    def _solve_finalize(self):
+        """
+        Perform any post processing after the solution has been found.
+
+        The receive filters are only updated here, since they are not
+        needed during the iterations.
+        """
+        self._W = self._calc_W(self._multiUserChannel.dense_H, self._F)
+
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxx BatchedMinLeakageIASolver Class xxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class BatchedMinLeakageIASolver(BatchedIterativeIASolverBaseClass):
+    """
+    Batched version of :class:`MinLeakageIASolver`.
+
+    Parameters
+    ----------
+    multiUserChannel : muchannels.MultiUserChannelMatrixEnsemble
+        The ensemble of multiuser channel realizations.
+    """
+
+    def _calc_F(self, H, W):
+        # Interference covariance matrix of each user in the reverse
+        # network, where the channel from l to k is H_lk^H
+        H_rev = _conj_transpose(np.swapaxes(H, 1, 2))
+        HW = np.matmul(H_rev, W[:, np.newaxis])
+        Q_rev = _sum_over_other_users(
+            np.matmul(HW * self.P[:, np.newaxis, np.newaxis],
+                      _conj_transpose(HW)))
+        return _batched_leig(Q_rev, self.Ns[0])
+    _calc_F.__doc__ = BatchedIterativeIASolverBaseClass._calc_F.__doc__
+
+    def _calc_W(self, H, F):
+        full_F = F * np.sqrt(self.P)[:, np.newaxis, np.newaxis]
+        HF = np.matmul(H, full_F[:, np.newaxis])
+        Q = _sum_over_other_users(np.matmul(HF, _conj_transpose(HF)))
+        return _batched_leig(Q, self.Ns[0])
+    _calc_W.__doc__ = BatchedIterativeIASolverBaseClass._calc_W.__doc__
+
+    def get_cost(self):
+        """
+        Get the Cost of the algorithm for the current iteration of the
+        precoder of each realization.
+
+        Returns
+        -------
+        np.ndarray
+            The Cost of each realization (real non-negative numbers).
+        """
+        # $$C = Tr[\mtU_k^H \mtQ_k \mtU_k]$$
+        HF = np.matmul(self._multiUserChannel.dense_H,
+                       self.full_F[:, np.newaxis])
+        Q = _sum_over_other_users(np.matmul(HF, _conj_transpose(HF)))
+        Q += self.noise_var * np.eye(self.Nr[0])
+        aux = np.matmul(self.W_H, np.matmul(Q, self._W))
+        return np.sum(np.abs(np.diagonal(aux, axis1=-2, axis2=-1)),
+                      axis=(-2, -1))
+
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxx BatchedMaxSinrIASolver Class xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class BatchedMaxSinrIASolver(BatchedIterativeIASolverBaseClass):
+    """
+    Batched version of :class:`MaxSinrIASolver`.
+
+    Parameters
+    ----------
+    multiUserChannel : muchannels.MultiUserChannelMatrixEnsemble
+        The ensemble of multiuser channel realizations.
+    """
+
+    @staticmethod
+    def _calc_Uk_all_k(H, V, scaled_V, noise_var):
+        """
+        Calculates the receive filter of all users with the max SINR
+        criterion.
+
+        Parameters
+        ----------
+        H : np.ndarray
+            The channel. Dimension: `b x K x K x Nr x Nt`.
+        V : np.ndarray
+            The (normalized) precoders. Dimension: `b x K x Nt x Ns`.
+        scaled_V : np.ndarray
+            The precoders scaled by the transmit power of each stream,
+            used to calculate the Bkl covariance matrices. Dimension: `b x
+            K x Nt x Ns`.
+        noise_var : float
+            The noise variance.
+
+        Returns
+        -------
+        np.ndarray
+            The receive filters. Dimension: `b x K x Nr x Ns`.
+        """
+        K = H.shape[1]
+        Nr = H.shape[-2]
+        direct_H = H[:, np.arange(K), np.arange(K)]
+
+        HV = np.matmul(H, scaled_V[:, np.newaxis])
+        first_part = np.sum(np.matmul(HV, _conj_transpose(HV)), axis=2)
+
+        # Each stream l of each user k has its own Bkl matrix. Dimension
+        # of aux and second_part: `b x K x Ns x Nr (x Nr)`
+        aux = np.swapaxes(np.matmul(direct_H, scaled_V), -1, -2)
+        second_part = (aux[..., :, np.newaxis] *
+                       np.conj(aux[..., np.newaxis, :]))
+        Bkl = (first_part[:, :, np.newaxis] - second_part +
+               noise_var * np.eye(Nr))
+
+        # Solve Bkl Ukl = Hkk Vkl for all streams at once
+        HkkV = np.swapaxes(np.matmul(direct_H, V), -1, -2)
+        U = np.linalg.solve(Bkl, HkkV[..., np.newaxis])[..., 0]
+        U /= np.linalg.norm(U, axis=-1)[..., np.newaxis]
+        U = np.swapaxes(U, -1, -2)
+        return U / np.linalg.norm(U, axis=(-2, -1))[..., np.newaxis,
+                                                    np.newaxis]
+
+    def _calc_F(self, H, W):
+        # The precoder is the receive filter of the reverse network, where
+        # the channel from l to k is H_lk^H
+        H_rev = _conj_transpose(np.swapaxes(H, 1, 2))
+        scaled_W = W * np.sqrt(self.P / self.Ns)[:, np.newaxis, np.newaxis]
+        return self._calc_Uk_all_k(H_rev, W, scaled_W, self.noise_var)
+    _calc_F.__doc__ = BatchedIterativeIASolverBaseClass._calc_F.__doc__
+
+    def _calc_W(self, H, F):
+        full_F = F * np.sqrt(self.P)[:, np.newaxis, np.newaxis]
+        return self._calc_Uk_all_k(H, F, full_F, self.noise_var)
+    _calc_W.__doc__ = BatchedIterativeIASolverBaseClass._calc_W.__doc__
+
 # xxxxxxxxxx End of the File xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
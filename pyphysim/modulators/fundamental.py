@@ -27,6 +27,16 @@ from pyphysim.util.conversion import gray2binary, binary2gray, dB2Linear
 
 PI = np.pi
 
+# Maximum number of elements in the matrix with the distance of each
+# received symbol to each constellation symbol computed at once during the
+# demodulation.
+_MAX_DISTANCE_MATRIX_SIZE = 2 ** 20
+
+# Received symbols closer than this (relative) distance to a decision
+# boundary are demodulated by computing their distance to every symbol in
+# the constellation.
+_DECISION_BOUNDARY_TOL = 1e-9
+
 __all__ = ['Modulator', 'PSK', 'QPSK', 'BPSK', 'QAM']
 
 
@@ -236,17 +246,193 @@ class Modulator(object):
 
         # xxxxxxxxxx Third Try xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
         # This version uses more memory because of the numpy broadcasting,
-        # but it is much faster.
-        shape = receivedData.shape
-        reshaped_received_data = receivedData.flatten()
+        # but it is much faster. The distances are computed in chunks to
+        # bound the used memory.
+        return self._demodulate_closest_symbol(receivedData)
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+    def _demodulate_closest_symbol(self, receivedData):
+        """
+        Demodulate the data by computing the distance of each received
+        symbol to every symbol in the constellation.
+
+        The distances are computed for chunks of the received data such
+        that the distance matrix never has more than
+        `_MAX_DISTANCE_MATRIX_SIZE` elements.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated.
+
+        Returns
+        -------
+        demodulated_data : np.ndarray
+            The index of the closest symbol in the constellation for each
+            element in `receivedData`.
+        """
+        shape = np.shape(receivedData)
+        reshaped_received_data = np.ravel(receivedData)
+        num_symbols = reshaped_received_data.size
 
         constellation = np.reshape(self.symbols, [self.symbols.size, 1])
-        output = np.abs(constellation -
-                        reshaped_received_data).argmin(axis=0)
+        chunk_size = max(1, _MAX_DISTANCE_MATRIX_SIZE // self.symbols.size)
+        output = np.empty(num_symbols, dtype=int)
+        for start in range(0, num_symbols, chunk_size):
+            end = start + chunk_size
+            output[start:end] = np.abs(
+                constellation - reshaped_received_data[start:end]).argmin(
+                    axis=0)
         output.shape = shape
 
         return output
-        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+    def demodulate_soft(self, receivedData, noise_var, method='exact'):
+        """
+        Demodulate the data calculating the log-likelihood ratio (LLR) of
+        each bit.
+
+        The LLR of a bit `b` is defined as
+        :math:`\\log(P(b=0|r) / P(b=1|r))`, assuming equally likely
+        symbols and circularly symmetric complex Gaussian noise. Therefore,
+        a positive LLR means that the bit is more likely to be 0.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated. This can have any shape.
+        noise_var : float
+            Noise variance (power in linear scale of the complex noise).
+        method : str, optional
+            Either 'exact' or 'maxlog'. If 'maxlog' the sum of the
+            likelihoods of the symbols is approximated by its maximum
+            term.
+
+        Returns
+        -------
+        llrs : np.ndarray
+            The LLRs of the bits of the demodulated data. The shape is
+            equal to the shape of `receivedData` plus one extra dimension
+            with size equal to the number of bits per symbol. The bits of
+            each symbol are in the same order as in the binary
+            representation of the symbol index (most significant bit
+            first).
+
+        Raises
+        ------
+        ValueError
+            If `method` is not 'exact' or 'maxlog', or if `noise_var` is
+            not positive.
+
+        Examples
+        --------
+        >>> m = QAM(4)
+        >>> llrs = m.demodulate_soft(m.modulate(np.array([0, 3])), 0.5)
+        >>> print(np.round(llrs, 4))
+        [[ 4.  4.]
+         [-4. -4.]]
+        """
+        if method not in ('exact', 'maxlog'):
+            raise ValueError(
+                "Invalid method: '{0}'. It must be either 'exact' or "
+                "'maxlog'".format(method))
+        if not noise_var > 0:
+            raise ValueError(
+                "Invalid noise variance: '{0}'. It must be a positive "
+                "number".format(noise_var))
+
+        shape = np.shape(receivedData)
+        reshaped_received_data = np.ravel(receivedData)
+        num_symbols = reshaped_received_data.size
+        num_bits = level2bits(self._M)
+
+        chunk_size = max(1, _MAX_DISTANCE_MATRIX_SIZE //
+                         (self.symbols.size * num_bits))
+        llrs = np.empty([num_symbols, num_bits])
+        for start in range(0, num_symbols, chunk_size):
+            end = start + chunk_size
+            llrs[start:end] = self._calc_llrs(
+                reshaped_received_data[start:end], noise_var, method)
+        llrs.shape = shape + (num_bits,)
+
+        return llrs
+
+    def _calc_llrs(self, receivedData, noise_var, method):
+        """
+        Calculate the LLRs of the bits of each element in the 1D numpy
+        array `receivedData`.
+
+        This is called by :meth:`demodulate_soft` for each chunk of the
+        received data and subclasses can reimplement it to take advantage
+        of the structure of the constellation.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated (1D numpy array).
+        noise_var : float
+            Noise variance (power in linear scale of the complex noise).
+        method : str
+            Either 'exact' or 'maxlog'.
+
+        Returns
+        -------
+        llrs : np.ndarray
+            A 2D numpy array with the LLRs of the bits of each element in
+            `receivedData`.
+        """
+        # Log-likelihood of each symbol (except for a constant term)
+        metrics = -np.abs(receivedData[:, np.newaxis] -
+                          self.symbols) ** 2 / noise_var
+        return self._calc_bit_llrs(metrics, np.arange(self._M), method)
+
+    @staticmethod
+    def _calc_bit_llrs(metrics, labels, method):
+        """
+        Calculate the LLRs of the bits of the labels from the
+        log-likelihood of each label.
+
+        Parameters
+        ----------
+        metrics : np.ndarray
+            A 2D numpy array where the element `[n, m]` is the
+            log-likelihood (except for a constant term) of the label
+            `labels[m]` for the n-th received symbol.
+        labels : np.ndarray
+            The labels (integers) corresponding to each column of
+            `metrics`. All labels must have the same number of bits and all
+            possible labels must be present.
+        method : str
+            Either 'exact' or 'maxlog'.
+
+        Returns
+        -------
+        llrs : np.ndarray
+            A 2D numpy array where the element `[n, k]` is the LLR of the
+            k-th bit (most significant bit first) of the labels.
+        """
+        num_bits = level2bits(labels.size)
+        # bits[m, k] is the k-th bit of labels[m]
+        bits = (labels[:, np.newaxis] >>
+                np.arange(num_bits - 1, -1, -1)) & 1
+
+        llrs = np.empty([metrics.shape[0], num_bits])
+        for k in range(num_bits):
+            # Log-likelihood of the labels with the k-th bit equal to zero
+            # and equal to one
+            metrics0 = metrics[:, bits[:, k] == 0]
+            metrics1 = metrics[:, bits[:, k] == 1]
+            max0 = np.max(metrics0, axis=1)
+            max1 = np.max(metrics1, axis=1)
+            llrs[:, k] = max0 - max1
+
+            if method == 'exact':
+                # Exact LLR computed with the log-sum-exp trick
+                llrs[:, k] += np.log(
+                    np.sum(np.exp(metrics0 - max0[:, np.newaxis]), axis=1) /
+                    np.sum(np.exp(metrics1 - max1[:, np.newaxis]), axis=1))
+
+        return llrs
 
     def calcTheoreticalSER(self, SNR):  # pragma: no cover
         """
@@ -402,6 +588,8 @@ class PSK(Modulator):
         # Check if M is a power of 2
         assert 2 ** math.log(M, 2) == M
 
+        self._phaseOffset = phaseOffset
+
         # Generates the constellation
         symbols = self._createConstellation(M, phaseOffset)
 
@@ -449,9 +637,58 @@ class PSK(Modulator):
             A phase offset (in radians) to be applied to the PSK
             constellation.
         """
+        self._phaseOffset = phaseOffset
         self.setConstellation(
             self._createConstellation(self._M, phaseOffset))
 
+    def demodulate(self, receivedData):
+        """
+        Demodulate the data.
+
+        The phase of each received symbol is quantized to the closest
+        phase in the constellation. Received symbols too close to a
+        decision boundary are demodulated by computing their distance to
+        every symbol in the constellation, which gives the same result of
+        :meth:`Modulator.demodulate`.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated.
+
+        Returns
+        -------
+        demodulated_data : np.ndarray
+            The demodulated data.
+        """
+        shape = np.shape(receivedData)
+        reshaped_received_data = np.ravel(receivedData)
+        M = self._M
+
+        # Position (in the constellation created by _createConstellation)
+        # of the closest phase
+        t = ((np.angle(reshaped_received_data) - self._phaseOffset) *
+             M / (2. * PI))
+        rounded_t = np.round(t)
+
+        # Distance to the closest decision boundary
+        magnitude = np.abs(reshaped_received_data)
+        margin = magnitude * (0.5 - np.abs(t - rounded_t)) * 2. * PI / M
+        ambiguous = ~(margin > _DECISION_BOUNDARY_TOL * (1 + magnitude) ** 2)
+
+        # Index in self.symbols of the symbol at each position
+        phases = 2. * PI / M * np.arange(0, M) + self._phaseOffset
+        position_to_index = np.abs(
+            self.symbols[:, np.newaxis] - np.exp(1j * phases)).argmin(axis=0)
+
+        positions = np.mod(np.where(ambiguous, 0, rounded_t), M).astype(int)
+        output = position_to_index[positions]
+        output[ambiguous] = self._demodulate_closest_symbol(
+            reshaped_received_data[ambiguous])
+        output.shape = shape
+
+        return output
+
     # noinspection PyPep8
     def calcTheoreticalSER(self, SNR):
         """Calculates the theoretical (approximation for high M and high
@@ -769,6 +1006,114 @@ class QAM(Modulator):
         # in numpy)
         return np.reshape(index_matrix, L ** 2)
 
+    def demodulate(self, receivedData):
+        """
+        Demodulate the data.
+
+        The real and imaginary parts of each received symbol are sliced
+        independently to find the closest symbol. Received symbols too
+        close to a decision boundary are demodulated by computing their
+        distance to every symbol in the constellation, which gives the
+        same result of :meth:`Modulator.demodulate`.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated.
+
+        Returns
+        -------
+        demodulated_data : np.ndarray
+            The demodulated data.
+        """
+        shape = np.shape(receivedData)
+        reshaped_received_data = np.ravel(receivedData)
+        L = int(round(math.sqrt(self._M)))
+
+        # Scale the received data to the constellation created by
+        # _createConstellation before the normalization, where the
+        # decision boundaries (of each axis) are the even integers
+        average_energy = (self._M - 1) * 2.0 / 3.0
+        x = reshaped_received_data.real * math.sqrt(average_energy)
+        y = reshaped_received_data.imag * math.sqrt(average_energy)
+
+        # The column (real part) and the row (imaginary part) of the
+        # closest symbol are the integer part of tx and ty
+        tx = (x + L) / 2.
+        ty = (L - y) / 2.
+
+        # Distance to the closest decision boundary
+        margin = 2. * np.minimum(
+            np.abs(tx - np.clip(np.round(tx), 1, L - 1)),
+            np.abs(ty - np.clip(np.round(ty), 1, L - 1)))
+        ambiguous = ~(margin > _DECISION_BOUNDARY_TOL * (1 + x ** 2 + y ** 2))
+
+        columns = np.clip(np.where(ambiguous, 0, np.floor(tx)), 0, L - 1)
+        rows = np.clip(np.where(ambiguous, 0, np.floor(ty)), 0, L - 1)
+
+        # Index in self.symbols of each symbol created by
+        # _createConstellation
+        position_to_index = np.argsort(self._calculateGrayMappingIndexQAM(L))
+        output = position_to_index[(rows * L + columns).astype(int)]
+        output[ambiguous] = self._demodulate_closest_symbol(
+            reshaped_received_data[ambiguous])
+        output.shape = shape
+
+        return output
+
+    def _calc_llrs(self, receivedData, noise_var, method):
+        """
+        Calculate the LLRs of the bits of each element in the 1D numpy
+        array `receivedData`.
+
+        For a square QAM the first half of the bits of each symbol only
+        depend on its imaginary part, while the second half only depend on
+        its real part (see :meth:`_calculateGrayMappingIndexQAM`). Since
+        the noise in each axis is independent, both the exact and the
+        max-log LLRs can be calculated for each axis separately using only
+        the `sqrt(M)` levels of that axis.
+
+        Parameters
+        ----------
+        receivedData : np.ndarray
+            Data to be demodulated (1D numpy array).
+        noise_var : float
+            Noise variance (power in linear scale of the complex noise).
+        method : str
+            Either 'exact' or 'maxlog'.
+
+        Returns
+        -------
+        llrs : np.ndarray
+            A 2D numpy array with the LLRs of the bits of each element in
+            `receivedData`.
+        """
+        L = int(round(math.sqrt(self._M)))
+        average_energy = (self._M - 1) * 2.0 / 3.0
+        x = receivedData.real * math.sqrt(average_energy)
+        y = receivedData.imag * math.sqrt(average_energy)
+
+        # Levels of each column (real part) and each row (imaginary part)
+        # in the constellation created by _createConstellation before the
+        # normalization
+        column_levels = -(L - 1) + 2 * np.arange(0, L)
+        row_levels = (L - 1) - 2 * np.arange(0, L)
+
+        # The symbol at row `ii` and column `jj` of the constellation
+        # created by _createConstellation has the index
+        # (binary2gray^-1(ii) << half_bits) + binary2gray^-1(jj)
+        labels = gray2binary(np.arange(0, L))
+
+        scaled_noise_var = noise_var * average_energy
+        column_metrics = -(x[:, np.newaxis] - column_levels) ** 2 / (
+            scaled_noise_var)
+        row_metrics = -(y[:, np.newaxis] - row_levels) ** 2 / (
+            scaled_noise_var)
+
+        return np.hstack(
+            [self._calc_bit_llrs(row_metrics, labels, method),
+             self._calc_bit_llrs(column_metrics, labels, method)])
+
     # noinspection PyPep8
     def _calcTheoreticalSingleCarrierErrorRate(self, SNR):
         """
@@ -5,14 +5,17 @@
 
 from __future__ import division
 
+import json
 import numpy as np
 import os.path
-from collections import Iterable
+import warnings
+from collections import Iterable, MutableMapping
 
 from .parameters import SimulationParameters, combine_simulation_parameters
 from ..util.misc import calc_confidence_interval, equal_dicts, \
     replace_dict_values
-from ..util.serialize import JsonSerializable
+from ..util.serialize import JsonSerializable, NumpyOrSetEncoder, \
+    json_numpy_or_set_obj_hook
 
 try:
     import cPickle as pickle
@@ -103,6 +106,281 @@ def combine_simulation_results(simresults1, simresults2):
     return union
 
 
+def _values_to_numeric_array(values):
+    """
+    Convert `values` into a numeric numpy array, if possible.
+
+    Parameters
+    ----------
+    values : list | np.ndarray
+        The values to convert.
+
+    Returns
+    -------
+    np.ndarray | None
+        The numeric numpy array, or None if `values` cannot be
+        represented as a (non ragged) numeric array.
+    """
+    with warnings.catch_warnings():
+        # Ragged sequences emit a warning (or raise a ValueError in newer
+        # numpy versions) when converted to an array
+        warnings.simplefilter('error')
+        try:
+            array = np.array(values)
+        except (ValueError, TypeError, Warning):
+            return None
+
+    if array.dtype.kind not in 'biufc':
+        return None
+    return array
+
+
+def _numpy_scalar_to_python(value):
+    """
+    Convert a numpy scalar to the equivalent python type.
+
+    Other values (such as numpy arrays) are returned unchanged.
+
+    Parameters
+    ----------
+    value : any
+        The value to convert.
+
+    Returns
+    -------
+    any
+        The converted value.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx _GrowableArray - START xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class _GrowableArray(object):
+    """
+    Numpy array that can grow along its first dimension, similar to a
+    python list.
+
+    Each stored element is a row of the internal array, whose capacity is
+    doubled each time it is full, so that appending an element is done in
+    amortized constant time. Scalars appended one at a time are first
+    kept in a python list and moved to the array only when the stored
+    elements are requested (or other elements are added), so that
+    appending them is as fast as appending to a list. The shape of the
+    rows is the shape of the first stored element and the dtype of the
+    array is chosen from it and promoted as needed (from int to float, for
+    instance). If an element is not numeric or does not have the same shape
+    of the previous ones (or if `dtype` is `object`), then the elements are
+    stored as python objects in a one dimensional array.
+
+    This is used by the :class:`Result` class to store the accumulated
+    values.
+
+    Parameters
+    ----------
+    dtype : np.dtype, optional
+        The dtype of the stored elements. If not provided, it will be
+        chosen from the stored elements.
+
+    Examples
+    --------
+    >>> a = _GrowableArray()
+    >>> a.append(3)
+    >>> a.extend([2, 4.5])
+    >>> len(a)
+    3
+    >>> a.to_array()
+    array([3. , 2. , 4.5])
+    >>> a == [3, 2, 4.5]
+    True
+    >>> b = _GrowableArray()
+    >>> b.append(np.array([1, 2]))
+    >>> b.append(np.array([3, 4]))
+    >>> len(b)
+    2
+    >>> b.to_array()
+    array([[1, 2],
+           [3, 4]])
+    """
+
+    # Scalars of these types appended with `append` are kept in a list and
+    # only moved to the internal array when it is needed
+    _SCALAR_TYPES = frozenset([int, float, complex, np.int32, np.int64,
+                               np.float32, np.float64, np.complex64,
+                               np.complex128])
+
+    def __init__(self, dtype=None):
+        self._dtype = dtype
+        self._data = None
+        self._size = 0
+        # Scalars appended but not yet stored in `_data`
+        self._pending = []
+
+    def __len__(self):
+        return self._size + len(self._pending)
+
+    def _flush(self):
+        """
+        Move the pending scalars to the internal array.
+        """
+        if self._pending:
+            pending = self._pending
+            self._pending = []
+            self.extend(pending)
+
+    def __eq__(self, other):
+        if isinstance(other, _GrowableArray):
+            other = other.tolist()
+        return self.tolist() == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    @staticmethod
+    def _to_object_array(rows):
+        """
+        Create a one dimensional object array with one element for each
+        row in `rows`.
+
+        Parameters
+        ----------
+        rows : list | np.ndarray
+            The rows.
+
+        Returns
+        -------
+        np.ndarray
+            The object array.
+        """
+        if isinstance(rows, np.ndarray):
+            rows = rows.tolist() if rows.ndim == 1 else list(rows)
+        array = np.empty(len(rows), dtype=object)
+        for i, row in enumerate(rows):
+            array[i] = row
+        return array
+
+    def _reserve(self, size, rows):
+        """
+        Make sure the internal array can store `size` elements with the
+        dtype and shape of the elements in `rows`.
+
+        Parameters
+        ----------
+        size : int
+            The total number of elements that must fit in the array.
+        rows : np.ndarray
+            The new elements.
+        """
+        if self._data is None:
+            self._data = np.empty((max(size, 16), ) + rows.shape[1:],
+                                  dtype=rows.dtype)
+            return
+
+        if self._data.dtype == object:
+            new_dtype = object
+        else:
+            new_dtype = np.promote_types(self._data.dtype, rows.dtype)
+
+        if size > len(self._data) or new_dtype != self._data.dtype:
+            capacity = len(self._data)
+            while capacity < size:
+                capacity *= 2
+            data = np.empty((capacity, ) + self._data.shape[1:],
+                            dtype=new_dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def append(self, value):
+        """
+        Append a single element.
+
+        Parameters
+        ----------
+        value : any
+            The element to append.
+        """
+        if type(value) in _GrowableArray._SCALAR_TYPES:
+            self._pending.append(value)
+        else:
+            self.extend([value])
+
+    def extend(self, values):
+        """
+        Append all the elements in `values`.
+
+        Parameters
+        ----------
+        values : list | np.ndarray | _GrowableArray
+            The elements to append. Each element of `values` (each row, if
+            it is a numpy array) is stored as a single element.
+        """
+        if isinstance(values, _GrowableArray):
+            values = values.to_array()
+        if len(values) == 0:
+            return
+        self._flush()
+
+        rows = None
+        if self._dtype != object and (self._data is None
+                                      or self._data.dtype != object):
+            rows = _values_to_numeric_array(values)
+            if rows is not None and self._dtype is not None:
+                rows = rows.astype(self._dtype)
+            if rows is not None and rows.ndim == 0:
+                rows = None
+            if (rows is not None and self._data is not None
+                    and rows.shape[1:] != self._data.shape[1:]):
+                rows = None
+        if rows is None:
+            rows = self._to_object_array(values)
+            if self._data is not None and self._data.dtype != object:
+                self._data = self._to_object_array(self._data[:self._size])
+
+        size = self._size + len(rows)
+        self._reserve(size, rows)
+        self._data[self._size:size] = rows
+        self._size = size
+
+    def to_array(self):
+        """
+        Get a numpy array with the stored elements.
+
+        Returns
+        -------
+        np.ndarray
+            The stored elements (one per row). Note that this is a view of
+            the internal array.
+        """
+        self._flush()
+        if self._data is None:
+            return np.empty(0, dtype=self._dtype)
+        return self._data[:self._size]
+
+    def tolist(self):
+        """
+        Get a list with the stored elements.
+
+        Returns
+        -------
+        list
+            The stored elements. Elements that are numpy arrays are
+            returned as (copies of) numpy arrays.
+        """
+        array = self.to_array()
+        if array.ndim == 1:
+            return array.tolist()
+        return list(array.copy())
+
+
+# xxxxxxxxxx _GrowableArray - END xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx Result - START xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -247,6 +525,12 @@ class Result(JsonSerializable):
         # At each update the square of the current result will be added to
         # this variable.
         self._result_squared_sum = 0.0
+        # Running mean of the results and running sum of squared
+        # differences from the mean (Welford's algorithm). These are used
+        # to calculate the variance, since calculating it from
+        # _result_sum and _result_squared_sum is not numerically stable.
+        self._result_mean = 0.0
+        self._result_m2 = 0.0
         # Number of times the Result object was updated
         self.num_updates = 0
 
@@ -260,8 +544,74 @@ class Result(JsonSerializable):
 
         # Accumulation of values: This is useful for debugging/testing
         self._accumulate_values_bool = accumulate_values
-        self._value_list = []
-        self._total_list = []
+        # The values of MISCTYPE can be anything
+        dtype = object if update_type_code == Result.MISCTYPE else None
+        self._accumulated_values = _GrowableArray(dtype)
+        self._accumulated_totals = _GrowableArray()
+
+        # The functions used to update the Result depend on its type. They
+        # are chosen only once here instead of in each call of update.
+        self._set_update_functions()
+
+    def _set_update_functions(self):
+        """
+        Set the functions used in the `update` and `update_many` methods
+        according to the Result type.
+        """
+        self._update_func, self._update_many_func = \
+            Result._all_update_functions.get(
+                self._update_type_code,
+                (Result._update_invalid_type, Result._update_invalid_type))
+
+    def __getstate__(self):
+        # The update functions are not pickled. They are chosen again
+        # according to the Result type when the object is unpickled.
+        state = dict(self.__dict__)
+        del state['_update_func']
+        del state['_update_many_func']
+        return state
+
+    def __setstate__(self, state):
+        # Result objects pickled with older versions do not have the
+        # running statistics
+        if '_result_m2' not in state:
+            (state['_result_mean'],
+             state['_result_m2']) = Result._running_stats_from_sums(
+                 state['_result_sum'], state['_result_squared_sum'],
+                 state['num_updates'])
+
+        # Result objects pickled with older versions store the accumulated
+        # values as lists
+        if '_value_list' in state:
+            dtype = (object if state['_update_type_code'] == Result.MISCTYPE
+                     else None)
+            state['_accumulated_values'] = _GrowableArray(dtype)
+            state['_accumulated_values'].extend(state.pop('_value_list'))
+            state['_accumulated_totals'] = _GrowableArray()
+            state['_accumulated_totals'].extend(state.pop('_total_list'))
+        self.__dict__.update(state)
+        self._set_update_functions()
+
+    @property
+    def _value_list(self):
+        """List with the accumulated values."""
+        return self._accumulated_values.tolist()
+
+    @_value_list.setter
+    def _value_list(self, values):
+        self._accumulated_values = _GrowableArray(
+            self._accumulated_values._dtype)
+        self._accumulated_values.extend(values)
+
+    @property
+    def _total_list(self):
+        """List with the accumulated totals."""
+        return self._accumulated_totals.tolist()
+
+    @_total_list.setter
+    def _total_list(self, totals):
+        self._accumulated_totals = _GrowableArray()
+        self._accumulated_totals.extend(totals)
 
     def __eq__(self, other):
         """
@@ -466,88 +816,270 @@ class Result(JsonSerializable):
 
         See also
         --------
-        create
+        create, update_many
         """
         self.num_updates += 1
+        self._update_func(self, value, total)
 
-        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-        # Python does not have a switch statement. We use dictionaries as
-        # the equivalent of a switch statement.
-        # First we define a function for each possibility.
-        def __default_update(*_):  # "*_" denotes the two unused args here
-            """Default update method.
+    def update_many(self, values, totals=None):
+        """
+        Update the current value with many samples at once.
 
-            This will only be called when the update type is not one of the
-            available types. Thus, an exception will be raised.
+        This is equivalent to calling :meth:`update` for each element in
+        `values` (and `totals`), but the samples are folded into the
+        Result in a few vectorized operations.
 
-            """
-            msg = "Can't update a Result object of type '{0}'"
-            raise ValueError(msg.format(self._update_type_code))
-
-        def __update_SUMTYPE_value(p_value, _):
-            """Update the Result object when its type is SUMTYPE."""
-            self._value += p_value
-            self._result_sum += p_value
-            self._result_squared_sum += p_value**2
-            if self._accumulate_values_bool is True:
-                self._value_list.append(p_value)
-
-        def __update_RATIOTYPE_value(p_value, p_total):
-            """Update the Result object when its type is RATIOTYPE.
-
-            Raises
-            ------
-            ValueError
-                If the `p_total` parameter is None (not provided).
-            """
-            if p_total is None:
-                msg = ("A 'p_value' and a 'p_total' are required when "
-                       "updating a Result object of the RATIOTYPE type.")
-                raise ValueError(msg)
-
-            self._value += p_value
-            self._total += p_total
-
-            result = p_value / p_total
-            self._result_sum += result
-            self._result_squared_sum += result**2
-
-            if self._accumulate_values_bool is True:
-                self._value_list.append(p_value)
-                self._total_list.append(p_total)
-
-        def __update_by_replacing_current_value(p_value, _):
-            """Update the Result object when its type is MISCTYPE."""
-            self._value = p_value
-            if self._accumulate_values_bool is True:
-                self._value_list.append(p_value)
-
-        def __update_CHOICETYPE_value(p_value, _):
-            """Update the Result object when its type is CHOICETYPE."""
-            # The provided 'p_value' is used as an index to increase the
-            # choice in self._value, which is stored as a numpy array.
-            assert isinstance(p_value, (int, np.int, np.int32, np.int64)), (
-                "Value for the CHOICETYPE must be an integer.")
-
-            self._value[p_value] += 1
-            self._total += 1
-            if self._accumulate_values_bool is True:
-                self._value_list.append(p_value)
-        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        Parameters
+        ----------
+        values : np.ndarray | list
+            The values of each sample.
+        totals : np.ndarray | list
+            The totals of each sample (only useful for the RATIOTYPE
+            update type).
+
+        Examples
+        --------
+        >>> result = Result("name", Result.RATIOTYPE)
+        >>> result.update_many([1, 2, 3], [4, 4, 4])
+        >>> result.num_updates
+        3
+        >>> print(result)
+        Result -> name: 6/12 -> 0.5
+
+        See also
+        --------
+        update
+        """
+        values = np.asarray(values).ravel()
+        if totals is not None:
+            totals = np.asarray(totals).ravel()
+        if values.size == 0:
+            return
+        self._update_many_func(self, values, totals)
+        self.num_updates += values.size
+
+    # xxxxxxxxxx Update functions for each Result type xxxxxxxxxxxxxxxxxxxx
+    # Each Result type has one function used in `update` (that receives a
+    # single value and total) and another one used in `update_many` (that
+    # receives numpy arrays).
+    def _update_invalid_type(self, *_):  # "*_" denotes the unused args
+        """Default update method.
+
+        This will only be called when the update type is not one of the
+        available types. Thus, an exception will be raised.
+
+        """
+        msg = "Can't update a Result object of type '{0}'"
+        raise ValueError(msg.format(self._update_type_code))
 
-        # Now we fill the dictionary with the functions
-        possible_updates = {
-            Result.RATIOTYPE: __update_RATIOTYPE_value,
-            Result.MISCTYPE: __update_by_replacing_current_value,
-            Result.SUMTYPE: __update_SUMTYPE_value,
-            Result.CHOICETYPE: __update_CHOICETYPE_value}
+    @staticmethod
+    def _running_stats_from_sums(result_sum, result_squared_sum, n):
+        """
+        Calculate the running mean and the sum of squared differences from
+        the mean from the sum and the squared sum of the results.
+
+        This is only used for Result objects saved with older versions,
+        which did not store the running statistics.
+
+        Parameters
+        ----------
+        result_sum : float
+            The sum of the results.
+        result_squared_sum : float
+            The sum of the squared results.
+        n : int
+            The number of results.
+
+        Returns
+        -------
+        (float, float)
+            The mean and the sum of squared differences from the mean.
+        """
+        if n == 0:
+            return 0.0, 0.0
+        mean = result_sum / n
+        return mean, max(result_squared_sum - n * mean**2, 0.0)
+
+    def _update_running_stats(self, result):
+        """
+        Update the running mean and the sum of squared differences from the
+        mean with a single result (Welford's algorithm).
 
-        # Call the appropriated update method. If self._update_type_code
-        #  does not contain a key in the possible_updates dictionary (
-        # that is, a valid update type), then the function
-        # __default_update is called.
-        possible_updates.get(self._update_type_code,
-                             __default_update)(value, total)
+        Parameters
+        ----------
+        result : float
+            The new result. Note that `num_updates` must already account
+            for it.
+        """
+        delta = result - self._result_mean
+        self._result_mean += delta / self.num_updates
+        self._result_m2 += delta * (result - self._result_mean)
+
+    def _merge_running_stats(self, n_a, n_b, mean_b, m2_b):
+        """
+        Merge the running statistics of `n_b` other results into the
+        running statistics of the `n_a` results in self (Chan's parallel
+        algorithm).
+
+        Parameters
+        ----------
+        n_a : int
+            Number of results in self.
+        n_b : int
+            Number of other results.
+        mean_b : float
+            Mean of the other results.
+        m2_b : float
+            Sum of squared differences from the mean of the other results.
+        """
+        n = n_a + n_b
+        if n == 0:
+            return
+        delta = mean_b - self._result_mean
+        self._result_mean += delta * n_b / n
+        self._result_m2 += m2_b + delta**2 * n_a * n_b / n
+
+    def _update_many_running_stats(self, results):
+        """
+        Update the running statistics with many results at once.
+
+        Parameters
+        ----------
+        results : np.ndarray
+            The new results. Note that `num_updates` must NOT account for
+            them yet.
+        """
+        mean_b = results.mean()
+        m2_b = np.sum(np.abs(results - mean_b)**2)
+        self._merge_running_stats(self.num_updates, results.size,
+                                  mean_b.item(), m2_b.item())
+
+    def _update_SUMTYPE_value(self, p_value, _):
+        """Update the Result object when its type is SUMTYPE."""
+        self._value += p_value
+        self._result_sum += p_value
+        self._result_squared_sum += p_value**2
+        self._update_running_stats(p_value)
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.append(p_value)
+
+    def _update_many_SUMTYPE_values(self, p_values, _):
+        """Update the Result object with many values (SUMTYPE)."""
+        if p_values.dtype.kind == 'b':
+            # The dot product of boolean arrays is a boolean
+            p_values = p_values.astype(int)
+        values_sum = p_values.sum().item()
+        self._value += values_sum
+        self._result_sum += values_sum
+        self._result_squared_sum += np.dot(p_values, p_values).item()
+        self._update_many_running_stats(p_values)
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.extend(p_values)
+
+    @staticmethod
+    def _check_ratio_total(p_total):
+        """
+        Raises
+        ------
+        ValueError
+            If the `p_total` parameter is None (not provided).
+        """
+        if p_total is None:
+            msg = ("A 'p_value' and a 'p_total' are required when "
+                   "updating a Result object of the RATIOTYPE type.")
+            raise ValueError(msg)
+
+    def _update_RATIOTYPE_value(self, p_value, p_total):
+        """Update the Result object when its type is RATIOTYPE.
+
+        Raises
+        ------
+        ValueError
+            If the `p_total` parameter is None (not provided).
+        """
+        Result._check_ratio_total(p_total)
+
+        self._value += p_value
+        self._total += p_total
+
+        result = p_value / p_total
+        self._result_sum += result
+        self._result_squared_sum += result**2
+        self._update_running_stats(result)
+
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.append(p_value)
+            self._accumulated_totals.append(p_total)
+
+    def _update_many_RATIOTYPE_values(self, p_values, p_totals):
+        """Update the Result object with many values (RATIOTYPE).
+
+        Raises
+        ------
+        ValueError
+            If the `p_totals` parameter is None (not provided).
+        """
+        Result._check_ratio_total(p_totals)
+        if p_totals.size != p_values.size:
+            raise ValueError("'values' and 'totals' must have the same size")
+
+        self._value += p_values.sum().item()
+        self._total += p_totals.sum().item()
+
+        results = p_values / p_totals
+        self._result_sum += results.sum().item()
+        self._result_squared_sum += np.dot(results, results).item()
+        self._update_many_running_stats(results)
+
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.extend(p_values)
+            self._accumulated_totals.extend(p_totals)
+
+    def _update_by_replacing_current_value(self, p_value, _):
+        """Update the Result object when its type is MISCTYPE."""
+        self._value = p_value
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.append(p_value)
+
+    def _update_many_by_replacing_current_value(self, p_values, _):
+        """Update the Result object with many values (MISCTYPE)."""
+        self._value = p_values[-1:].tolist()[0]
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.extend(p_values)
+
+    def _update_CHOICETYPE_value(self, p_value, _):
+        """Update the Result object when its type is CHOICETYPE."""
+        # The provided 'p_value' is used as an index to increase the
+        # choice in self._value, which is stored as a numpy array.
+        assert isinstance(p_value, (int, np.integer)), (
+            "Value for the CHOICETYPE must be an integer.")
+
+        self._value[p_value] += 1
+        self._total += 1
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.append(p_value)
+
+    def _update_many_CHOICETYPE_values(self, p_values, _):
+        """Update the Result object with many values (CHOICETYPE)."""
+        assert p_values.dtype.kind in 'iu', (
+            "Values for the CHOICETYPE must be integers.")
+        if p_values.min() < 0 or p_values.max() >= self._value.size:
+            raise IndexError("Invalid choice for the CHOICETYPE")
+
+        self._value += np.bincount(p_values, minlength=self._value.size)
+        self._total += p_values.size
+        if self._accumulate_values_bool is True:
+            self._accumulated_values.extend(p_values)
+
+    _all_update_functions = {
+        SUMTYPE: (_update_SUMTYPE_value, _update_many_SUMTYPE_values),
+        RATIOTYPE: (_update_RATIOTYPE_value, _update_many_RATIOTYPE_values),
+        MISCTYPE: (_update_by_replacing_current_value,
+                   _update_many_by_replacing_current_value),
+        CHOICETYPE: (_update_CHOICETYPE_value,
+                     _update_many_CHOICETYPE_values),
+    }
+    # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
     def merge(self, other):
         """
@@ -574,9 +1106,11 @@ class Result(JsonSerializable):
                    "accumulate values.")
             assert other.accumulate_values_bool is True, msg
 
-            self._value_list.extend(other._value_list)
-            self._total_list.extend(other._total_list)
+            self._accumulated_values.extend(other._accumulated_values)
+            self._accumulated_totals.extend(other._accumulated_totals)
 
+        self._merge_running_stats(self.num_updates, other.num_updates,
+                                  other._result_mean, other._result_m2)
         self.num_updates += other.num_updates
         self._value += other._value
         self._total += other._total
@@ -606,23 +1140,23 @@ class Result(JsonSerializable):
 
     def get_result_accumulated_values(self):  # pragma: no cover
         """
-        Return the accumulated values.
+        Return the accumulated values (as a list).
 
         Note that in case the result if of type RATIOTYPE this you probably
         want to call the get_result_accumulated_totals function to also get
         the totals.
         """
-        return self._value_list
+        return self._accumulated_values.tolist()
 
     def get_result_accumulated_totals(self):  # pragma: no cover
         """
-        Return the accumulated values.
+        Return the accumulated totals (as a list).
 
         Note that in case the result if of type RATIOTYPE this you probably
         want to call the get_result_accumulated_values function to also get
         the values.
         """
-        return self._total_list
+        return self._accumulated_totals.tolist()
 
     def get_result_mean(self):
         """Get the mean of all the updated results.
@@ -634,12 +1168,16 @@ class Result(JsonSerializable):
         """
         # self._fix_old_version()  # Remove this line in the future
 
-        return self._result_sum / self.num_updates
+        return self._result_mean
 
     def get_result_var(self):
         """
         Get the variance of all updated results.
 
+        The variance is calculated from running statistics updated with
+        Welford's algorithm (and merged with Chan's algorithm), which is
+        numerically stable even for a large number of very small results.
+
         Returns
         -------
         float
@@ -647,8 +1185,7 @@ class Result(JsonSerializable):
         """
         # self._fix_old_version()  # Remove this line in the future
 
-        return ((self._result_squared_sum / self.num_updates) -
-                (self.get_result_mean())**2)
+        return self._result_m2 / self.num_updates
 
     def get_confidence_interval(self, P=95):
         """
@@ -698,6 +1235,8 @@ class Result(JsonSerializable):
              'total': self._total,
              'result_sum': self._result_sum,
              'result_squared_sum': self._result_squared_sum,
+             'result_mean': self._result_mean,
+             'result_m2': self._result_m2,
              'num_updates': self.num_updates,
              'accumulate_values_bool': self._accumulate_values_bool,
              'value_list': self._value_list,
@@ -741,60 +1280,149 @@ class Result(JsonSerializable):
             r.num_updates = d['num_updates']
             r._result_sum = d['result_sum']
             r._result_squared_sum = d['result_squared_sum']
+            if 'result_m2' in d:
+                r._result_mean = d['result_mean']
+                r._result_m2 = d['result_m2']
+            else:
+                r._result_mean, r._result_m2 = \
+                    Result._running_stats_from_sums(
+                        r._result_sum, r._result_squared_sum, r.num_updates)
         return r
 
-    # # TODO: Save the _value_list, _total_list and _accumulate_values_bool
-    # # variables
-    # @staticmethod
-    # def save_to_hdf5_dataset(parent, results_list):
-    #     """
-    #     Create an HDF5 dataset in `parent` and fill it with the Result
-    #     objects
-    #     in `results_list`.
-
-    #     Parameters
-    #     ----------
-    #     parent : An HDF5 group (usually) or file.
-    #         The parent that will contain the dataset.
-    #     results_list : A python list of Result objects.
-    #         A list of Result objects. All of these objects must have the
-    #         same name and update type.
-
-    #     Notes
-    #     -----
-    #     This method is called from the save_to_hdf5_file method in the
-    #     SimulationResults class. It uses the python h5py library and
-    #     `parent` is supposed to be an HDF5 group created with that
-    #     library.
-
-    #     See also
-    #     --------
-    #     load_from_hdf5_dataset
-    #     """
-    #     # When using the hdf5 format to save the Result object it is not
-    #     # possible to save the accumulated values (if there is any)
-    #     if results_list[0]._accumulate_values_bool is True:
-    #         warnings.warn(
-    #        'Cannot save the accumulated values in'
-    #        ' a Result to an hdf5 file.')
-
-    #     dtype=[('_value', float),('_total', float),('num_updates', int),
-    #              ('_result_sum', float), ('_result_squared_sum', float)]
-    #     name = results_list[0].name
-    #     size = len(results_list)
-    #     ds = parent.create_dataset(name, shape=(size,), dtype=dtype)
+    @staticmethod
+    def _results_to_columns(results_list):
+        """
+        Convert a list of Result objects into columns.
 
-    #     r = None
-    #     for i, r in enumerate(results_list):
-    #         # pylint: disable=W0212
-    #         ds[i] = (r._value, r._total, r.num_updates, r._result_sum,
-    #                  r._result_squared_sum)
+        Each attribute of the Result objects (value, total, sums, number
+        of updates, etc) is stored as a single numpy array with one
+        element per Result object. The accumulated values (if any) of all
+        Result objects are concatenated into a single array and the
+        offsets of each Result object in it are stored in another array.
 
-    #     if r is not None:
-    #         ds.attrs.create('update_type_code', data=r.type_code)
-    #     # Save the TITTLE attribute to be more consistent with what
-    #     # Pytables would do.
-    #     ds.attrs.create("TITLE", name)
+        Parameters
+        ----------
+        results_list : list[Result]
+            A list of Result objects. All of these objects must have the
+            same name and update type.
+
+        Returns
+        -------
+        (dict, dict)
+            The first dictionary maps the name of each column to a numpy
+            array. The second dictionary contains the Result type and the
+            columns that could not be stored as numeric arrays (such as
+            the values of a MISCTYPE Result holding strings), encoded as
+            json strings.
+
+        See also
+        --------
+        _results_from_columns
+        """
+        first = results_list[0]
+        columns = {}
+        meta = {'update_type_code': first.type_code,
+                'accumulate_values': first.accumulate_values_bool,
+                'json_columns': {}}
+
+        def add_column(column_name, values):
+            """Add a column, encoded as json if it is not numeric."""
+            array = _values_to_numeric_array(values)
+            if array is None:
+                meta['json_columns'][column_name] = json.dumps(
+                    list(values), cls=NumpyOrSetEncoder)
+            else:
+                columns[column_name] = array
+
+        # pylint: disable=W0212
+        add_column('value', [r._value for r in results_list])
+        add_column('total', [r._total for r in results_list])
+        columns['result_sum'] = np.array(
+            [r._result_sum for r in results_list], dtype=float)
+        columns['result_squared_sum'] = np.array(
+            [r._result_squared_sum for r in results_list], dtype=float)
+        columns['result_mean'] = np.array(
+            [r._result_mean for r in results_list], dtype=float)
+        columns['result_m2'] = np.array(
+            [r._result_m2 for r in results_list], dtype=float)
+        columns['num_updates'] = np.array(
+            [r.num_updates for r in results_list], dtype=int)
+
+        if first.accumulate_values_bool:
+            for column_name in ['accumulated_values', 'accumulated_totals']:
+                lists = [getattr(r, '_' + column_name).tolist()
+                         for r in results_list]
+                columns[column_name + '_offsets'] = np.cumsum(
+                    [0] + [len(l) for l in lists])
+                add_column(column_name, [v for l in lists for v in l])
+
+        return columns, meta
+
+    @staticmethod
+    def _results_from_columns(name, meta, get_column):
+        """
+        Create a list of Result objects from columns.
+
+        Parameters
+        ----------
+        name : str
+            The name of the Result objects.
+        meta : dict
+            The Result type and the json encoded columns, as returned by
+            `_results_to_columns`.
+        get_column : callable
+            Function that receives the name of a column and returns it
+            (the json encoded columns in `meta` are already decoded).
+
+        Returns
+        -------
+        list[Result]
+            The list of Result objects.
+
+        See also
+        --------
+        _results_to_columns
+        """
+        update_type_code = meta['update_type_code']
+        accumulate_values = meta['accumulate_values']
+        values = get_column('value')
+        totals = get_column('total')
+        result_sums = get_column('result_sum')
+        result_squared_sums = get_column('result_squared_sum')
+        result_means = get_column('result_mean')
+        result_m2s = get_column('result_m2')
+        num_updates = get_column('num_updates')
+
+        if accumulate_values:
+            accumulated_values = get_column('accumulated_values')
+            values_offsets = get_column('accumulated_values_offsets')
+            accumulated_totals = get_column('accumulated_totals')
+            totals_offsets = get_column('accumulated_totals_offsets')
+
+        results_list = []
+        for i in range(len(num_updates)):
+            choice_num = None
+            if update_type_code == Result.CHOICETYPE:
+                choice_num = len(values[i])
+            r = Result(name, update_type_code, accumulate_values, choice_num)
+            # pylint: disable=W0212
+            r._value = _numpy_scalar_to_python(values[i])
+            r._total = _numpy_scalar_to_python(totals[i])
+            r._result_sum = float(result_sums[i])
+            r._result_squared_sum = float(result_squared_sums[i])
+            r._result_mean = float(result_means[i])
+            r._result_m2 = float(result_m2s[i])
+            r.num_updates = int(num_updates[i])
+            if accumulate_values:
+                r._accumulated_values.extend(
+                    accumulated_values[values_offsets[i]:
+                                       values_offsets[i + 1]])
+                r._accumulated_totals.extend(
+                    accumulated_totals[totals_offsets[i]:
+                                       totals_offsets[i + 1]])
+            results_list.append(r)
+
+        return results_list
 
     # # TODO: Save the _value_list, _total_list and _accumulate_values_bool
     # # variables
@@ -827,50 +1455,222 @@ class Result(JsonSerializable):
     #     pytables_file.setNodeAttr(table, 'update_type_code', r.type_code)
     #     table.flush()
 
-    # @staticmethod
-    # def load_from_hdf5_dataset(ds):
-    #     """Load a list of Result objects from an HDF5 dataset.
+# xxxxxxxxxx Result - END xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
-    #     This dataset was supposedly saved with the save_to_hdf5_dataset
-    #     function.
 
-    #     Parameters
-    #     ----------
-    #     ds : An HDF5 Dataset
-    #         The dataset to be loaded.
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx Columnar storage - START xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class _NpzColumnReader(object):
+    """
+    Read the columns of a SimulationResults object saved in a '.npz' file.
 
-    #     Returns
-    #     -------
-    #     results_list : A list of Result objects.
-    #         The list of Result objects loaded from the dataset.
+    The file is opened each time a column is read, and only the desired
+    column is read from it.
 
-    #     Notes
-    #     -----
-    #     This method is called from the load_from_hdf5_file method in the
-    #     SimulationResults class. It uses the python h5py library and
-    #     `ds` is supposed to be an HDF5 dataset created with that library.
+    Parameters
+    ----------
+    filename : str
+        The name of the '.npz' file.
+    """
 
-    #     See also
-    #     --------
-    #     save_to_hdf5_dataset
+    def __init__(self, filename):
+        self.filename = filename
 
-    #     """
-    #     results_list = []
-
-    #     name = ds.name.split('/')[-1]
-    #     update_type_code = ds.attrs['update_type_code']
-    #     for data in ds:
-    #         r = Result.create(name,
-    #                           update_type_code,
-    #                           data['_value'],
-    #                           data['_total'])
-    #         r.num_updates = data['num_updates']
-    #         r._result_sum = data['_result_sum']
-    #         r._result_squared_sum = data['_result_squared_sum']
-    #         results_list.append(r)
-    #     return results_list
+    def read_metadata(self):
+        """
+        Read the metadata (json encoded) stored in the file.
 
-# xxxxxxxxxx Result - END xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        Returns
+        -------
+        str
+            The json encoded metadata.
+        """
+        return str(self('metadata'))
+
+    def __call__(self, key):
+        """
+        Read the column with name `key`.
+
+        Parameters
+        ----------
+        key : str
+            The name of the column.
+
+        Returns
+        -------
+        np.ndarray
+            The column.
+        """
+        with np.load(self.filename) as data:
+            return data[key]
+
+
+class _Hdf5ColumnReader(object):
+    """
+    Read the columns of a SimulationResults object saved in an HDF5 file.
+
+    The file is opened each time a column is read, and only the desired
+    dataset is read from it. This requires the h5py library.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the HDF5 file.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def read_metadata(self):
+        """
+        Read the metadata (json encoded) stored in the file.
+
+        Returns
+        -------
+        str
+            The json encoded metadata.
+        """
+        import h5py
+        with h5py.File(self.filename, 'r') as fid:
+            metadata = fid.attrs['metadata']
+        if isinstance(metadata, bytes):  # pragma: no cover
+            metadata = metadata.decode('utf-8')
+        return metadata
+
+    def __call__(self, key):
+        """
+        Read the dataset with name `key`.
+
+        Parameters
+        ----------
+        key : str
+            The name of the dataset.
+
+        Returns
+        -------
+        np.ndarray
+            The dataset contents.
+        """
+        import h5py
+        with h5py.File(self.filename, 'r') as fid:
+            return fid[key][()]
+
+
+class _ColumnarResults(MutableMapping):
+    """
+    Dictionary of lists of Result objects loaded lazily from a file.
+
+    This is used to store the results of a :class:`SimulationResults`
+    object loaded from a columnar ('.npz' or HDF5) file. The list of Result
+    objects with a given name is only created (reading the columns from the
+    file) when it is accessed for the first time. The
+    :meth:`get_result_values` method can get the result values directly
+    from the columns, without creating any Result object.
+
+    When pickled, this is converted into a regular dictionary.
+
+    Parameters
+    ----------
+    reader : _NpzColumnReader | _Hdf5ColumnReader
+        Object used to read the columns from the file.
+    names : list[str]
+        The names of the results stored in the file.
+    meta : dict
+        Dictionary mapping each result name to its metadata (see
+        :meth:`Result._results_to_columns`).
+    """
+
+    def __init__(self, reader, names, meta):
+        self._reader = reader
+        self._names = list(names)
+        self._meta = meta
+        self._loaded = {}
+
+    def __reduce__(self):
+        return dict, (list(self.items()),)
+
+    def _get_column(self, name, column_name):
+        """
+        Get the column `column_name` of the result with name `name`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the result.
+        column_name : str
+            The name of the column.
+
+        Returns
+        -------
+        np.ndarray | list
+            The column. Columns that were json encoded are returned as a
+            list.
+        """
+        json_columns = self._meta[name]['json_columns']
+        if column_name in json_columns:
+            return json.loads(json_columns[column_name],
+                              object_hook=json_numpy_or_set_obj_hook)
+        return self._reader('results/{0}/{1}'.format(name, column_name))
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            if name not in self._names:
+                raise KeyError(name)
+            self._loaded[name] = Result._results_from_columns(
+                name, self._meta[name],
+                lambda column_name: self._get_column(name, column_name))
+        return self._loaded[name]
+
+    def __setitem__(self, name, value):
+        if name not in self._names:
+            self._names.append(name)
+        self._loaded[name] = value
+
+    def __delitem__(self, name):
+        self._names.remove(name)
+        self._loaded.pop(name, None)
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def get_result_values(self, name):
+        """
+        Get the values of the results with name `name`.
+
+        This is equivalent to calling `get_result` of each Result object
+        in `self[name]`, but if these Result objects were not created yet
+        only the required columns are read.
+
+        Parameters
+        ----------
+        name : str
+            The name of the result.
+
+        Returns
+        -------
+        list
+            The value of each Result object.
+        """
+        if name in self._loaded or name not in self._names:
+            return [r.get_result() for r in self[name]]
+
+        update_type_code = self._meta[name]['update_type_code']
+        values = self._get_column(name, 'value')
+        num_updates = self._get_column(name, 'num_updates')
+        if update_type_code in (Result.RATIOTYPE, Result.CHOICETYPE):
+            totals = np.asarray(self._get_column(name, 'total'))
+            if update_type_code == Result.CHOICETYPE:
+                totals = totals[:, np.newaxis]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.asarray(values) / totals
+
+        return [_numpy_scalar_to_python(v) if n > 0 else "Nothing yet"
+                for v, n in zip(values, num_updates)]
+# xxxxxxxxxx Columnar storage - END xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1287,15 +2087,21 @@ class SimulationResults(JsonSerializable):
         if fixed_params is None:
             fixed_params = {}
 
+        if isinstance(self._results, _ColumnarResults):
+            # Results loaded from a columnar file. Only the needed columns
+            # are read (no Result object is created).
+            values = self._results.get_result_values(result_name)
+        else:
+            values = [v.get_result() for v in self[result_name]]
+
         # If the dictionary is not empty
         if fixed_params:
             indexes = self.params.get_pack_indexes(fixed_params)
-            out = [v.get_result() for i, v in enumerate(self[result_name])
-                   if i in indexes]
+            out = [v for i, v in enumerate(values) if i in indexes]
         else:
             # If fixed_params is an empty dictionary (default value) then
             # we return the full list of results
-            out = [v.get_result() for v in self[result_name]]
+            out = values
         return out
 
     def get_result_values_confidence_intervals(self,
@@ -1550,6 +2356,81 @@ class SimulationResults(JsonSerializable):
         with open(filename, 'w') as output:
             output.write(self.to_json())
 
+    def _to_columns(self):
+        """
+        Convert the SimulationResults object to a columnar representation.
+
+        Returns
+        -------
+        (dict, dict)
+            The first dictionary maps the name of each column (in the form
+            "results/<result name>/<column name>") to a numpy array. The
+            second dictionary contains everything else (parameters, result
+            types, etc) and can be encoded as json.
+        """
+        columns = {}
+        results_meta = {}
+        for name in self.get_result_names():
+            result_columns, results_meta[name] = \
+                Result._results_to_columns(self[name])
+            for column_name, column in result_columns.items():
+                columns['results/{0}/{1}'.format(name, column_name)] = column
+
+        meta = {'params': self._params.to_dict(),
+                'runned_reps': self.runned_reps,
+                'original_filename': self.original_filename,
+                'result_names': list(self.get_result_names()),
+                'results': results_meta}
+        return columns, meta
+
+    def _save_to_npz(self, filename):
+        """
+        Save the SimulationResults object to the '.npz' file with name
+        `filename`.
+
+        Each Result attribute is stored as a separated array (see
+        :meth:`Result._results_to_columns`).
+
+        Parameters
+        ----------
+        filename : src
+            Name of the file to save the SimulationResults object.
+        """
+        columns, meta = self._to_columns()
+        columns['metadata'] = np.array(
+            json.dumps(meta, cls=NumpyOrSetEncoder))
+        # Passing a file object prevents numpy from changing the extension
+        with open(filename, 'wb') as output:
+            np.savez(output, **columns)
+
+    def _save_to_hdf5(self, filename):
+        """
+        Save the SimulationResults object to the HDF5 file with name
+        `filename`.
+
+        Each Result attribute is stored as a separated dataset (see
+        :meth:`Result._results_to_columns`). This requires the h5py library.
+
+        Parameters
+        ----------
+        filename : src
+            Name of the file to save the SimulationResults object.
+        """
+        # We import it here to avoid import errors when h5py is not
+        # installed and the HDF5 format is not used.
+        import h5py
+
+        # All columns are created before opening the file, since this
+        # object might have been loaded (lazily) from the same file.
+        columns, meta = self._to_columns()
+        with h5py.File(filename, 'w') as fid:
+            # Save the TITTLE attribute to be more consistent with what
+            # Pytables would do.
+            fid.attrs.create("TITLE", "Simulation Results file")
+            fid.attrs['metadata'] = json.dumps(meta, cls=NumpyOrSetEncoder)
+            for key, column in columns.items():
+                fid.create_dataset(key, data=column)
+
     def save_to_file(self, filename):
         """
         Save the SimulationResults to the file `filename`.
@@ -1564,7 +2445,12 @@ class SimulationResults(JsonSerializable):
             placements for replacements of simulation parameters. For
             instance, is `filename` is "somename_{age}.pickle" and the
             value of an 'age' parameter is '3', then the actual name used
-            to save the file will be "somename_3.pickle"
+            to save the file will be "somename_3.pickle". The file format
+            is chosen from the extension, which can be '.pickle' (default),
+            '.json', '.npz' or '.h5' (requires the h5py library). The
+            '.npz' and '.h5' formats store each Result attribute as a
+            separated array and are much faster to load for a large number
+            of parameter variations.
 
         Returns
         -------
@@ -1588,11 +2474,19 @@ class SimulationResults(JsonSerializable):
 
         # xxxxxxxxxx Finally save to the appropriated file xxxxxxxxxxxxxxxx
         ext_to_save_func_mapping = {'.pickle': self._save_to_pickle,
-                                    '.json': self._save_to_json}
+                                    '.json': self._save_to_json,
+                                    '.npz': self._save_to_npz,
+                                    '.h5': self._save_to_hdf5,
+                                    '.hdf5': self._save_to_hdf5}
         save_func = ext_to_save_func_mapping[ext]
 
-        # Save the SimulationResults to the file with the desired format
-        save_func(filename)
+        # Save the SimulationResults to a temporary file with the desired
+        # format, which then replaces `filename`. This way `filename` is
+        # never left partially written if the process is killed while
+        # saving.
+        temp_filename = '{0}.tmp'.format(filename)
+        save_func(temp_filename)
+        os.replace(temp_filename, filename)
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
         return filename
@@ -1630,6 +2524,44 @@ class SimulationResults(JsonSerializable):
         obj = SimulationResults.from_json(json_data)
         return obj
 
+    @staticmethod
+    def _load_from_columnar_file(reader):
+        """
+        Load a SimulationResults object from a columnar file.
+
+        Only the metadata is read here. The Result objects are created
+        when they are accessed for the first time.
+
+        Parameters
+        ----------
+        reader : _NpzColumnReader | _Hdf5ColumnReader
+            Object used to read the columns from the file.
+
+        Returns
+        -------
+        SimulationResults
+            The SimulationResults object.
+        """
+        meta = json.loads(reader.read_metadata(),
+                          object_hook=json_numpy_or_set_obj_hook)
+        simresults = SimulationResults()
+        simresults._params = SimulationParameters.from_dict(meta['params'])
+        simresults.runned_reps = meta['runned_reps']
+        simresults.original_filename = meta['original_filename']
+        simresults._results = _ColumnarResults(
+            reader, meta['result_names'], meta['results'])
+        return simresults
+
+    @staticmethod
+    def _load_from_npz_file(filename):
+        return SimulationResults._load_from_columnar_file(
+            _NpzColumnReader(filename))
+
+    @staticmethod
+    def _load_from_hdf5_file(filename):
+        return SimulationResults._load_from_columnar_file(
+            _Hdf5ColumnReader(filename))
+
     @staticmethod
     def load_from_file(filename):
         """
@@ -1644,95 +2576,25 @@ class SimulationResults(JsonSerializable):
         -------
         SimulationResults
             The SimulationResults object loaded from the file `filename`.
+
+        Notes
+        -----
+        For the columnar formats ('.npz' and '.h5') the results are read
+        lazily: a column is only read from the file when it is needed.
+        Therefore the file should not be removed or changed while the
+        returned object is in use.
         """
         ext = os.path.splitext(filename)[-1]
         ext_to_load_func_mapping = {
             '.pickle': SimulationResults._load_from_pickle_file,
-            '.json': SimulationResults._load_from_json_file}
+            '.json': SimulationResults._load_from_json_file,
+            '.npz': SimulationResults._load_from_npz_file,
+            '.h5': SimulationResults._load_from_hdf5_file,
+            '.hdf5': SimulationResults._load_from_hdf5_file}
         load_func = ext_to_load_func_mapping[ext]
 
         return load_func(filename)
 
-    # def save_to_hdf5_file(self, filename, attrs=None):
-    #     """
-    #     Save the SimulationResults to the file `filename` using the HDF5
-    #     format standard.
-
-    #     The string in `filename` can have placeholders for string
-    #     replacements with any parameter value.
-
-    #     Parameters
-    #     ----------
-    #     filename : src
-    #         Name of the file to save the results. This can have string
-    #         placements for replacements of simulation parameters. For
-    #         instance, is `filename` is "somename_{age}.pickle" and the
-    #         value of an 'age' parameter is '3', then the actual name used
-    #         to save the file will be "somename_3.pickle"
-    #     attrs : a dictionary
-    #         Extra attributes to add to the HDF5 file.
-
-    #     Returns
-    #     -------
-    #     new_filename : string
-    #         The name of the file where the results were saved. This will
-    #         be equivalent to `filename` after string replacements (with
-    #         the simulation parameters) are done.
-
-    #     See also
-    #     --------
-    #     load_from_hdf5_file
-    #     """
-    #     # Get the file extension (if there is any). If it is not equal to
-    #     # '.pickle' that means we need to add the '.pickle' extension.
-    #     ext = os.path.splitext(filename)[-1]
-    #     if ext != '.h5':
-    #         filename = '{0}.h5'.format(filename)
-
-    #     # Save the original filename before string replacements
-    #     self.original_filename = filename
-
-    #     filename = self.get_filename_with_replaced_params(filename)
-
-    #     if attrs is None:
-    #         attrs = {}
-
-    #     import h5py
-    #     fid = h5py.File(filename, 'w')
-
-    #     # Save the TITTLE attribute to be more consistent with what
-    #     # Pytables would do.
-    #     fid.attrs.create("TITLE", "Simulation Results file")
-
-    #     # Save the original_filename variable
-    #     fid.attrs.create("original_filename", self.original_filename)
-
-    #     # Add the attributes, if any
-    #     if isinstance(attrs, dict):  # pragma: no cover
-    #         # attr is a dictionary of attributes
-    #         for name, value in attrs.items():
-    #             fid.attrs.create(name, value)
-
-    #     # xxxxxxxxxx Save the results in the 'results' group xxxxxxxxxxxx
-    #     g = fid.create_group('results')
-    #     # Save the TITTLE attribute to be more consistent with what
-    #     # Pytables would do.
-    #     g.attrs.create("TITLE", "Simulation Results")
-    #     for r in self:
-    #         Result.save_to_hdf5_dataset(g, r)
-    #     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-
-    #     # xxxxxxxxxx Save the parameters in the 'parameters' group xxxxxx
-    #     pg = fid.create_group('parameters')
-    #     # Save the TITTLE attribute to be more consistent with what
-    #     # Pytables would do.
-    #     pg.attrs.create("TITLE", "Simulation Parameters")
-    #     self.params.save_to_hdf5_group(pg)
-    #     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-
-    #     fid.close()
-    #     return filename
-
     # # TODO: Test if this method saves all the information that the
     # # save_to_hdf5_file method saves.
     # def save_to_pytables_file(self, filename, attrs=None):
@@ -1766,59 +2628,6 @@ class SimulationResults(JsonSerializable):
 
     #     fid.close()
 
-    # @staticmethod
-    # def load_from_hdf5_file(filename):
-    #     """Load a SimulationResults object from an HDF5 file saved with
-    #     the save_to_hdf5_file method.
-
-    #     Parameters
-    #     ----------
-    #     filename : src
-    #         Name of the file from which the SimulationResults should be
-    #         loaded.
-
-    #     Returns
-    #     -------
-    #     simresults : A SimulationResults object.
-    #         The SimulationResults object loaded from the file.
-
-    #     See also
-    #     --------
-    #     save_to_hdf5_file
-    #     """
-    #     simresults = SimulationResults()
-
-    #     import h5py
-    #     fid = h5py.File(filename, 'r')
-
-    #     # Get the original filename variable
-    #     simresults.original_filename = fid.attrs['original_filename']
-
-    #     # xxxxxxxxxx Results group xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-    #     rg = fid['results']
-
-    #     for result_name in rg:
-    #         ds = rg[result_name]
-    #         # simresults._results[result_name] \
-    #         #     = Result.load_from_hdf5_dataset(ds)
-    #         result = Result.load_from_hdf5_dataset(ds)[-1]
-    #         simresults.add_result(result)
-    #     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-
-    #     # xxxxxxxxxx Parameters group xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-    #     try:
-    #         # We only set the simulation parameters if it was stored in
-    #         # the hdf5 file.
-    #         pg = fid['parameters']
-    #         simresults.set_parameters(
-    #             SimulationParameters.load_from_hdf5_group(pg))
-    #     except KeyError:  # pragma: no cover
-    #         pass
-
-    #     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
-    #     fid.close()
-    #     return simresults
-
     def to_dataframe(self):
         """
         Convert the SimulationResults object to a pandas DataFrame.
@@ -1829,9 +2638,8 @@ class SimulationResults(JsonSerializable):
         for name in self.params:
             data[name] = [a[name] for a in all_params_list]
 
-        for res in self:
-            name = res[0].name
-            data[name] = [r.get_result() for r in res]
+        for name in self.get_result_names():
+            data[name] = self.get_result_values_list(name)
 
         try:
             data['runned_reps'] = self.runned_reps
@@ -6,8 +6,20 @@
 from time import time
 import sys
 import os
+import copy
 import itertools
 import argparse
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import concurrent.futures
+
+import numpy as np
+
+try:
+    import cPickle as pickle
+except ImportError:  # pragma: no cover
+    import pickle
 
 try:
     # noinspection PyUnresolvedReferences
@@ -20,10 +32,11 @@ from .results import SimulationResults, Result
 
 from ..util.misc import pretty_time
 from .progressbar import ProgressbarText, ProgressbarText2, \
-    ProgressbarText3, ProgressbarZMQServer, ProgressBarIPython
+    ProgressbarText3, ProgressbarZMQServer, ProgressBarIPython, \
+    ProgressbarMultiProcessServer, ProgressbarDistributedClientBase
 
 __all__ = ["get_partial_results_filename", "SimulationRunner",
-           "SkipThisOne"]
+           "SkipThisOne", "ProcessPoolView"]
 
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -130,6 +143,216 @@ def get_partial_results_filename(results_base_filename,
     return partial_results_filename
 
 
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx Partial Results Journal xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class _PartialResultsJournal(object):
+    """
+    Append-only storage of the partial results of one parameter variation.
+
+    The partial results are stored in two files. The file with name
+    `partial_results_filename` (see :func:`get_partial_results_filename`)
+    stores a complete SimulationResults object (a "snapshot") and can be
+    loaded with :meth:`.SimulationResults.load_from_file` as before. The
+    file with the same name plus the '.journal' extension stores the
+    results of the repetitions simulated after the snapshot was saved.
+
+    Each time the partial results are saved only the results simulated
+    since the previous save (the "delta") are appended to the journal.
+    After `compaction_interval` deltas the journal is compacted, that is,
+    the snapshot is saved again with the complete results and the journal
+    is removed.
+
+    Each delta in the journal stores the range of repetitions it contains,
+    as well as its size and checksum. When the partial results are loaded,
+    deltas already included in the snapshot (the process was killed during
+    a compaction) and a truncated last delta (the process was killed while
+    appending it) are ignored.
+
+    Parameters
+    ----------
+    partial_results_filename : str
+        The name of the file with the snapshot of the partial results.
+    compaction_interval : int
+        Number of deltas appended to the journal before it is compacted.
+    """
+    # Each delta is preceded by its size and its CRC32 checksum
+    _header = struct.Struct('<QI')
+
+    def __init__(self, partial_results_filename, compaction_interval=10):
+        self.partial_results_filename = partial_results_filename
+        self.journal_filename = self.get_journal_filename(
+            partial_results_filename)
+        self.compaction_interval = compaction_interval
+
+        # Results simulated since the last save (None if there is no new
+        # result) and the number of repetitions before them.
+        self._delta = None
+        self._last_saved_rep = 0
+        # Number of deltas in the journal and whether the snapshot exists
+        self._num_deltas = 0
+        self._has_snapshot = False
+
+    @staticmethod
+    def get_journal_filename(partial_results_filename):
+        """
+        Get the name of the journal file for the partial results file
+        `partial_results_filename`.
+
+        Parameters
+        ----------
+        partial_results_filename : str
+            The name of the file with the snapshot of the partial results.
+
+        Returns
+        -------
+        str
+            The name of the journal file.
+        """
+        return '{0}.journal'.format(partial_results_filename)
+
+    def _read_deltas(self):
+        """
+        Read all the (complete) deltas stored in the journal file.
+
+        A truncated or corrupted delta at the end of the journal is
+        removed from the file.
+
+        Returns
+        -------
+        list[(int, int, SimulationResults)]
+            The first and last repetitions (the first one is not included)
+            of each delta, and the delta itself.
+        """
+        deltas = []
+        try:
+            with open(self.journal_filename, 'rb') as journal:
+                data = journal.read()
+        except IOError:
+            return deltas
+
+        offset = 0
+        while offset + self._header.size <= len(data):
+            size, checksum = self._header.unpack_from(data, offset)
+            start = offset + self._header.size
+            payload = data[start:start + size]
+            if (len(payload) < size or
+                    zlib.crc32(payload) & 0xffffffff != checksum):
+                break
+            deltas.append(pickle.loads(payload))
+            offset = start + size
+
+        if offset < len(data):
+            # Remove the incomplete delta so that new deltas can be
+            # appended after the last complete one.
+            with open(self.journal_filename, 'r+b') as journal:
+                journal.truncate(offset)
+
+        return deltas
+
+    def load(self):
+        """
+        Load the partial results, replaying the deltas in the journal.
+
+        Returns
+        -------
+        SimulationResults
+            The partial results. The number of repetitions in it is stored
+            in its `current_rep` attribute.
+
+        Raises
+        ------
+        IOError
+            If there is no snapshot of the partial results.
+        """
+        sim_results = SimulationResults.load_from_file(
+            self.partial_results_filename)
+        self._has_snapshot = True
+
+        current_rep = sim_results.current_rep
+        deltas = self._read_deltas()
+        for first_rep, last_rep, delta in deltas:
+            # Deltas ending before current_rep are already in the snapshot
+            if first_rep == current_rep:
+                sim_results.merge_all_results(delta)
+                current_rep = last_rep
+
+        sim_results.current_rep = current_rep
+        self._last_saved_rep = current_rep
+        self._num_deltas = len(deltas)
+        return sim_results
+
+    def add(self, sim_results):
+        """
+        Add new results to the delta that will be saved in the next call
+        of :meth:`save`.
+
+        Parameters
+        ----------
+        sim_results : SimulationResults
+            The results of the new repetitions. These are the same results
+            merged into the complete partial results.
+        """
+        if self._delta is None:
+            # The delta must not share Result objects with sim_results,
+            # since they will also be merged into the partial results.
+            self._delta = copy.deepcopy(sim_results)
+        else:
+            self._delta.merge_all_results(sim_results)
+
+    def save(self, current_rep, current_sim_results, compact=False):
+        """
+        Save the partial results.
+
+        Only the delta is appended to the journal, unless the journal must
+        be compacted.
+
+        Parameters
+        ----------
+        current_rep : int
+            Number of repetitions in `current_sim_results`.
+        current_sim_results : SimulationResults
+            The complete partial results.
+        compact : bool
+            If True, the journal is compacted (the snapshot is saved with
+            `current_sim_results`).
+
+        Returns
+        -------
+        str
+            The name of the file with the snapshot of the partial results.
+        """
+        current_sim_results.current_rep = current_rep
+
+        if (compact or not self._has_snapshot or
+                self._num_deltas >= self.compaction_interval):
+            # save_to_file replaces the snapshot atomically
+            filename = current_sim_results.save_to_file(
+                self.partial_results_filename)
+            self._has_snapshot = True
+            self._num_deltas = 0
+            try:
+                os.remove(self.journal_filename)
+            except OSError:
+                pass
+        else:
+            filename = self.partial_results_filename
+            if self._delta is not None:
+                payload = pickle.dumps(
+                    (self._last_saved_rep, current_rep, self._delta),
+                    protocol=2)
+                header = self._header.pack(len(payload),
+                                           zlib.crc32(payload) & 0xffffffff)
+                with open(self.journal_filename, 'ab') as journal:
+                    journal.write(header + payload)
+                self._num_deltas += 1
+
+        self._delta = None
+        self._last_saved_rep = current_rep
+        return filename
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx Exception xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -170,6 +393,147 @@ class SkipThisOne(Exception):
         return "SkipThisOne: {0}".format(self.msg)
 
 
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxx Local "view" based on a pool of processes xxxxxxxxxxxxxxx
+# xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+class _ProcessPoolAsyncMapResult(object):
+    """
+    Object returned by the `map` method of :class:`ProcessPoolView` when
+    `block` is False.
+
+    It mimics the (small) part of the interface of the AsyncMapResult class
+    from ipyparallel that is used by the :class:`SimulationRunner` class,
+    namely the `wait` and `get` methods.
+
+    Parameters
+    ----------
+    executor : ProcessPoolExecutor
+        The executor running the tasks. It will be shut down after the
+        results are retrieved.
+    futures : list[concurrent.futures.Future]
+        The futures for each submitted task (in the same order of the
+        mapped sequences).
+    """
+
+    def __init__(self, executor, futures):
+        self._executor = executor
+        self._futures = futures
+
+    def wait(self, timeout=None):
+        """
+        Wait until all tasks are finished.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time (in seconds) to wait. If not provided, wait until
+            all tasks finish.
+        """
+        concurrent.futures.wait(self._futures, timeout=timeout)
+
+    def ready(self):
+        """
+        Check if all the tasks are finished.
+
+        Returns
+        -------
+        bool
+            True if all tasks finished and False otherwise.
+        """
+        return all(f.done() for f in self._futures)
+
+    def get(self):
+        """
+        Get the results of all tasks, in the same order of the mapped
+        sequences.
+
+        If any of the tasks raised an exception, the same exception is
+        raised here.
+
+        Returns
+        -------
+        list
+            The list with the results of each task.
+        """
+        try:
+            return [f.result() for f in self._futures]
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+class ProcessPoolView(object):
+    """
+    A "view" that runs the tasks in a pool of local processes.
+
+    This class implements the (small) part of the interface of the
+    LoadBalancedView class from ipyparallel that is used by the
+    :meth:`SimulationRunner.simulate_in_parallel` method. With it the
+    different parameters variations of a simulation can be simulated in
+    all cores of the local machine without having to start an IPython
+    cluster.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        The number of worker processes. If not provided, the number of
+        processors in the machine is used.
+
+    Examples
+    --------
+    >>> view = ProcessPoolView(max_workers=2)
+    >>> len(view)
+    2
+    >>> view.map(abs, [-1, 2, -3], block=True)
+    [1, 2, 3]
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def __len__(self):
+        """
+        Get the number of worker processes.
+
+        Returns
+        -------
+        int
+            The number of worker processes.
+        """
+        if self.max_workers is None:
+            return os.cpu_count() or 1
+        return self.max_workers
+
+    def map(self, f, *sequences, block=False):
+        """
+        Call `f` with the arguments taken from each sequence in
+        `sequences` in a pool of local processes.
+
+        Parameters
+        ----------
+        f : callable
+            The function to be called. It must be pickle-able, as well as
+            the arguments in `sequences`.
+        *sequences : list
+            One sequence for each argument of `f`.
+        block : bool
+            If True, wait for all tasks and return their results. If False
+            (default) return an object with the `wait` and `get` methods.
+
+        Returns
+        -------
+        list | _ProcessPoolAsyncMapResult
+            The results (if `block` is True) or an object that can be used
+            to get the results later.
+        """
+        executor = ProcessPoolExecutor(max_workers=len(self))
+        futures = [executor.submit(f, *args) for args in zip(*sequences)]
+        async_results = _ProcessPoolAsyncMapResult(executor, futures)
+
+        if block is True:
+            return async_results.get()
+        return async_results
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx SimulationRunner - START xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -354,6 +718,58 @@ class SimulationRunner(object):
         # to save the partial results in the same folder of the final
         # results.
         self.partial_results_folder = 'partial_results'
+
+        # When partial results are saved, only the results simulated since
+        # the previous save are appended to a journal file. After this
+        # number of saves the journal is compacted into the partial
+        # results file.
+        self.partial_results_compaction_interval = 10
+
+        # The partial results are saved each time this number of
+        # repetitions is simulated, as well as each 5 minutes.
+        self.partial_results_save_reps = 500
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx Parallelism inside a single variation xxxxxxxxxxxxxxxx
+        # Number of worker processes used to run the repetitions of a
+        # single combination of simulation parameters. If this is greater
+        # than 1, the repetitions are split in shards of `reps_per_shard`
+        # repetitions, each one simulated in a worker process with its own
+        # seed (see _on_simulate_shard_start). The results of each shard
+        # are merged in the main process, where _keep_going is checked.
+        # Note that the first repetition of each variation is still
+        # simulated in the main process.
+        self.num_rep_workers = 1
+        self.reps_per_shard = 100
+
+        # Seed used to derive the seeds of each shard. If this is None,
+        # then the seeds are derived from fresh entropy and the simulation
+        # will not be reproducible.
+        self.rep_workers_seed = None
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx Stop criterion based on confidence intervals xxxxxxxxx
+        # If this is set to the name of a Result, then the simulation of
+        # each variation stops (even if rep_max was not reached) as soon as
+        # the width of the confidence interval of that Result, relative to
+        # its mean, is lower than `ci_stop_relative_width`. The confidence
+        # interval is calculated with probability `ci_stop_confidence` (in
+        # %) and only after `ci_stop_min_reps` repetitions. This criterion
+        # is checked in addition to the _keep_going method.
+        self.ci_stop_result_name = None
+        self.ci_stop_relative_width = 0.1
+        self.ci_stop_confidence = 95
+        self.ci_stop_min_reps = 10
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx Batched repetitions xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        # If this is greater than 1, then the _run_simulation_batch method
+        # is called (instead of _run_simulation) to simulate up to
+        # `reps_per_batch` repetitions at once. This is useful to amortize
+        # the overhead of each repetition when _run_simulation is cheap and
+        # many repetitions can be simulated in a single vectorized
+        # computation.
+        self.reps_per_batch = 1
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
         # xxxxx Internal variables you should not modify xxxxxxxxxxxxxxxxxx
@@ -441,7 +857,7 @@ class SimulationRunner(object):
             results_filename = None
         else:
             ext = os.path.splitext(results_base_filename)[-1]
-            if ext == '.pickle':
+            if ext in ('.pickle', '.json', '.npz', '.h5', '.hdf5'):
                 results_filename = results_base_filename
             else:
                 results_filename = '{0}.pickle'.format(results_base_filename)
@@ -509,7 +925,7 @@ class SimulationRunner(object):
 
     def __save_partial_results(self, current_rep, current_params,
                                current_sim_results,
-                               partial_results_filename):
+                               partial_results_journal, compact=False):
         """
         Save the partial simulation results to a file.
 
@@ -521,8 +937,13 @@ class SimulationRunner(object):
             The current parameters.
         current_sim_results : SimulationResults
             The partial simulations results object to be saved.
-        partial_results_filename : str
-            The name of the file to save the partial simulation results.
+        partial_results_journal : _PartialResultsJournal
+            The journal of the partial simulation results. Only the results
+            added to it since the previous save are written, unless the
+            journal is compacted.
+        compact : bool
+            If True, the complete partial results are written to the
+            partial results file.
 
         Returns
         -------
@@ -544,20 +965,18 @@ class SimulationRunner(object):
         # First we add the current parameters to the partial simulation
         # results object
         current_sim_results.set_parameters(current_params)
-        # Now we can save the partial results to a file.
-        current_sim_results.current_rep = current_rep
 
         # Try to save the partial results
         try:
-            filename = current_sim_results.save_to_file(
-                partial_results_filename)
+            filename = partial_results_journal.save(
+                current_rep, current_sim_results, compact)
         except IOError as e:
             if self.partial_results_folder is not None:
 
                 os.mkdir(self.partial_results_folder)
                 # This should not raise IOError again.
-                filename = current_sim_results.save_to_file(
-                    partial_results_filename)
+                filename = partial_results_journal.save(
+                    current_rep, current_sim_results, compact)
             else:  # pragma: no cover
                 raise e
 
@@ -579,7 +998,26 @@ class SimulationRunner(object):
         self._runned_reps = []
         self.results = SimulationResults()
 
-    def __run_simulation_and_track_elapsed_time(self, current_parameters):
+    def __get_num_reps_in_next_run(self, current_rep):
+        """
+        Get the number of repetitions that should be simulated in the next
+        call of __run_simulation_and_track_elapsed_time.
+
+        Parameters
+        ----------
+        current_rep : int
+            Number of repetitions already run.
+
+        Returns
+        -------
+        int
+            The number of repetitions. This is always 1, unless
+            `reps_per_batch` is greater than 1.
+        """
+        return max(1, min(self.reps_per_batch, self.rep_max - current_rep))
+
+    def __run_simulation_and_track_elapsed_time(self, current_parameters,
+                                                num_reps=1):
         """
         Perform the _run_simulation method and track its execution time.
         This time will be added as a Result to the returned
@@ -592,13 +1030,22 @@ class SimulationRunner(object):
             simulation. The self.params variable is not used directly. It
             is first unpacked in the simulate function which then calls
             _run_simulation for each combination of unpacked parameters.
+        num_reps : int
+            Number of repetitions to simulate. This is only used if
+            `reps_per_batch` is greater than 1, in which case the
+            _run_simulation_batch method is called instead of
+            _run_simulation.
 
         Notes
         -----
         This method is called in the `simulate` and `simulate_in_parallel`.
         """
         tic = time()
-        current_sim_results = self._run_simulation(current_parameters)
+        if self.reps_per_batch > 1:
+            current_sim_results = self._run_simulation_batch(
+                current_parameters, num_reps)
+        else:
+            current_sim_results = self._run_simulation(current_parameters)
         toc = time()
         elapsed_time_result = Result.create('elapsed_time',
                                             Result.SUMTYPE,
@@ -639,6 +1086,44 @@ class SimulationRunner(object):
         raise NotImplementedError("'_run_simulation' must be implemented "
                                   "in a subclass of SimulationRunner")
 
+    def _run_simulation_batch(self, current_parameters, num_reps):
+        """
+        Performs `num_reps` iterations of the simulation at once.
+
+        This method is only called if `reps_per_batch` is greater than
+        1. It can be implemented in a subclass to simulate many
+        repetitions in a single (vectorized) computation. The returned
+        :class:`.SimulationResults` object must contain the aggregated
+        results of all `num_reps` repetitions (for instance, the total
+        number of bit errors and the total number of simulated bits), and
+        it will be counted as `num_reps` repetitions for `rep_max`, for the
+        progress and for `_keep_going`.
+
+        The default implementation simply calls _run_simulation `num_reps`
+        times and merges the results. Raising a SkipThisOne exception skips
+        the whole batch, which is counted as `num_reps` skipped repetitions
+        in the 'num_skipped_reps' Result.
+
+        Parameters
+        ----------
+        current_parameters : SimulationParameters
+            SimulationParameters object with the parameters for the
+            simulation.
+        num_reps : int
+            The number of repetitions to simulate.
+
+        Returns
+        -------
+        simulation_results : SimulationResults
+            A SimulationResults object containing the aggregated simulation
+            results of the `num_reps` repetitions.
+        """
+        simulation_results = self._run_simulation(current_parameters)
+        for _ in range(num_reps - 1):
+            simulation_results.merge_all_results(
+                self._run_simulation(current_parameters))
+        return simulation_results
+
     # pylint: disable=W0613,R0201
     def _keep_going(self,
                     current_params, current_sim_results, current_rep):
@@ -677,6 +1162,90 @@ class SimulationRunner(object):
         # maximum number of allowed iterations is reached.
         return True
 
+    def _is_confidence_interval_small_enough(self, current_sim_results,
+                                             current_rep):
+        """
+        Check if the stop criterion based on the confidence interval of the
+        `ci_stop_result_name` Result was reached.
+
+        Parameters
+        ----------
+        current_sim_results : SimulationResults
+            SimulationResults object from the last iteration (merged with
+            all the previous results)
+        current_rep : int
+            Number of iterations already run.
+
+        Returns
+        -------
+        bool
+            True if the relative width of the confidence interval is lower
+            than `ci_stop_relative_width` and False otherwise. If
+            `ci_stop_result_name` is None this is always False.
+        """
+        if (self.ci_stop_result_name is None or
+                current_rep < self.ci_stop_min_reps):
+            return False
+
+        result = current_sim_results[self.ci_stop_result_name][-1]
+        mean = result.get_result_mean()
+        if mean == 0:
+            # The relative width is not defined (this happens, for
+            # instance, if no bit error happened yet)
+            return False
+
+        interval = result.get_confidence_interval(self.ci_stop_confidence)
+        relative_width = (interval[1] - interval[0]) / abs(mean)
+        return relative_width < self.ci_stop_relative_width
+
+    def __should_run_more_reps(self, current_params, current_sim_results,
+                               current_rep):
+        """
+        Check all the stop criteria for the current parameters.
+
+        Parameters
+        ----------
+        current_params : SimulationParameters
+            SimulationParameters object with the parameters of the
+            simulation.
+        current_sim_results : SimulationResults
+            SimulationResults object from the last iteration (merged with
+            all the previous results)
+        current_rep : int
+            Number of iterations already run.
+
+        Returns
+        -------
+        bool
+            True if more repetitions should be simulated.
+        """
+        return (self._keep_going(current_params, current_sim_results,
+                                 current_rep) and
+                not self._is_confidence_interval_small_enough(
+                    current_sim_results, current_rep) and
+                current_rep < self.rep_max)
+
+    # noinspection PyMethodMayBeStatic
+    def _on_simulate_shard_start(self, current_params, seed):
+        """
+        This method is called in the worker process before the repetitions
+        of a shard are simulated, when `num_rep_workers` is greater than 1.
+
+        The default implementation seeds the global RandomState object in
+        numpy. Reimplement this method in a subclass if you use other
+        random sources (such as RandomState objects stored in the
+        SimulationRunner object) so that each shard uses an independent
+        random stream.
+
+        Parameters
+        ----------
+        current_params : SimulationParameters
+            The current combination of simulation parameters.
+        seed : int
+            The seed for the shard. Each shard receives a different seed.
+        """
+        np.random.seed(seed)
+
     def _get_serial_update_progress_function(
             self, current_params):  # pragma: no cover
         """
@@ -775,7 +1344,8 @@ class SimulationRunner(object):
         return update_progress_func
     # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
-    def _get_parallel_update_progress_function(self):  # pragma: no cover
+    def _get_parallel_update_progress_function(
+            self, local=False):  # pragma: no cover
         """
         Return a function that should be called to update the
         progressbar for the simulation of the current parameters.
@@ -788,10 +1358,19 @@ class SimulationRunner(object):
         # The progressbar used to get the returned function depend on the
         # value of the self.update_progress_function_style attribute.
 
+        Parameters
+        ----------
+        local : bool
+            If True, the simulation is performed in local processes (see
+            :class:`ProcessPoolView`) and a progressbar based on the
+            multiprocessing module is used instead of one based on ZMQ
+            sockets.
+
         Returns
         -------
-        list[int,int]
-            List with the proxybar client_id, ip and port.
+        list[int,int] | ProgressbarMultiProcessClient
+            List with the proxybar client_id, ip and port. If `local` is
+            True then the proxybar itself is returned instead.
 
         Notes
         -----
@@ -821,17 +1400,28 @@ class SimulationRunner(object):
                     filename = '{0}_progress.txt'.format(
                         self._results_base_filename)
 
-                self._pbar = ProgressbarZMQServer(
-                    message=message,
-                    sleep_time=sleep_time,
-                    filename=filename,
-                    **self.progressbar_extra_args)
+                if local is True:
+                    self._pbar = ProgressbarMultiProcessServer(
+                        message=message,
+                        sleep_time=sleep_time,
+                        filename=filename)
+                else:
+                    self._pbar = ProgressbarZMQServer(
+                        message=message,
+                        sleep_time=sleep_time,
+                        filename=filename,
+                        **self.progressbar_extra_args)
 
             # Note that this will be an object of the ProgressbarZMQClient
-            # class, but it behaves like a function.
+            # class (or ProgressbarMultiProcessClient if local is True),
+            # but it behaves like a function.
             proxybar = \
                 self._pbar.register_client_and_get_proxy_progressbar(
                     self.rep_max)
+            if local is True:
+                # The ProgressbarMultiProcessClient object can be pickled
+                # and sent to the worker process directly
+                return proxybar
             proxybar_data = [proxybar.client_id,
                              proxybar.ip,
                              proxybar.port]
@@ -874,6 +1464,9 @@ class SimulationRunner(object):
         # pickled (uses ZMQ sockets).
         state = dict(self.__dict__)
         del state['_pbar']
+        # The _async_results member variable may hold a pool of processes
+        # (see ProcessPoolView), which cannot be pickled either.
+        state['_async_results'] = None
         return state
 
     # def get_runned_reps_fix_params(
@@ -935,18 +1528,22 @@ class SimulationRunner(object):
                     self.results_base_filename,
                     current_params,
                     self.partial_results_folder)
+                partial_results_journal = _PartialResultsJournal(
+                    partial_results_filename,
+                    self.partial_results_compaction_interval)
             else:
                 # If __results_base_filename is None there is also no
                 # partial results to load. Therefore, lets raise an
                 # IOError here to go to the except catching
+                partial_results_filename = None
+                partial_results_journal = None
                 raise IOError()
 
             # If loading partial results succeeds, then we will have
             # partial results. If it fails because the file does not
             # exist, this will thrown a IOError exception and we will
             # execute the except block instead.
-            current_sim_results = SimulationResults.load_from_file(
-                partial_results_filename)
+            current_sim_results = partial_results_journal.load()
             num_skipped_reps_result = Result.create(
                 "num_skipped_reps", Result.SUMTYPE, 0)
             current_sim_results.add_result(num_skipped_reps_result)
@@ -977,56 +1574,73 @@ class SimulationRunner(object):
         # repetition here and the "while" statement after this
         # try/except block will run as usual.
         except IOError:
-            # Perform the first iteration of _run_simulation
+            # Perform the first iteration of _run_simulation (or the first
+            # batch of iterations if reps_per_batch is greater than 1)
+            current_rep = self.__get_num_reps_in_next_run(0)
             current_sim_results = \
                 self.__run_simulation_and_track_elapsed_time(
-                    current_params)
+                    current_params, current_rep)
             # Add the extra 'num_skipped_reps' Result.
             current_sim_results.add_new_result('num_skipped_reps',
                                                Result.SUMTYPE, 0)
-            current_rep = 1
 
         last_tic = time()
+        if self.num_rep_workers > 1:
+            # The remaining repetitions are simulated in worker processes
+            current_rep = self.__simulate_shards(current_params,
+                                                 current_sim_results,
+                                                 current_rep,
+                                                 update_progress_func,
+                                                 partial_results_journal)
+
         # Run more iterations until one of the stop criteria is
         # reached. Note that if partial results were loaded successfully
         # from file and they already achieve the stop criteria then the
         # while loop below will not run.
-        while (self._keep_going(current_params, current_sim_results,
-                                current_rep) and
-                current_rep < self.rep_max):
+        while self.__should_run_more_reps(current_params,
+                                          current_sim_results,
+                                          current_rep):
             # xxxxxxxxxx Run one repetition of the simulation xxxxxxxxxxxxx
+            previous_rep = current_rep
             try:
                 # Run one repetition of the `_run_simulation` and merge the
                 # new results. If `_run_simulation` raises a SkipThisOne
                 # exception, then we do not increase current_rep or the
                 # current progress, since there is no new result to merge.
-                current_sim_results.merge_all_results(
+                num_reps = self.__get_num_reps_in_next_run(current_rep)
+                new_sim_results = \
                     self.__run_simulation_and_track_elapsed_time(
-                        current_params))
+                        current_params, num_reps)
+                current_sim_results.merge_all_results(new_sim_results)
+                if partial_results_journal is not None:
+                    partial_results_journal.add(new_sim_results)
 
-                current_rep += 1
+                current_rep += num_reps
                 update_progress_func(current_rep)
             except SkipThisOne:
                 # Each time a SkipThisOne exception is raised we increase
-                # the num_skipped_reps_reps result to indicate that, but we
+                # the num_skipped_reps_reps result to indicate that (by the
+                # number of repetitions in the skipped batch), but we
                 # don't increase the current progress or the
                 # current_rep. After that, the while loop will continue the
                 # simulation.
-                current_sim_results['num_skipped_reps'][-1].update(1)
+                current_sim_results['num_skipped_reps'][-1].update(num_reps)
                 # TODO: Maybe log that one repetition was skipped
                 # print("\nAlready skipped {0} repetitions").format(
                 #     current_sim_results['num_skipped_reps'][-1].get_result())
             # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
             toc = time()
-            # Save partial results each 500 iterations as well as each 5
-            # minutes
-            if ((toc - last_tic > 300 or current_rep % 500 == 0) and
+            # Save partial results each `partial_results_save_reps`
+            # iterations as well as each 5 minutes
+            save_reps = self.partial_results_save_reps
+            if ((toc - last_tic > 300 or
+                 current_rep // save_reps > previous_rep // save_reps) and
                     self._results_base_filename is not None):
                 self.__save_partial_results(current_rep,
                                             current_params,
                                             current_sim_results,
-                                            partial_results_filename)
+                                            partial_results_journal)
                 last_tic = time()
 
         # If the while loop ended before rep_max repetitions (because
@@ -1041,12 +1655,15 @@ class SimulationRunner(object):
                                                 current_sim_results)
 
         # xxxxxxxxxx Save partial results to file xxxxxxxxxxxxxxxxxxxxx
-        # Save partial results for current parameters after all repetitions
+        # Save partial results for current parameters after all
+        # repetitions. The journal is compacted so that the partial results
+        # file has the complete results.
         if self._results_base_filename is not None:
             self.__save_partial_results(current_rep,
                                         current_params,
                                         current_sim_results,
-                                        partial_results_filename)
+                                        partial_results_journal,
+                                        compact=True)
         else:
             partial_results_filename = None
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -1055,6 +1672,157 @@ class SimulationRunner(object):
         # iterations run as well as the SimulationResults object.
         return current_rep, current_sim_results, partial_results_filename
 
+    # This method is run in another process. Therefore, the python coverage
+    # program cannot see that it is actually used.
+    @staticmethod
+    def _simulate_shard(obj, current_params, num_reps,
+                        seed):  # pragma: no cover
+        """
+        Simulate `num_reps` repetitions for the current parameters.
+
+        This is run in a worker process when `num_rep_workers` is greater
+        than 1.
+
+        Parameters
+        ----------
+        obj : SimulationRunner
+            The same as the self parameter in regular methods. The reason
+            that this method is set to static is to allow it to be pickled.
+        current_params : SimulationParameters
+            The current parameters
+        num_reps : int
+            Number of repetitions to simulate.
+        seed : int
+            Seed for the random sources used in the shard.
+
+        Returns
+        -------
+        (int, SimulationResults)
+            The number of simulated repetitions and the merged results of
+            all repetitions (including the 'num_skipped_reps' Result).
+        """
+        # pylint: disable= W0212
+        # noinspection PyProtectedMember
+        obj._on_simulate_shard_start(current_params, seed)
+
+        shard_results = None
+        num_skipped_reps_result = Result.create(
+            "num_skipped_reps", Result.SUMTYPE, 0)
+        rep = 0
+        while rep < num_reps:
+            batch_reps = max(1, min(obj.reps_per_batch, num_reps - rep))
+            try:
+                # noinspection PyProtectedMember
+                results = obj.__run_simulation_and_track_elapsed_time(
+                    current_params, batch_reps)
+            except SkipThisOne:
+                num_skipped_reps_result.update(batch_reps)
+                continue
+
+            if shard_results is None:
+                shard_results = results
+            else:
+                shard_results.merge_all_results(results)
+            rep += batch_reps
+
+        shard_results.add_result(num_skipped_reps_result)
+        return rep, shard_results
+
+    def __simulate_shards(self, current_params, current_sim_results,
+                          current_rep, update_progress_func,
+                          partial_results_journal):
+        """
+        Simulate the repetitions for the current parameters in
+        `num_rep_workers` worker processes.
+
+        The results of each shard are merged into `current_sim_results` as
+        soon as the shard is finished and `_keep_going` is checked with the
+        merged results.
+
+        Parameters
+        ----------
+        current_params : SimulationParameters
+            The current parameters
+        current_sim_results : SimulationResults
+            The results of the repetitions simulated so far. The results of
+            each shard are merged into this object.
+        current_rep : int
+            Number of repetitions simulated so far.
+        update_progress_func : (int) -> []
+            The function that can be called to update the current progress.
+        partial_results_journal : _PartialResultsJournal | None
+            The journal used to save the partial simulation results (None
+            if the partial results are not saved).
+
+        Returns
+        -------
+        int
+            The number of repetitions simulated so far (including the ones
+            simulated before this method was called).
+        """
+        if self.rep_workers_seed is None:
+            seeds_RS = np.random.RandomState()
+        else:
+            seeds_RS = np.random.RandomState(
+                [self.rep_workers_seed, current_params.unpack_index + 1])
+
+        executor = ProcessPoolExecutor(max_workers=self.num_rep_workers)
+        # Map each pending future to the number of repetitions it simulates
+        pending = {}
+        # Number of repetitions simulated plus the ones being simulated
+        assigned_reps = current_rep
+        last_tic = time()
+
+        try:
+            while self.__should_run_more_reps(current_params,
+                                              current_sim_results,
+                                              current_rep):
+                # Keep all workers busy with a new shard
+                while (len(pending) < self.num_rep_workers and
+                       assigned_reps < self.rep_max):
+                    num_reps = min(self.reps_per_shard,
+                                   self.rep_max - assigned_reps)
+                    future = executor.submit(
+                        SimulationRunner._simulate_shard,
+                        self, current_params, num_reps,
+                        seeds_RS.randint(0, 2**31 - 1))
+                    pending[future] = num_reps
+                    assigned_reps += num_reps
+
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+                previous_rep = current_rep
+                for future in done:
+                    del pending[future]
+                    reps, shard_results = future.result()
+                    current_sim_results.merge_all_results(shard_results)
+                    if partial_results_journal is not None:
+                        partial_results_journal.add(shard_results)
+                    current_rep += reps
+                    update_progress_func(current_rep)
+
+                toc = time()
+                # Save partial results each `partial_results_save_reps`
+                # iterations as well as each 5 minutes
+                save_reps = self.partial_results_save_reps
+                if ((toc - last_tic > 300 or
+                     current_rep // save_reps > previous_rep // save_reps)
+                        and self._results_base_filename is not None):
+                    self.__save_partial_results(current_rep,
+                                                current_params,
+                                                current_sim_results,
+                                                partial_results_journal)
+                    last_tic = time()
+        finally:
+            # If _keep_going returned False there may still be shards being
+            # simulated. Their results are discarded.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        return current_rep
+
     def _simulate_for_current_params_serial(self,
                                             current_params,
                                             var_print_iter):
@@ -1098,11 +1866,13 @@ class SimulationRunner(object):
             that this method is set to static is to allow it to be pickled.
         current_params : SimulationParameters
             The current parameters
-        proxybar_data : (int,str,int) | None
+        proxybar_data : (int,str,int) | ProgressbarMultiProcessClient | None
                 The elements are the "client_id" (and int), the "ip" (a
                 string with an IP address) and the "port". This data should
                 be used to create a ProgressbarZMQClient object that can be
-                used to update the progressbar (via a ZMQ socket)
+                used to update the progressbar (via a ZMQ socket). When the
+                simulation runs in local processes this is the proxy
+                progressbar itself.
 
         Returns
         -------
@@ -1117,6 +1887,8 @@ class SimulationRunner(object):
         if proxybar_data is None:
             def update_progress_func(_):
                 pass
+        elif isinstance(proxybar_data, ProgressbarDistributedClientBase):
+            update_progress_func = proxybar_data.progress
         else:
             client_id, ip, port = proxybar_data  # pylint: disable=W0633
             proxybar = ProgressbarZMQClient(client_id, ip, port)
@@ -1307,18 +2079,20 @@ class SimulationRunner(object):
 
     # The unittests for this method only run if an ipython cluster is
     # started with a profile called "tests".
-    def simulate_in_parallel(self, view, wait=True):  # pragma: no cover
+    def simulate_in_parallel(self, view=None, wait=True):  # pragma: no cover
         """
         Same as the simulate method, but the different parameters
         configurations are simulated in parallel.
 
         Parameters
         ----------
-        view : LoadBalancedView | DirectView
+        view : LoadBalancedView | DirectView | ProcessPoolView, optional
             A ´view´ of the IPython engines.
             The parallel processing will happen by calling the 'map' method
             of the provided view to simulate in parallel the different
-            configurations of transmission parameters.
+            configurations of transmission parameters. If not provided, a
+            :class:`ProcessPoolView` is used to simulate in all cores of
+            the local machine.
         wait : bool
             If True then the self.wait_parallel_simulation method will be
             automatically called at the end of simulate_in_parallel. If
@@ -1340,6 +2114,9 @@ class SimulationRunner(object):
         """
         # xxxxxxxxxxxxxxx Some initialization xxxxxxxxxxxxxxxxxxxxxxxxxxxxx
         self.__tic = time()
+        if view is None:
+            view = ProcessPoolView()
+        local = isinstance(view, ProcessPoolView)
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
         # xxxxx Store rep_max in the results object xxxxxxxxxxxxxxxxxxxxxxx
@@ -1373,7 +2150,7 @@ class SimulationRunner(object):
             proxybar_data_list = []
             for _ in range(num_variations):
                 proxybar_data_list.append(
-                    self._get_parallel_update_progress_function())
+                    self._get_parallel_update_progress_function(local))
         else:  # self.update_progress_function_style is None
             # Create the dummy update progress functions
             proxybar_data_list = [None] * num_variations
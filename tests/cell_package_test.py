@@ -27,6 +27,7 @@ import doctest
 import numpy as np
 
 from pyphysim.cell import shapes, cell
+from pyphysim.channels import antennagain, pathloss
 
 
 class ConcreteShape(shapes.Shape):
@@ -222,6 +223,23 @@ class HexagonTestCase(unittest.TestCase):
                 self.H3._get_vertex_positions(), 30) + 3 + 5j,
             self.H3.vertices)
 
+    def test_vertices_cache(self):
+        vertices = self.H3.vertices
+        self.assertTrue(self.H3.vertices is vertices)
+        with self.assertRaises(ValueError):
+            vertices[0] = 0
+
+        # Changing the position, radius or rotation invalidates the cache
+        self.H3.pos = 1 + 1j
+        np.testing.assert_array_almost_equal(self.H3.vertices,
+                                             vertices - 2 - 4j)
+        self.H3.radius = 3.0
+        np.testing.assert_array_almost_equal(self.H3.vertices,
+                                             2 * (vertices - 3 - 5j) + 1 + 1j)
+        self.H3.rotation = 0
+        np.testing.assert_array_almost_equal(
+            self.H3.vertices, self.H3._get_vertex_positions() + 1 + 1j)
+
     def test_is_point_inside_shape(self, ):
         # If the point is exactly in the shape's border, such as the
         # shape's vertexes, then is_point_inside_shape could return either
@@ -236,6 +254,18 @@ class HexagonTestCase(unittest.TestCase):
             # This test is very incomplete. If any bugs are found in
             # is_point_inside_shape add tests for them here
 
+        # Test with an array of points. The result must be the same of
+        # the generic (polygon based) test in the Shape class
+        points = self.H3.pos + 4 * (
+            np.random.random_sample([10, 50]) - 0.5 +
+            1j * (np.random.random_sample([10, 50]) - 0.5))
+        inside = self.H3.is_point_inside_shape(points)
+        self.assertEqual(inside.shape, (10, 50))
+        np.testing.assert_array_equal(
+            inside, shapes.Shape.is_point_inside_shape(self.H3, points))
+        self.assertEqual(inside[3, 7],
+                         self.H3.is_point_inside_shape(points[3, 7]))
+
     def test_get_border_point(self):
         # Test for an angle of 0 degrees
         point_0_degrees = self.H3.get_border_point(0., 1.)
@@ -319,6 +349,11 @@ class RectangleTestCase(unittest.TestCase):
         self.assertFalse(R1.is_point_inside_shape(-10 + 5j))
         self.assertFalse(R1.is_point_inside_shape(0 + -0.1j))
 
+        # Test with an array of points
+        points = np.array([0., 0.01j, -1.3 + 2.4j, -0.5 + 3.4j, -14 + 1j])
+        np.testing.assert_array_equal(R1.is_point_inside_shape(points),
+                                      [True, True, False, True, False])
+
 
 class CircleTestCase(unittest.TestCase):
     def setUp(self):
@@ -373,6 +408,11 @@ class CircleTestCase(unittest.TestCase):
         point2 = self.C1.get_border_point(89, 1.00000001)
         self.assertFalse(self.C1.is_point_inside_shape(point2))
 
+        # Test with an array of points
+        np.testing.assert_array_equal(
+            self.C1.is_point_inside_shape(np.array([point, point2])),
+            [True, False])
+
 
 # noinspection PyMethodMayBeStatic
 class ShapesModuleMethodsTestCase(unittest.TestCase):
@@ -385,6 +425,23 @@ class ShapesModuleMethodsTestCase(unittest.TestCase):
         np.testing.assert_array_almost_equal(
             expected_value,
             shapes.from_complex_array_to_real_matrix(A))
+        # The input array is not modified
+        np.testing.assert_array_equal(A, B.flatten())
+
+    def test_points_inside_polygon(self):
+        hexagon = shapes.Hexagon(2 - 1j, 1.5, rotation=17)
+        points = hexagon.pos + 4 * (np.random.random_sample(500) - 0.5 +
+                                    1j * (np.random.random_sample(500) - 0.5))
+        # The Hexagon class uses a closed form test
+        expected_inside = hexagon.is_point_inside_shape(points)
+        inside = shapes.points_inside_polygon(points, hexagon.vertices)
+        np.testing.assert_array_equal(inside, expected_inside)
+
+        inside = shapes.points_inside_polygon(
+            points.reshape([20, 25]), hexagon.vertices)
+        self.assertEqual(inside.shape, (20, 25))
+        self.assertTrue(shapes.points_inside_polygon(hexagon.pos,
+                                                     hexagon.vertices))
 
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -401,6 +458,120 @@ class NodeTestCase(unittest.TestCase):
         self.assertEqual(n.marker_color, 'g')
 
 
+class UserStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        """Called before each test."""
+        self.C1 = cell.Cell(0, 1.0, cell_id=1)
+        self.C2 = cell.Cell(2, 1.0, cell_id=2)
+        self.C1.add_user(cell.Node(0.1 + 0.2j, marker_color='b'), False)
+        self.C2.add_user(cell.Node(2.3, marker_color='g'), False)
+        self.C2.add_user(cell.Node(1.8 - 0.1j), False)
+        self.store = cell.UserStore([self.C1, self.C2])
+
+    def test_arrays(self):
+        self.assertEqual(self.store.num_users, 3)
+        np.testing.assert_array_almost_equal(self.store.positions,
+                                             [0.1 + 0.2j, 2.3, 1.8 - 0.1j])
+        np.testing.assert_array_equal(self.store.cell_ids, [1, 2, 2])
+        np.testing.assert_array_equal(self.store.cell_indexes, [0, 1, 1])
+        np.testing.assert_array_equal(self.store.colors, ['b', 'g', 'r'])
+        self.assertEqual(self.store.users,
+                         self.C1.users + self.C2.users)
+
+        np.testing.assert_array_almost_equal(
+            self.store.calc_dists([self.C1.pos, self.C2.pos]),
+            np.array([[abs(u.pos - c.pos) for c in [self.C1, self.C2]]
+                      for u in self.store.users]))
+
+    def test_nodes_are_views(self):
+        self.store.update()
+        user = self.C2.users[0]
+
+        # Changing the store changes the Node
+        self.store.move_users([0, 0.1j, 0])
+        self.assertAlmostEqual(user.pos, 2.3 + 0.1j)
+        self.store.positions[1] = 2.2
+        self.assertAlmostEqual(user.pos, 2.2)
+
+        # Changing the Node changes the store
+        user.pos = 2.1 + 0.1j
+        user.marker_color = 'k'
+        self.assertAlmostEqual(self.store.positions[1], 2.1 + 0.1j)
+        self.assertEqual(self.store.colors[1], 'k')
+
+        # Moving the cell moves its users in the store
+        self.C2.pos = 3
+        self.assertAlmostEqual(self.store.positions[2], 2.8 - 0.1j)
+
+    def test_update(self):
+        self.store.update()
+        old_user = self.C1.users[0]
+        self.store.set_attribute('speed', 3.0)
+        np.testing.assert_array_equal(self.store.get_attribute('speed'),
+                                      [3.0, 3.0, 3.0])
+        with self.assertRaises(ValueError):
+            self.store.set_attribute('speed', [1.0, 2.0])
+
+        # Adding a user rebuilds the store
+        self.C1.add_user(cell.Node(-0.3j), False)
+        self.assertEqual(self.store.num_users, 4)
+        np.testing.assert_array_equal(self.store.cell_ids, [1, 1, 2, 2])
+        with self.assertRaises(KeyError):
+            self.store.get_attribute('speed')
+
+        # Removed users are not views into the store anymore
+        self.C1.delete_all_users()
+        np.testing.assert_array_equal(self.store.cell_ids, [2, 2])
+        self.store.move_users(1j)
+        self.assertAlmostEqual(old_user.pos, 0.1 + 0.2j)
+        old_user.pos = 5
+        self.assertAlmostEqual(old_user.pos, 5)
+        np.testing.assert_array_almost_equal(self.store.positions,
+                                             [2.3 + 1j, 1.8 + 0.9j])
+
+        # A store taking the users of another store
+        other_store = cell.UserStore([self.C2])
+        np.testing.assert_array_almost_equal(other_store.positions,
+                                             [2.3 + 1j, 1.8 + 0.9j])
+        other_store.move_users(1)
+        np.testing.assert_array_almost_equal(self.store.positions,
+                                             [3.3 + 1j, 2.8 + 0.9j])
+
+    def test_update_with_replaced_user(self):
+        self.store.update()
+        old_user = self.C2.users[1]
+
+        # Replace a user without changing the number of users in the cell
+        self.C2.users.pop()
+        new_user = cell.Node(2.5 + 0.5j)
+        self.C2.add_user(new_user, False)
+        np.testing.assert_array_almost_equal(self.store.positions,
+                                             [0.1 + 0.2j, 2.3, 2.5 + 0.5j])
+        np.testing.assert_array_almost_equal(
+            self.store.calc_dists([self.C2.pos])[:, 0],
+            [abs(u.pos - self.C2.pos) for u in self.store.users])
+
+        # Only the new user is a view into the store
+        self.store.move_users(1j)
+        self.assertAlmostEqual(new_user.pos, 2.5 + 1.5j)
+        self.assertAlmostEqual(old_user.pos, 1.8 - 0.1j)
+
+        # The same in a Cluster
+        cluster = cell.Cluster(cell_radius=1.0, num_cells=3)
+        cluster.add_random_users([1, 2, 3], 2)
+        cluster.calc_dist_all_users_to_each_cell()
+        first_cell = cluster.get_cell_by_id(1)
+        first_cell.users.pop()
+        first_cell.add_user(cell.Node(first_cell.pos + 0.1), False)
+        dists = cluster.calc_dist_all_users_to_each_cell_no_wrap_around()
+        expected_dists = np.array(
+            [[abs(u.pos - c.pos) for c in cluster]
+             for u in cluster.get_all_users()])
+        np.testing.assert_array_almost_equal(dists, expected_dists)
+        np.testing.assert_array_almost_equal(
+            cluster.calc_dist_all_users_to_each_cell(), expected_dists)
+
+
 class CellTestCase(unittest.TestCase):
     def setUp(self):
         """Called before each test."""
@@ -530,6 +701,19 @@ class CellTestCase(unittest.TestCase):
             min_dist = self.C1.radius * min_dist_ratio
             self.assertTrue(self.C1.calc_dist(self.C1.users[index]) > min_dist)
 
+    def test_calc_random_user_positions(self):
+        min_dist_ratio = 0.3
+        positions = self.C1.calc_random_user_positions(1000, min_dist_ratio)
+        self.assertEqual(positions.shape, (1000,))
+        # No user is added to the cell
+        self.assertEqual(self.C1.num_users, 0)
+        for pos in positions:
+            self.assertTrue(self.C1.is_point_inside_shape(pos))
+        self.assertTrue(np.all(np.abs(positions - self.C1.pos) >=
+                               min_dist_ratio * self.C1.radius))
+
+        self.assertEqual(self.C1.calc_random_user_positions(0).shape, (0,))
+
     def test_set_pos(self):
         # When the position of a cell is changed, the position of any user
         # in the cell must be updated.
@@ -610,6 +794,14 @@ class Cell3SecTestCase(unittest.TestCase):
         expected_secradius = np.sqrt(3) * self.C1.radius / 3.0
         self.assertAlmostEqual(self.C1.secradius, expected_secradius)
 
+    def test_sector_boresight_angles(self):
+        np.testing.assert_array_almost_equal(
+            self.C1.sector_boresight_angles, [-150, -30, 90])
+
+        self.C1.rotation = 40
+        np.testing.assert_array_almost_equal(
+            self.C1.sector_boresight_angles, [-110, 10, 130])
+
     def test_set_radius(self):
         # Whenever the radius property of the Cell3Sec object changes, the
         # position and radius of each individual sector should change
@@ -692,6 +884,18 @@ class Cell3SecTestCase(unittest.TestCase):
             expected_vertexes_with_translation,
             vertexes_with_translation)
 
+    def test_is_point_inside_shape(self):
+        # A point is inside the cell if it is inside one of its sectors
+        points = self.C1.pos + 2 * self.C1.radius * (
+            np.random.random_sample(500) - 0.5 +
+            1j * (np.random.random_sample(500) - 0.5))
+        inside = self.C1.is_point_inside_shape(points)
+        expected_inside = (self.C1._sec1.is_point_inside_shape(points) |
+                           self.C1._sec2.is_point_inside_shape(points) |
+                           self.C1._sec3.is_point_inside_shape(points))
+        np.testing.assert_array_equal(inside, expected_inside)
+        self.assertTrue(self.C1.is_point_inside_shape(self.C1.pos))
+
     def test_add_random_users_in_sector(self):
         self.C1.add_random_user_in_sector(1)
         self.assertEqual(self.C1.num_users, 1)
@@ -1174,6 +1378,30 @@ class ClusterTestCase(unittest.TestCase):
 
             # self.C3.plot()
 
+    def test_calc_random_user_positions(self):
+        positions, cell_ids = self.C2.calc_random_user_positions(
+            [2, 5], [3, 4], 0.2)
+        self.assertEqual(positions.shape, (7,))
+        np.testing.assert_array_equal(cell_ids, [2, 2, 2, 5, 5, 5, 5])
+        # No user is added to the cells
+        self.assertEqual(self.C2.num_users, 0)
+        for pos, cell_id in zip(positions, cell_ids):
+            c = self.C2.get_cell_by_id(cell_id)
+            self.assertTrue(c.is_point_inside_shape(pos))
+            self.assertTrue(abs(pos - c.pos) >= 0.2 * c.radius)
+
+        # If cell id is not provided, then all cells are used
+        positions, cell_ids = self.C3.calc_random_user_positions(
+            num_users=2)
+        self.assertEqual(positions.shape, (38,))
+        np.testing.assert_array_equal(cell_ids,
+                                      np.repeat(np.arange(1, 20), 2))
+
+        # A single cell ID
+        positions, cell_ids = self.C3.calc_random_user_positions(4, 3)
+        self.assertEqual(positions.shape, (3,))
+        np.testing.assert_array_equal(cell_ids, [4, 4, 4])
+
     def test_add_border_users(self):
         self.C1.delete_all_users()
         cell_ids = [1, 2, 3]
@@ -1246,6 +1474,28 @@ class ClusterTestCase(unittest.TestCase):
 
         np.testing.assert_array_almost_equal(expected_all_dists, all_dists)
 
+    def test_user_store(self):
+        store = self.C1.user_store
+        self.assertEqual(store.users, self.C1.get_all_users())
+
+        # Moving the users in the store is seen by the distance calculation
+        # and by the users themselves
+        store.move_users(0.1 + 0.05j)
+        all_dists = self.C1.calc_dist_all_users_to_each_cell()
+        all_users = self.C1.get_all_users()
+        expected_all_dists = np.array(
+            [[c.calc_dist(u) for c in self.C1] for u in all_users])
+        np.testing.assert_array_almost_equal(expected_all_dists, all_dists)
+
+        # New users are added to the store
+        self.C1.add_random_users(2, 3)
+        self.assertEqual(self.C1.user_store.num_users, 13)
+        self.assertEqual(self.C1.calc_dist_all_users_to_each_cell().shape,
+                         (13, 3))
+        np.testing.assert_array_equal(
+            self.C1.user_store.cell_ids,
+            [u.cell_id for u in self.C1.get_all_users()])
+
     def test_properties(self):
         # Test num_cells property
         self.assertEqual(self.C1.num_cells, 3)
@@ -1288,6 +1538,144 @@ class ClusterTestCase(unittest.TestCase):
             self.assertTrue(isinstance(c, cell.Cell))
         self.assertEqual(i, 6)
 
+    def test_calc_wrap_around_diffs(self):
+        for num_cells, cell_type in [(1, 'simple'), (3, 'simple'),
+                                     (4, '3sec'), (7, 'simple'),
+                                     (13, 'simple'), (19, 'simple'),
+                                     (4, 'square'), (9, 'square')]:
+            C = cell.Cluster(cell_radius=1.0, num_cells=num_cells,
+                             pos=1 - 2j, cell_type=cell_type, rotation=10)
+            v1, v2 = C._wrap_around_basis
+            all_cells_pos = np.array([c.pos for c in C])
+
+            # The cells must be different modulo the lattice of wrapped
+            # images (otherwise the wrapped cluster does not tile the
+            # plane)
+            inv_basis = C._wrap_around_inv_basis
+            d = all_cells_pos - all_cells_pos[0]
+            coords = inv_basis.dot(np.vstack([d.real, d.imag]))
+            coords = np.round(coords - np.floor(coords + 1e-9), 6) % 1
+            self.assertEqual(len(set(map(tuple, coords.T))), num_cells)
+
+            # Compare with the closest image found by brute force
+            points = C.pos + 3 * C.external_radius * (
+                np.random.random_sample(50) - 0.5 +
+                1j * (np.random.random_sample(50) - 0.5))
+            diffs = C.calc_wrap_around_diffs(points)
+            self.assertEqual(diffs.shape, (50, num_cells))
+            m, n = np.meshgrid(np.arange(-4, 5), np.arange(-4, 5))
+            images = (m * v1 + n * v2).flatten()
+            all_diffs = (points[:, np.newaxis, np.newaxis] -
+                         all_cells_pos[:, np.newaxis] - images)
+            expected_dists = np.min(np.abs(all_diffs), axis=-1)
+            np.testing.assert_array_almost_equal(np.abs(diffs),
+                                                 expected_dists)
+            # The difference must correspond to an image of each cell
+            coords = inv_basis.dot(np.vstack(
+                [(points[:, np.newaxis] - diffs - all_cells_pos).real.ravel(),
+                 (points[:, np.newaxis] - diffs - all_cells_pos).imag.ravel()]))
+            np.testing.assert_array_almost_equal(coords, np.round(coords))
+
+        # Wrap around is not supported for a cluster with 2 cells
+        C2 = cell.Cluster(cell_radius=1.0, num_cells=2)
+        with self.assertRaises(RuntimeError):
+            C2.calc_wrap_around_diffs(0)
+        with self.assertRaises(RuntimeError):
+            C2.wrap_around = True
+
+    def test_wrap_around(self):
+        C = self.C2
+        C.add_random_users(num_users=5)
+        dists = C.calc_dist_all_users_to_each_cell()
+        angles = C.calc_angle_all_users_to_each_cell()
+        all_cells_pos = np.array([c.pos for c in C])
+        all_users_pos = np.array([u.pos for u in C.get_all_users()])
+        expected_diffs = all_users_pos[:, np.newaxis] - all_cells_pos
+        np.testing.assert_array_almost_equal(dists, np.abs(expected_diffs))
+        np.testing.assert_array_almost_equal(
+            angles, np.angle(expected_diffs, deg=True))
+
+        self.assertFalse(C.wrap_around)
+        C.wrap_around = True
+        expected_diffs = C.calc_wrap_around_diffs(all_users_pos)
+        wrap_dists = C.calc_dist_all_users_to_each_cell()
+        np.testing.assert_array_almost_equal(wrap_dists,
+                                             np.abs(expected_diffs))
+        np.testing.assert_array_almost_equal(
+            C.calc_angle_all_users_to_each_cell(),
+            np.angle(expected_diffs, deg=True))
+        self.assertTrue(np.all(wrap_dists <= dists + 1e-12))
+        # Each user is in the cell it was assigned to
+        cell_indexes = np.array([u.cell_id for u in C.get_all_users()]) - 1
+        np.testing.assert_array_almost_equal(
+            wrap_dists[np.arange(35), cell_indexes],
+            dists[np.arange(35), cell_indexes])
+        np.testing.assert_array_almost_equal(
+            C.calc_dist_all_users_to_each_cell_no_wrap_around(), dists)
+
+        # Distance between cells with wrap around. In a 7 cells cluster all
+        # cells are neighbors.
+        cell_dists = np.abs(C.calc_dists_between_cells())
+        expected_cell_dists = np.full([7, 7], 2 * C.cell_height)
+        np.fill_diagonal(expected_cell_dists, 0)
+        np.testing.assert_array_almost_equal(cell_dists, expected_cell_dists)
+
+        # Creating the wrapped cells also enables wrap around
+        self.assertFalse(self.C3.wrap_around)
+        self.C3.create_wrap_around_cells()
+        self.assertTrue(self.C3.wrap_around)
+
+    def test_calc_link_budget_all_users_to_each_sector(self):
+        C = cell.Cluster(cell_radius=0.5, num_cells=7, cell_type='3sec',
+                         rotation=20)
+        C.add_random_users(num_users=2, min_dist_ratio=0.1)
+        path_loss_obj = pathloss.PathLoss3GPP1()
+        path_loss_obj.handle_small_distances_bool = True
+        ant_gain_obj = antennagain.AntGainBS3GPP25996()
+
+        dists, angles, gains = C.calc_link_budget_all_users_to_each_sector(
+            path_loss_obj, ant_gain_obj)
+        self.assertEqual(angles.shape, (14, 7, 3))
+        self.assertEqual(gains.shape, (14, 7, 3))
+        np.testing.assert_array_almost_equal(
+            dists, C.calc_dist_all_users_to_each_cell())
+        np.testing.assert_array_almost_equal(
+            angles, C.calc_off_boresight_angle_all_users_to_each_sector())
+
+        for user_index, user in enumerate(C.get_all_users()):
+            for cell_index, c in enumerate(C):
+                for sector in [1, 2, 3]:
+                    sec = c._get_sector(sector)
+                    boresight = np.angle(sec.pos - c.pos, deg=True)
+                    angle = np.angle(user.pos - c.pos, deg=True) - boresight
+                    angle = (angle + 180) % 360 - 180
+                    self.assertAlmostEqual(
+                        angles[user_index, cell_index, sector - 1], angle)
+                    expected_gain = (
+                        path_loss_obj.calc_path_loss(c.calc_dist(user)) *
+                        ant_gain_obj.get_antenna_gain(angle))
+                    self.assertAlmostEqual(
+                        gains[user_index, cell_index, sector - 1] /
+                        expected_gain, 1.0)
+
+        # Without an antenna gain model only the path loss is considered
+        _, _, gains = C.calc_link_budget_all_users_to_each_sector(
+            path_loss_obj)
+        np.testing.assert_array_almost_equal(
+            gains, np.repeat(path_loss_obj.calc_path_loss(
+                dists)[:, :, np.newaxis], 3, axis=-1))
+
+        # Cells which are not sectorized have a single sector
+        self.C1.wrap_around = True
+        dists, angles, gains = \
+            self.C1.calc_link_budget_all_users_to_each_sector(
+                path_loss_obj, antennagain.AntGainOmni())
+        self.assertEqual(angles.shape, (10, 3, 1))
+        np.testing.assert_array_almost_equal(
+            angles[:, :, 0], self.C1.calc_angle_all_users_to_each_cell())
+        np.testing.assert_array_almost_equal(
+            gains[:, :, 0], path_loss_obj.calc_path_loss(dists))
+
     def test_create_wrap_around_cells(self):
         # It is complicated to test the create_wrap_around_cells method
         # pragmatically. However, with a simple plot you can easily see if
@@ -1362,6 +1750,23 @@ class GridTestCase(unittest.TestCase):
             self.assertTrue(isinstance(c, cell.Cluster))
         self.assertEqual(i, 1)
 
+    def test_user_store(self):
+        G1 = cell.Grid()
+        G1.create_clusters(2, 2, 0.5)
+        for cluster in G1:
+            cluster.add_random_users(num_users=[2, 3])
+
+        all_users = G1.get_all_users()
+        self.assertEqual(len(all_users), 10)
+        store = G1.user_store
+        self.assertEqual(store.users, all_users)
+        np.testing.assert_array_equal(store.cell_ids,
+                                      [1, 1, 2, 2, 2, 1, 1, 2, 2, 2])
+        np.testing.assert_array_equal(store.cell_indexes,
+                                      [0, 0, 1, 1, 1, 2, 2, 3, 3, 3])
+        np.testing.assert_array_equal(store.positions,
+                                      [u.pos for u in all_users])
+
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
@@ -305,6 +305,51 @@ class JakesSampleGeneratorTestCase(unittest.TestCase):
         np.testing.assert_array_almost_equal(self.obj1.get_samples(),
                                              obj2.get_samples())
 
+    def test_generate_more_samples_with_stride(self):
+        obj2 = copy(self.obj2)
+
+        # Generate 4 samples spaced by 7 sampling intervals at once
+        self.obj2.generate_more_samples_with_stride(4, 7)
+
+        # Do the same thing one sample at a time
+        expected = []
+        for _ in range(4):
+            obj2.generate_more_samples()
+            expected.append(obj2.get_samples())
+            obj2.skip_samples_for_next_generation(6)
+        expected = np.concatenate(expected, axis=-1)
+
+        self.assertEqual(self.obj2.get_samples().shape, (3, 2, 4))
+        np.testing.assert_array_equal(self.obj2.get_samples(), expected)
+        self.assertEqual(self.obj2._current_time, obj2._current_time)
+
+    def test_generate_more_samples_in_chunks_and_output_buffer(self):
+        obj2 = copy(self.obj2)
+        # Force obj2 to calculate the samples in many small chunks
+        obj2._max_chunk_size = 12
+
+        self.obj2.generate_more_samples(50)
+        out = np.empty((3, 2, 50), dtype=complex)
+        obj2.generate_more_samples(50, out=out)
+
+        # The samples are stored in the provided array and they are exactly
+        # equal to the ones calculated in a single chunk
+        self.assertIs(obj2.get_samples(), out)
+        np.testing.assert_array_equal(self.obj2.get_samples(), out)
+        self.assertEqual(self.obj2._current_time, obj2._current_time)
+
+        # Same thing with a stride
+        self.obj2.generate_more_samples_with_stride(10, 3)
+        obj2.generate_more_samples_with_stride(10, 3, out=out[..., :10])
+        np.testing.assert_array_equal(self.obj2.get_samples(),
+                                      out[..., :10])
+
+        # The output array must have the correct shape and type
+        with self.assertRaises(ValueError):
+            obj2.generate_more_samples(49, out=out)
+        with self.assertRaises(ValueError):
+            obj2.generate_more_samples(50, out=np.empty((3, 2, 50)))
+
     def test_get_similar_fading_generator(self):
         obj1 = self.obj1.get_similar_fading_generator()
         obj2 = self.obj2.get_similar_fading_generator()
@@ -1379,6 +1424,49 @@ class TdlMIMOChannelTestCase(unittest.TestCase):
                                              received_signal)
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
+    def test_corrupt_data_with_output_buffer(self):
+        num_samples = 50
+        tdlmimochannel = fading.TdlMimoChannel(
+            fading_generators.RayleighSampleGenerator(shape=(4, 3)),
+            tap_powers_dB=np.array([0, -3, -6]),
+            tap_delays=np.array([0, 2, 5]))
+        channel_memory = tdlmimochannel.num_taps_with_padding - 1
+        tap_indexes = tdlmimochannel.channel_profile.tap_delays
+
+        for switched_direction in [False, True]:
+            tdlmimochannel.switched_direction = switched_direction
+            num_tx, num_rx = (4, 3) if switched_direction else (3, 4)
+            signal = (np.random.randn(num_tx, num_samples) +
+                      1j * np.random.randn(num_tx, num_samples))
+
+            out = np.empty((num_rx, num_samples + channel_memory),
+                           dtype=complex)
+            received_signal = tdlmimochannel.corrupt_data(signal, out=out)
+            self.assertIs(received_signal, out)
+
+            # Compare with the result of adding the contribution of each
+            # tap and each transmit antenna one at a time. The results must
+            # be exactly the same.
+            tap_values = tdlmimochannel.get_last_impulse_response(
+            ).tap_values_sparse
+            expected_received_signal = np.zeros(
+                (num_rx, num_samples + channel_memory), dtype=complex)
+            for i, d in enumerate(tap_indexes):
+                for tx_idx in range(num_tx):
+                    if switched_direction:
+                        h = tap_values[i, tx_idx, :, :]
+                    else:
+                        h = tap_values[i, :, tx_idx, :]
+                    expected_received_signal[:, d:d + num_samples] += (
+                        h * signal[tx_idx])
+            np.testing.assert_array_equal(received_signal,
+                                          expected_received_signal)
+
+        # The output buffer must have the correct shape
+        with self.assertRaises(ValueError):
+            tdlmimochannel.corrupt_data(signal, out=np.empty((3, 10),
+                                                             dtype=complex))
+
     def test_corrupt_data2(self):
         # This method tests test_corrupt_data, but now for a SIMO
         # system. The only difference is that the transmit signal can be a
@@ -3197,6 +3285,130 @@ class MuMimoChannelTestCase(unittest.TestCase):
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
 
+class StackedMuChannelTestCase(unittest.TestCase):
+    def setUp(self):
+        """Called before each test."""
+        self.musisochannel = multiuser.StackedMuChannel(
+            N=(2, 3), tap_powers_dB=np.array([0, -3, -6]),
+            tap_delays=np.array([0, 2, 5]), Ts=1)
+        self.mumimochannel = multiuser.StackedMuMimoChannel(
+            N=2, num_rx_antennas=3, num_tx_antennas=2,
+            fading_generator=fading_generators.JakesSampleGenerator(
+                Fd=30, Ts=3.25e-8, L=16),
+            channel_profile=fading.COST259_TUx)
+
+    def test_repr_and_properties(self):
+        self.assertEqual(repr(self.musisochannel),
+                         "StackedMuChannel(shape=2x3, switched=False)")
+        self.musisochannel.switched_direction = True
+        self.assertEqual(repr(self.musisochannel),
+                         "StackedMuChannel(shape=2x3, switched=True)")
+        self.assertEqual(repr(self.mumimochannel),
+                         "StackedMuMimoChannel(shape=2x2, switched=False)")
+
+        np.testing.assert_array_equal(self.musisochannel.num_rx_antennas,
+                                      [-1, -1])
+        np.testing.assert_array_equal(self.musisochannel.num_tx_antennas,
+                                      [-1, -1, -1])
+        np.testing.assert_array_equal(self.mumimochannel.num_rx_antennas,
+                                      [3, 3])
+        np.testing.assert_array_equal(self.mumimochannel.num_tx_antennas,
+                                      [2, 2])
+        self.assertEqual(self.musisochannel.num_taps, 3)
+        self.assertEqual(self.musisochannel.num_taps_with_padding, 6)
+        self.assertEqual(self.mumimochannel.channel_profile.name,
+                         'COST259_TU (discretized)')
+
+        self.assertIsNone(self.musisochannel.pathloss_matrix)
+        with self.assertRaises(ValueError):
+            self.musisochannel.set_pathloss(2 * np.ones((2, 3)))
+
+    def test_corrupt_data(self):
+        num_samples = 20
+        pathloss = np.random.rand(2, 3)
+        self.musisochannel.set_pathloss(pathloss)
+        np.testing.assert_array_equal(self.musisochannel.pathloss_matrix,
+                                      pathloss)
+
+        for switched in [False, True]:
+            self.musisochannel.switched_direction = switched
+            num_rx, num_tx = (3, 2) if switched else (2, 3)
+            data = np.random.randint(0, 10, (num_tx, num_samples))
+            output = self.musisochannel.corrupt_data(data)
+            self.assertEqual(output.shape, (num_rx, ))
+
+            for rx in range(num_rx):
+                expected_output = np.zeros(num_samples + 5, dtype=complex)
+                for tx in range(num_tx):
+                    if switched:
+                        impulse_response = \
+                            self.musisochannel.get_last_impulse_response(
+                                tx, rx)
+                    else:
+                        impulse_response = \
+                            self.musisochannel.get_last_impulse_response(
+                                rx, tx)
+                    h = impulse_response.tap_values
+                    for d in range(h.shape[0]):
+                        expected_output[d:d + num_samples] += h[d] * data[tx]
+                np.testing.assert_array_almost_equal(output[rx],
+                                                     expected_output)
+
+        # The path loss is included in the impulse response of each link
+        self.musisochannel.switched_direction = False
+        self.musisochannel.set_pathloss(None)
+        self.musisochannel.corrupt_data(np.ones((3, 10)))
+        impulse_response = self.musisochannel.get_last_impulse_response(1, 2)
+        self.musisochannel.set_pathloss(np.zeros((2, 3)))
+        self.musisochannel.corrupt_data(np.ones((3, 10)))
+        self.assertEqual(impulse_response.tap_values_sparse.shape, (3, 10))
+        np.testing.assert_array_equal(
+            self.musisochannel.get_last_impulse_response(1, 2).tap_values,
+            np.zeros((6, 10)))
+
+    def test_corrupt_data_in_freq_domain(self):
+        fft_size = 64
+        num_blocks = 4
+        num_samples = num_blocks * fft_size
+        self.mumimochannel.set_pathloss(np.random.rand(2, 2))
+
+        for switched in [False, True]:
+            self.mumimochannel.switched_direction = switched
+            num_rx_ant, num_tx_ant = (2, 3) if switched else (3, 2)
+
+            # The signal of each transmitter can also be given as a list
+            data = [np.random.randint(0, 10, (num_tx_ant, num_samples))
+                    for _ in range(2)]
+            output = self.mumimochannel.corrupt_data_in_freq_domain(
+                data, fft_size)
+
+            for rx in range(2):
+                self.assertEqual(output[rx].shape, (num_rx_ant, num_samples))
+                expected_output = np.zeros((num_rx_ant, num_samples),
+                                           dtype=complex)
+                for tx in range(2):
+                    if switched:
+                        freq_response = \
+                            self.mumimochannel.get_last_impulse_response(
+                                tx, rx).get_freq_response(fft_size)
+                        freq_response = np.swapaxes(freq_response, 1, 2)
+                    else:
+                        freq_response = \
+                            self.mumimochannel.get_last_impulse_response(
+                                rx, tx).get_freq_response(fft_size)
+                    for b in range(num_blocks):
+                        for k in range(fft_size):
+                            idx = b * fft_size + k
+                            expected_output[:, idx] += \
+                                freq_response[k, :, :, b].dot(data[tx][:, idx])
+                np.testing.assert_array_almost_equal(output[rx],
+                                                     expected_output)
+
+        with self.assertRaises(ValueError):
+            self.mumimochannel.corrupt_data_in_freq_domain(
+                np.ones((2, 2, num_samples)), fft_size)
+
+
 # noinspection PyMethodMayBeStatic
 class MultiUserChannelMatrixTestCase(unittest.TestCase):
     def setUp(self):
@@ -4170,6 +4382,60 @@ class MultiUserChannelMatrixTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(expected_SINR2, SINR_all_users[2])
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
+    def test_dense_backend(self):
+        K = 3
+        Nr = np.array([2, 4, 6])
+        Nt = np.array([2, 3, 5])
+        Ns = np.array([1, 2, 3])
+        multiH_dense = multiuser.MultiUserChannelMatrix()
+        multiH_dense.use_dense_backend = True
+
+        pathloss = np.abs(np.random.randn(K, K))
+        for multiH in [self.multiH, multiH_dense]:
+            multiH.set_channel_seed(42)
+            multiH.randomize(Nr, Nt, K)
+            multiH.set_pathloss(pathloss)
+            multiH.noise_var = 0.1
+
+        # The dense channel is padded with zeros
+        self.assertEqual(multiH_dense.dense_H.shape, (K, K, 6, 5))
+        np.testing.assert_array_equal(multiH_dense.dense_H[0, 1, 2:], 0.0)
+        np.testing.assert_array_equal(multiH_dense.dense_H[0, 1, :, 3:], 0.0)
+
+        F = np.empty(K, dtype=np.ndarray)
+        U = np.empty(K, dtype=np.ndarray)
+        for k in range(K):
+            F[k] = randn_c(Nt[k], Ns[k])
+            U[k] = randn_c(Nr[k], Ns[k])
+
+        for k in range(K):
+            np.testing.assert_array_almost_equal(
+                multiH_dense.get_Hk(k), self.multiH.get_Hk(k))
+            for l in range(K):
+                np.testing.assert_array_almost_equal(
+                    multiH_dense.get_Hkl(k, l), self.multiH.get_Hkl(k, l))
+            np.testing.assert_array_almost_equal(
+                multiH_dense.calc_Q(k, F), self.multiH.calc_Q(k, F))
+
+            Bkl_all_l = self.multiH._calc_Bkl_cov_matrix_all_l(F, k, 0.1)
+            Bkl_all_l_dense = multiH_dense._calc_Bkl_cov_matrix_all_l(
+                F, k, 0.1)
+            self.assertEqual(len(Bkl_all_l_dense), Ns[k])
+            for l in range(Ns[k]):
+                np.testing.assert_array_almost_equal(Bkl_all_l_dense[l],
+                                                     Bkl_all_l[l])
+
+        SINRs = self.multiH.calc_SINR(F, U)
+        SINRs_dense = multiH_dense.calc_SINR(F, U)
+        for k in range(K):
+            np.testing.assert_array_almost_equal(SINRs_dense[k], SINRs[k])
+
+        # Changing the path loss also changes the dense channel
+        multiH_dense.set_pathloss(None)
+        self.multiH.set_pathloss(None)
+        np.testing.assert_array_almost_equal(multiH_dense.get_Hkl(2, 1),
+                                             self.multiH.get_Hkl(2, 1))
+
     def test_calc_JP_Bkl_cov_matrix_first_part(self):
         K = 3
         Nr = np.ones(K, dtype=int) * 2
@@ -5539,6 +5805,39 @@ class MultiUserChannelMatrixExtIntTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(expected_SINR2, SINR_all_users[2])
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
+    def test_calc_SINR_with_dense_backend(self):
+        K = 3
+        Nr = np.array([3, 3, 3])
+        Nt = np.array([2, 2, 2])
+        NtE = 2
+        multiH_dense = multiuser.MultiUserChannelMatrixExtInt()
+        multiH_dense.use_dense_backend = True
+
+        pathloss = np.abs(np.random.randn(K, K))
+        ext_int_pathloss = np.abs(np.random.randn(K, 1))
+        for multiH in [self.multiH, multiH_dense]:
+            multiH.set_channel_seed(42)
+            multiH.randomize(Nr, Nt, K, NtE)
+            multiH.set_pathloss(pathloss, ext_int_pathloss)
+            multiH.noise_var = 0.01
+
+        self.assertEqual(multiH_dense.dense_H.shape, (K, K, 3, 2))
+
+        F = np.empty(K, dtype=np.ndarray)
+        U = np.empty(K, dtype=np.ndarray)
+        for k in range(K):
+            F[k] = randn_c(Nt[k], 1)
+            U[k] = randn_c(Nr[k], 1)
+
+        for k in range(K):
+            np.testing.assert_array_almost_equal(
+                multiH_dense.calc_Q(k, F), self.multiH.calc_Q(k, F))
+
+        SINRs = self.multiH.calc_SINR(F, U)
+        SINRs_dense = multiH_dense.calc_SINR(F, U)
+        for k in range(K):
+            np.testing.assert_array_almost_equal(SINRs_dense[k], SINRs[k])
+
     def test_calc_JP_Bkl_cov_matrix_first_part(self):
         K = 3
         Nr = np.ones(K, dtype=int) * 2
@@ -5879,6 +6178,102 @@ class MultiUserChannelMatrixExtIntTestCase(unittest.TestCase):
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
 
+class MultiUserChannelMatrixEnsembleTestCase(unittest.TestCase):
+    def setUp(self):
+        """Called before each test."""
+        self.B = 4
+        self.K = 3
+        self.Nr = np.array([2, 4, 3])
+        self.Nt = np.array([2, 3, 1])
+        self.ensemble = multiuser.MultiUserChannelMatrixEnsemble(self.B)
+        self.ensemble.set_channel_seed(42)
+        self.ensemble.randomize(self.Nr, self.Nt, self.K)
+
+    def test_randomize_and_init_from_channel_matrix(self):
+        self.assertEqual(self.ensemble.B, self.B)
+        self.assertEqual(self.ensemble.K, self.K)
+        np.testing.assert_array_equal(self.ensemble.Nr, self.Nr)
+        np.testing.assert_array_equal(self.ensemble.Nt, self.Nt)
+        self.assertEqual(self.ensemble.big_H.shape, (self.B, 9, 6))
+        self.assertEqual(self.ensemble.dense_H.shape,
+                         (self.B, self.K, self.K, 4, 3))
+
+        ensemble2 = multiuser.MultiUserChannelMatrixEnsemble(self.B)
+        ensemble2.init_from_channel_matrix(
+            np.array(self.ensemble.big_H), self.Nr, self.Nt, self.K)
+        np.testing.assert_array_equal(ensemble2.dense_H,
+                                      self.ensemble.dense_H)
+
+        with self.assertRaises(ValueError):
+            ensemble2.init_from_channel_matrix(
+                np.ones((self.B + 1, 9, 6)), self.Nr, self.Nt, self.K)
+        with self.assertRaises(ValueError):
+            ensemble2.set_pathloss(np.ones((2, 2)))
+
+    def test_set_pathloss(self):
+        pathloss = np.random.rand(self.K, self.K)
+        self.ensemble.set_pathloss(pathloss)
+        np.testing.assert_array_equal(self.ensemble.pathloss, pathloss)
+
+        # Path loss values must be between 0 and 1
+        with self.assertRaises(ValueError):
+            self.ensemble.set_pathloss(pathloss + 1.0)
+        with self.assertRaises(ValueError):
+            self.ensemble.set_pathloss(
+                -np.random.rand(self.B, self.K, self.K))
+
+    def test_corrupt_data_and_calc_SINR(self):
+        pathloss = np.random.rand(self.B, self.K, self.K)
+        self.ensemble.set_pathloss(pathloss)
+        self.ensemble.noise_var = 0.1
+
+        Ns = [1, 2, 1]
+        # Precoders differ in each realization, while the receive filters
+        # and the data of the first two users are the same for all of them
+        F = [randn_c(self.B, self.Nt[k], Ns[k]) for k in range(self.K)]
+        U = [randn_c(self.Nr[k], Ns[k]) for k in range(self.K)]
+        data = [randn_c(self.Nt[0], 10), randn_c(self.Nt[1], 10),
+                randn_c(self.B, self.Nt[2], 10)]
+
+        SINRs = self.ensemble.calc_SINR(F, U)
+        output = self.ensemble.corrupt_data(data)
+        noise = self.ensemble.last_noise
+        self.assertEqual(noise.shape, (self.B, 9, 10))
+
+        cumNr = np.hstack([0, np.cumsum(self.Nr)])
+        for b in range(self.B):
+            multiH = self.ensemble.get_realization(b)
+            np.testing.assert_array_equal(multiH.pathloss, pathloss[b])
+            self.assertEqual(multiH.noise_var, 0.1)
+
+            Fb = np.empty(self.K, dtype=np.ndarray)
+            Ub = np.empty(self.K, dtype=np.ndarray)
+            for k in range(self.K):
+                Fb[k] = F[k][b]
+                Ub[k] = U[k]
+            expected_SINRs = multiH.calc_SINR(Fb, Ub)
+
+            expected_output = np.dot(
+                multiH.big_H,
+                np.vstack([data[0], data[1], data[2][b]])) + noise[b]
+
+            for k in range(self.K):
+                np.testing.assert_array_almost_equal(SINRs[k][b],
+                                                     expected_SINRs[k])
+                np.testing.assert_array_almost_equal(
+                    output[k][b], expected_output[cumNr[k]:cumNr[k + 1]])
+                for l in range(self.K):
+                    np.testing.assert_array_almost_equal(
+                        self.ensemble.get_Hkl(k, l)[b],
+                        multiH.get_Hkl(k, l))
+
+        # Disable the path loss
+        self.ensemble.set_pathloss(None)
+        self.assertIsNone(self.ensemble.pathloss)
+        np.testing.assert_array_equal(
+            self.ensemble.get_realization(1).big_H, self.ensemble.big_H[1])
+
+
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx Pathloss Module xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -31,7 +31,7 @@ from pyphysim.comm import blockdiagonalization, waterfilling
 from pyphysim.modulators import fundamental
 from pyphysim.channels import multiuser
 from pyphysim.util.misc import calc_whitening_matrix, randn_c, \
-    calc_shannon_sum_capacity
+    calc_shannon_sum_capacity, least_right_singular_vectors
 from pyphysim.util.conversion import dB2Linear, linear2dB
 from pyphysim.subspace.projections import calcProjectionMatrix
 
@@ -98,6 +98,100 @@ class WaterfillingTestCase(unittest.TestCase):
                                     0.95446418, 0.])
         np.testing.assert_array_almost_equal(vtOptP, expected_vtOptP)
 
+        # A channel with zero gain never receives any power
+        (vtOptP2, mu2) = waterfilling.doWF(
+            np.hstack([channel_power_gains, 0.0]), total_power, noise_var)
+        self.assertAlmostEqual(mu2, expected_mu)
+        np.testing.assert_array_almost_equal(
+            vtOptP2, np.hstack([expected_vtOptP, 0.0]))
+
+    def test_doWF_batched(self):
+        np.random.seed(42)
+        channels = np.random.rand(4, 3, 8)
+        total_powers = 10 * np.random.rand(4, 3)
+        noise_var = 0.5
+
+        (vtOptP, mu) = waterfilling.doWF(channels, total_powers, noise_var)
+        self.assertEqual(vtOptP.shape, (4, 3, 8))
+        self.assertEqual(mu.shape, (4, 3))
+        for i in range(4):
+            for j in range(3):
+                (expected_vtOptP, expected_mu) = waterfilling.doWF(
+                    channels[i, j], total_powers[i, j], noise_var)
+                np.testing.assert_array_almost_equal(vtOptP[i, j],
+                                                     expected_vtOptP)
+                self.assertAlmostEqual(mu[i, j], expected_mu)
+
+        # A single total power for all the vectors of channels
+        (vtOptP, _) = waterfilling.doWF(channels, 2.0, noise_var)
+        np.testing.assert_array_almost_equal(np.sum(vtOptP, axis=-1),
+                                             2.0 * np.ones([4, 3]))
+
+    def test_doWF_single_and_batched_agree(self):
+        # A single 1D array of channels (without maximum powers) uses a
+        # different implementation than the ND case
+        np.random.seed(1234)
+        for num_channels in [1, 2, 5, 12]:
+            for _ in range(20):
+                channels = (np.random.rand(num_channels) *
+                            10**np.random.uniform(-3, 3, num_channels))
+                channels[np.random.rand(num_channels) < 0.2] = 0.0
+                total_power = 20 * np.random.rand()
+                (vtOptP, mu) = waterfilling.doWF(channels, total_power, 0.5,
+                                                 Es=0.7)
+                (vtOptP2, mu2) = waterfilling.doWF(
+                    channels[np.newaxis], total_power, 0.5, Es=0.7)
+                np.testing.assert_array_almost_equal(vtOptP, vtOptP2[0])
+                if np.isfinite(mu):
+                    self.assertAlmostEqual(mu / mu2[0], 1.0)
+                else:
+                    self.assertEqual(mu2[0], np.inf)
+
+    def test_doWF_with_max_power(self):
+        channel_power_gains = np.array([2.0, 1.0, 0.5, 0.25])
+        noise_var = 1.0
+        max_powers = np.array([0.5, 1.0, 1.0, 1.0])
+
+        # The first channel would receive more than 0.5 without the
+        # power limit
+        (vtOptP, mu) = waterfilling.doWF(channel_power_gains, 3.0, noise_var,
+                                         vtMaxP=max_powers)
+        self.assertAlmostEqual(np.sum(vtOptP), 3.0)
+        self.assertTrue(np.all(vtOptP <= max_powers + 1e-12))
+        # The channels that did not reach the maximum power follow the
+        # water level
+        expected_vtOptP = np.minimum(
+            np.maximum(mu - noise_var / channel_power_gains, 0), max_powers)
+        np.testing.assert_array_almost_equal(vtOptP, expected_vtOptP)
+        np.testing.assert_array_almost_equal(vtOptP, [0.5, 1.0, 1.0, 0.5])
+        self.assertAlmostEqual(mu, 4.5)
+
+        # If the power limit is not reached the result is the same as
+        # without the limit
+        (vtOptP, mu) = waterfilling.doWF(channel_power_gains, 1.0, noise_var,
+                                         vtMaxP=10.0)
+        (expected_vtOptP, expected_mu) = waterfilling.doWF(
+            channel_power_gains, 1.0, noise_var)
+        np.testing.assert_array_almost_equal(vtOptP, expected_vtOptP)
+        self.assertAlmostEqual(mu, expected_mu)
+
+        # If there is more power than the sum of the maximum powers then
+        # all channels use their maximum power
+        (vtOptP, mu) = waterfilling.doWF(channel_power_gains, 10.0, noise_var,
+                                         vtMaxP=max_powers)
+        np.testing.assert_array_almost_equal(vtOptP, max_powers)
+        self.assertEqual(mu, np.inf)
+
+    def test_doWF_tiny_gains(self):
+        # The inverse SNR of each channel is much larger than the total
+        # power, but all the power must still be allocated
+        (vtOptP, mu) = waterfilling.doWF(np.array([1e-20]), 1.0)
+        np.testing.assert_array_almost_equal(vtOptP, [1.0])
+        self.assertAlmostEqual(mu, 1e20)
+
+        (vtOptP, _) = waterfilling.doWF(np.array([1e-20, 2e-20]), 1.0)
+        np.testing.assert_array_almost_equal(vtOptP, [0.0, 1.0])
+
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx Block Diagonalization Module xxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -153,6 +247,46 @@ class BlockDiaginalizerTestCase(unittest.TestCase):
         # zero
         self.assertAlmostEqual(0., np.abs(masked_newH).sum())
 
+    def test_calc_BD_matrix_no_power_scaling_per_user(self):
+        # Compare the (batched) implementation with the BD matrix
+        # calculated for one user at a time
+        def calc_per_user(BD, mtChannel):
+            iNr = mtChannel.shape[0]
+            iNrU = iNr // BD.num_users
+            Ms_bad = []
+            Sigma = []
+            for user in range(BD.num_users):
+                tilde_H = BD._get_tilde_channel(mtChannel, user)
+                nStreams = iNr - np.linalg.matrix_rank(tilde_H)
+                tilde_V0 = least_right_singular_vectors(tilde_H, nStreams)[0]
+                H_cur_user = BD._get_sub_channel(mtChannel, user)
+                (_, V1, S) = least_right_singular_vectors(
+                    np.dot(H_cur_user, tilde_V0), iNrU - nStreams)
+                Ms_bad.append(np.dot(tilde_V0, V1))
+                Sigma.extend(S)
+            return np.hstack(Ms_bad), np.array(Sigma)
+
+        channel = randn_c(self.iNr, self.iNt)
+        tilde_H_all = self.BD._get_all_tilde_channels(channel)
+        self.assertEqual(tilde_H_all.shape,
+                         (self.num_users, self.iNr - self.iNrk, self.iNt))
+        for user in range(self.num_users):
+            np.testing.assert_array_equal(
+                tilde_H_all[user], self.BD._get_tilde_channel(channel, user))
+
+        (Ms_bad, Sigma) = self.BD._calc_BD_matrix_no_power_scaling(channel)
+        (expected_Ms_bad, expected_Sigma) = calc_per_user(self.BD, channel)
+        np.testing.assert_array_almost_equal(Ms_bad, expected_Ms_bad)
+        np.testing.assert_array_almost_equal(Sigma, expected_Sigma)
+
+        # Now a degenerated channel, where the interfering channels of the
+        # users have different ranks
+        channel[2:4] = channel[0:2]
+        (Ms_bad, Sigma) = self.BD._calc_BD_matrix_no_power_scaling(channel)
+        (expected_Ms_bad, expected_Sigma) = calc_per_user(self.BD, channel)
+        np.testing.assert_array_almost_equal(Ms_bad, expected_Ms_bad)
+        np.testing.assert_array_almost_equal(Sigma, expected_Sigma)
+
     def test_perform_global_waterfilling_power_scaling(self):
         channel = randn_c(self.iNr, self.iNt)
         (Ms_bad, Sigma) = self.BD._calc_BD_matrix_no_power_scaling(channel)
@@ -222,6 +356,20 @@ class BlockDiaginalizerTestCase(unittest.TestCase):
             self.assertGreaterEqual(self.Pu + tol,
                                     individual_powers[-1])
 
+    def test_block_diagonalize_degenerated_channel(self):
+        # Both users have exactly the same channel. After the projection
+        # into the null space of the other user's channel the effective
+        # channel gains are only numerical noise, but the precoder must
+        # still be finite.
+        np.random.seed(1)
+        channel = randn_c(4, 4)
+        channel[2:4] = channel[0:2]
+
+        BD = blockdiagonalization.BlockDiagonalizer(2, 1, 1)
+        (newH, Ms) = BD.block_diagonalize(channel)
+        self.assertTrue(np.all(np.isfinite(newH)))
+        self.assertTrue(np.all(np.isfinite(Ms)))
+
     def test_block_diagonalize(self):
         Pu = self.Pu
         noise_var = self.noise_var
@@ -28,6 +28,7 @@ except ImportError as e:  # pragma: no cover
 
 import unittest
 import doctest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import numpy as np
 from numpy.linalg import norm
 
@@ -35,7 +36,9 @@ from pyphysim import channels
 import pyphysim.ia  # Import the package ia
 from pyphysim.ia.algorithms import AlternatingMinIASolver, IASolverBaseClass, \
     MaxSinrIASolver, MinLeakageIASolver, ClosedFormIASolver, MMSEIASolver, \
-    IterativeIASolverBaseClass, GreedStreamIASolver, BruteForceStreamIASolver
+    IterativeIASolverBaseClass, GreedStreamIASolver, BruteForceStreamIASolver, \
+    BatchedIterativeIASolverBaseClass, BatchedAlternatingMinIASolver, \
+    BatchedMinLeakageIASolver, BatchedMaxSinrIASolver
 from pyphysim.util.misc import peig, leig, randn_c
 from pyphysim.util.conversion import linear2dB
 
@@ -3273,6 +3276,28 @@ class GreedStreamIASolverTestCase(CustomTestCase):
             self._save_state('GreedStream_test_solve_state.pickle')
             raise  # re-raises the last exception
 
+    def test_solve_with_pruning(self):
+        multiUserChannel = channels.multiuser.MultiUserChannelMatrix()
+        multiUserChannel.set_channel_seed(2)
+        multiUserChannel.randomize(4, 4, 3)
+        multiUserChannel.noise_var = 0.01
+        Ns = np.array([3, 3, 3])
+        P = np.array([1.2, 1.5, 0.9])
+
+        expected = []
+        for use_pruning in [False, True]:
+            alt_min_iasolver = AlternatingMinIASolver(multiUserChannel)
+            alt_min_iasolver.max_iterations = 100
+            alt_min_iasolver._rs.seed(42)
+            iasolver = GreedStreamIASolver(alt_min_iasolver)
+            iasolver.use_pruning = use_pruning
+            iasolver.solve(Ns, P)
+            expected.append((alt_min_iasolver.calc_sum_capacity(),
+                             alt_min_iasolver.Ns))
+
+        self.assertAlmostEqual(expected[0][0], expected[1][0])
+        np.testing.assert_array_equal(expected[0][1], expected[1][1])
+
 
 class BruteForceStreamIASolverTestCase(CustomTestCase):
     def setUp(self):
@@ -3410,6 +3435,290 @@ class BruteForceStreamIASolverTestCase(CustomTestCase):
             self._save_state('BruteForce_test_solve_state.pickle')
             raise  # re-raises the last exception
 
+    def test_solve_with_pruning(self):
+        multiUserChannel = channels.multiuser.MultiUserChannelMatrix()
+        multiUserChannel.set_channel_seed(1)
+        multiUserChannel.randomize(4, 4, 3)
+        multiUserChannel.noise_var = 0.01
+        Ns = np.array([3, 3, 3])
+        P = np.array([1.2, 1.5, 0.9])
+
+        alt_min_iasolver = AlternatingMinIASolver(multiUserChannel)
+        alt_min_iasolver.max_iterations = 100
+        iasolver = BruteForceStreamIASolver(alt_min_iasolver)
+        iasolver.solve(Ns, P)
+        expected_sum_capacity = np.array(iasolver.every_sum_capacity)
+        expected_Ns = alt_min_iasolver.Ns
+
+        # The sum capacity of each stream configuration is limited by its
+        # interference free capacity
+        bounds = pyphysim.ia.algorithms._calc_capacity_upper_bounds(
+            alt_min_iasolver, Ns, P)
+        for comb, sum_capacity in zip(iasolver.stream_combinations,
+                                      expected_sum_capacity):
+            self.assertLessEqual(sum_capacity,
+                                 np.sum(bounds[np.arange(3), comb]))
+
+        iasolver.use_pruning = True
+        iasolver.solve(Ns, P)
+        sum_capacity = np.array(iasolver.every_sum_capacity)
+        solved = ~np.isnan(sum_capacity)
+
+        # Some configurations were skipped, but the ones that were solved
+        # have the same solution and the best solution is the same
+        self.assertGreater(np.sum(~solved), 0)
+        np.testing.assert_array_almost_equal(sum_capacity[solved],
+                                             expected_sum_capacity[solved])
+        self.assertAlmostEqual(np.nanmax(sum_capacity),
+                               np.max(expected_sum_capacity))
+        np.testing.assert_array_equal(alt_min_iasolver.Ns, expected_Ns)
+
+    def test_solve_with_warm_start(self):
+        multiUserChannel = channels.multiuser.MultiUserChannelMatrix()
+        multiUserChannel.set_channel_seed(1)
+        multiUserChannel.randomize(4, 4, 3)
+        multiUserChannel.noise_var = 0.01
+        P = np.array([1.2, 1.5, 0.9])
+
+        max_sinr_iasolver = MaxSinrIASolver(multiUserChannel)
+        max_sinr_iasolver.max_iterations = 50
+        iasolver = BruteForceStreamIASolver(max_sinr_iasolver)
+        iasolver.use_warm_start = True
+        iasolver.solve(np.array([2, 2, 2]), P)
+
+        # Every stream configuration, except the first one, is solved
+        # starting from a neighbor configuration
+        self.assertEqual(set(iasolver._solutions.keys()),
+                         set(iasolver.stream_combinations))
+        self.assertEqual(max_sinr_iasolver.initialize_with, 'fix')
+        self.assertIsNone(iasolver._find_solved_neighbor((3, 3, 3)))
+        self.assertEqual(iasolver._find_solved_neighbor((3, 2, 2)),
+                         (2, 2, 2))
+        self.assertTrue(np.all(np.isfinite(iasolver.every_sum_capacity)))
+        self.assertAlmostEqual(max_sinr_iasolver.calc_sum_capacity(),
+                               np.max(iasolver.every_sum_capacity))
+
+        iasolver.clear()
+        self.assertEqual(iasolver._solutions, {})
+
+    def test_solve_with_executor(self):
+        multiUserChannel = channels.multiuser.MultiUserChannelMatrix()
+        multiUserChannel.set_channel_seed(5)
+        multiUserChannel.randomize(4, 4, 3)
+        multiUserChannel.noise_var = 0.1
+        Ns = np.array([2, 3, 2])
+        P = np.array([1.2, 1.5, 0.9])
+
+        solutions = []
+        for executor in [None, ThreadPoolExecutor(max_workers=2),
+                         ProcessPoolExecutor(max_workers=2)]:
+            max_sinr_iasolver = MaxSinrIASolver(multiUserChannel)
+            max_sinr_iasolver.max_iterations = 20
+            iasolver = BruteForceStreamIASolver(max_sinr_iasolver)
+            iasolver.executor = executor
+            runned_iterations = iasolver.solve(Ns, P)
+            solutions.append((runned_iterations,
+                              iasolver.stream_combinations,
+                              iasolver.every_sum_capacity,
+                              max_sinr_iasolver.Ns,
+                              max_sinr_iasolver.F,
+                              max_sinr_iasolver.W_H))
+            if executor is not None:
+                executor.shutdown()
+
+        # The solution must be exactly the same one found when the stream
+        # configurations are solved sequentially
+        expected = solutions[0]
+        for solution in solutions[1:]:
+            self.assertEqual(solution[0], expected[0])
+            self.assertEqual(solution[1], expected[1])
+            self.assertEqual(solution[2], expected[2])
+            np.testing.assert_array_equal(solution[3], expected[3])
+            for k in range(3):
+                np.testing.assert_array_equal(solution[4][k], expected[4][k])
+                np.testing.assert_array_equal(solution[5][k], expected[5][k])
+
+        # Warm-start and pruning depend on the order the configurations
+        # are solved
+        iasolver.executor = ThreadPoolExecutor(max_workers=2)
+        iasolver.use_warm_start = True
+        with self.assertRaises(RuntimeError):
+            iasolver.solve(Ns, P)
+        iasolver.executor.shutdown()
+
+    def test_extend_precoder(self):
+        Hkk = randn_c(4, 4)
+        Fk = randn_c(4, 2)
+
+        # Less streams: keep the subspace of the first columns
+        newFk = pyphysim.ia.algorithms._extend_precoder(Fk, Hkk, 1)
+        self.assertAlmostEqual(norm(newFk, 'fro'), 1.0)
+        np.testing.assert_array_almost_equal(
+            newFk.dot(newFk.conj().T),
+            Fk[:, :1].dot(Fk[:, :1].conj().T) / norm(Fk[:, 0]) ** 2)
+
+        # More streams: orthonormal columns that include the original
+        # subspace
+        newFk = pyphysim.ia.algorithms._extend_precoder(Fk, Hkk, 3)
+        self.assertEqual(newFk.shape, (4, 3))
+        np.testing.assert_array_almost_equal(newFk.conj().T.dot(newFk),
+                                             np.eye(3) / 3.0)
+        proj = 3 * newFk.dot(newFk.conj().T)
+        np.testing.assert_array_almost_equal(proj.dot(Fk), Fk)
+
+
+class BatchedIASolversTestCase(unittest.TestCase):
+    def setUp(self):
+        """Called before each test."""
+        self.B = 5
+        self.K = 3
+        self.P = np.array([1.2, 1.5, 0.9])
+        self.ensemble = channels.multiuser.MultiUserChannelMatrixEnsemble(
+            self.B)
+        self.ensemble.set_channel_seed(1234)
+        self.ensemble.noise_var = 1e-2
+
+    def _solve_each_realization(self, batched_solver, solver_class, Ns):
+        """
+        Solve each realization with `solver_class` starting from the
+        initial precoders used by `batched_solver`.
+        """
+        batched_solver.max_iterations = 10
+        batched_solver._rs.seed(42)
+        batched_solver.solve(Ns, self.P)
+
+        # Get the same initial precoders used by batched_solver
+        batched_solver._rs.seed(42)
+        batched_solver.randomizeF(Ns, self.P)
+        initial_F = batched_solver.F.copy()
+        batched_solver._rs.seed(42)
+        batched_solver.solve(Ns, self.P)
+
+        solvers = []
+        for b in range(self.B):
+            iasolver = solver_class(self.ensemble.get_realization(b))
+            iasolver.initialize_with = 'fix'
+            iasolver.max_iterations = 10
+            F = np.empty(self.K, dtype=np.ndarray)
+            for k in range(self.K):
+                F[k] = initial_F[b, k]
+            iasolver.set_precoders(F=F)
+            iasolver.solve(Ns, self.P)
+            solvers.append(iasolver)
+        return solvers
+
+    def test_invalid_channel_and_streams(self):
+        with self.assertRaises(ValueError):
+            BatchedMinLeakageIASolver(
+                channels.multiuser.MultiUserChannelMatrix())
+
+        self.ensemble.randomize(np.array([2, 2, 3]), 2, self.K)
+        iasolver = BatchedMaxSinrIASolver(self.ensemble)
+        with self.assertRaises(ValueError):
+            iasolver.solve(1)
+
+        self.ensemble.randomize(3, 3, self.K)
+        with self.assertRaises(ValueError):
+            iasolver.solve([1, 1, 2])
+
+    def test_is_diff_significant(self):
+        F_old = np.ones((4, self.K, 2, 1), dtype=complex)
+        F_new = F_old.copy()
+        F_new[1, 2, 0, 0] += 1e-3
+        F_new[3, 0, 1, 0] += 1e-9
+        np.testing.assert_array_equal(
+            BatchedIterativeIASolverBaseClass._is_diff_significant(
+                F_old, F_new, 1e-6),
+            [False, True, False, False])
+
+        # Same as the non batched version for each realization
+        for b in range(4):
+            Fb_old = np.empty(self.K, dtype=np.ndarray)
+            Fb_new = np.empty(self.K, dtype=np.ndarray)
+            for k in range(self.K):
+                Fb_old[k] = F_old[b, k]
+                Fb_new[k] = F_new[b, k]
+            self.assertEqual(
+                IterativeIASolverBaseClass._is_diff_significant(
+                    Fb_old, Fb_new, 1e-6),
+                b == 1)
+
+    def test_solve(self):
+        self.ensemble.randomize(4, 4, self.K)
+        Ns = 2
+
+        for batched_class, solver_class in [
+                (BatchedMaxSinrIASolver, MaxSinrIASolver),
+                (BatchedAlternatingMinIASolver, AlternatingMinIASolver)]:
+            batched_solver = batched_class(self.ensemble)
+            solvers = self._solve_each_realization(
+                batched_solver, solver_class, Ns)
+
+            self.assertEqual(batched_solver.F.shape, (self.B, self.K, 4, 2))
+            self.assertEqual(batched_solver.W.shape, (self.B, self.K, 4, 2))
+            sum_capacity = batched_solver.calc_sum_capacity()
+            for b, iasolver in enumerate(solvers):
+                for k in range(self.K):
+                    # Compare the subspaces, since the eigenvectors are
+                    # only unique up to a phase
+                    np.testing.assert_array_almost_equal(
+                        iasolver.F[k].dot(iasolver.F[k].conj().T),
+                        batched_solver.F[b, k].dot(
+                            batched_solver.F[b, k].conj().T))
+                    np.testing.assert_array_almost_equal(
+                        iasolver.full_W_H[k],
+                        batched_solver.full_W_H[b, k])
+                self.assertAlmostEqual(iasolver.calc_sum_capacity(),
+                                       sum_capacity[b])
+                np.testing.assert_array_almost_equal(
+                    iasolver.calc_SINR()[1],
+                    batched_solver.calc_SINR()[b, 1])
+
+    def test_solve_min_leakage(self):
+        self.ensemble.randomize(2, 2, self.K)
+        batched_solver = BatchedMinLeakageIASolver(self.ensemble)
+        solvers = self._solve_each_realization(
+            batched_solver, MinLeakageIASolver, 1)
+
+        cost = batched_solver.get_cost()
+        for b, iasolver in enumerate(solvers):
+            for k in range(self.K):
+                np.testing.assert_array_almost_equal(
+                    iasolver.F[k].dot(iasolver.F[k].conj().T),
+                    batched_solver.F[b, k].dot(
+                        batched_solver.F[b, k].conj().T))
+                np.testing.assert_array_almost_equal(
+                    iasolver.W[k].dot(iasolver.W[k].conj().T),
+                    batched_solver.W[b, k].dot(
+                        batched_solver.W[b, k].conj().T))
+            self.assertAlmostEqual(iasolver.get_cost(), cost[b])
+
+    def test_convergence_of_each_realization(self):
+        self.ensemble.randomize(2, 2, self.K)
+        batched_solver = BatchedMinLeakageIASolver(self.ensemble)
+        batched_solver.relative_factor = 1e-2
+        batched_solver.max_iterations = 300
+        batched_solver._rs.seed(42)
+        runned_iterations = batched_solver.solve(1)
+
+        batched_solver._rs.seed(42)
+        batched_solver.randomizeF(1)
+        initial_F = batched_solver.F.copy()
+        for b in range(self.B):
+            iasolver = MinLeakageIASolver(self.ensemble.get_realization(b))
+            iasolver.initialize_with = 'fix'
+            iasolver.relative_factor = 1e-2
+            iasolver.max_iterations = 300
+            F = np.empty(self.K, dtype=np.ndarray)
+            for k in range(self.K):
+                F[k] = initial_F[b, k]
+            iasolver.set_precoders(F=F)
+            self.assertEqual(iasolver.solve(1), runned_iterations[b])
+
+        batched_solver.clear()
+        self.assertIsNone(batched_solver.F)
+        np.testing.assert_array_equal(batched_solver.runned_iterations, 0)
+
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 if __name__ == "__main__":  # pragma: nocover
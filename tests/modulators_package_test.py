@@ -173,6 +173,24 @@ class PSKTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.psk_obj2.modulate(10)
 
+    def test_demodulate_same_as_closest_symbol(self):
+        psk_obj3 = fundamental.PSK(8, phaseOffset=0.3)
+        psk_obj4 = fundamental.PSK(4)
+        psk_obj4.setPhaseOffset(np.pi / 4.)
+        for psk in [self.psk_obj, self.psk_obj2, psk_obj3, psk_obj4]:
+            # Received data exactly at the decision boundaries (including
+            # zero) must be demodulated to the same symbol as the one with
+            # the smallest distance (first one in case of ties)
+            received_data = np.hstack(
+                [randn_c(100),
+                 ((psk.symbols[:, np.newaxis] +
+                   psk.symbols[np.newaxis, :]) / 2.).flatten(),
+                 np.exp(1j * np.linspace(-np.pi, np.pi, 257)),
+                 1e10 * randn_c(10)]).reshape([1, -1])
+            np.testing.assert_array_equal(
+                psk.demodulate(received_data),
+                psk._demodulate_closest_symbol(received_data))
+
 
 class BPSKTestCase(unittest.TestCase):
     def setUp(self):
@@ -365,6 +383,105 @@ class QAMTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.qam_obj3.modulate(65)
 
+    def test_demodulate_same_as_closest_symbol(self):
+        grid = np.linspace(-1.5, 1.5, 61)
+        for qam in [self.qam_obj, self.qam_obj2, self.qam_obj3]:
+            # Received data exactly at the decision boundaries (including
+            # zero) must be demodulated to the same symbol as the one with
+            # the smallest distance (first one in case of ties)
+            received_data = np.hstack(
+                [randn_c(100),
+                 ((qam.symbols[:, np.newaxis] +
+                   qam.symbols[np.newaxis, :]) / 2.).flatten(),
+                 (grid[:, np.newaxis] + 1j * grid[np.newaxis, :]).flatten(),
+                 1e10 * randn_c(10)])
+            np.testing.assert_array_equal(
+                qam.demodulate(received_data),
+                qam._demodulate_closest_symbol(received_data))
+
+        # The distance matrix is computed in chunks when the received data
+        # is large. Here we force a small chunk size.
+        received_data = randn_c(10, 33)
+        expected_demodulated_data = self.qam_obj3.demodulate(received_data)
+        original_size = fundamental._MAX_DISTANCE_MATRIX_SIZE
+        fundamental._MAX_DISTANCE_MATRIX_SIZE = 100
+        try:
+            np.testing.assert_array_equal(
+                fundamental.Modulator.demodulate(self.qam_obj3,
+                                                 received_data),
+                expected_demodulated_data)
+        finally:
+            fundamental._MAX_DISTANCE_MATRIX_SIZE = original_size
+
+    def test_demodulate_soft(self):
+        noise_var = 0.2
+
+        def calc_llrs_bit_by_bit(modulator, received_data, method):
+            # Calculates the LLRs directly from the definition
+            num_bits = int(modulator.K)
+            llrs = np.empty(received_data.shape + (num_bits,))
+            for index in np.ndindex(*received_data.shape):
+                metrics = -np.abs(received_data[index] -
+                                  modulator.symbols) ** 2 / noise_var
+                for k in range(num_bits):
+                    bits = (np.arange(modulator.M) >> (num_bits - 1 - k)) & 1
+                    if method == 'exact':
+                        llrs[index + (k,)] = (
+                            np.log(np.sum(np.exp(metrics[bits == 0]))) -
+                            np.log(np.sum(np.exp(metrics[bits == 1]))))
+                    else:
+                        llrs[index + (k,)] = (np.max(metrics[bits == 0]) -
+                                              np.max(metrics[bits == 1]))
+            return llrs
+
+        psk_obj = fundamental.PSK(8)
+        for modulator in [self.qam_obj, self.qam_obj2, self.qam_obj3,
+                          psk_obj]:
+            input_data = np.random.randint(0, modulator.M, [3, 5])
+            received_data = (modulator.modulate(input_data) +
+                             np.sqrt(noise_var) * randn_c(3, 5))
+            for method in ['exact', 'maxlog']:
+                llrs = modulator.demodulate_soft(received_data, noise_var,
+                                                 method)
+                self.assertEqual(llrs.shape, (3, 5, int(modulator.K)))
+                np.testing.assert_array_almost_equal(
+                    llrs,
+                    calc_llrs_bit_by_bit(modulator, received_data, method))
+
+            # The hard decision of the max-log LLRs is equal to the bits
+            # of the demodulated symbols
+            demodulated_data = modulator.demodulate(received_data)
+            bits = (demodulated_data[..., np.newaxis] >>
+                    np.arange(int(modulator.K) - 1, -1, -1)) & 1
+            np.testing.assert_array_equal(
+                modulator.demodulate_soft(received_data, noise_var,
+                                          'maxlog') < 0,
+                bits == 1)
+
+        # The LLRs are computed in chunks when the received data is large.
+        # Here we force a small chunk size.
+        received_data = randn_c(10, 33)
+        expected_llrs = self.qam_obj3.demodulate_soft(received_data,
+                                                      noise_var)
+        original_size = fundamental._MAX_DISTANCE_MATRIX_SIZE
+        fundamental._MAX_DISTANCE_MATRIX_SIZE = 1000
+        try:
+            np.testing.assert_array_almost_equal(
+                self.qam_obj3.demodulate_soft(received_data, noise_var),
+                expected_llrs)
+        finally:
+            fundamental._MAX_DISTANCE_MATRIX_SIZE = original_size
+
+        # Test if an exception is raised for an invalid method
+        with self.assertRaises(ValueError):
+            self.qam_obj.demodulate_soft(received_data, noise_var, 'invalid')
+
+        # Test if an exception is raised for an invalid noise variance
+        with self.assertRaises(ValueError):
+            self.qam_obj.demodulate_soft(received_data, 0.0)
+        with self.assertRaises(ValueError):
+            self.qam_obj.demodulate_soft(received_data, -0.5, 'maxlog')
+
 
 # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 # xxxxxxxxxxxxxxx OFDM Module xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
@@ -26,11 +26,13 @@ import unittest
 import doctest
 import numpy as np
 import glob
+import timeit
 from time import sleep
 from io import StringIO
 from itertools import repeat
 from copy import copy
 import json
+import pickle
 
 try:
     # noinspection PyUnresolvedReferences
@@ -59,7 +61,7 @@ from pyphysim.simulations.parameters import SimulationParameters, \
     combine_simulation_parameters
 from pyphysim.simulations.results import Result, SimulationResults
 from pyphysim.simulations.runner import SimulationRunner, SkipThisOne, \
-    get_common_parser
+    get_common_parser, ProcessPoolView, _PartialResultsJournal
 from pyphysim.util import misc
 
 
@@ -1374,6 +1376,140 @@ class ResultTestCase(unittest.TestCase):
         self.assertEqual(result4._value_list, [3, 1, 0, 3, 4])
         self.assertEqual(result4._total_list, [])
 
+    def test_update_with_accumulate_performance(self):
+        # Scalars are only converted to a numpy array when the accumulated
+        # values are requested
+        result = Result('name', Result.SUMTYPE, accumulate_values=True)
+        for v in [3, 4.5, np.float64(2.0)]:
+            result.update(v)
+        # pylint: disable=W0212
+        self.assertIsNone(result._accumulated_values._data)
+        self.assertEqual(result.get_result_accumulated_values(),
+                         [3.0, 4.5, 2.0])
+
+        # Accumulating the values must not make update much slower (it
+        # should cost about as much as appending to a list)
+        def run_updates(accumulate_values):
+            r = Result('name', Result.SUMTYPE, accumulate_values)
+            for _ in range(10000):
+                r.update(3)
+
+        time_no_accumulate = min(
+            timeit.repeat(lambda: run_updates(False), number=1, repeat=3))
+        time_accumulate = min(
+            timeit.repeat(lambda: run_updates(True), number=1, repeat=3))
+        self.assertLess(time_accumulate, 2 * time_no_accumulate)
+
+    def test_update_with_accumulate_array_values(self):
+        # Each update must be accumulated as a single element, even if the
+        # updated values are numpy arrays
+        result = Result('name', Result.SUMTYPE, accumulate_values=True)
+        result.update(np.array([1., 2.]))
+        result.update(np.array([3., 4.]))
+        accumulated_values = result.get_result_accumulated_values()
+        self.assertIsInstance(accumulated_values, list)
+        self.assertEqual(len(accumulated_values), result.num_updates)
+        np.testing.assert_array_equal(accumulated_values[0], [1., 2.])
+        np.testing.assert_array_equal(accumulated_values[1], [3., 4.])
+
+        # Strings and values with different shapes are returned as they
+        # were accumulated
+        result2 = Result('name', Result.MISCTYPE, accumulate_values=True)
+        result2.update("some string")
+        result2.update("other string")
+        self.assertEqual(result2.get_result_accumulated_values(),
+                         ["some string", "other string"])
+        result2.update(np.array([5., 6., 7.]))
+        accumulated_values = result2.get_result_accumulated_values()
+        self.assertEqual(len(accumulated_values), 3)
+        np.testing.assert_array_equal(accumulated_values[2], [5., 6., 7.])
+
+        # The accumulated values survive the conversion to columns (used
+        # to save the results)
+        result3 = Result('name', Result.MISCTYPE, accumulate_values=True)
+        result3.update(np.array([1., 2.]))
+        (columns, meta) = Result._results_to_columns([result3, result3])
+        (r1, r2) = Result._results_from_columns('name', meta,
+                                                columns.__getitem__)
+        self.assertEqual(len(r2.get_result_accumulated_values()), 1)
+        np.testing.assert_array_equal(r2.get_result_accumulated_values()[0],
+                                      [1., 2.])
+
+    def test_update_many(self):
+        values = np.array([3, 9, 12, 5])
+        totals = np.array([4, 36, 8, 10])
+
+        # xxxxxxxxxx SUMTYPE and RATIOTYPE xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        for update_type in [Result.SUMTYPE, Result.RATIOTYPE]:
+            result = Result('name', update_type, accumulate_values=True)
+            result_many = Result('name', update_type, accumulate_values=True)
+            for v, t in zip(values, totals):
+                result.update(v, t)
+            result_many.update(13, 20)
+            result_many.update_many(values[:0], totals[:0])
+            self.assertEqual(result_many.num_updates, 1)
+            result_many.update_many(values, totals)
+            result.update(13, 20)
+
+            self.assertEqual(result_many.num_updates, 5)
+            self.assertEqual(result_many._value, result._value + 0)
+            self.assertEqual(result_many.get_result(), result.get_result())
+            self.assertAlmostEqual(result_many._result_sum,
+                                   result._result_sum)
+            self.assertAlmostEqual(result_many._result_squared_sum,
+                                   result._result_squared_sum)
+            self.assertEqual(sorted(result_many._value_list),
+                             sorted(result._value_list))
+            self.assertEqual(sorted(result_many._total_list),
+                             sorted(result._total_list))
+
+        with self.assertRaises(ValueError):
+            self.result2.update_many(values)
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx MISCTYPE xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        self.result3.update_many(["First", "Second"])
+        self.assertEqual(self.result3.get_result(), "Second")
+        self.assertEqual(self.result3.num_updates, 2)
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx CHOICETYPE xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+        self.result4.update_many([0, 1, 0, 4])
+        np.testing.assert_array_almost_equal(
+            self.result4.get_result(), [.5, .25, 0, 0, .25, 0])
+        with self.assertRaises(IndexError):
+            self.result4.update_many([2, 8])
+        with self.assertRaises(AssertionError):
+            self.result4.update_many([3.4])
+
+    def test_update_many_bool_and_int_values(self):
+        # update_many must be equivalent to many calls to update
+        for values in [np.array([True, True, False]), np.array([3, 9, 12])]:
+            result = Result('name', Result.SUMTYPE)
+            result_many = Result('name', Result.SUMTYPE)
+            for v in values:
+                result.update(v)
+            result_many.update_many(values)
+
+            self.assertEqual(result_many.get_result(), result.get_result())
+            self.assertAlmostEqual(result_many._result_sum,
+                                   result._result_sum)
+            self.assertAlmostEqual(result_many._result_squared_sum,
+                                   result._result_squared_sum)
+            self.assertAlmostEqual(result_many.get_result_var(),
+                                   result.get_result_var())
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+    def test_pickle_with_accumulate(self):
+        import pickle
+        result = Result('name', Result.RATIOTYPE, accumulate_values=True)
+        result.update_many(np.arange(100), np.arange(100) + 1)
+        result2 = pickle.loads(pickle.dumps(result))
+        self.assertEqual(result, result2)
+        result2.update(3, 4)
+        self.assertEqual(result2.num_updates, 101)
+        self.assertEqual(result2._value_list[-1], 3)
+
     def test_create(self):
         r1 = Result.create(name='nome1',
                            update_type=Result.SUMTYPE,
@@ -1587,6 +1723,37 @@ class ResultTestCase(unittest.TestCase):
         expected_var2 = aux2.var()
         self.assertAlmostEqual(result2.get_result_var(), expected_var2)
 
+    def test_get_result_var_numerical_stability(self):
+        # Results with a large mean and a small variance. Calculating the
+        # variance as E[x^2] - E[x]^2 loses all precision here.
+        np.random.seed(42)
+        values = 1e9 + np.random.rand(1000)
+        result = Result('name', Result.SUMTYPE)
+        for v in values[:300]:
+            result.update(v)
+
+        # Merge results obtained in "shards"
+        other1 = Result('name', Result.SUMTYPE)
+        other1.update_many(values[300:700])
+        other2 = Result('name', Result.SUMTYPE)
+        for v in values[700:]:
+            other2.update(v)
+        result.merge(other1)
+        result.merge(other2)
+
+        self.assertEqual(result.num_updates, 1000)
+        self.assertAlmostEqual(result.get_result_mean() / values.mean(), 1.0)
+        self.assertAlmostEqual(result.get_result_var() / values.var(), 1.0,
+                               places=6)
+
+        # Results loaded from old files only have the sum and squared sum
+        d = result.to_dict()
+        del d['result_mean']
+        del d['result_m2']
+        old_result = Result.from_dict(d)
+        self.assertAlmostEqual(
+            old_result.get_result_mean() / result.get_result_mean(), 1.0)
+
     def test_representation(self):
         self.assertEqual(self.result1.__repr__(),
                          "Result -> name: Nothing yet")
@@ -2182,6 +2349,152 @@ class SimulationResultsTestCase(unittest.TestCase):
         delete_file_if_possible(filename_json)
         # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
 
+    def test_save_to_and_load_from_columnar_file(self):
+        base_filename = 'results_({age})_({factor})'
+
+        # Set simulation parameters
+        self.simresults.params.add('factor', [0.5, 0.6])
+        self.simresults.params.add('age', 3)
+        self.simresults.params.set_unpack_parameter('factor')
+        self.simresults.runned_reps = [2, 1]
+
+        # Add a second Result for each name (one for each variation)
+        self.simresults.append_all_results(self.other_simresults)
+        self.simresults.add_new_result('lili', Result.MISCTYPE, "a string")
+        self.simresults.append_result(
+            Result.create('lili', Result.MISCTYPE, "other string"))
+
+        # xxxxx Add a result with accumulate set to True xxxxxxxxxxxxxxxxxx
+        result_acu = Result('name', Result.RATIOTYPE, accumulate_values=True)
+        result_acu.update(13, 15)
+        result_acu.update(30, 43)
+        result_acu2 = Result('name', Result.RATIOTYPE, accumulate_values=True)
+        result_acu2.update(1, 5)
+        self.simresults.add_result(result_acu)
+        self.simresults.append_result(result_acu2)
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        extensions = ['.npz']
+        try:
+            import h5py
+            del h5py
+            extensions.append('.h5')
+        except ImportError:  # pragma: no cover
+            pass
+
+        for ext in extensions:
+            filename = self.simresults.save_to_file(base_filename + ext)
+            simresults2 = SimulationResults.load_from_file(filename)
+
+            # Getting the values only reads the required columns and no
+            # Result object is created
+            for name in ['lala', 'lele', 'lili', 'name']:
+                self.assertEqual(
+                    simresults2.get_result_values_list(name),
+                    self.simresults.get_result_values_list(name))
+            np.testing.assert_array_almost_equal(
+                simresults2.get_result_values_list('lulu'),
+                self.simresults.get_result_values_list('lulu'))
+            self.assertEqual(
+                simresults2.get_result_values_list(
+                    'lala', fixed_params={'factor': 0.6}),
+                [30])
+            # pylint: disable=W0212
+            self.assertEqual(len(simresults2._results._loaded), 0)
+
+            self.assertEqual(simresults2, self.simresults)
+            self.assertEqual(simresults2.original_filename,
+                             base_filename + ext)
+            self.assertEqual(simresults2.runned_reps, [2, 1])
+            self.assertEqual(simresults2.params, self.simresults.params)
+            self.assertEqual(simresults2['name'][0]._value_list, [13, 30])
+            self.assertEqual(simresults2['name'][0]._total_list, [15, 43])
+            self.assertEqual(simresults2['name'][1]._value_list, [1])
+            self.assertAlmostEqual(simresults2['lele'][0].get_result_var(),
+                                   self.simresults['lele'][0].get_result_var())
+
+            # When pickled, all Result objects are loaded
+            simresults3 = pickle.loads(pickle.dumps(simresults2))
+            self.assertEqual(simresults3, self.simresults)
+
+            # Delete the where the results were saved
+            delete_file_if_possible(filename)
+
+    def test_save_to_and_load_from_columnar_hdf5_file(self):
+        try:
+            import h5py
+        except ImportError:  # pragma: no cover
+            self.skipTest("The h5py module is not installed")
+
+        # Set simulation parameters
+        self.simresults.params.add('factor', [0.5, 0.6])
+        self.simresults.params.add('age', 3)
+        self.simresults.params.set_unpack_parameter('factor')
+        self.simresults.runned_reps = [2, 1]
+        self.simresults.append_all_results(self.other_simresults)
+        self.simresults.add_new_result('lili', Result.MISCTYPE, "a string")
+        self.simresults.append_result(
+            Result.create('lili', Result.MISCTYPE, "other string"))
+        choice = Result('choice', Result.CHOICETYPE, choice_num=3)
+        choice.update(2)
+        choice.update(0)
+        choice2 = Result('choice', Result.CHOICETYPE, choice_num=3)
+        choice2.update(1)
+        self.simresults.add_result(choice)
+        self.simresults.append_result(choice2)
+        result_acu = Result('name', Result.RATIOTYPE, accumulate_values=True)
+        result_acu.update(13, 15)
+        result_acu.update(30, 43)
+        result_acu2 = Result('name', Result.RATIOTYPE, accumulate_values=True)
+        result_acu2.update(1, 5)
+        self.simresults.add_result(result_acu)
+        self.simresults.append_result(result_acu2)
+
+        filename = self.simresults.save_to_file(
+            'results_columnar_({age}).h5')
+        self.assertEqual(filename, 'results_columnar_(3).h5')
+
+        # Each Result attribute is stored as a separated dataset
+        with h5py.File(filename, 'r') as fid:
+            self.assertEqual(fid.attrs['TITLE'], "Simulation Results file")
+            self.assertIn('metadata', fid.attrs)
+            self.assertGreater(len(fid.keys()), 0)
+        del h5py
+
+        simresults2 = SimulationResults.load_from_file(filename)
+        # Getting the values only reads the required datasets and no
+        # Result object is created
+        for name in ['lala', 'lele', 'lili', 'name']:
+            self.assertEqual(simresults2.get_result_values_list(name),
+                             self.simresults.get_result_values_list(name))
+        self.assertEqual(
+            simresults2.get_result_values_list(
+                'lala', fixed_params={'factor': 0.6}),
+            [30])
+        # pylint: disable=W0212
+        self.assertEqual(len(simresults2._results._loaded), 0)
+
+        self.assertEqual(simresults2, self.simresults)
+        self.assertEqual(simresults2.params, self.simresults.params)
+        self.assertEqual(simresults2.runned_reps, [2, 1])
+        np.testing.assert_array_equal(simresults2['choice'][0]._value,
+                                      [1, 0, 1])
+        np.testing.assert_array_almost_equal(
+            simresults2['choice'][1].get_result(), [0, 1, 0])
+        self.assertEqual(simresults2['name'][0]._value_list, [13, 30])
+        self.assertEqual(simresults2['name'][0]._total_list, [15, 43])
+        self.assertEqual(simresults2['name'][1]._value_list, [1])
+        self.assertEqual(simresults2['lili'][1].get_result(), "other string")
+        self.assertAlmostEqual(simresults2['lele'][0].get_result_var(),
+                               self.simresults['lele'][0].get_result_var())
+
+        # The loaded results can be saved again to the same file
+        simresults2.save_to_file(filename)
+        simresults3 = SimulationResults.load_from_file(filename)
+        self.assertEqual(simresults3, self.simresults)
+
+        delete_file_if_possible(filename)
+
     # def test_save_to_and_load_from_hdf5_file(self):
     #     base_filename = 'results_({age})_({temperature})_({factor})'
 
@@ -2468,6 +2781,92 @@ class _DummyRunnerRandom(SimulationRunner):  # pragma: no cover
         return sim_results
 
 
+class _DummyRunnerShards(SimulationRunner):
+    def __init__(self):
+        SimulationRunner.__init__(self, read_command_line_args=False)
+        self.rep_max = 250
+        self.update_progress_function_style = None
+        self.params.add('P', np.array([2., 4.]))
+        self.params.set_unpack_parameter('P')
+        self.num_rep_workers = 3
+        self.reps_per_shard = 20
+        self.rep_workers_seed = 1234
+        # Stop a variation as soon as at least this number of repetitions
+        # were simulated
+        self.stop_after = None
+
+    def _keep_going(self, current_params, current_sim_results, current_rep):
+        if self.stop_after is None:
+            return True
+        return current_sim_results['count'][-1].get_result() < self.stop_after
+
+    def _run_simulation(self, current_params):
+        sim_results = SimulationResults()
+        sim_results.add_new_result('count', Result.SUMTYPE, 1)
+        sim_results.add_new_result('random', Result.RATIOTYPE,
+                                   current_params['P'] * np.random.rand(), 1)
+        return sim_results
+
+
+class _DummyRunnerShardsWithCheckpoints(_DummyRunnerShards):
+    def __init__(self):
+        _DummyRunnerShards.__init__(self)
+        self.params.add('P', np.array([2.]))
+        self.partial_results_save_reps = 100
+        self.delete_partial_results_bool = True
+        # Value of current_rep each time the partial results are saved
+        self.saved_reps = []
+
+    # pylint: disable=W0221
+    def _SimulationRunner__save_partial_results(self, current_rep,
+                                                *args, **kwargs):
+        self.saved_reps.append(current_rep)
+        SimulationRunner._SimulationRunner__save_partial_results(
+            self, current_rep, *args, **kwargs)
+
+
+class _DummyRunnerBatch(SimulationRunner):
+    def __init__(self):
+        SimulationRunner.__init__(self, read_command_line_args=False)
+        self.rep_max = 1234
+        self.reps_per_batch = 100
+        self.update_progress_function_style = None
+        self.params.add('P', np.array([2., 4.]))
+        self.params.set_unpack_parameter('P')
+        # Number of times _run_simulation_batch was called
+        self.num_batches = 0
+
+    def _keep_going(self, current_params, current_sim_results, current_rep):
+        # The 'count' Result must always be equal to current_rep
+        assert current_sim_results['count'][-1].get_result() == current_rep
+        return True
+
+    def _run_simulation_batch(self, current_params, num_reps):
+        self.num_batches += 1
+        sim_results = SimulationResults()
+        sim_results.add_new_result('count', Result.SUMTYPE, num_reps)
+        sim_results.add_new_result('value', Result.RATIOTYPE,
+                                   current_params['P'] * num_reps, num_reps)
+        return sim_results
+
+
+class _DummyRunnerBatchWithSkip(_DummyRunnerBatch):
+    def __init__(self):
+        _DummyRunnerBatch.__init__(self)
+        self.params.add('P', np.array([2.]))
+        # Number of times _run_simulation_batch was called, including the
+        # skipped batches
+        self.num_calls = 0
+
+    def _run_simulation_batch(self, current_params, num_reps):
+        # The second batch is skipped (the first one cannot be skipped)
+        self.num_calls += 1
+        if self.num_calls == 2:
+            raise SkipThisOne('Skipping this batch')
+        return _DummyRunnerBatch._run_simulation_batch(
+            self, current_params, num_reps)
+
+
 # Define a _DummyRunnerWithSkip class for the testing the simulate when a
 # SkipThisOne exception is raised in the implemented _run_simulation
 # method.
@@ -2655,6 +3054,77 @@ class SimulationRunnerTestCase(unittest.TestCase):
         # Delete the pickle files in the same folder
         _delete_pickle_files()
 
+    def test_partial_results_journal(self):
+        filename = 'journal_results_unpack_1.pickle'
+        journal_filename = 'journal_results_unpack_1.pickle.journal'
+        journal = _PartialResultsJournal(filename, compaction_interval=3)
+
+        def new_results(value):
+            results = SimulationResults()
+            results.add_new_result('lala', Result.SUMTYPE, value)
+            return results
+
+        # The first save writes the complete results
+        current_sim_results = new_results(1)
+        journal.add(current_sim_results)
+        journal.save(1, current_sim_results)
+        self.assertFalse(os.path.exists(journal_filename))
+
+        # The next saves only append the new results to the journal
+        for rep in range(2, 4):
+            current_sim_results.merge_all_results(new_results(rep))
+            journal.add(new_results(rep))
+            journal.save(rep, current_sim_results)
+        self.assertTrue(os.path.exists(journal_filename))
+        # The partial results file can still be loaded as usual, but it
+        # only has the results of the first save
+        self.assertEqual(
+            SimulationResults.load_from_file(filename)['lala'][0].get_result(),
+            1)
+
+        loaded = _PartialResultsJournal(filename).load()
+        self.assertEqual(loaded.current_rep, 3)
+        self.assertEqual(loaded['lala'][0].get_result(), 6)
+
+        # A truncated delta (process killed while appending it) is ignored
+        with open(journal_filename, 'ab') as fid:
+            fid.write(b'\x10\x00\x00\x00')
+        loaded = _PartialResultsJournal(filename).load()
+        self.assertEqual(loaded.current_rep, 3)
+        self.assertEqual(loaded['lala'][0].get_result(), 6)
+
+        # Deltas already in the partial results file are ignored (process
+        # killed after the compaction, but before removing the journal)
+        with open(journal_filename, 'rb') as fid:
+            old_journal = fid.read()
+        journal.save(3, current_sim_results, compact=True)
+        self.assertFalse(os.path.exists(journal_filename))
+        with open(journal_filename, 'wb') as fid:
+            fid.write(old_journal)
+        journal = _PartialResultsJournal(filename, compaction_interval=3)
+        loaded = journal.load()
+        self.assertEqual(loaded.current_rep, 3)
+        self.assertEqual(loaded['lala'][0].get_result(), 6)
+
+        # New deltas are appended after the old ones
+        loaded.merge_all_results(new_results(4))
+        journal.add(new_results(4))
+        journal.save(4, loaded)
+        self.assertEqual(
+            _PartialResultsJournal(filename).load()['lala'][0].get_result(),
+            10)
+
+        # Since the journal has now 3 deltas the next save compacts it
+        loaded.merge_all_results(new_results(5))
+        journal.add(new_results(5))
+        journal.save(5, loaded)
+        self.assertFalse(os.path.exists(journal_filename))
+        self.assertEqual(
+            SimulationResults.load_from_file(filename)['lala'][0].get_result(),
+            15)
+
+        delete_file_if_possible(filename)
+
     def test_simulate_with_param_variation_index(self):
         # Test the "simulate" method when the param_variation_index
         # argument is specified.
@@ -2690,6 +3160,159 @@ class SimulationRunnerTestCase(unittest.TestCase):
 
         _delete_pickle_files()
 
+    def test_simulate_in_parallel_with_process_pool(self):
+        sim_runner = _DummyRunner()
+
+        # xxxxxxxxxx Set the name of the results file xxxxxxxxxxxxxxxxxxxxx
+        filename = 'runner_pool_results_bias_{bias}.pickle'
+        sim_runner.set_results_filename(filename)
+        _delete_pickle_files()
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # The variations are simulated in a pool of local processes
+        sim_runner.simulate_in_parallel(view=ProcessPoolView(max_workers=2))
+
+        results_extra_1 = sim_runner.results.get_result_values_list(
+            'lala', {'extra': 2.2})
+        expected_results_extra_1 = [3.5, 9.5, 15.5, 21.5, 27.5]
+        np.testing.assert_array_almost_equal(
+            results_extra_1, expected_results_extra_1)
+
+        results_extra_2 = sim_runner.results.get_result_values_list(
+            'lala', {'extra': 4.1})
+        expected_results_extra_2 = [5.4, 11.4, 17.4, 23.4, 29.4]
+        np.testing.assert_array_almost_equal(
+            results_extra_2, expected_results_extra_2)
+        self.assertEqual(sim_runner.runned_reps, [2] * 10)
+
+        # xxxxxxxxxx Test if the results were saved correctly xxxxxxxxxxxxx
+        sim_results = SimulationResults.load_from_file(
+            sim_runner.results_filename)
+        self.assertEqual(sim_results, sim_runner.results)
+        # The partial results should have been deleted
+        self.assertEqual(glob.glob('./partial_results/*.pickle'), [])
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx Compare with the serial simulation xxxxxxxxxxxxxxxxxxx
+        runner2 = _DummyRunner()
+        runner2.simulate()
+        self.assertEqual(sim_runner.results['lala'], runner2.results['lala'])
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        # xxxxxxxxxx Repeat the test with wrong partial results xxxxxxxxxxx
+        runner3 = _DummyRunner()
+        runner3.set_results_filename('runner3_pool_results')
+        runner3.delete_partial_results_bool = False
+        runner3.simulate_in_parallel()
+        runner3.params.add('bias', 1.5)
+
+        # The exception raised in the worker process is raised again in the
+        # main process
+        with self.assertRaises(ValueError):
+            runner3.simulate_in_parallel()
+        # xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx
+
+        _delete_pickle_files()
+
+    def test_simulate_with_batches(self):
+        dummyrunner = _DummyRunnerBatch()
+        dummyrunner.simulate()
+        self.assertEqual(dummyrunner.runned_reps, [1234, 1234])
+        self.assertEqual(
+            dummyrunner.results.get_result_values_list('count'), [1234, 1234])
+        self.assertEqual(
+            dummyrunner.results.get_result_values_list('value'), [2.0, 4.0])
+        # 12 batches of 100 repetitions plus one batch of 34 repetitions
+        # for each variation
+        self.assertEqual(dummyrunner.num_batches, 26)
+
+        # The default implementation of _run_simulation_batch calls
+        # _run_simulation many times
+        dummyrunner2 = _DummyRunner()
+        dummyrunner2.rep_max = 11
+        dummyrunner2.reps_per_batch = 4
+        dummyrunner2.simulate()
+        self.assertEqual(dummyrunner2.runned_reps, [11] * 10)
+        self.assertEqual(
+            [r.num_updates for r in dummyrunner2.results['lala']], [11] * 10)
+
+    def test_simulate_with_batches_and_skipthisone(self):
+        # A skipped batch is counted as 'reps_per_batch' skipped
+        # repetitions
+        dummyrunner = _DummyRunnerBatchWithSkip()
+        dummyrunner.simulate()
+        self.assertEqual(dummyrunner.runned_reps, [1234])
+        self.assertEqual(
+            dummyrunner.results.get_result_values_list('count'), [1234])
+        self.assertEqual(
+            dummyrunner.results.get_result_values_list('num_skipped_reps'),
+            [100])
+
+    def test_simulate_with_confidence_interval_stop(self):
+        dummyrunner = _DummyRunnerShards()
+        dummyrunner.num_rep_workers = 1
+        dummyrunner.rep_max = 1000
+        dummyrunner.ci_stop_result_name = 'random'
+        dummyrunner.ci_stop_relative_width = 0.3
+        dummyrunner.simulate()
+
+        for reps, result in zip(dummyrunner.runned_reps,
+                                dummyrunner.results['random']):
+            self.assertGreaterEqual(reps, dummyrunner.ci_stop_min_reps)
+            self.assertLess(reps, 1000)
+            interval = result.get_confidence_interval(95)
+            self.assertLess((interval[1] - interval[0]) /
+                            result.get_result_mean(), 0.3)
+
+        # Without a result name the stop criterion is not used
+        dummyrunner2 = _DummyRunnerShards()
+        dummyrunner2.num_rep_workers = 1
+        dummyrunner2.simulate()
+        self.assertEqual(dummyrunner2.runned_reps, [250, 250])
+
+    def test_simulate_with_rep_workers(self):
+        dummyrunner = _DummyRunnerShards()
+        dummyrunner.simulate()
+        self.assertEqual(dummyrunner.runned_reps, [250, 250])
+        self.assertEqual(
+            dummyrunner.results.get_result_values_list('count'), [250, 250])
+        self.assertEqual(
+            dummyrunner.results['num_skipped_reps'][0].get_result(), 0)
+        # Each shard uses a different seed and thus the random values are
+        # (statistically) uniformly distributed between 0 and P
+        np.testing.assert_array_almost_equal(
+            dummyrunner.results.get_result_values_list('random'),
+            [1.0, 2.0], decimal=0)
+        values = dummyrunner.results['random'][0]
+        self.assertGreater(values.get_result_var(), 0.1)
+
+        # _keep_going is checked with the merged results of the shards
+        dummyrunner3 = _DummyRunnerShards()
+        dummyrunner3.stop_after = 50
+        dummyrunner3.simulate()
+        for reps in dummyrunner3.runned_reps:
+            self.assertGreaterEqual(reps, 50)
+            self.assertLess(reps, 250)
+
+    def test_simulate_with_rep_workers_saves_partial_results(self):
+        # The partial results are saved each `partial_results_save_reps`
+        # repetitions, and not only each 5 minutes
+        dummyrunner = _DummyRunnerShardsWithCheckpoints()
+        dummyrunner.set_results_filename('dummyrunnershards_results')
+        dummyrunner.simulate()
+        self.assertEqual(dummyrunner.runned_reps, [250])
+        # Each save happens as soon as the shards that crossed a multiple
+        # of 100 repetitions are merged (more than one shard can finish at
+        # the same time). The last one is the save at the end of the
+        # variation.
+        max_delay = dummyrunner.num_rep_workers * dummyrunner.reps_per_shard
+        self.assertEqual(len(dummyrunner.saved_reps), 3)
+        self.assertTrue(100 <= dummyrunner.saved_reps[0] < 100 + max_delay)
+        self.assertTrue(200 <= dummyrunner.saved_reps[1] <= 250)
+        self.assertEqual(dummyrunner.saved_reps[2], 250)
+
+        _delete_pickle_files()
+
     # This test method is normally skipped, unless you have started an
     # IPython cluster with a "tests" profile so that you have at least one
     # engine running.